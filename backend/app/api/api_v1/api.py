@@ -1,6 +1,6 @@
 from fastapi import APIRouter
 
-from app.api.api_v1.endpoints import auth, users, children
+from app.api.api_v1.endpoints import auth, users, children, sessions, messages, admin
 
 # Create main API router
 api_router = APIRouter()
@@ -9,5 +9,22 @@ api_router = APIRouter()
 api_router.include_router(auth.router, prefix="/auth", tags=["authentication"])
 api_router.include_router(users.router, prefix="/users", tags=["users"])
 api_router.include_router(children.router, prefix="/children", tags=["children"])
+api_router.include_router(sessions.router, prefix="/sessions", tags=["sessions"])
+api_router.include_router(messages.router, prefix="/messages", tags=["messages"])
+api_router.include_router(admin.router, prefix="/admin", tags=["admin"])
 
 # Additional routers will be added in later phases (sessions, quizzes, etc.)
+
+
+def build_ai_router() -> APIRouter:
+    """
+    Build the router for AI-backed endpoint groups (chat, quiz generation).
+    Endpoint modules are imported here instead of at module level, so that
+    apps built with AI features disabled never import them or their
+    LLM dependencies.
+    """
+    from app.api.api_v1.endpoints import tutor
+    
+    ai_router = APIRouter()
+    ai_router.include_router(tutor.router, prefix="/sessions", tags=["tutor"])
+    return ai_router
@@ -0,0 +1,394 @@
+import json
+import logging
+from typing import Any, Callable, Dict, Iterator
+
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Request, status
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from sqlalchemy.orm import Session
+
+from app import models
+from app.api import deps
+from app.core.config import settings
+from app.core.profiling import profile_store
+from app.db.slow_query import slow_query_log
+from app.services import provisioning
+from app.services.coalescing import llm_flights
+from app.services.embedding import embedding_batcher
+from app.services.prompts import prompt_registry
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+_BULK_RESPONSES: Dict[int, Dict[str, Any]] = {
+    200: {
+        "description": (
+            "One NDJSON result line per uploaded row, then a summary line, or an "
+            "error line if provisioning stopped on an unexpected error"
+        ),
+        "content": {
+            "application/x-ndjson": {
+                "example": (
+                    '{"line": 1, "status": "created", "id": "3fa85f64-5717-4562-b3fc-2c963f66afa6", '
+                    '"email": "parent@example.com"}\n'
+                    '{"line": 2, "status": "error", "detail": "Invalid JSON: Expecting value"}\n'
+                    '{"summary": {"rows": 2, "created": 1, "updated": 0, "failed": 1, '
+                    '"elapsed_seconds": 0.41, "rows_per_second": 4.9}}\n'
+                )
+            }
+        },
+    },
+    401: {"description": "Not authenticated"},
+    403: {"description": "Not enough permissions"},
+    413: {"description": "Upload larger than BULK_PROVISION_MAX_UPLOAD_BYTES"},
+    415: {"description": "Body is neither NDJSON nor CSV"},
+}
+
+
+async def _read_upload(request: Request) -> Iterator[provisioning.RawRow]:
+    """
+    Read and parse the request body according to its content type.
+    """
+    media_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    body = await request.body()
+    if len(body) > settings.BULK_PROVISION_MAX_UPLOAD_BYTES:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail="Upload too large, split it into several requests",
+        )
+    try:
+        return provisioning.parse_upload(body, media_type)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, detail=str(exc))
+    except UnicodeDecodeError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Upload must be UTF-8 encoded"
+        )
+
+
+def _stream_results(
+    provision: Callable[..., Iterator[Dict[str, Any]]],
+    db: Session,
+    rows: Iterator[provisioning.RawRow],
+) -> StreamingResponse:
+    """
+    Stream provisioning results as NDJSON while later chunks are still being written.
+
+    The status line is already sent, so an unexpected error ends the stream
+    with an {"error": ...} line instead of a summary.
+    """
+    def lines() -> Iterator[str]:
+        try:
+            for result in provision(db, rows):
+                yield json.dumps(result, default=str) + "\n"
+        except Exception:
+            logger.exception("Bulk provisioning stopped")
+            db.rollback()
+            yield json.dumps({"error": "Provisioning stopped; rows without a result were not processed"}) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+@router.post(
+    "/users/bulk",
+    summary="Bulk provision parent accounts",
+    description=(
+        "Create or update parent accounts from an NDJSON or CSV upload with "
+        "`email`, `name`, `password` and optional `is_active` fields. Existing "
+        "emails are updated and keep their password, and their active flag "
+        "when `is_active` is omitted; superuser accounts are never changed. "
+        "Superusers only."
+    ),
+    responses=_BULK_RESPONSES,
+)
+async def bulk_provision_users(
+    request: Request,
+    db: Session = Depends(deps.get_db),
+    current_user: models.User = Depends(deps.get_current_active_superuser),
+) -> Any:
+    """
+    Bulk create or update parent accounts.
+    """
+    rows = await _read_upload(request)
+    return _stream_results(provisioning.provision_users, db, rows)
+
+
+@router.post(
+    "/children/bulk",
+    summary="Bulk provision child profiles",
+    description=(
+        "Create child profiles from an NDJSON or CSV upload with `parent_email`, "
+        "`name`, `grade`, `subjects` and optional `learning_style` and "
+        "`preferences` fields. In CSV, subjects are separated by ';' and "
+        "preferences are a JSON object. Superusers only."
+    ),
+    responses=_BULK_RESPONSES,
+)
+async def bulk_provision_children(
+    request: Request,
+    db: Session = Depends(deps.get_db),
+    current_user: models.User = Depends(deps.get_current_active_superuser),
+) -> Any:
+    """
+    Bulk create child profiles for existing parent accounts.
+    """
+    rows = await _read_upload(request)
+    return _stream_results(provisioning.provision_children, db, rows)
+
+
+@router.get(
+    "/prompts/stats",
+    summary="Prompt template metrics",
+    description=(
+        "Render counts and times per prompt template and tutor prompt prefix "
+        "cache counters of the worker serving the request. Superusers only."
+    ),
+    responses={
+        200: {
+            "description": "Metrics since the worker started",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "templates": {
+                            "tutor_session": {"renders": 1200, "mean_us": 1.4, "max_us": 18.2}
+                        },
+                        "prefix_cache": {"size": 37, "hits": 1163, "misses": 37},
+                    }
+                }
+            },
+        },
+        401: {"description": "Not authenticated"},
+        403: {"description": "Not enough permissions"},
+    },
+)
+def read_prompt_stats(
+    current_user: models.User = Depends(deps.get_current_active_superuser),
+) -> Any:
+    """
+    Get prompt template render metrics of this worker.
+    """
+    return prompt_registry.stats()
+
+
+@router.get(
+    "/embeddings/stats",
+    summary="Embedding batcher metrics",
+    description=(
+        "Batch size and queue wait histograms of the embedding micro-batcher of "
+        "the worker serving the request. Superusers only."
+    ),
+    responses={
+        200: {
+            "description": "Metrics since the worker started",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "requests": 5210,
+                        "batches": 1304,
+                        "batched_requests": 5210,
+                        "texts_embedded": 5178,
+                        "failed_batches": 0,
+                        "mean_batch_size": 4.0,
+                        "max_wait_ms": 6.1,
+                        "batch_sizes": {
+                            "le_1": 310, "le_2": 201, "le_4": 380, "le_8": 413, "le_16": 0,
+                            "le_32": 0, "le_64": 0, "le_128": 0, "gt_max": 0,
+                        },
+                        "queue_wait": {
+                            "le_1ms": 1020, "le_2ms": 870, "le_5ms": 3300, "le_10ms": 20, "le_20ms": 0,
+                            "le_50ms": 0, "le_100ms": 0, "gt_max": 0,
+                        },
+                        "queued": 0,
+                    }
+                }
+            },
+        },
+        401: {"description": "Not authenticated"},
+        403: {"description": "Not enough permissions"},
+    },
+)
+def read_embedding_stats(
+    current_user: models.User = Depends(deps.get_current_active_superuser),
+) -> Any:
+    """
+    Get embedding batching metrics of this worker.
+    """
+    return embedding_batcher.stats()
+
+
+@router.get(
+    "/llm/coalescing",
+    summary="LLM request coalescing metrics",
+    description=(
+        "LLM calls made and calls saved by sharing an identical call already in "
+        "flight, on the worker serving the request. Superusers only."
+    ),
+    responses={
+        200: {
+            "description": "Metrics since the worker started",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "calls": 1840,
+                        "coalesced": 412,
+                        "coalesced_ratio": 0.1829,
+                        "cancelled": 3,
+                        "tokens_saved": 151330,
+                        "in_flight": 2,
+                    }
+                }
+            },
+        },
+        401: {"description": "Not authenticated"},
+        403: {"description": "Not enough permissions"},
+    },
+)
+def read_llm_coalescing_stats(
+    current_user: models.User = Depends(deps.get_current_active_superuser),
+) -> Any:
+    """
+    Get LLM request coalescing metrics of this worker.
+    """
+    return llm_flights.stats()
+
+
+@router.get(
+    "/slow-queries",
+    summary="Slow query log",
+    description=(
+        "Statements slower than `SLOW_QUERY_THRESHOLD_MS` on the worker serving the "
+        "request, newest first, with their SQL fingerprint, issuing CRUD method and "
+        "route, plus a summary per fingerprint ordered by total time. With "
+        "`SLOW_QUERY_EXPLAIN_ENABLED`, sampled SELECTs carry their "
+        "`EXPLAIN (ANALYZE, BUFFERS)` plan once captured. Superusers only."
+    ),
+    responses={
+        200: {
+            "description": "Contents of the ring buffer",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "threshold_ms": 200.0,
+                        "recorded": 14,
+                        "explained": 2,
+                        "fingerprints": [
+                            {
+                                "fingerprint": "5c1f0e9a7d3b2c41",
+                                "sql": "SELECT messages.id, messages.content FROM messages WHERE messages.session_id = ? ORDER BY messages.created_at",
+                                "count": 9,
+                                "total_ms": 3120.5,
+                                "max_ms": 611.2,
+                                "call_sites": ["crud_message.CRUDMessage.get_multi_by_session"],
+                                "routes": ["GET /api/v1/sessions/{session_id}/messages"],
+                            }
+                        ],
+                        "entries": [
+                            {
+                                "fingerprint": "5c1f0e9a7d3b2c41",
+                                "sql": "SELECT messages.id, messages.content FROM messages WHERE messages.session_id = ? ORDER BY messages.created_at",
+                                "duration_ms": 611.2,
+                                "at": "2026-10-19T09:30:12.402113",
+                                "call_site": "crud_message.CRUDMessage.get_multi_by_session",
+                                "route": "GET /api/v1/sessions/{session_id}/messages",
+                                "plan": [{"Plan": {"Node Type": "Seq Scan", "Actual Total Time": 598.1}}],
+                            }
+                        ],
+                    }
+                }
+            },
+        },
+        401: {"description": "Not authenticated"},
+        403: {"description": "Not enough permissions"},
+    },
+)
+def read_slow_queries(
+    limit: int = Query(50, ge=1, le=1000, description="Maximum number of entries to return"),
+    current_user: models.User = Depends(deps.get_current_active_superuser),
+) -> Any:
+    """
+    Get the slow query log of this worker.
+    """
+    return slow_query_log.snapshot(limit)
+
+
+@router.get(
+    "/profiles",
+    summary="List request profiles",
+    description=(
+        "Metadata of the newest stored request profiles, newest first. Profiles are "
+        "recorded for superuser requests sent with an `X-Profile` header (the response "
+        "carries the profile ID in `X-Profile-Id`) and for a `PROFILE_SAMPLE_RATE` "
+        "fraction of all requests. Superusers only."
+    ),
+    responses={
+        200: {
+            "description": "Profile metadata",
+            "content": {
+                "application/json": {
+                    "example": [
+                        {
+                            "id": "01928c5e-7b1a-7cc3-9a51-3f2d8e4b6a10",
+                            "method": "GET",
+                            "path": "/api/v1/children/",
+                            "status_code": 200,
+                            "trigger": "header",
+                            "started_at": "2026-10-19T09:30:12.402113",
+                            "duration_ms": 182.4,
+                            "samples": 36,
+                        }
+                    ]
+                }
+            },
+        },
+        401: {"description": "Not authenticated"},
+        403: {"description": "Not enough permissions"},
+    },
+)
+def list_profiles(
+    limit: int = Query(50, ge=1, le=500, description="Maximum number of profiles to return"),
+    current_user: models.User = Depends(deps.get_current_active_superuser),
+) -> Any:
+    """
+    List stored request profiles.
+    """
+    return profile_store.list(limit)
+
+
+@router.get(
+    "/profiles/{profile_id}",
+    summary="Get a request profile",
+    description=(
+        "Collapsed stacks of a stored profile, one `frame;frame;... count` line per "
+        "distinct stack with a sample every `PROFILE_SAMPLE_INTERVAL_MS`. Render it with "
+        "flamegraph.pl or speedscope. Superusers only."
+    ),
+    response_class=PlainTextResponse,
+    responses={
+        200: {
+            "description": "Collapsed stacks",
+            "content": {
+                "text/plain": {
+                    "example": (
+                        "loop;(idle) 21\n"
+                        "threadpool;run (threading.py);read_children (app/api/api_v1/endpoints/children.py);"
+                        "CRUDChild.get_multi_by_parent (app/crud/crud_child.py) 12\n"
+                    )
+                }
+            },
+        },
+        401: {"description": "Not authenticated"},
+        403: {"description": "Not enough permissions"},
+        404: {"description": "Profile not found"},
+    },
+)
+def read_profile(
+    profile_id: str = Path(..., description="ID from the X-Profile-Id response header"),
+    current_user: models.User = Depends(deps.get_current_active_superuser),
+) -> Any:
+    """
+    Get the collapsed stacks of a stored request profile.
+    """
+    collapsed = profile_store.get(profile_id)
+    if collapsed is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
+    return PlainTextResponse(collapsed)
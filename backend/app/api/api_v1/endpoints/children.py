@@ -1,11 +1,22 @@
-from typing import Any, List
+import json
+from typing import Any, Dict, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Path, Query, status
+from fastapi import APIRouter, Body, Depends, Header, HTTPException, Path, Query, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from uuid import UUID
 
 from app import crud, models, schemas
 from app.api import deps
+from app.api.caching import (
+    CACHE_CONTROL_PRIVATE_REVALIDATE,
+    compute_etag,
+    etag_matches,
+    not_modified,
+    set_cache_headers,
+)
+from app.services import history_export
+from app.services.skill import choose_difficulty
 
 router = APIRouter()
 
@@ -34,18 +45,59 @@ router = APIRouter()
                 }
             }
         },
+        304: {"description": "Not modified since the ETag given in If-None-Match"},
         401: {"description": "Not authenticated"}
     }
 )
 def read_children(
-    db: Session = Depends(deps.get_db),
+    response: Response,
+    db: Session = Depends(deps.get_read_db),
     skip: int = Query(0, description="Number of records to skip"),
     limit: int = Query(100, description="Maximum number of records to return"),
-    current_user: models.User = Depends(deps.get_current_user),
+    preference: List[str] = Query(
+        [],
+        description=(
+            "Filter by preference as key=value, e.g. response_style=concise (repeatable). "
+            "Values are read as JSON when they parse, e.g. show_hints=true or level=3; "
+            "quote them to match a string, e.g. level=\"3\""
+        ),
+    ),
+    if_none_match: Optional[str] = Header(None, description="ETag of a previously fetched list"),
+    current_user: models.User = Depends(deps.get_current_read_user),
 ) -> Any:
     """
     Retrieve children profiles for the authenticated user.
     """
+    preferences = {}
+    for item in preference:
+        key, sep, value = item.partition("=")
+        if not key or not sep:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="Preference filters must be in key=value format",
+            )
+        # Preferences are JSON, so "true" or "3" must match booleans and numbers
+        try:
+            preferences[key] = json.loads(value)
+        except ValueError:
+            preferences[key] = value
+    
+    # Validate the cached list with one aggregate query before loading any rows
+    count, last_updated = crud.child.get_list_version_by_parent(
+        db, parent_id=current_user.id, preferences=preferences
+    )
+    etag = compute_etag(
+        current_user.id, count, last_updated, skip, limit, sorted(preferences.items())
+    )
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag, CACHE_CONTROL_PRIVATE_REVALIDATE)
+    set_cache_headers(response, etag, CACHE_CONTROL_PRIVATE_REVALIDATE)
+    
+    if preferences:
+        return crud.child.get_multi_by_preferences(
+            db, preferences=preferences, parent_id=current_user.id, skip=skip, limit=limit
+        )
+    
     children = crud.child.get_multi_by_parent(
         db, parent_id=current_user.id, skip=skip, limit=limit
     )
@@ -126,20 +178,35 @@ def create_child(
                 }
             }
         },
+        304: {"description": "Not modified since the ETag given in If-None-Match"},
         401: {"description": "Not authenticated"},
         404: {"description": "Child profile not found or inaccessible"}
     }
 )
 def read_child(
     *,
-    db: Session = Depends(deps.get_db),
+    response: Response,
+    db: Session = Depends(deps.get_read_db),
     child_id: UUID = Path(..., description="The ID of the child to retrieve"),
-    current_user: models.User = Depends(deps.get_current_user),
+    if_none_match: Optional[str] = Header(None, description="ETag of a previously fetched profile"),
+    current_user: models.User = Depends(deps.get_current_read_user),
 ) -> Any:
     """
     Get a specific child profile by ID.
     """
-    # Get child and verify ownership
+    # Check ownership and freshness from updated_at alone before loading the row
+    updated_at = crud.child.get_version_by_id_and_parent(
+        db=db, id=child_id, parent_id=current_user.id
+    )
+    if updated_at is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Child profile not found or you don't have access to it",
+        )
+    etag = compute_etag(child_id, updated_at)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag, CACHE_CONTROL_PRIVATE_REVALIDATE)
+    
     child = crud.child.get_by_id_and_parent(
         db=db, id=child_id, parent_id=current_user.id
     )
@@ -148,9 +215,213 @@ def read_child(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Child profile not found or you don't have access to it",
         )
+    # Derive the ETag from the row actually returned, in case it changed in between
+    set_cache_headers(response, compute_etag(child.id, child.updated_at), CACHE_CONTROL_PRIVATE_REVALIDATE)
     return child
 
 
+@router.get(
+    "/{child_id}/skills",
+    response_model=List[schemas.SkillEstimate],
+    summary="Get child skill estimates",
+    description="Retrieve the child's estimated skill per subject and topic, with the difficulty of their next quiz",
+    responses={
+        200: {
+            "description": "Skill estimates ordered by subject and topic",
+            "content": {
+                "application/json": {
+                    "example": [
+                        {
+                            "subject": "Math",
+                            "topic": "Fractions",
+                            "rating": 0.84,
+                            "answers": 12,
+                            "last_answer_at": "2026-10-19T15:30:00",
+                            "recommended_difficulty": "medium"
+                        }
+                    ]
+                }
+            }
+        },
+        401: {"description": "Not authenticated"},
+        404: {"description": "Child profile not found or inaccessible"}
+    }
+)
+def read_child_skills(
+    *,
+    db: Session = Depends(deps.get_read_db),
+    child_id: UUID = Path(..., description="The ID of the child"),
+    current_user: models.User = Depends(deps.get_current_read_user),
+) -> Any:
+    """
+    Get the skill estimates of a specific child.
+    """
+    if crud.child.get_version_by_id_and_parent(db=db, id=child_id, parent_id=current_user.id) is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Child profile not found or you don't have access to it",
+        )
+    return [
+        schemas.SkillEstimate(
+            subject=estimate.subject,
+            topic=estimate.topic,
+            rating=estimate.rating,
+            answers=estimate.answers,
+            last_answer_at=estimate.last_answer_at,
+            recommended_difficulty=choose_difficulty(estimate.rating),
+        )
+        for estimate in crud.skill.get_by_child(db, child_id=child_id)
+    ]
+
+
+@router.get(
+    "/{child_id}/sessions/current",
+    response_model=schemas.Session,
+    summary="Get current session",
+    description="Retrieve the child's most recently started session that is still active",
+    responses={
+        200: {
+            "description": "The active session",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "id": "3fa85f64-5717-4562-b3fc-2c963f66afa6",
+                        "subject": "Science",
+                        "topic": "Volcanoes",
+                        "child_id": "3fa85f64-5717-4562-b3fc-2c963f66afa6",
+                        "status": "active",
+                        "ended_at": None,
+                        "created_at": "2026-10-19T15:30:00",
+                        "updated_at": "2026-10-19T15:30:00"
+                    }
+                }
+            }
+        },
+        401: {"description": "Not authenticated"},
+        404: {"description": "Child profile not found or inaccessible, or no active session"}
+    }
+)
+def read_current_session(
+    *,
+    db: Session = Depends(deps.get_read_db),
+    child_id: UUID = Path(..., description="The ID of the child"),
+    current_user: models.User = Depends(deps.get_current_read_user),
+) -> Any:
+    """
+    Get the active session of a specific child.
+    """
+    if crud.child.get_version_by_id_and_parent(db=db, id=child_id, parent_id=current_user.id) is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Child profile not found or you don't have access to it",
+        )
+    session = crud.session.get_active_by_child(db, child_id=child_id)
+    if session is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="The child has no active session",
+        )
+    return session
+
+
+@router.get(
+    "/{child_id}/progress",
+    response_model=List[schemas.SubjectProgress],
+    summary="Get child progress",
+    description="Retrieve the child's completed sessions, messages and minutes per subject",
+    responses={
+        200: {
+            "description": "Progress ordered by subject",
+            "content": {
+                "application/json": {
+                    "example": [
+                        {
+                            "subject": "Math",
+                            "sessions_completed": 7,
+                            "messages": 96,
+                            "minutes": 142.5,
+                            "last_session_at": "2026-10-19T15:30:00"
+                        }
+                    ]
+                }
+            }
+        },
+        401: {"description": "Not authenticated"},
+        404: {"description": "Child profile not found or inaccessible"}
+    }
+)
+def read_child_progress(
+    *,
+    db: Session = Depends(deps.get_read_db),
+    child_id: UUID = Path(..., description="The ID of the child"),
+    current_user: models.User = Depends(deps.get_current_read_user),
+) -> Any:
+    """
+    Get the per-subject progress of a specific child.
+    """
+    if crud.child.get_version_by_id_and_parent(db=db, id=child_id, parent_id=current_user.id) is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Child profile not found or you don't have access to it",
+        )
+    return crud.progress.get_by_child(db, child_id=child_id)
+
+
+@router.get(
+    "/{child_id}/export",
+    response_class=StreamingResponse,
+    summary="Export child learning history",
+    description=(
+        "Download everything the child has done: profile, sessions, messages (including "
+        "archived ones), quizzes, quiz attempts and answers. NDJSON has one object per "
+        "line with a `type` key; CSV has one row per record with the union of all fields. "
+        "The export is streamed with constant memory, optionally gzip-compressed."
+    ),
+    responses={
+        200: {
+            "description": "The history as a file download",
+            "content": {
+                "application/x-ndjson": {
+                    "example": (
+                        '{"type":"child","id":"3fa85f64-5717-4562-b3fc-2c963f66afa6","name":"Child Name",'
+                        '"grade":"3rd grade","subjects":["Math"],"learning_style":"Visual","created_at":"2026-09-01T10:00:00"}\n'
+                        '{"type":"message","id":"01928c5e-7b1a-7cc3-9a51-3f2d8e4b6a10","session_id":'
+                        '"01928c5e-6e02-7b41-8c0d-2a9f1e3b5c77","role":"user","content":"Why do volcanoes erupt?",'
+                        '"created_at":"2026-09-01T10:02:11"}\n'
+                    )
+                },
+                "text/csv": {},
+                "application/gzip": {},
+            },
+        },
+        401: {"description": "Not authenticated"},
+        404: {"description": "Child profile not found or inaccessible"}
+    }
+)
+def export_child_history(
+    *,
+    db: Session = Depends(deps.get_read_db),
+    child_id: UUID = Path(..., description="The ID of the child"),
+    export_format: str = Query("ndjson", alias="format", regex="^(ndjson|csv)$", description="ndjson or csv"),
+    gzip: bool = Query(False, description="Compress the download with gzip"),
+    current_user: models.User = Depends(deps.get_current_read_user),
+) -> Any:
+    """
+    Stream the full learning history of a specific child.
+    """
+    if crud.child.get_version_by_id_and_parent(db=db, id=child_id, parent_id=current_user.id) is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Child profile not found or you don't have access to it",
+        )
+    filename = f"history-{child_id}.{export_format}" + (".gz" if gzip else "")
+    return StreamingResponse(
+        history_export.export_history(child_id, export_format, gzip=gzip),
+        media_type="application/gzip" if gzip else history_export.MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
 @router.put(
     "/{child_id}", 
     response_model=schemas.Child,
@@ -212,6 +483,54 @@ def update_child(
     return updated_child
 
 
+@router.patch(
+    "/{child_id}/preferences",
+    response_model=schemas.Child,
+    summary="Partially update child preferences",
+    description="Merge the given keys into a child's preferences; keys set to null are removed",
+    responses={
+        200: {
+            "description": "Child preferences successfully updated",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "id": "3fa85f64-5717-4562-b3fc-2c963f66afa6",
+                        "name": "Child Name",
+                        "grade": "3rd grade",
+                        "subjects": ["Math", "Science"],
+                        "learning_style": "Visual",
+                        "preferences": {"response_style": "detailed", "examples_type": "real-world"},
+                        "parent_id": "3fa85f64-5717-4562-b3fc-2c963f66afa6"
+                    }
+                }
+            }
+        },
+        401: {"description": "Not authenticated"},
+        404: {"description": "Child profile not found or inaccessible"}
+    }
+)
+def patch_child_preferences(
+    *,
+    db: Session = Depends(deps.get_db),
+    child_id: UUID = Path(..., description="The ID of the child to update"),
+    patch: Dict[str, Any] = Body(..., example={"response_style": "detailed", "examples_type": None}),
+    current_user: models.User = Depends(deps.get_current_user),
+) -> Any:
+    """
+    Partially update a child's preferences.
+    """
+    # Ownership is enforced by the update itself
+    child = crud.child.patch_preferences(
+        db=db, id=child_id, parent_id=current_user.id, patch=patch
+    )
+    if not child:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Child profile not found or you don't have access to it",
+        )
+    return child
+
+
 @router.delete(
     "/{child_id}", 
     response_model=schemas.Child,
@@ -0,0 +1,69 @@
+from typing import Any, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+from uuid import UUID
+
+from app import crud, models, schemas
+from app.api import deps
+
+router = APIRouter()
+
+
+@router.get(
+    "/search",
+    response_model=schemas.MessageSearchPage,
+    summary="Search session messages",
+    description="Full-text search over the session messages of the authenticated parent's children",
+    responses={
+        200: {
+            "description": "Ranked page of matching messages with highlighted snippets",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "results": [
+                            {
+                                "id": "3fa85f64-5717-4562-b3fc-2c963f66afa6",
+                                "session_id": "3fa85f64-5717-4562-b3fc-2c963f66afa6",
+                                "child_id": "3fa85f64-5717-4562-b3fc-2c963f66afa6",
+                                "role": "user",
+                                "created_at": "2025-07-22T14:27:51",
+                                "rank": 0.1,
+                                "headline": "Why do <mark>volcanoes</mark> erupt?"
+                            }
+                        ],
+                        "next_cursor": "MC4xOjNmYTg1ZjY0LTU3MTctNDU2Mi1iM2ZjLTJjOTYzZjY2YWZhNg"
+                    }
+                }
+            }
+        },
+        400: {"description": "Invalid cursor"},
+        401: {"description": "Not authenticated"}
+    }
+)
+def search_messages(
+    db: Session = Depends(deps.get_read_db),
+    q: str = Query(..., min_length=1, description="Search text, e.g. 'fractions' or 'volcano -lava'"),
+    child_id: Optional[UUID] = Query(None, description="Restrict the search to one child"),
+    cursor: Optional[str] = Query(None, description="Cursor returned by the previous page"),
+    limit: int = Query(20, ge=1, le=100, description="Maximum number of results to return"),
+    current_user: models.User = Depends(deps.get_current_read_user),
+) -> Any:
+    """
+    Search messages across the authenticated parent's children.
+    """
+    try:
+        results, next_cursor = crud.message.search_by_parent(
+            db,
+            parent_id=current_user.id,
+            query=q,
+            child_id=child_id,
+            cursor=cursor,
+            limit=limit,
+        )
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(exc),
+        )
+    return {"results": results, "next_cursor": next_cursor}
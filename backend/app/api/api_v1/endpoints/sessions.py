@@ -0,0 +1,63 @@
+from typing import Any, List
+
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, status
+from sqlalchemy.orm import Session
+from uuid import UUID
+
+from app import crud, models, schemas
+from app.api import deps
+
+router = APIRouter()
+
+
+@router.get(
+    "/{session_id}/messages",
+    response_model=List[schemas.Message],
+    summary="List session messages",
+    description="Get the message history of a learning session, including archived messages",
+    responses={
+        200: {
+            "description": "Messages in chronological order",
+            "content": {
+                "application/json": {
+                    "example": [
+                        {
+                            "id": "3fa85f64-5717-4562-b3fc-2c963f66afa6",
+                            "content": "Why do volcanoes erupt?",
+                            "role": "user",
+                            "session_id": "3fa85f64-5717-4562-b3fc-2c963f66afa6",
+                            "created_at": "2025-07-22T14:27:51",
+                            "updated_at": "2025-07-22T14:27:51"
+                        }
+                    ]
+                }
+            }
+        },
+        401: {"description": "Not authenticated"},
+        404: {"description": "Session not found or inaccessible"}
+    }
+)
+def read_session_messages(
+    *,
+    db: Session = Depends(deps.get_read_db),
+    session_id: UUID = Path(..., description="The ID of the learning session"),
+    skip: int = Query(0, description="Number of records to skip"),
+    limit: int = Query(100, description="Maximum number of records to return"),
+    current_user: models.User = Depends(deps.get_current_read_user),
+) -> Any:
+    """
+    Get the message history of a learning session.
+    """
+    # Get session and verify ownership through the child
+    session = crud.session.get_by_id_and_parent(
+        db=db, id=session_id, parent_id=current_user.id
+    )
+    if not session:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Session not found or you don't have access to it",
+        )
+    
+    return crud.message.get_multi_by_session(
+        db, session_id=session_id, skip=skip, limit=limit
+    )
@@ -0,0 +1,312 @@
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Optional
+from uuid import UUID
+
+from fastapi import (
+    APIRouter,
+    Depends,
+    HTTPException,
+    Path,
+    Query,
+    WebSocket,
+    WebSocketDisconnect,
+    status,
+)
+from starlette.concurrency import run_in_threadpool
+from starlette.websockets import WebSocketState
+from sqlalchemy.orm import Session
+
+from app import crud, models, schemas
+from app.api import deps
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.session import SessionStatus
+from app.services.llm import LLMClient, get_llm_client
+from app.services.retrieval import reference_for
+from app.services.safety import content_filter, log_matches
+from app.services.tutor import TutorContext
+from app.services.usage import BudgetExceeded
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+# Errors raised when the client has gone away: Starlette's disconnect, and the
+# ASGI server's error for a send on a dropped connection (uvicorn's
+# ClientDisconnected is an OSError)
+_DISCONNECTED = (WebSocketDisconnect, OSError)
+
+
+def _load_context(db: Session, *, session_id: UUID, parent_id: UUID) -> TutorContext:
+    """
+    Load the tutoring context of an active session owned by the parent.
+
+    Raises:
+        HTTPException: 404 if the session is inaccessible, 409 if it has ended
+    """
+    session = crud.session.get_by_id_and_parent(db=db, id=session_id, parent_id=parent_id)
+    if not session:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Session not found or you don't have access to it",
+        )
+    if session.status != SessionStatus.ACTIVE:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Session has ended",
+        )
+    return TutorContext.load(db, session)
+
+
+@router.post(
+    "/{session_id}/chat",
+    response_model=schemas.Message,
+    summary="Send a chat message",
+    description=(
+        "Send the child's message to the AI tutor and get the full reply. "
+        "Prefer the WebSocket endpoint for streamed replies and multi-turn conversations."
+    ),
+    responses={
+        200: {
+            "description": "The tutor's reply",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "id": "3fa85f64-5717-4562-b3fc-2c963f66afa6",
+                        "content": "Volcanoes erupt when pressure from melted rock builds up...",
+                        "role": "assistant",
+                        "session_id": "3fa85f64-5717-4562-b3fc-2c963f66afa6",
+                        "created_at": "2025-07-22T14:27:53",
+                        "updated_at": "2025-07-22T14:27:53"
+                    }
+                }
+            }
+        },
+        401: {"description": "Not authenticated"},
+        404: {"description": "Session not found or inaccessible"},
+        409: {"description": "Session has ended"},
+        429: {"description": "Monthly AI usage budget reached"}
+    }
+)
+async def chat(
+    *,
+    db: Session = Depends(deps.get_db),
+    session_id: UUID = Path(..., description="The ID of the learning session"),
+    message_in: schemas.ChatMessageCreate,
+    current_user: models.User = Depends(deps.get_current_user),
+    llm: LLMClient = Depends(get_llm_client),
+) -> Any:
+    """
+    Send a chat message and wait for the complete reply.
+    """
+    context = await run_in_threadpool(
+        _load_context, db, session_id=session_id, parent_id=current_user.id
+    )
+    try:
+        reference = await reference_for(context, message_in.content)
+        response = await llm.chat(context.prompt(message_in.content, reference), parent_id=current_user.id)
+    except BudgetExceeded as exc:
+        raise HTTPException(status_code=status.HTTP_429_TOO_MANY_REQUESTS, detail=str(exc))
+    reply = response["choices"][0]["message"]["content"]
+    if settings.SAFETY_FILTER_ENABLED:
+        reply, checked = content_filter.filter_text(reply)
+        log_matches(context.session_id, checked)
+
+    user_row = context.append("user", message_in.content)
+    assistant_row = context.append("assistant", reply)
+    # Batched with other requests' messages; respond only once both are durable
+    for pending in [await crud.message.create_buffered_async(obj_in=row) for row in (user_row, assistant_row)]:
+        await pending
+    return {**assistant_row, "updated_at": assistant_row["created_at"]}
+
+
+def _open_connection(token: str, session_id: UUID) -> TutorContext:
+    """
+    Authenticate a WebSocket client and load its session context, using a
+    database session only for the duration of the handshake.
+    """
+    db = SessionLocal()
+    try:
+        user = deps._get_user_from_token(db, token)
+        return _load_context(db, session_id=session_id, parent_id=user.id)
+    finally:
+        db.close()
+
+
+class TutorConnection:
+    """
+    One tutoring WebSocket connection.
+
+    Frames are JSON objects with a "type". The client sends
+    {"type": "message", "content": ...} and answers server pings with
+    {"type": "pong"}. The server replies with "token" frames carrying reply
+    text, then {"type": "done", "message_id": ...} once both messages of the
+    turn have been persisted through the write-behind buffer. If the safety
+    filter blocks a reply part way, a {"type": "replace", "content": ...}
+    frame replaces the text streamed so far before "done".
+
+    Replies are streamed with awaited sends, so a client that reads slowly
+    pauses the LLM stream instead of growing a buffer. Clients may send at most
+    `TUTOR_WS_MAX_QUEUED_MESSAGES` messages ahead; further ones are rejected
+    with a "busy" error.
+    """
+
+    def __init__(self, websocket: WebSocket, context: TutorContext, llm: LLMClient):
+        self.websocket = websocket
+        self.context = context
+        self.llm = llm
+        self.inbox: "asyncio.Queue[Optional[str]]" = asyncio.Queue(
+            maxsize=settings.TUTOR_WS_MAX_QUEUED_MESSAGES
+        )
+        self.last_seen = time.monotonic()
+        self._send_lock = asyncio.Lock()
+
+    async def send(self, frame: Dict[str, Any]) -> None:
+        """Send a frame; the lock keeps heartbeats from interleaving with replies."""
+        async with self._send_lock:
+            try:
+                await self.websocket.send_json(frame)
+            except RuntimeError as exc:
+                # Starlette raises a plain RuntimeError for sends after the close handshake
+                if WebSocketState.DISCONNECTED in (self.websocket.client_state, self.websocket.application_state):
+                    raise WebSocketDisconnect(code=status.WS_1001_GOING_AWAY) from exc
+                raise
+
+    async def run(self) -> None:
+        """Serve the connection until the client disconnects or goes idle."""
+        receiver = asyncio.create_task(self._receive())
+        heartbeat = asyncio.create_task(self._heartbeat())
+        try:
+            await self.send({"type": "ready", "session_id": str(self.context.session_id)})
+            while (content := await self.inbox.get()) is not None:
+                await self._reply(content)
+        except _DISCONNECTED:
+            pass
+        finally:
+            receiver.cancel()
+            heartbeat.cancel()
+
+    async def _receive(self) -> None:
+        try:
+            while True:
+                frame = await self.websocket.receive_json()
+                self.last_seen = time.monotonic()
+                kind = frame.get("type") if isinstance(frame, dict) else None
+                if kind == "message":
+                    await self._enqueue(frame.get("content"))
+                elif kind == "ping":
+                    await self.send({"type": "pong"})
+                elif kind != "pong":
+                    await self.send({"type": "error", "detail": "Unknown frame type"})
+        except (*_DISCONNECTED, ValueError, KeyError):
+            # ValueError: invalid JSON; KeyError: Starlette's missing text on close
+            pass
+        finally:
+            # Wake the reply loop so the connection shuts down
+            while True:
+                try:
+                    self.inbox.put_nowait(None)
+                    break
+                except asyncio.QueueFull:
+                    self.inbox.get_nowait()
+
+    async def _enqueue(self, content: Any) -> None:
+        if not isinstance(content, str) or not content.strip() or len(content) > 4000:
+            await self.send({"type": "error", "detail": "Message content must be 1-4000 characters"})
+            return
+        try:
+            self.inbox.put_nowait(content)
+        except asyncio.QueueFull:
+            await self.send({"type": "error", "detail": "busy"})
+
+    async def _heartbeat(self) -> None:
+        while True:
+            await asyncio.sleep(settings.TUTOR_WS_HEARTBEAT_SECONDS)
+            if time.monotonic() - self.last_seen > settings.TUTOR_WS_IDLE_TIMEOUT_SECONDS:
+                await self.websocket.close(code=status.WS_1001_GOING_AWAY)
+                return
+            await self.send({"type": "ping"})
+
+    async def _reply(self, content: str) -> None:
+        try:
+            reference = await reference_for(self.context, content)
+        except BudgetExceeded as exc:
+            await self.send({"type": "error", "detail": str(exc)})
+            return
+        prompt = self.context.prompt(content, reference)
+        user_row = self.context.append("user", content)
+        parts, buffer, buffered = [], [], 0
+        last_flush = time.monotonic()
+        stream_filter = content_filter.stream() if settings.SAFETY_FILTER_ENABLED else None
+        stream = self.llm.stream_chat(prompt, parent_id=self.context.parent_id)
+        try:
+            async for token in stream:
+                if stream_filter is not None:
+                    # Holds back the last few characters until they cannot start a term
+                    token = stream_filter.feed(token)
+                    if stream_filter.blocked is not None:
+                        await stream.aclose()
+                        break
+                    if not token:
+                        continue
+                parts.append(token)
+                buffer.append(token)
+                buffered += len(token)
+                now = time.monotonic()
+                # Coalesce small tokens into fewer frames without delaying them long
+                if (buffered >= settings.TUTOR_WS_FLUSH_CHARS
+                        or (now - last_flush) * 1000 >= settings.TUTOR_WS_FLUSH_INTERVAL_MS):
+                    await self.send({"type": "token", "content": "".join(buffer)})
+                    buffer, buffered, last_flush = [], 0, now
+        except _DISCONNECTED:
+            # Keep the question and the part of the reply that was sent
+            await crud.message.create_buffered_async(obj_in=user_row)
+            await crud.message.create_buffered_async(obj_in=self.context.append("assistant", "".join(parts)))
+            raise
+        except BudgetExceeded as exc:
+            self.context.history.pop()
+            await self.send({"type": "error", "detail": str(exc)})
+            return
+        except Exception:
+            logger.exception("LLM stream failed for session %s", self.context.session_id)
+            await crud.message.create_buffered_async(obj_in=user_row)
+            await self.send({"type": "error", "detail": "The tutor could not answer, please try again"})
+            return
+        if stream_filter is not None:
+            tail = stream_filter.finish()
+            log_matches(self.context.session_id, stream_filter)
+            if stream_filter.blocked is not None:
+                parts, buffer = [settings.SAFETY_FALLBACK_REPLY], []
+                await self.send({"type": "replace", "content": settings.SAFETY_FALLBACK_REPLY})
+            elif tail:
+                parts.append(tail)
+                buffer.append(tail)
+        if buffer:
+            await self.send({"type": "token", "content": "".join(buffer)})
+        assistant_row = self.context.append("assistant", "".join(parts))
+        # Tokens are already out; "done" acknowledges that the turn is durable
+        for pending in [await crud.message.create_buffered_async(obj_in=row) for row in (user_row, assistant_row)]:
+            await pending
+        await self.send({"type": "done", "message_id": str(assistant_row["id"])})
+
+
+@router.websocket("/{session_id}/ws")
+async def tutor_websocket(
+    websocket: WebSocket,
+    session_id: UUID,
+    token: str = Query(..., description="JWT access token"),
+    llm: LLMClient = Depends(get_llm_client),
+) -> None:
+    """
+    Chat with the AI tutor over a WebSocket, authenticated once per connection.
+    """
+    await websocket.accept()
+    try:
+        context = await run_in_threadpool(_open_connection, token, session_id)
+    except HTTPException as exc:
+        await websocket.send_json({"type": "error", "detail": exc.detail})
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    await TutorConnection(websocket, context, llm).run()
@@ -35,7 +35,7 @@ router = APIRouter()
     }
 )
 def read_user_me(
-    current_user: models.User = Depends(deps.get_current_user),
+    current_user: models.User = Depends(deps.get_current_read_user),
 ) -> Any:
     """
     Get current user profile.
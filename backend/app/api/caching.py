@@ -0,0 +1,62 @@
+import hashlib
+from typing import Any, Optional
+
+from fastapi import Response, status
+
+# Cache-Control policies per route type. Child profiles are private to the
+# parent and change through the API, so clients may keep them but must
+# revalidate (cheaply, with If-None-Match) before each use.
+CACHE_CONTROL_PRIVATE_REVALIDATE = "private, no-cache"
+CACHE_CONTROL_NO_STORE = "no-store"
+
+
+def compute_etag(*parts: Any) -> str:
+    """
+    Build a strong ETag from values that change whenever the representation does,
+    e.g. a row's (id, updated_at) or a list's (count, max(updated_at), query).
+
+    Args:
+        *parts: Version components; converted with str()
+
+    Returns:
+        Quoted ETag header value
+    """
+    digest = hashlib.blake2b("|".join(str(p) for p in parts).encode(), digest_size=16)
+    return f'"{digest.hexdigest()}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Check an If-None-Match header against the current ETag.
+
+    Args:
+        if_none_match: Raw If-None-Match header value, may list several tags or be "*"
+        etag: Current ETag of the resource
+
+    Returns:
+        True if the client's cached copy is current
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison, as required for If-None-Match
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return etag in candidates
+
+
+def set_cache_headers(response: Response, etag: str, cache_control: str) -> None:
+    """
+    Set validator and caching policy headers on a response.
+    """
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = cache_control
+
+
+def not_modified(etag: str, cache_control: str) -> Response:
+    """
+    Build an empty 304 Not Modified response carrying the current validators.
+    """
+    response = Response(status_code=status.HTTP_304_NOT_MODIFIED)
+    set_cache_headers(response, etag, cache_control)
+    return response
@@ -9,6 +9,7 @@ from sqlalchemy.orm import Session
 from app import crud, models, schemas
 from app.core import security
 from app.core.config import settings
+from app.db.routing import open_read_session
 from app.db.session import SessionLocal
 
 # OAuth2 scheme for token authentication
@@ -25,12 +26,22 @@ def get_db() -> Generator:
     finally:
         db.close()
 
-def get_current_user(
-    db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)
-) -> models.User:
+def get_read_db() -> Generator:
     """
-    Dependency for getting the current authenticated user.
-    Validates JWT token and returns the user if valid.
+    Dependency for getting a read-only database session.
+    Served by the read replica when configured, unless the replica has not
+    yet replayed the client's most recent write (see `app.db.routing`).
+    Never write through this session.
+    """
+    try:
+        db = open_read_session()
+        yield db
+    finally:
+        db.close()
+
+def _get_user_from_token(db: Session, token: str) -> models.User:
+    """
+    Validate a JWT token and load its user from the given session.
     """
     try:
         payload = jwt.decode(
@@ -61,6 +72,25 @@ def get_current_user(
         )
     return user
 
+def get_current_user(
+    db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)
+) -> models.User:
+    """
+    Dependency for getting the current authenticated user.
+    Validates JWT token and returns the user if valid.
+    """
+    return _get_user_from_token(db, token)
+
+def get_current_read_user(
+    db: Session = Depends(get_read_db), token: str = Depends(oauth2_scheme)
+) -> models.User:
+    """
+    Dependency for getting the current authenticated user on read-only routes.
+    Loads the user through the read session so the request uses one connection.
+    The returned user must not be passed to write operations.
+    """
+    return _get_user_from_token(db, token)
+
 def get_current_active_superuser(
     current_user: models.User = Depends(get_current_user),
 ) -> models.User:
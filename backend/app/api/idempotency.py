@@ -0,0 +1,114 @@
+"""
+Idempotency keys for POST endpoints.
+
+A client that may retry a POST sends a unique `Idempotency-Key` header. The
+first request with a key claims it in the `idempotencykey` table, scoped to
+the authenticated user, together with a digest of the request. The request
+then runs as usual and its response is stored for `IDEMPOTENCY_TTL_SECONDS`.
+A retry with the same key and request gets the stored response back, with an
+`Idempotent-Replayed` header, without reaching the endpoint. A duplicate that
+arrives while the first request is still running waits for its response.
+Reusing a key for a different request is rejected.
+
+Server errors and responses over `IDEMPOTENCY_MAX_RESPONSE_BYTES` are not
+stored: the key is released and a retry runs the request again. So is a key
+whose request has not finished within `IDEMPOTENCY_LOCK_SECONDS`, e.g.
+because its worker died; if that request does finish after all, its
+response is not stored over the new claim's.
+
+Requests without a valid bearer token are not handled; they either fail
+authentication or are login/registration requests, whose responses (tokens,
+account details) are not worth keeping at rest.
+"""
+import hashlib
+from typing import List, Optional
+from uuid import UUID
+
+from jose import JWTError, jwt
+
+from app import crud
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.idempotency import IdempotencyKey
+
+KEY_HEADER = "idempotency-key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+MAX_KEY_LENGTH = 255
+
+
+def request_hash(method: str, path: str, query_string: bytes, body: bytes) -> bytes:
+    """
+    Digest of everything that makes two requests the same request.
+
+    Returns:
+        16-byte BLAKE2b digest
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for part in (method.encode(), path.encode(), query_string, body):
+        digest.update(len(part).to_bytes(8, "big"))
+        digest.update(part)
+    return digest.digest()
+
+
+def token_subject(authorization: Optional[str]) -> Optional[UUID]:
+    """
+    User ID of a bearer token, checked by signature only.
+
+    The endpoint still authenticates the request; this only scopes the key.
+
+    Returns:
+        User ID, or None without a valid bearer token
+    """
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        return UUID(jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])["sub"])
+    except (JWTError, KeyError, TypeError, ValueError):
+        return None
+
+
+class IdempotencyStore:
+    """
+    Idempotency keys in the primary database, one short session per call.
+    """
+    
+    def claim(self, user_id: UUID, key: str, digest: bytes) -> Optional[UUID]:
+        """Claim a key; a claim ID if the caller must run the request, else None."""
+        db = SessionLocal()
+        try:
+            return crud.idempotency_key.claim(db, user_id=user_id, key=key, request_hash=digest)
+        finally:
+            db.close()
+    
+    def get(self, user_id: UUID, key: str) -> Optional[IdempotencyKey]:
+        """Get an unexpired key, completed or still in flight."""
+        db = SessionLocal()
+        try:
+            return crud.idempotency_key.get_by_key(db, user_id=user_id, key=key)
+        finally:
+            db.close()
+    
+    def complete(
+        self, user_id: UUID, key: str, claim_id: UUID, status_code: int, headers: List[List[str]], body: bytes
+    ) -> None:
+        """Store the response of a key, unless the claim has been taken over."""
+        db = SessionLocal()
+        try:
+            crud.idempotency_key.complete(
+                db, user_id=user_id, key=key, claim_id=claim_id, status_code=status_code, headers=headers, body=body
+            )
+        finally:
+            db.close()
+    
+    def release(self, user_id: UUID, key: str, claim_id: UUID) -> None:
+        """Give up a claimed key without storing a response, unless the claim has been taken over."""
+        db = SessionLocal()
+        try:
+            crud.idempotency_key.release(db, user_id=user_id, key=key, claim_id=claim_id)
+        finally:
+            db.close()
+
+
+# Shared store instance
+idempotency_store = IdempotencyStore()
@@ -0,0 +1,290 @@
+import asyncio
+import random
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Set, Tuple
+from uuid import UUID
+
+from fastapi import HTTPException
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.api import deps, idempotency
+from app.api.idempotency import IdempotencyStore, idempotency_store
+from app.core.config import settings
+from app.core.ids import uuid7
+from app.core.profiling import ProfileStore, StackSampler, profile_store
+from app.db import routing, slow_query
+from app.db.session import SessionLocal
+
+PROFILE_HEADER = "x-profile"
+PROFILE_ID_HEADER = "X-Profile-Id"
+
+
+class ReplicaStickinessMiddleware(BaseHTTPMiddleware):
+    """
+    Read-your-writes support for read replica routing.
+    
+    Passes the client's last write position (cookie or `X-Min-LSN` header) to
+    the read session dependency, and after a request that committed a write,
+    returns the primary's current LSN to the client for `REPLICA_STICKY_SECONDS`.
+    """
+    
+    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
+        min_lsn = request.headers.get(routing.LSN_HEADER) or request.cookies.get(routing.LSN_COOKIE)
+        state = routing.begin_request(min_lsn)
+        
+        response = await call_next(request)
+        
+        if state.wrote:
+            lsn = await run_in_threadpool(routing.current_primary_lsn)
+            response.headers[routing.LSN_HEADER] = lsn
+            response.set_cookie(
+                routing.LSN_COOKIE,
+                lsn,
+                max_age=settings.REPLICA_STICKY_SECONDS,
+                httponly=True,
+                samesite="lax",
+            )
+        return response
+
+
+class QueryRouteMiddleware:
+    """
+    Makes the route of the current request available to the slow query log.
+    """
+    
+    def __init__(self, app: ASGIApp):
+        self.app = app
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] in ("http", "websocket"):
+            slow_query.begin_request(scope)
+        await self.app(scope, receive, send)
+
+
+def _is_superuser(authorization: Optional[str]) -> bool:
+    """Check a bearer token with `deps.get_current_active_superuser`."""
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return False
+    db = SessionLocal()
+    try:
+        deps.get_current_active_superuser(deps._get_user_from_token(db, token))
+        return True
+    except HTTPException:
+        return False
+    finally:
+        db.close()
+
+
+class ProfilingMiddleware:
+    """
+    On-demand and sampled request profiling (see `app.core.profiling`).
+    
+    A superuser request with an `X-Profile` header is profiled and answered
+    with an `X-Profile-Id` header naming the stored profile; the header is
+    ignored for everyone else. Independently, a `PROFILE_SAMPLE_RATE` fraction
+    of all requests is profiled. Other requests pay one header lookup.
+    
+    Implemented as plain ASGI middleware so streamed responses are not buffered
+    and the profile covers the whole response body.
+    """
+    
+    def __init__(self, app: ASGIApp, store: ProfileStore = profile_store):
+        self.app = app
+        self.store = store
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        headers = Headers(scope=scope)
+        requested = PROFILE_HEADER in headers and await run_in_threadpool(
+            _is_superuser, headers.get("authorization")
+        )
+        if not requested and not (settings.PROFILE_SAMPLE_RATE and random.random() < settings.PROFILE_SAMPLE_RATE):
+            await self.app(scope, receive, send)
+            return
+        
+        profile_id = str(uuid7())
+        status_code = 500
+        
+        async def send_with_id(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if requested:
+                    MutableHeaders(scope=message).append(PROFILE_ID_HEADER, profile_id)
+            await send(message)
+        
+        sampler = StackSampler(threading.get_ident())
+        started_at, start = datetime.utcnow(), time.perf_counter()
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            stacks = sampler.stop()
+            meta = {
+                "method": scope["method"],
+                "path": scope["path"],
+                "status_code": status_code,
+                "trigger": "header" if requested else "sampled",
+                "started_at": started_at.isoformat(),
+                "duration_ms": round((time.perf_counter() - start) * 1000, 2),
+                "samples": sampler.samples,
+            }
+            await run_in_threadpool(self.store.save, profile_id, stacks, meta)
+
+
+async def _read_body(receive: Receive) -> Optional[bytes]:
+    """Read the whole request body; None if the client disconnects first."""
+    chunks = []
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            return None
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body", False):
+            return b"".join(chunks)
+
+
+class IdempotencyMiddleware:
+    """
+    `Idempotency-Key` support for authenticated POSTs (see `app.api.idempotency`).
+    
+    Requests without the header pass straight through. Replays and rejected
+    duplicates are answered here, before routing, so endpoints never see them.
+    Duplicates waiting for an in-flight request poll the store, and are woken
+    early when the request finishes in the same worker.
+    """
+    
+    def __init__(self, app: ASGIApp, store: IdempotencyStore = idempotency_store):
+        self.app = app
+        self.store = store
+        # Events of the duplicates waiting for each in-flight key
+        self._finished: Dict[Tuple[UUID, str], Set[asyncio.Event]] = {}
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] != "POST":
+            await self.app(scope, receive, send)
+            return
+        headers = Headers(scope=scope)
+        key = headers.get(idempotency.KEY_HEADER)
+        user_id = idempotency.token_subject(headers.get("authorization")) if key is not None else None
+        if user_id is None:
+            await self.app(scope, receive, send)
+            return
+        if not key or len(key) > idempotency.MAX_KEY_LENGTH:
+            response = JSONResponse(
+                {"detail": f"Idempotency-Key must be 1 to {idempotency.MAX_KEY_LENGTH} characters"},
+                status_code=400,
+            )
+            await response(scope, receive, send)
+            return
+        
+        body = await _read_body(receive)
+        if body is None:
+            return
+        digest = idempotency.request_hash(scope["method"], scope["path"], scope["query_string"], body)
+        
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + settings.IDEMPOTENCY_WAIT_SECONDS
+        delay = 0.05
+        while True:
+            claim_id = await run_in_threadpool(self.store.claim, user_id, key, digest)
+            if claim_id is not None:
+                await self._run(scope, receive, send, body, user_id, key, claim_id)
+                return
+            # None if released or expired since the claim; it is claimed again after the wait
+            stored = await run_in_threadpool(self.store.get, user_id, key)
+            if stored is not None and stored.request_hash != digest:
+                response = JSONResponse(
+                    {"detail": "Idempotency-Key has already been used for a different request"},
+                    status_code=422,
+                )
+                break
+            if stored is not None and stored.status_code is not None:
+                response = Response(stored.response_body, status_code=stored.status_code)
+                response.raw_headers += [
+                    (name.encode("latin-1"), value.encode("latin-1"))
+                    for name, value in stored.response_headers
+                    if name.lower() != "content-length"
+                ] + [(idempotency.REPLAYED_HEADER.lower().encode(), b"true")]
+                break
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                response = JSONResponse(
+                    {"detail": "A request with this Idempotency-Key is still being processed"},
+                    status_code=409,
+                    headers={"Retry-After": "1"},
+                )
+                break
+            await self._wait(user_id, key, min(delay, remaining))
+            delay = min(delay * 2, 1.0)
+        await response(scope, receive, send)
+    
+    async def _wait(self, user_id: UUID, key: str, timeout: float) -> None:
+        """Wait until a request with the key finishes in this worker, or for `timeout` seconds."""
+        event = asyncio.Event()
+        waiting = self._finished.setdefault((user_id, key), set())
+        waiting.add(event)
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            waiting.discard(event)
+            if not waiting and self._finished.get((user_id, key)) is waiting:
+                del self._finished[(user_id, key)]
+    
+    async def _run(
+        self, scope: Scope, receive: Receive, send: Send, body: bytes, user_id: UUID, key: str, claim_id: UUID
+    ) -> None:
+        """Run the request holding the key, then store its response or release the key."""
+        pending: Optional[Message] = {"type": "http.request", "body": body, "more_body": False}
+        status_code: Optional[int] = None
+        response_headers: List[List[str]] = []
+        chunks: List[bytes] = []
+        size = 0
+        
+        async def receive_body() -> Message:
+            nonlocal pending
+            if pending is not None:
+                message, pending = pending, None
+                return message
+            return await receive()
+        
+        async def send_and_record(message: Message) -> None:
+            nonlocal status_code, size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                response_headers.extend(
+                    [name.decode("latin-1"), value.decode("latin-1")] for name, value in message.get("headers", [])
+                )
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+                if size <= settings.IDEMPOTENCY_MAX_RESPONSE_BYTES:
+                    chunks.append(message.get("body", b""))
+            await send(message)
+        
+        try:
+            try:
+                await self.app(scope, receive_body, send_and_record)
+            except Exception:
+                await run_in_threadpool(self.store.release, user_id, key, claim_id)
+                raise
+            if status_code is None or status_code >= 500 or size > settings.IDEMPOTENCY_MAX_RESPONSE_BYTES:
+                await run_in_threadpool(self.store.release, user_id, key, claim_id)
+            else:
+                await run_in_threadpool(
+                    self.store.complete, user_id, key, claim_id, status_code, response_headers, b"".join(chunks)
+                )
+        finally:
+            for event in self._finished.pop((user_id, key), ()):
+                event.set()
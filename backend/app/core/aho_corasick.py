@@ -0,0 +1,85 @@
+"""
+Aho-Corasick multi-pattern matcher.
+
+All patterns are compiled into one automaton, so text is scanned once, one
+character at a time, however many patterns there are. Failure links are
+resolved at build time into a full transition table (a deterministic
+automaton), so each character costs a single dictionary lookup. Scanning is
+resumable: `scan` takes and returns the automaton state, so a stream can be
+scanned chunk by chunk and matches spanning chunk boundaries are still found.
+"""
+from collections import deque
+from typing import Any, Dict, Iterable, List, Tuple
+
+# (match end offset, exclusive; pattern length; pattern value)
+Match = Tuple[int, int, Any]
+
+
+class Automaton:
+    """
+    Compiled Aho-Corasick automaton over a fixed set of patterns.
+    """
+    __slots__ = ("transitions", "outputs", "max_length", "pattern_count")
+
+    def __init__(self, patterns: Iterable[Tuple[str, Any]]):
+        """
+        Build the automaton.
+
+        Args:
+            patterns: (pattern, value) pairs; the value is reported with each match
+
+        Raises:
+            ValueError: If a pattern is empty
+        """
+        goto: List[Dict[str, int]] = [{}]
+        outputs: List[List[Tuple[int, Any]]] = [[]]
+        self.max_length = 0
+        self.pattern_count = 0
+        for pattern, value in patterns:
+            if not pattern:
+                raise ValueError("Patterns must not be empty")
+            state = 0
+            for char in pattern:
+                next_state = goto[state].get(char)
+                if next_state is None:
+                    next_state = goto[state][char] = len(goto)
+                    goto.append({})
+                    outputs.append([])
+                state = next_state
+            outputs[state].append((len(pattern), value))
+            self.max_length = max(self.max_length, len(pattern))
+            self.pattern_count += 1
+
+        # Breadth-first, so a state's failure target is complete before the state itself
+        transitions: List[Dict[str, int]] = [dict(goto[0])] + [{} for _ in goto[1:]]
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            transitions[state] = {**transitions[fail[state]], **goto[state]}
+            outputs[state].extend(outputs[fail[state]])
+            for char, child in goto[state].items():
+                fail[child] = transitions[fail[state]].get(char, 0)
+                queue.append(child)
+        self.transitions = transitions
+        self.outputs = [tuple(output) for output in outputs]
+
+    def scan(self, text: str, state: int = 0, offset: int = 0) -> Tuple[int, List[Match]]:
+        """
+        Find all pattern occurrences in text, including overlapping ones.
+
+        Args:
+            text: Text to scan; case-insensitive matching needs text and patterns lowercased
+            state: State returned by the previous call for the same stream, 0 to start
+            offset: Stream offset of `text[0]`, added to reported match ends
+
+        Returns:
+            The state after the text and the matches as (end, length, value) tuples
+        """
+        transitions, outputs = self.transitions, self.outputs
+        matches: List[Match] = []
+        for index, char in enumerate(text, offset + 1):
+            state = transitions[state].get(char, 0)
+            if outputs[state]:
+                matches.extend((index, length, value) for length, value in outputs[state])
+        return state, matches
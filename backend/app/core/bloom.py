@@ -0,0 +1,46 @@
+import hashlib
+import math
+from typing import Optional
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over string keys, serializable to bytes.
+
+    Membership tests never miss an added key; unseen keys test positive with
+    roughly the configured error rate until `capacity` keys have been added.
+    """
+
+    def __init__(self, capacity: int, error_rate: float, data: Optional[bytes] = None):
+        """
+        Initialize an empty filter, or load one serialized by `to_bytes`.
+
+        Args:
+            capacity: Number of keys the filter is sized for
+            error_rate: False positive rate at capacity, e.g. 0.01
+            data: Serialized bit array; ignored if its size does not match
+        """
+        self.num_bits = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        size = (self.num_bits + 7) // 8
+        self.bits = bytearray(data) if data is not None and len(data) == size else bytearray(size)
+
+    def _positions(self, key: str):
+        # Double hashing: h1 + i * h2 gives k independent-enough positions from one digest
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, key: str) -> None:
+        """Add a key to the filter."""
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+    def to_bytes(self) -> bytes:
+        """Serialize the bit array."""
+        return bytes(self.bits)
@@ -0,0 +1,118 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional
+
+from app.core.config import settings
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    Thread-safe in-process LRU cache with a per-entry time to live.
+
+    Entries are evicted explicitly by the cross-worker invalidation bus
+    (`app.db.invalidation`); the TTL is a fallback that bounds staleness if
+    an invalidation message is ever missed.
+    """
+
+    def __init__(self, name: str, *, ttl: Optional[float] = None, maxsize: int = 10_000):
+        """
+        Initialize an empty cache.
+
+        Args:
+            name: Cache name, used in metrics
+            ttl: Seconds an entry stays valid, defaults to `CACHE_TTL_SECONDS`
+            maxsize: Maximum number of entries before least recently used ones are dropped
+        """
+        self.name = name
+        self.ttl = ttl if ttl is not None else settings.CACHE_TTL_SECONDS
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value for `key`, or `default` if missing or expired."""
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                return default
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store `value` under `key`, evicting the least recently used entry if full."""
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + self.ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def evict(self, key: Hashable) -> bool:
+        """Remove `key`; returns True if it was cached."""
+        with self._lock:
+            return self._data.pop(key, _MISSING) is not _MISSING
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class CacheRegistry:
+    """
+    Maps entity types (table names) to the caches holding entries keyed by entity id.
+    """
+
+    def __init__(self):
+        self._caches: Dict[str, List[TTLCache]] = {}
+        self._lock = threading.Lock()
+
+    def register(self, entity_type: str, cache: TTLCache) -> TTLCache:
+        """
+        Register a cache whose keys are ids of `entity_type` rows.
+
+        Args:
+            entity_type: Table name of the cached entity, e.g. "child"
+            cache: Cache to evict from when the entity changes
+
+        Returns:
+            The registered cache, for use as `cache = registry.register(...)`
+        """
+        with self._lock:
+            self._caches.setdefault(entity_type, []).append(cache)
+        return cache
+
+    def has(self, entity_type: str) -> bool:
+        """Return True if any cache holds `entity_type` rows."""
+        return bool(self._caches.get(entity_type))
+
+    def __len__(self) -> int:
+        return sum(len(caches) for caches in self._caches.values())
+
+    def evict(self, entity_type: str, key: Hashable) -> int:
+        """
+        Evict `key` from every cache registered for `entity_type`.
+
+        Returns:
+            Number of caches that held the key
+        """
+        return sum(cache.evict(key) for cache in self._caches.get(entity_type, ()))
+
+    def clear_all(self) -> None:
+        """Clear every registered cache, e.g. after missing invalidation messages."""
+        for caches in list(self._caches.values()):
+            for cache in caches:
+                cache.clear()
+
+
+# Process-wide registry used by the invalidation bus
+cache_registry = CacheRegistry()
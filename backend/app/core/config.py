@@ -50,8 +50,173 @@ class Settings(BaseSettings):
             path=f"/{values.get('POSTGRES_DB') or ''}",
         )
     
+    # Read replica settings
+    # Optional streaming replica for read-only routes; reads use the primary when unset
+    SQLALCHEMY_REPLICA_URI: Optional[PostgresDsn] = None
+    # Lifetime of the read-your-writes cookie set after a write
+    REPLICA_STICKY_SECONDS: int = 30
+    
+    # Slow query log settings
+    # Statements slower than this are recorded in a per-worker ring buffer
+    SLOW_QUERY_LOG_ENABLED: bool = True
+    SLOW_QUERY_THRESHOLD_MS: float = 200.0
+    SLOW_QUERY_LOG_SIZE: int = 200
+    # EXPLAIN (ANALYZE, BUFFERS) re-runs a sample of slow SELECTs in the background
+    SLOW_QUERY_EXPLAIN_ENABLED: bool = False
+    SLOW_QUERY_EXPLAIN_SAMPLE_RATE: float = 0.1
+    SLOW_QUERY_EXPLAIN_TIMEOUT_MS: int = 10000
+    
+    # Session lifecycle settings
+    # Active sessions without a message for this long are completed by scripts/maintain_sessions.py
+    SESSION_IDLE_MINUTES: int = 30
+    SESSION_REAP_BATCH_SIZE: int = 500
+    # Post-session follow-ups (progress aggregates, summary) processed per transaction
+    SESSION_FOLLOW_UP_BATCH_SIZE: int = 50
+    SESSION_FOLLOW_UP_MAX_ATTEMPTS: int = 5
+    # Delay before the first retry of a failed follow-up, doubled on each further failure
+    SESSION_FOLLOW_UP_RETRY_SECONDS: int = 60
+    # Parent-facing LLM summary of each completed session, billed to the parent
+    SESSION_SUMMARY_ENABLED: bool = False
+    SESSION_SUMMARY_MAX_MESSAGES: int = 60
+    
+    # Idempotency settings
+    # Authenticated POSTs with an Idempotency-Key header run once per key and user; retries replay the response
+    IDEMPOTENCY_ENABLED: bool = True
+    # Stored responses are replayed for this long
+    IDEMPOTENCY_TTL_SECONDS: int = 86400
+    # A key whose first request has not finished after this long can be claimed again
+    IDEMPOTENCY_LOCK_SECONDS: int = 120
+    # Concurrent duplicates wait this long for the first request before getting a 409
+    IDEMPOTENCY_WAIT_SECONDS: float = 30.0
+    # Larger responses are not stored; retries run the request again
+    IDEMPOTENCY_MAX_RESPONSE_BYTES: int = 1048576
+
+    # History export settings
+    # Rows fetched per server-side cursor round trip
+    EXPORT_YIELD_PER: int = 1000
+    # Uncompressed bytes per streamed chunk
+    EXPORT_CHUNK_BYTES: int = 65536
+    EXPORT_GZIP_LEVEL: int = 6
+    
+    # Message storage settings
+    MESSAGE_PARTITION_MONTHS_AHEAD: int = 3
+    MESSAGE_RETENTION_DAYS: int = 90
+    MESSAGE_ARCHIVE_BATCH_SIZE: int = 100
+    MESSAGE_ARCHIVE_ZSTD_LEVEL: int = 10
+    
+    # In-process cache settings
+    # TTL bounds staleness if an invalidation message is ever missed
+    CACHE_TTL_SECONDS: int = 300
+    CACHE_INVALIDATION_ENABLED: bool = True
+    CACHE_INVALIDATION_CHANNEL: str = "cache_invalidation"
+    # Listeners lagging further behind than this clear all caches
+    CACHE_INVALIDATION_MAX_LAG_MS: int = 5000
+    
+    # Bulk provisioning settings
+    # Rows per INSERT ... ON CONFLICT statement and per commit
+    BULK_PROVISION_CHUNK_SIZE: int = 500
+    # Processes hashing passwords in parallel; 0 uses one per CPU
+    BULK_PROVISION_HASH_WORKERS: int = 0
+    BULK_PROVISION_MAX_UPLOAD_BYTES: int = 20 * 1024 * 1024
+    
+    # Write-behind buffer for small inserts (messages, answers, feedback)
+    # Rows wait at most this long for a batch; lost if the process is killed
+    WRITE_BEHIND_ENABLED: bool = True
+    WRITE_BEHIND_FLUSH_MS: int = 20
+    WRITE_BEHIND_MAX_BATCH: int = 500
+    # Queued rows at which submitters block until the next flush
+    WRITE_BEHIND_MAX_PENDING: int = 10_000
+    
+    # Tutoring session settings
+    # Recent messages kept in the LLM context of a session
+    TUTOR_CONTEXT_MESSAGES: int = 20
+    # WebSocket pings; connections silent for the idle timeout are closed
+    TUTOR_WS_HEARTBEAT_SECONDS: int = 20
+    TUTOR_WS_IDLE_TIMEOUT_SECONDS: int = 60
+    # Messages a client may send ahead while a reply is still streaming
+    TUTOR_WS_MAX_QUEUED_MESSAGES: int = 2
+    # Streamed tokens are coalesced into frames of this size or age
+    TUTOR_WS_FLUSH_CHARS: int = 64
+    TUTOR_WS_FLUSH_INTERVAL_MS: int = 50
+    
+    # Content safety settings
+    # Tutor replies are checked against this term list, defaults to app/safety/blocklist.txt
+    SAFETY_FILTER_ENABLED: bool = True
+    SAFETY_TERMS_FILE: Optional[str] = None
+    # Sent instead of a reply that contains a "block" term
+    SAFETY_FALLBACK_REPLY: str = (
+        "Let's keep our chat about learning. What would you like to explore in today's lesson?"
+    )
+    
     # OpenAI settings (for future phases)
     OPENAI_API_KEY: Optional[str] = None
+    OPENAI_MODEL: str = "gpt-3.5-turbo"
+    OPENAI_EMBEDDING_MODEL: str = "text-embedding-ada-002"
+    # Identical concurrent chat completions share one in-flight call (see app/services/coalescing.py)
+    LLM_COALESCING_ENABLED: bool = True
+    
+    # Prompt template settings
+    # Directory of *.txt prompt templates, defaults to app/prompts
+    PROMPT_TEMPLATE_DIR: Optional[str] = None
+    # Tutor prompt prefixes cached per (grade, subject, learning style, preferences)
+    PROMPT_PREFIX_CACHE_SIZE: int = 1024
+    
+    # LLM usage accounting
+    # Default monthly spending cap per parent; users.llm_monthly_budget_usd overrides it
+    LLM_MONTHLY_BUDGET_USD: float = 10.0
+    USAGE_FLUSH_SECONDS: int = 10
+    # Age after which a cached budget is refreshed in the background
+    USAGE_BUDGET_REFRESH_SECONDS: int = 60
+    
+    # Adaptive difficulty settings
+    # Rating step size k = max(SKILL_K_MIN, SKILL_K_INITIAL / (1 + SKILL_K_DECAY * answers))
+    SKILL_K_INITIAL: float = 0.6
+    SKILL_K_MIN: float = 0.1
+    SKILL_K_DECAY: float = 0.1
+    # Next quiz difficulty is the level whose expected success rate is closest to this
+    SKILL_TARGET_SUCCESS: float = 0.6
+    
+    # Question bank settings
+    # Questions with the same answer and at least this estimated text similarity are duplicates
+    QUESTION_BANK_DUPLICATE_THRESHOLD: float = 0.7
+    # Bank rows scanned per quiz before the shortfall is generated by the LLM
+    QUESTION_BANK_MAX_SCAN: int = 500
+    # Per-child "already seen" Bloom filter; it restarts empty once capacity is reached
+    QUESTION_BANK_SEEN_CAPACITY: int = 5000
+    QUESTION_BANK_SEEN_ERROR_RATE: float = 0.01
+    
+    # Embedding settings
+    # "openai" (OPENAI_EMBEDDING_MODEL) or "local" (a sentence-transformers model on CPU)
+    EMBEDDING_BACKEND: str = "openai"
+    EMBEDDING_LOCAL_MODEL: str = "all-MiniLM-L6-v2"
+    EMBEDDING_LOCAL_WORKERS: int = 1
+    # Concurrent requests are sent as one batch after this wait or once this many are queued
+    EMBEDDING_BATCH_WAIT_MS: int = 5
+    EMBEDDING_MAX_BATCH: int = 64
+    
+    # Retrieval settings
+    # Vector index of curriculum snippets and good past answers; retrieval is off when unset
+    RETRIEVAL_INDEX_DIR: Optional[str] = None
+    RETRIEVAL_TOP_K: int = 3
+    # Inverted lists scanned per query; higher improves recall at the cost of latency
+    RETRIEVAL_NPROBE: int = 16
+    # Snippets less similar than this to the question are not added to the prompt
+    RETRIEVAL_MIN_SCORE: float = 0.78
+    
+    # Request profiling
+    # Superusers get a profile of one request by sending "X-Profile: 1"
+    PROFILE_SAMPLE_INTERVAL_MS: float = 5.0
+    # Fraction of all requests profiled automatically; 0 disables always-on sampling
+    PROFILE_SAMPLE_RATE: float = 0.0
+    # Profile directory shared by the workers of a host, defaults to <tmp>/ai_teacher_profiles
+    PROFILE_DIR: Optional[str] = None
+    PROFILE_MAX_STORED: int = 500
+    
+    # Startup settings
+    # Workers that only serve non-AI routes can disable AI features entirely
+    ENABLE_AI_FEATURES: bool = True
+    # Cold start import budget enforced by scripts/check_startup_time.py
+    STARTUP_IMPORT_BUDGET_MS: int = 1500
     
     class Config:
         env_file = ".env"
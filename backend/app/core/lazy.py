@@ -0,0 +1,80 @@
+import importlib
+import sys
+import threading
+import types
+from typing import Any, Optional
+
+
+class LazyModule(types.ModuleType):
+    """
+    Module proxy that imports the real module on first attribute access.
+
+    Heavy optional dependencies (openai, langchain, numpy, ...) can be bound at
+    module level without paying their import time until a code path actually
+    uses them. Workers that never touch AI features never import them.
+    """
+
+    def __init__(self, name: str, install_hint: Optional[str] = None):
+        super().__init__(name)
+        self.__dict__["_lazy_install_hint"] = install_hint
+        self.__dict__["_lazy_module"] = None
+        self.__dict__["_lazy_lock"] = threading.Lock()
+
+    def _load(self) -> types.ModuleType:
+        module = self.__dict__["_lazy_module"]
+        if module is not None:
+            return module
+        with self.__dict__["_lazy_lock"]:
+            module = self.__dict__["_lazy_module"]
+            if module is None:
+                try:
+                    module = importlib.import_module(self.__name__)
+                except ImportError as exc:
+                    hint = self.__dict__["_lazy_install_hint"] or self.__name__
+                    raise ImportError(
+                        f"Optional dependency '{self.__name__}' is required for this feature. "
+                        f"Install it with `pip install {hint}`."
+                    ) from exc
+                self.__dict__["_lazy_module"] = module
+        return module
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self) -> str:
+        state = "loaded" if self.__dict__["_lazy_module"] is not None else "not loaded"
+        return f"<lazy module '{self.__name__}' ({state})>"
+
+
+def lazy_import(name: str, install_hint: Optional[str] = None) -> types.ModuleType:
+    """
+    Return a module that is only imported when first used.
+
+    Args:
+        name: Fully qualified module name
+        install_hint: Package spec shown in the error if the module is missing
+
+    Returns:
+        The module itself if it is already imported, otherwise a LazyModule proxy
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    return LazyModule(name, install_hint)
+
+
+def is_loaded(module: types.ModuleType) -> bool:
+    """
+    Check whether a module returned by `lazy_import` has been imported yet.
+
+    Args:
+        module: Module or LazyModule proxy
+
+    Returns:
+        True if the real module is loaded
+    """
+    if isinstance(module, LazyModule):
+        return module.__dict__["_lazy_module"] is not None
+    return True
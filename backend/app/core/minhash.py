@@ -0,0 +1,74 @@
+import hashlib
+import random
+import re
+from typing import List, Sequence, Set
+
+# Signature length and its split into LSH bands. Texts with Jaccard similarity
+# s share at least one band bucket with probability 1 - (1 - s^ROWS)^BANDS:
+# ~0.99 at s = 0.7, ~0.12 at s = 0.3, so near-duplicates are found reliably
+# while few unrelated texts become candidates.
+NUM_PERMUTATIONS = 64
+LSH_BANDS = 16
+LSH_ROWS = NUM_PERMUTATIONS // LSH_BANDS
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+# Fixed seed: signatures are stored and must stay comparable across processes
+_rng = random.Random(20261019)
+_PERMUTATIONS = [
+    (_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME))
+    for _ in range(NUM_PERMUTATIONS)
+]
+_WORD = re.compile(r"\w+")
+
+
+def shingles(text: str, size: int = 5) -> Set[str]:
+    """
+    Return the character n-grams of a text after lowercasing and dropping punctuation.
+
+    Character n-grams suit short texts such as quiz questions, where a single
+    changed word would remove most word n-grams. Texts shorter than `size`
+    yield a single shingle.
+    """
+    normalized = " ".join(_WORD.findall(text.lower()))
+    if len(normalized) <= size:
+        return {normalized}
+    return {normalized[i:i + size] for i in range(len(normalized) - size + 1)}
+
+
+def signature(text: str) -> List[int]:
+    """
+    Compute the MinHash signature of a text's shingles.
+
+    Returns:
+        NUM_PERMUTATIONS 32-bit values; the fraction of equal positions in two
+        signatures estimates the Jaccard similarity of the shingle sets
+    """
+    hashes = [
+        int.from_bytes(hashlib.blake2b(shingle.encode(), digest_size=8).digest(), "little")
+        for shingle in shingles(text)
+    ]
+    return [
+        min(((a * h + b) % _MERSENNE_PRIME) & _MAX_HASH for h in hashes)
+        for a, b in _PERMUTATIONS
+    ]
+
+
+def lsh_buckets(sig: Sequence[int]) -> List[int]:
+    """
+    Hash each band of a signature to a bucket id.
+
+    The band number is part of the hash, so two signatures share a bucket id
+    only if they agree on a whole band. Ids are signed 64-bit integers.
+    """
+    buckets = []
+    for band in range(LSH_BANDS):
+        rows = sig[band * LSH_ROWS:(band + 1) * LSH_ROWS]
+        key = f"{band}:" + ",".join(map(str, rows))
+        buckets.append(int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "little", signed=True))
+    return buckets
+
+
+def similarity(a: Sequence[int], b: Sequence[int]) -> float:
+    """Estimate the Jaccard similarity of two texts from their signatures."""
+    return sum(x == y for x, y in zip(a, b)) / len(a)
@@ -0,0 +1,186 @@
+"""
+Wall-clock sampling profiler for single requests.
+
+While a request is profiled, a `StackSampler` thread records the Python stack
+of the event loop thread serving it, and of threadpool workers running
+application code (sync endpoints and `run_in_threadpool` calls), every
+`PROFILE_SAMPLE_INTERVAL_MS`. Samples where the event loop has nothing to run
+are recorded as "(idle)", which is time spent awaiting I/O such as the
+database or the LLM. Other requests handled by the same worker at the same
+time show up in the profile too.
+
+Profiles are written in collapsed stack format, one "frame;frame;... count"
+line per distinct stack, which flamegraph.pl, speedscope and similar tools
+render as a flame graph. A `ProfileStore` keeps the latest
+`PROFILE_MAX_STORED` profiles on disk with a JSON metadata file each.
+"""
+import json
+import os
+import sys
+import tempfile
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+
+APP_ROOT = str(Path(__file__).resolve().parent.parent)
+IDLE_STACK = "(idle)"
+_WORKER_THREAD_NAME = "AnyIO worker thread"
+_PROFILE_ID_CHARS = set("0123456789abcdef-")
+
+
+def _frame_label(code: Any, cache: Dict[Any, str]) -> str:
+    label = cache.get(code)
+    if label is None:
+        filename = code.co_filename
+        if filename.startswith(APP_ROOT):
+            filename = "app" + filename[len(APP_ROOT):]
+        elif "site-packages" in filename:
+            filename = filename.rsplit("site-packages" + os.sep, 1)[-1]
+        else:
+            filename = os.path.basename(filename)
+        # co_qualname is new in Python 3.11
+        name = getattr(code, "co_qualname", code.co_name)
+        # Semicolons separate frames in the collapsed format
+        label = cache[code] = f"{name} ({filename})".replace(";", ":")
+    return label
+
+
+def collapse(frame: Any, cache: Dict[Any, str]) -> Optional[str]:
+    """
+    Render a stack as collapsed frames, outermost first.
+
+    Returns:
+        The stack, or None if no frame belongs to the application
+    """
+    labels, in_app = [], False
+    while frame is not None:
+        code = frame.f_code
+        in_app = in_app or code.co_filename.startswith(APP_ROOT)
+        labels.append(_frame_label(code, cache))
+        frame = frame.f_back
+    if not in_app:
+        return None
+    labels.reverse()
+    return ";".join(labels)
+
+
+class StackSampler:
+    """
+    Background thread sampling the stacks serving one request.
+    """
+
+    def __init__(self, thread_id: int, interval_ms: Optional[float] = None):
+        """
+        Args:
+            thread_id: Ident of the event loop thread handling the request
+            interval_ms: Sampling interval, defaults to `PROFILE_SAMPLE_INTERVAL_MS`
+        """
+        self.thread_id = thread_id
+        self.interval = (interval_ms or settings.PROFILE_SAMPLE_INTERVAL_MS) / 1000
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._labels: Dict[Any, str] = {}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def start(self) -> None:
+        """Start sampling."""
+        self._thread.start()
+
+    def stop(self) -> Counter:
+        """Stop sampling and return the sample count per collapsed stack."""
+        self._stop.set()
+        self._thread.join()
+        return self.stacks
+
+    def sample(self) -> None:
+        """Record the current stacks once."""
+        workers = {thread.ident for thread in threading.enumerate() if thread.name == _WORKER_THREAD_NAME}
+        for ident, frame in sys._current_frames().items():
+            if ident == self.thread_id:
+                self.stacks["loop;" + (collapse(frame, self._labels) or IDLE_STACK)] += 1
+            elif ident in workers:
+                # Idle workers wait in library code only and are skipped
+                stack = collapse(frame, self._labels)
+                if stack is not None:
+                    self.stacks["threadpool;" + stack] += 1
+        self.samples += 1
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+
+def to_collapsed(stacks: Counter) -> str:
+    """Format sample counts as collapsed stack lines, most frequent first."""
+    return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+
+class ProfileStore:
+    """
+    Directory of stored profiles: `<id>.collapsed` plus `<id>.json` metadata.
+    """
+
+    def __init__(self, directory: Optional[str] = None, *, max_stored: Optional[int] = None):
+        """
+        Args:
+            directory: Profile directory, defaults to `PROFILE_DIR` or a temporary directory
+            max_stored: Profiles kept, defaults to `PROFILE_MAX_STORED`
+        """
+        self.directory = Path(
+            directory or settings.PROFILE_DIR or os.path.join(tempfile.gettempdir(), "ai_teacher_profiles")
+        )
+        self.max_stored = max_stored or settings.PROFILE_MAX_STORED
+
+    def save(self, profile_id: str, stacks: Counter, meta: Dict[str, Any]) -> None:
+        """
+        Store a profile and remove the oldest ones beyond `max_stored`.
+
+        Args:
+            profile_id: Time-ordered profile ID
+            stacks: Sample count per collapsed stack
+            meta: JSON-serializable details of the request
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        for suffix, content in (
+            (".collapsed", to_collapsed(stacks)),
+            (".json", json.dumps({"id": profile_id, **meta}, default=str)),
+        ):
+            tmp = self.directory / f"{profile_id}{suffix}.tmp"
+            tmp.write_text(content)
+            os.replace(tmp, self.directory / f"{profile_id}{suffix}")
+        for path in self._metadata_files()[self.max_stored:]:
+            path.unlink(missing_ok=True)
+            path.with_suffix(".collapsed").unlink(missing_ok=True)
+
+    def list(self, limit: int = 50) -> List[Dict[str, Any]]:
+        """Return metadata of the newest profiles, newest first."""
+        profiles = []
+        for path in self._metadata_files()[:limit]:
+            try:
+                profiles.append(json.loads(path.read_text()))
+            except (FileNotFoundError, ValueError):
+                continue
+        return profiles
+
+    def get(self, profile_id: str) -> Optional[str]:
+        """Return a profile's collapsed stacks, or None if it does not exist."""
+        if not profile_id or not set(profile_id) <= _PROFILE_ID_CHARS:
+            return None
+        try:
+            return (self.directory / f"{profile_id}.collapsed").read_text()
+        except FileNotFoundError:
+            return None
+
+    def _metadata_files(self) -> List[Path]:
+        # Profile IDs are UUIDv7, so names sort by creation time
+        if not self.directory.is_dir():
+            return []
+        return sorted(self.directory.glob("*.json"), reverse=True)
+
+
+# Process-wide store; workers on one host share its directory
+profile_store = ProfileStore()
@@ -0,0 +1,419 @@
+"""
+Embedded approximate nearest neighbour index over memory-mapped NumPy arrays.
+
+IVF (inverted file) index for cosine similarity: vectors are normalized,
+assigned to the nearest of `nlist` k-means centroids, and a query only scores
+the vectors of its `nprobe` nearest lists. Everything lives in flat files in
+one directory and is opened with `numpy.memmap`, so every worker process maps
+the same page cache pages instead of holding its own copy.
+
+Layout of generation `g` (all files are rewritten together by `compact`):
+
+- `meta.json`: dimensions, counts, the current generation and values from
+  `update_meta`, replaced atomically
+- `centroids.g.npy`: float32 centroids, one row per list
+- `vectors.g.bin`: vectors as float16/float32 rows; the first `sorted_count`
+  rows are grouped by list, later rows were appended by `add`
+- `lists.g.i32`: list of each row
+- `offsets.g.i64`: start row of each list within the sorted rows, plus the end
+- `docs.g.jsonl`, `doc_offsets.g.i64`: JSON payload of each row
+
+Single writer, many readers: `add` appends rows and then publishes the new
+count in `meta.json`; readers pick up changes in `refresh`, which every
+search calls. Appended rows are found by a scan of their list ids until the
+next `compact` groups them with the rest.
+
+The mapped files of a generation are held in one immutable `_Snapshot` that
+`refresh` replaces with a single assignment. A search reads the snapshot once,
+so threads searching while another refreshes never mix arrays or counts of
+different generations. Row numbers are only meaningful within a snapshot;
+`search_docs` returns payloads looked up in the snapshot that was searched.
+"""
+import json
+import os
+from pathlib import Path
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+from app.core.lazy import lazy_import
+
+np = lazy_import("numpy", install_hint="numpy")
+
+META_FILE = "meta.json"
+_CHUNK_ROWS = 16_384
+
+
+def normalize(vectors: "np.ndarray") -> "np.ndarray":
+    """Scale rows to unit length (float32), leaving zero rows as they are."""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+
+def _nearest_lists(vectors: "np.ndarray", centroids: "np.ndarray") -> "np.ndarray":
+    lists = np.empty(len(vectors), dtype=np.int32)
+    for start in range(0, len(vectors), _CHUNK_ROWS):
+        chunk = np.asarray(vectors[start:start + _CHUNK_ROWS], dtype=np.float32)
+        lists[start:start + len(chunk)] = np.argmax(chunk @ centroids.T, axis=1)
+    return lists
+
+
+def train_centroids(
+    vectors: "np.ndarray", nlist: int, *, iterations: int = 10, sample_size: Optional[int] = None, seed: int = 0
+) -> "np.ndarray":
+    """
+    Train spherical k-means centroids on a sample of normalized vectors.
+
+    Args:
+        vectors: Normalized vectors
+        nlist: Number of centroids
+        iterations: k-means iterations
+        sample_size: Vectors trained on, defaults to 64 per centroid
+        seed: Random seed
+
+    Returns:
+        float32 array of shape (nlist, dim)
+    """
+    rng = np.random.default_rng(seed)
+    count = len(vectors)
+    nlist = min(nlist, count)
+    sample_size = min(count, sample_size or nlist * 64)
+    sample = np.asarray(vectors[np.sort(rng.choice(count, sample_size, replace=False))], dtype=np.float32)
+    centroids = sample[rng.choice(sample_size, nlist, replace=False)].copy()
+    for _ in range(iterations):
+        assigned = _nearest_lists(sample, centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assigned, sample)
+        empty = np.bincount(assigned, minlength=nlist) == 0
+        # Restart empty lists from random sample vectors
+        sums[empty] = sample[rng.choice(sample_size, int(empty.sum()))]
+        centroids = normalize(sums)
+    return centroids
+
+
+class _Snapshot(NamedTuple):
+    """The mapped files of one generation and the meta they were mapped with."""
+
+    meta: Dict[str, Any]
+    mtime: Optional[int]
+    centroids: "np.ndarray"
+    vectors: "np.ndarray"
+    lists: "np.ndarray"
+    offsets: "np.ndarray"
+    doc_offsets: "np.ndarray"
+    docs: "np.ndarray"
+
+
+class VectorIndex:
+    """
+    Memory-mapped IVF index with JSON payloads. See the module docstring.
+    """
+
+    def __init__(self, directory: Union[str, Path]):
+        """
+        Open an existing index by mapping its files.
+
+        Args:
+            directory: Index directory created by `VectorIndex.create`
+        """
+        self.directory = Path(directory)
+        self._snapshot: Optional[_Snapshot] = None
+        self.refresh()
+
+    @classmethod
+    def create(
+        cls,
+        directory: Union[str, Path],
+        vectors: "np.ndarray",
+        docs: Sequence[Dict[str, Any]],
+        *,
+        nlist: int,
+        dtype: str = "float16",
+        iterations: int = 10,
+        sample_size: Optional[int] = None,
+    ) -> "VectorIndex":
+        """
+        Build a new index, replacing any index in the directory.
+
+        Args:
+            directory: Index directory, created if missing
+            vectors: Embeddings, one row per document
+            docs: JSON-serializable payload of each vector
+            nlist: Number of inverted lists, e.g. about sqrt(number of vectors)
+            dtype: Storage type of vectors, "float16" (half the memory) or "float32"
+            iterations: k-means iterations when training the lists
+            sample_size: Vectors the lists are trained on
+
+        Returns:
+            The opened index
+        """
+        vectors = normalize(vectors)
+        if len(vectors) != len(docs) or len(vectors) == 0:
+            raise ValueError("Need one document per vector and at least one vector")
+        centroids = train_centroids(vectors, nlist, iterations=iterations, sample_size=sample_size)
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        previous = cls._read_meta(directory)
+        generation = previous["generation"] + 1 if previous else 1
+        meta = {"dim": int(vectors.shape[1]), "dtype": dtype, "nlist": len(centroids), "generation": generation}
+        encoded = [json.dumps(doc, default=str).encode() for doc in docs]
+        cls._write_generation(
+            directory, meta, centroids, vectors, _nearest_lists(vectors, centroids), encoded.__getitem__
+        )
+        cls._remove_generation(directory, previous)
+        return cls(directory)
+
+    @property
+    def meta(self) -> Dict[str, Any]:
+        """Contents of `meta.json` for the mapped generation."""
+        return self._snapshot.meta
+
+    @property
+    def vectors(self) -> "np.ndarray":
+        """Mapped vectors of the current generation."""
+        return self._snapshot.vectors
+
+    def __len__(self) -> int:
+        return self.meta.get("count", 0)
+
+    def refresh(self) -> bool:
+        """
+        Remap the files if another process changed the index.
+
+        Returns:
+            True if the index changed since the last call
+        """
+        try:
+            mtime = (self.directory / META_FILE).stat().st_mtime_ns
+        except FileNotFoundError:
+            raise FileNotFoundError(f"No vector index in {self.directory}") from None
+        if self._snapshot is not None and mtime == self._snapshot.mtime:
+            return False
+        for attempt in range(2):
+            meta = self._read_meta(self.directory)
+            try:
+                snapshot = self._map_generation(meta, mtime)
+                break
+            except FileNotFoundError:
+                # A concurrent compact removed the generation just read; retry with the new one
+                if attempt:
+                    raise
+        self._snapshot = snapshot
+        return True
+
+    def _map_generation(self, meta: Dict[str, Any], mtime: int) -> _Snapshot:
+        generation, count, dim = meta["generation"], meta["count"], meta["dim"]
+        doc_offsets = self._map(self._path("doc_offsets", generation, "i64"), np.int64, (count + 1,))
+        return _Snapshot(
+            meta=meta,
+            mtime=mtime,
+            centroids=np.load(self._path("centroids", generation, "npy"), mmap_mode="r"),
+            vectors=self._map(self._path("vectors", generation, "bin"), meta["dtype"], (count, dim)),
+            lists=self._map(self._path("lists", generation, "i32"), np.int32, (count,)),
+            offsets=self._map(self._path("offsets", generation, "i64"), np.int64, (meta["nlist"] + 1,)),
+            doc_offsets=doc_offsets,
+            docs=self._map(self._path("docs", generation, "jsonl"), np.uint8, (int(doc_offsets[-1]),)),
+        )
+
+    def search(
+        self, query: "np.ndarray", k: int = 10, *, nprobe: int = 16
+    ) -> List[Tuple[float, int]]:
+        """
+        Find the vectors most similar to a query.
+
+        Rows are only valid until the index changes; use `search_docs` to get
+        their payloads from the same generation.
+
+        Args:
+            query: Query embedding
+            k: Number of results
+            nprobe: Lists scanned; more lists improve recall and cost latency
+
+        Returns:
+            Up to k (cosine similarity, row) pairs, best first
+        """
+        self.refresh()
+        return self._search(self._snapshot, query, k, nprobe)
+
+    def search_docs(
+        self, query: "np.ndarray", k: int = 10, *, nprobe: int = 16
+    ) -> List[Tuple[float, Dict[str, Any]]]:
+        """
+        Find the vectors most similar to a query and return their payloads.
+
+        Args:
+            query: Query embedding
+            k: Number of results
+            nprobe: Lists scanned; more lists improve recall and cost latency
+
+        Returns:
+            Up to k (cosine similarity, payload) pairs, best first
+        """
+        self.refresh()
+        snapshot = self._snapshot
+        return [
+            (score, json.loads(self._doc_bytes(snapshot, row)))
+            for score, row in self._search(snapshot, query, k, nprobe)
+        ]
+
+    @staticmethod
+    def _search(snapshot: _Snapshot, query: "np.ndarray", k: int, nprobe: int) -> List[Tuple[float, int]]:
+        query = normalize(query).reshape(-1)
+        nprobe = min(nprobe, len(snapshot.centroids))
+        probes = np.argpartition(-(snapshot.centroids @ query), nprobe - 1)[:nprobe]
+
+        rows, scores = [], []
+        for probe in probes:
+            start, end = int(snapshot.offsets[probe]), int(snapshot.offsets[probe + 1])
+            if end > start:
+                rows.append(np.arange(start, end))
+                scores.append(np.asarray(snapshot.vectors[start:end], dtype=np.float32) @ query)
+        count, sorted_count = snapshot.meta["count"], snapshot.meta["sorted_count"]
+        if count > sorted_count:
+            tail = sorted_count + np.flatnonzero(np.isin(snapshot.lists[sorted_count:], probes))
+            if len(tail):
+                rows.append(tail)
+                scores.append(np.asarray(snapshot.vectors[tail], dtype=np.float32) @ query)
+        if not rows:
+            return []
+        rows, scores = np.concatenate(rows), np.concatenate(scores)
+        if len(scores) > k:
+            top = np.argpartition(-scores, k - 1)[:k]
+            rows, scores = rows[top], scores[top]
+        order = np.argsort(-scores, kind="stable")
+        return [(float(scores[i]), int(rows[i])) for i in order]
+
+    def doc(self, row: int) -> Dict[str, Any]:
+        """Return the payload stored with a row of the current generation."""
+        return json.loads(self._doc_bytes(self._snapshot, row))
+
+    @staticmethod
+    def _doc_bytes(snapshot: _Snapshot, row: int) -> bytes:
+        start, end = int(snapshot.doc_offsets[row]), int(snapshot.doc_offsets[row + 1])
+        return snapshot.docs[start:end].tobytes()
+
+    def add(self, vectors: "np.ndarray", docs: Sequence[Dict[str, Any]]) -> None:
+        """
+        Append vectors to the index without retraining or rewriting it.
+        Only one process may write to an index at a time.
+
+        Args:
+            vectors: Embeddings, one row per document
+            docs: JSON-serializable payload of each vector
+        """
+        self.refresh()
+        snapshot = self._snapshot
+        vectors = normalize(vectors)
+        if len(vectors) != len(docs):
+            raise ValueError("Need one document per vector")
+        if not len(vectors):
+            return
+        meta, generation = dict(snapshot.meta), snapshot.meta["generation"]
+        encoded = [json.dumps(doc, default=str).encode() for doc in docs]
+        doc_ends = int(snapshot.doc_offsets[-1]) + np.cumsum([len(data) for data in encoded], dtype=np.int64)
+        # Data first, count last: readers never see rows whose data is incomplete
+        with open(self._path("vectors", generation, "bin"), "ab") as f:
+            f.write(vectors.astype(meta["dtype"]).tobytes())
+        with open(self._path("lists", generation, "i32"), "ab") as f:
+            f.write(_nearest_lists(vectors, np.asarray(snapshot.centroids)).tobytes())
+        with open(self._path("docs", generation, "jsonl"), "ab") as f:
+            f.write(b"".join(encoded))
+        with open(self._path("doc_offsets", generation, "i64"), "ab") as f:
+            f.write(doc_ends.tobytes())
+        meta["count"] += len(vectors)
+        self._write_meta(self.directory, meta)
+        self.refresh()
+
+    def compact(self) -> None:
+        """
+        Rewrite the index with appended rows grouped into their lists, as a new
+        generation. Readers switch over on their next refresh.
+        """
+        self.refresh()
+        snapshot = self._snapshot
+        if snapshot.meta["count"] == snapshot.meta["sorted_count"]:
+            return
+        previous = dict(snapshot.meta)
+        meta = {**previous, "generation": previous["generation"] + 1}
+        self._write_generation(
+            self.directory,
+            meta,
+            np.asarray(snapshot.centroids),
+            snapshot.vectors,
+            np.asarray(snapshot.lists),
+            lambda row: self._doc_bytes(snapshot, row),
+        )
+        self._remove_generation(self.directory, previous)
+        self.refresh()
+
+    def update_meta(self, **values: Any) -> None:
+        """
+        Store extra JSON-serializable values in `meta.json`, e.g. how far a
+        source was indexed. They are kept by `add` and `compact`.
+        """
+        self.refresh()
+        self._write_meta(self.directory, {**self.meta, **values})
+        self.refresh()
+
+    def _path(self, name: str, generation: int, ext: str) -> Path:
+        return self.directory / f"{name}.{generation}.{ext}"
+
+    @staticmethod
+    def _map(path: Path, dtype: Any, shape: Tuple[int, ...]) -> "np.ndarray":
+        if 0 in shape:
+            return np.zeros(shape, dtype=dtype)
+        return np.memmap(path, dtype=dtype, mode="r", shape=shape)
+
+    @staticmethod
+    def _read_meta(directory: Path) -> Optional[Dict[str, Any]]:
+        try:
+            return json.loads((directory / META_FILE).read_text())
+        except FileNotFoundError:
+            return None
+
+    @staticmethod
+    def _write_meta(directory: Path, meta: Dict[str, Any]) -> None:
+        tmp = directory / f"{META_FILE}.tmp"
+        tmp.write_text(json.dumps(meta))
+        os.replace(tmp, directory / META_FILE)
+
+    @classmethod
+    def _write_generation(
+        cls,
+        directory: Path,
+        meta: Dict[str, Any],
+        centroids: "np.ndarray",
+        vectors: "np.ndarray",
+        lists: "np.ndarray",
+        doc_bytes: Callable[[int], bytes],
+    ) -> None:
+        generation, nlist = meta["generation"], meta["nlist"]
+        order = np.argsort(lists, kind="stable")
+
+        def path(name: str, ext: str) -> Path:
+            return directory / f"{name}.{generation}.{ext}"
+
+        np.save(path("centroids", "npy"), np.asarray(centroids, dtype=np.float32))
+        with open(path("vectors", "bin"), "wb") as f:
+            for start in range(0, len(order), _CHUNK_ROWS):
+                rows = order[start:start + _CHUNK_ROWS]
+                f.write(np.asarray(vectors[rows]).astype(meta["dtype"]).tobytes())
+        lists = np.asarray(lists, dtype=np.int32)[order]
+        lists.tofile(path("lists", "i32"))
+        offsets = np.concatenate(([0], np.cumsum(np.bincount(lists, minlength=nlist)))).astype(np.int64)
+        offsets.tofile(path("offsets", "i64"))
+        doc_offsets = [0]
+        with open(path("docs", "jsonl"), "wb") as f:
+            for row in order:
+                data = doc_bytes(int(row))
+                f.write(data)
+                doc_offsets.append(doc_offsets[-1] + len(data))
+        np.asarray(doc_offsets, dtype=np.int64).tofile(path("doc_offsets", "i64"))
+        cls._write_meta(directory, {**meta, "count": len(order), "sorted_count": len(order)})
+
+    @staticmethod
+    def _remove_generation(directory: Path, meta: Optional[Dict[str, Any]]) -> None:
+        # Processes that still map these files keep reading them until they refresh
+        if meta is None:
+            return
+        for path in directory.glob(f"*.{meta['generation']}.*"):
+            path.unlink(missing_ok=True)
@@ -1,5 +1,12 @@
 from app.crud.crud_user import user
 from app.crud.crud_child import child
+from app.crud.crud_session import session
+from app.crud.crud_message import message
+from app.crud.crud_usage import usage
+from app.crud.crud_skill import skill
+from app.crud.crud_progress import progress
+from app.crud.crud_question_bank import question_bank
+from app.crud.crud_idempotency import idempotency_key
 
 # Export all CRUD components
-__all__ = ["user", "child"]
+__all__ = ["user", "child", "session", "message", "usage", "skill", "progress", "question_bank", "idempotency_key"]
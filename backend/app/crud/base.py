@@ -2,11 +2,14 @@ from typing import Any, Dict, Generic, List, Optional, Type, TypeVar, Union
 
 from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel
-from sqlalchemy import select
+from sqlalchemy import lambda_stmt, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from uuid import UUID
 
+from app.core.cache import cache_registry
+from app.db.invalidation import notify_invalidation
+from app.db.write_behind import PendingWrite, write_buffer
 from app.models.base import Base
 
 
@@ -23,7 +26,13 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
     
     * `model`: A SQLAlchemy model class
     * `schema`: A Pydantic model (schema) class
+    
+    Subclasses whose entities are held in in-process caches set
+    `invalidates_cache = True`, so that updates and deletes notify every
+    worker to evict the entity (see `app.db.invalidation`).
     """
+    
+    invalidates_cache: bool = False
 
     def __init__(self, model: Type[ModelType]):
         """
@@ -31,6 +40,22 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         """
         self.model = model
     
+    def _queue_invalidation(self, db: Session, id: UUID) -> None:
+        """
+        Emit a cache invalidation for a record within the current transaction.
+        Delivered to all workers only when the transaction commits.
+        """
+        if self.invalidates_cache:
+            notify_invalidation(db, self.model.__tablename__, id)
+    
+    def _evict_local(self, id: UUID) -> None:
+        """
+        Evict a record from this worker's caches right after commit,
+        without waiting for the notification round-trip.
+        """
+        if self.invalidates_cache:
+            cache_registry.evict(self.model.__tablename__, id)
+    
     def get(self, db: Session, id: UUID) -> Optional[ModelType]:
         """
         Get a single record by ID.
@@ -42,7 +67,9 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         Returns:
             The model instance if found, None otherwise
         """
-        return db.query(self.model).filter(self.model.id == id).first()
+        # Lambda statements are built and cache-keyed once per model, not per call
+        model = self.model
+        return db.scalars(lambda_stmt(lambda: select(model).where(model.id == id).limit(1))).first()
     
     def get_multi(
         self, db: Session, *, skip: int = 0, limit: int = 100
@@ -78,6 +105,37 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         db.refresh(db_obj)
         return db_obj
     
+    def create_buffered(
+        self, *, obj_in: Union[CreateSchemaType, Dict[str, Any]]
+    ) -> PendingWrite:
+        """
+        Queue a new record in the write-behind buffer instead of committing it now.
+        Meant for append-only records written at high rates (messages, answers).
+        
+        Args:
+            obj_in: Pydantic schema or dict with create data
+        
+        Returns:
+            Handle with the record's id; the record is durable only once it completes
+        """
+        obj_in_data = obj_in if isinstance(obj_in, dict) else obj_in.dict()
+        return write_buffer.submit(self.model, obj_in_data)
+    
+    async def create_buffered_async(
+        self, *, obj_in: Union[CreateSchemaType, Dict[str, Any]]
+    ) -> PendingWrite:
+        """
+        Queue a new record like `create_buffered`, without blocking the event loop.
+        
+        Args:
+            obj_in: Pydantic schema or dict with create data
+        
+        Returns:
+            Handle with the record's id; the record is durable only once it completes
+        """
+        obj_in_data = obj_in if isinstance(obj_in, dict) else obj_in.dict()
+        return await write_buffer.submit_async(self.model, obj_in_data)
+    
     def update(
         self,
         db: Session,
@@ -105,7 +163,9 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
             if field in update_data:
                 setattr(db_obj, field, update_data[field])
         db.add(db_obj)
+        self._queue_invalidation(db, db_obj.id)
         db.commit()
+        self._evict_local(db_obj.id)
         db.refresh(db_obj)
         return db_obj
     
@@ -122,5 +182,7 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         """
         obj = db.query(self.model).get(id)
         db.delete(obj)
+        self._queue_invalidation(db, id)
         db.commit()
+        self._evict_local(id)
         return obj
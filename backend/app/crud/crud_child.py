@@ -1,8 +1,12 @@
-from typing import Any, Dict, List, Optional, Union
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple, Union
 from uuid import UUID
 
+from sqlalchemy import Text, cast, func, lambda_stmt, select, update
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB, insert
 from sqlalchemy.orm import Session
 
+from app.core.ids import uuid7
 from app.crud.base import CRUDBase
 from app.models.child import Child
 from app.schemas.child import ChildCreate, ChildUpdate
@@ -14,6 +18,8 @@ class CRUDChild(CRUDBase[Child, ChildCreate, ChildUpdate]):
     Extends the base CRUD operations with child-specific functionality.
     """
     
+    invalidates_cache = True
+    
     def get_multi_by_parent(
         self, db: Session, *, parent_id: UUID, skip: int = 0, limit: int = 100
     ) -> List[Child]:
@@ -37,6 +43,35 @@ class CRUDChild(CRUDBase[Child, ChildCreate, ChildUpdate]):
             .all()
         )
     
+    def get_multi_by_preferences(
+        self,
+        db: Session,
+        *,
+        preferences: Dict[str, Any],
+        parent_id: Optional[UUID] = None,
+        skip: int = 0,
+        limit: int = 100,
+    ) -> List[Child]:
+        """
+        Get children whose preferences contain all the given key/value pairs.
+        Uses the GIN index on preferences through the `@>` containment operator,
+        e.g. for batch personalization jobs across all parents.
+        
+        Args:
+            db: Database session
+            preferences: Key/value pairs that must all match, e.g. {"response_style": "concise"}
+            parent_id: Optionally restrict to the children of one parent
+            skip: Number of records to skip
+            limit: Maximum number of records to return
+            
+        Returns:
+            List of Child objects
+        """
+        query = db.query(self.model).filter(Child.preferences.contains(preferences))
+        if parent_id is not None:
+            query = query.filter(Child.parent_id == parent_id)
+        return query.order_by(Child.id).offset(skip).limit(limit).all()
+    
     def create_with_parent(
         self, db: Session, *, obj_in: ChildCreate, parent_id: UUID
     ) -> Child:
@@ -73,11 +108,55 @@ class CRUDChild(CRUDBase[Child, ChildCreate, ChildUpdate]):
         Returns:
             Child object if found and belongs to the parent, None otherwise
         """
-        return (
-            db.query(self.model)
-            .filter(Child.id == id, Child.parent_id == parent_id)
-            .first()
+        return db.scalars(
+            lambda_stmt(lambda: select(Child).where(Child.id == id, Child.parent_id == parent_id).limit(1))
+        ).first()
+    
+    def get_version_by_id_and_parent(
+        self, db: Session, *, id: UUID, parent_id: UUID
+    ) -> Optional[datetime]:
+        """
+        Get only the last modification time of a parent's child profile.
+        Used to answer conditional requests without loading the full row.
+        
+        Args:
+            db: Database session
+            id: Child ID
+            parent_id: ID of the parent user
+            
+        Returns:
+            updated_at of the child if found and belongs to the parent, None otherwise
+        """
+        return db.execute(
+            select(Child.updated_at).where(Child.id == id, Child.parent_id == parent_id)
+        ).scalar_one_or_none()
+    
+    def get_list_version_by_parent(
+        self,
+        db: Session,
+        *,
+        parent_id: UUID,
+        preferences: Optional[Dict[str, Any]] = None,
+    ) -> Tuple[int, Optional[datetime]]:
+        """
+        Get the row count and latest modification time of a parent's children.
+        Any create, update or delete changes at least one of the two.
+        
+        Args:
+            db: Database session
+            parent_id: ID of the parent user
+            preferences: Optional preference filter, as in `get_multi_by_preferences`
+            
+        Returns:
+            Tuple of (count, max updated_at or None)
+        """
+        stmt = select(func.count(Child.id), func.max(Child.updated_at)).where(
+            Child.parent_id == parent_id
         )
+        if preferences:
+            stmt = stmt.where(Child.preferences.contains(preferences))
+        count, last_updated = db.execute(stmt).one()
+        return count, last_updated
     
     def update_child_profile(
         self, 
@@ -101,6 +180,72 @@ class CRUDChild(CRUDBase[Child, ChildCreate, ChildUpdate]):
         # but we can add additional validation if needed in the future
         return super().update(db, db_obj=db_obj, obj_in=obj_in)
 
+    def patch_preferences(
+        self,
+        db: Session,
+        *,
+        id: UUID,
+        parent_id: UUID,
+        patch: Dict[str, Any],
+    ) -> Optional[Child]:
+        """
+        Merge a partial update into a child's preferences in a single statement.
+        
+        Follows JSON merge patch semantics for top-level keys: keys in `patch`
+        are set, keys with a null value are removed and all other keys are kept.
+        The document is merged by PostgreSQL, so the row is never loaded first.
+        
+        Args:
+            db: Database session
+            id: Child ID
+            parent_id: ID of the parent user; the update only applies to their child
+            patch: Preference keys to set, or to remove when the value is None
+            
+        Returns:
+            Updated Child object if found and belongs to the parent, None otherwise
+        """
+        to_set = {key: value for key, value in patch.items() if value is not None}
+        to_remove = [key for key, value in patch.items() if value is None]
+        
+        merged = func.coalesce(Child.preferences, cast({}, JSONB)).op("||")(cast(to_set, JSONB))
+        if to_remove:
+            merged = merged.op("-")(cast(to_remove, ARRAY(Text)))
+        
+        stmt = (
+            update(Child)
+            .where(Child.id == id, Child.parent_id == parent_id)
+            .values(preferences=merged, updated_at=datetime.utcnow())
+            .returning(Child)
+            .execution_options(populate_existing=True)
+        )
+        child = db.scalars(stmt).one_or_none()
+        if child is not None:
+            self._queue_invalidation(db, id)
+        db.commit()
+        self._evict_local(id)
+        return child
+
+    
+    def create_many(self, db: Session, *, rows: List[Dict[str, Any]]) -> List[UUID]:
+        """
+        Insert child profiles with a single multi-row INSERT and commit.
+        
+        Args:
+            db: Database session
+            rows: Dictionaries with the Child columns, including parent_id
+            
+        Returns:
+            IDs of the created children, in the order of `rows`
+        """
+        if not rows:
+            return []
+        now = datetime.utcnow()
+        values = [{**row, "id": uuid7(), "created_at": now, "updated_at": now} for row in rows]
+        ids = [value["id"] for value in values]
+        db.execute(insert(Child).values(values))
+        db.commit()
+        return ids
+
 
 # Create a singleton instance
 child = CRUDChild(Child)
@@ -0,0 +1,174 @@
+from datetime import datetime, timedelta
+from typing import List, Optional
+from uuid import UUID
+
+from pydantic import BaseModel
+from sqlalchemy import and_, delete, or_, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.ids import uuid7
+from app.crud.base import CRUDBase
+from app.models.idempotency import IdempotencyKey
+
+
+class CRUDIdempotencyKey(CRUDBase[IdempotencyKey, BaseModel, BaseModel]):
+    """
+    CRUD operations for the IdempotencyKey model.
+    Every method commits: keys are written outside the request's own transaction.
+    """
+    
+    def claim(self, db: Session, *, user_id: UUID, key: str, request_hash: bytes) -> Optional[UUID]:
+        """
+        Claim a key for a new request and commit, in one `INSERT ... ON CONFLICT DO UPDATE`.
+        
+        A key is free if it is new, expired, or held by an in-flight request
+        whose lock has run out. Every claim gives the row a new ID, so a request
+        whose claim was taken over can no longer complete or release the key.
+        
+        Args:
+            db: Database session
+            user_id: ID of the user making the request
+            key: Idempotency-Key header value
+            request_hash: Digest of the request
+        
+        Returns:
+            Claim ID if the caller now holds the key and must run the request, else None
+        """
+        now = datetime.utcnow()
+        stmt = insert(IdempotencyKey).values(
+            id=uuid7(),
+            user_id=user_id,
+            key=key,
+            request_hash=request_hash,
+            locked_until=now + timedelta(seconds=settings.IDEMPOTENCY_LOCK_SECONDS),
+            expires_at=now + timedelta(seconds=settings.IDEMPOTENCY_TTL_SECONDS),
+            created_at=now,
+            updated_at=now,
+        )
+        stmt = stmt.on_conflict_do_update(
+            constraint="uq_idempotencykey_user_id_key",
+            set_={
+                "id": stmt.excluded.id,
+                "request_hash": stmt.excluded.request_hash,
+                "status_code": None,
+                "response_headers": None,
+                "response_body": None,
+                "locked_until": stmt.excluded.locked_until,
+                "expires_at": stmt.excluded.expires_at,
+                "created_at": now,
+                "updated_at": now,
+            },
+            where=or_(
+                IdempotencyKey.expires_at < now,
+                and_(IdempotencyKey.status_code.is_(None), IdempotencyKey.locked_until < now),
+            ),
+        ).returning(IdempotencyKey.id)
+        claim_id = db.execute(stmt).scalar()
+        db.commit()
+        return claim_id
+    
+    def get_by_key(self, db: Session, *, user_id: UUID, key: str) -> Optional[IdempotencyKey]:
+        """
+        Get a user's unexpired key.
+        
+        Args:
+            db: Database session
+            user_id: ID of the user
+            key: Idempotency-Key header value
+        
+        Returns:
+            IdempotencyKey object or None if not found or expired
+        """
+        return db.scalars(
+            select(IdempotencyKey).where(
+                IdempotencyKey.user_id == user_id,
+                IdempotencyKey.key == key,
+                IdempotencyKey.expires_at >= datetime.utcnow(),
+            )
+        ).first()
+    
+    def complete(
+        self,
+        db: Session,
+        *,
+        user_id: UUID,
+        key: str,
+        claim_id: UUID,
+        status_code: int,
+        headers: List[List[str]],
+        body: bytes,
+    ) -> None:
+        """
+        Store the response of a claimed key and commit.
+        
+        Nothing is stored if the claim has been taken over meanwhile.
+        
+        Args:
+            db: Database session
+            user_id: ID of the user
+            key: Idempotency-Key header value
+            claim_id: ID returned by `claim`
+            status_code: Response status code
+            headers: Response headers as [name, value] pairs
+            body: Response body
+        """
+        db.execute(
+            update(IdempotencyKey)
+            .where(IdempotencyKey.user_id == user_id, IdempotencyKey.key == key, IdempotencyKey.id == claim_id)
+            .values(
+                status_code=status_code,
+                response_headers=headers,
+                response_body=body,
+                updated_at=datetime.utcnow(),
+            )
+        )
+        db.commit()
+    
+    def release(self, db: Session, *, user_id: UUID, key: str, claim_id: UUID) -> None:
+        """
+        Give up an in-flight key so the request can be retried, and commit.
+        
+        Nothing is removed if the claim has been taken over meanwhile.
+        
+        Args:
+            db: Database session
+            user_id: ID of the user
+            key: Idempotency-Key header value
+            claim_id: ID returned by `claim`
+        """
+        db.execute(
+            delete(IdempotencyKey).where(
+                IdempotencyKey.user_id == user_id,
+                IdempotencyKey.key == key,
+                IdempotencyKey.id == claim_id,
+                IdempotencyKey.status_code.is_(None),
+            )
+        )
+        db.commit()
+    
+    def remove_expired(self, db: Session, *, batch_size: int = 1000) -> int:
+        """
+        Delete up to `batch_size` expired keys and commit.
+        
+        Args:
+            db: Database session
+            batch_size: Maximum number of keys to delete
+        
+        Returns:
+            Number of keys deleted
+        """
+        expired = (
+            select(IdempotencyKey.id)
+            .where(IdempotencyKey.expires_at < datetime.utcnow())
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        deleted = db.execute(delete(IdempotencyKey).where(IdempotencyKey.id.in_(expired))).rowcount
+        db.commit()
+        return deleted
+
+
+# Create a singleton instance
+idempotency_key = CRUDIdempotencyKey(IdempotencyKey)
@@ -0,0 +1,201 @@
+import base64
+import binascii
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import REAL, and_, cast, func, literal, select, tuple_
+from sqlalchemy.dialects.postgresql import REGCONFIG
+from sqlalchemy.orm import Session
+
+from app.crud.base import CRUDBase
+from app.db.archive_codec import decompress_messages
+from app.models.child import Child
+from app.models.session import SEARCH_CONFIG, Message, MessageArchive, Session as LearningSession
+from app.schemas.session import MessageCreate, MessageUpdate
+
+
+# ts_headline options: wrap hits in <mark> and return up to two short fragments
+HEADLINE_OPTIONS = "StartSel=<mark>, StopSel=</mark>, MaxFragments=2, MaxWords=20, MinWords=5"
+
+
+def _encode_cursor(rank: float, id: UUID) -> str:
+    """Encode the keyset position of the last returned hit as an opaque string."""
+    raw = f"{rank!r}:{id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> Tuple[float, UUID]:
+    """
+    Decode a cursor produced by `_encode_cursor`.
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        rank, id = base64.urlsafe_b64decode(padded).decode().split(":", 1)
+        return float(rank), UUID(id)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as exc:
+        raise ValueError("Invalid search cursor") from exc
+
+
+class CRUDMessage(CRUDBase[Message, MessageCreate, MessageUpdate]):
+    """
+    CRUD operations for Message model.
+    Extends the base CRUD operations with session history reads across hot
+    and archived storage, and full-text search over message content.
+    """
+
+    def get_multi_by_session(
+        self, db: Session, *, session_id: UUID, skip: int = 0, limit: int = 100
+    ) -> List[Message]:
+        """
+        Get the message history of a session in chronological order.
+        
+        Archived messages are always older than the hot ones, so the archive
+        is read first and hot rows continue after it. Archived messages are
+        returned as detached Message instances that must not be added to the session.
+        
+        Args:
+            db: Database session
+            session_id: ID of the learning session
+            skip: Number of records to skip
+            limit: Maximum number of records to return
+            
+        Returns:
+            List of Message objects
+        """
+        messages: List[Message] = []
+        archive = db.execute(
+            select(MessageArchive.message_count, MessageArchive.payload)
+            .where(MessageArchive.session_id == session_id)
+        ).one_or_none()
+        if archive is not None:
+            if skip < archive.message_count:
+                messages = [
+                    Message(**m)
+                    for m in decompress_messages(archive.payload, skip, skip + limit)
+                ]
+            skip = max(skip - archive.message_count, 0)
+            limit -= len(messages)
+            if limit <= 0:
+                return messages
+
+        hot = (
+            db.query(self.model)
+            .filter(Message.session_id == session_id)
+            .order_by(Message.created_at, Message.id)
+            .offset(skip)
+            .limit(limit)
+            .all()
+        )
+        return messages + hot
+
+    def get_recent_by_session(
+        self, db: Session, *, session_id: UUID, limit: int
+    ) -> List[Message]:
+        """
+        Get the latest hot messages of a session, oldest first, e.g. to build LLM context.
+        
+        Args:
+            db: Database session
+            session_id: ID of the learning session
+            limit: Maximum number of messages to return
+            
+        Returns:
+            List of Message objects in chronological order
+        """
+        recent = (
+            db.query(self.model)
+            .filter(Message.session_id == session_id)
+            .order_by(Message.created_at.desc(), Message.id.desc())
+            .limit(limit)
+            .all()
+        )
+        return recent[::-1]
+    
+    def search_by_parent(
+        self,
+        db: Session,
+        *,
+        parent_id: UUID,
+        query: str,
+        child_id: Optional[UUID] = None,
+        cursor: Optional[str] = None,
+        limit: int = 20,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Full-text search over the messages of a parent's children.
+
+        Matches use the GIN-indexed `search_vector` column. Results are ordered
+        by rank and paginated with a keyset on (rank, id), so deep pages cost the
+        same as the first one. Headlines are only computed for the returned page.
+        Only hot messages are searched; archived sessions are not indexed.
+
+        Args:
+            db: Database session
+            parent_id: ID of the parent user; only their children's messages are searched
+            query: Search text in web search syntax (e.g. `volcano -lava`)
+            child_id: Optionally restrict the search to a single child
+            cursor: Opaque cursor returned by the previous page
+            limit: Maximum number of results to return
+
+        Returns:
+            Tuple of (list of result dicts, cursor for the next page or None)
+
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        tsquery = func.websearch_to_tsquery(literal(SEARCH_CONFIG).cast(REGCONFIG), query)
+        rank = func.ts_rank_cd(Message.search_vector, tsquery)
+
+        page = (
+            select(
+                Message.id,
+                Message.session_id,
+                LearningSession.child_id,
+                Message.role,
+                Message.created_at,
+                rank.label("rank"),
+            )
+            .join(LearningSession, Message.session_id == LearningSession.id)
+            .join(Child, LearningSession.child_id == Child.id)
+            .where(
+                Child.parent_id == parent_id,
+                Message.search_vector.op("@@")(tsquery),
+            )
+        )
+        if child_id is not None:
+            page = page.where(LearningSession.child_id == child_id)
+        if cursor is not None:
+            after_rank, after_id = _decode_cursor(cursor)
+            page = page.where(
+                tuple_(rank, Message.id) < tuple_(cast(after_rank, REAL), after_id)
+            )
+        # Fetch one extra row to know whether another page exists
+        page = page.order_by(rank.desc(), Message.id.desc()).limit(limit + 1).subquery()
+
+        headline = func.ts_headline(
+            literal(SEARCH_CONFIG).cast(REGCONFIG),
+            Message.content,
+            tsquery,
+            HEADLINE_OPTIONS,
+        )
+        stmt = (
+            select(page, headline.label("headline"))
+            # created_at is the partition key, so the join only probes one partition
+            .join(Message, and_(Message.id == page.c.id, Message.created_at == page.c.created_at))
+            .order_by(page.c.rank.desc(), page.c.id.desc())
+        )
+        rows = [dict(row) for row in db.execute(stmt).mappings()]
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            next_cursor = _encode_cursor(last["rank"], last["id"])
+        return rows, next_cursor
+
+
+# Create a singleton instance
+message = CRUDMessage(Message)
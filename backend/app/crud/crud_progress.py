@@ -0,0 +1,86 @@
+from datetime import datetime
+from typing import List
+from uuid import UUID
+
+from pydantic import BaseModel
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.core.ids import uuid7
+from app.crud.base import CRUDBase
+from app.models.progress import SubjectProgress
+
+
+class CRUDProgress(CRUDBase[SubjectProgress, BaseModel, BaseModel]):
+    """
+    CRUD operations for the SubjectProgress model.
+    Rows are only ever incremented, once per completed session.
+    """
+    
+    def get_by_child(self, db: Session, *, child_id: UUID) -> List[SubjectProgress]:
+        """
+        Get a child's progress in every subject they have completed a session in.
+        
+        Args:
+            db: Database session
+            child_id: ID of the child
+        
+        Returns:
+            List of SubjectProgress objects ordered by subject
+        """
+        return db.execute(
+            select(SubjectProgress)
+            .where(SubjectProgress.child_id == child_id)
+            .order_by(SubjectProgress.subject)
+        ).scalars().all()
+    
+    def add_session(
+        self,
+        db: Session,
+        *,
+        child_id: UUID,
+        subject: str,
+        messages: int,
+        minutes: float,
+        ended_at: datetime,
+    ) -> None:
+        """
+        Add one completed session to a child's subject progress with a single upsert.
+        Does not commit, so the increment commits together with its follow-up.
+        
+        Args:
+            db: Database session
+            child_id: ID of the child
+            subject: Subject of the session
+            messages: Number of messages in the session
+            minutes: Session duration in minutes
+            ended_at: When the session ended
+        """
+        now = datetime.utcnow()
+        stmt = insert(SubjectProgress).values(
+            id=uuid7(),
+            child_id=child_id,
+            subject=subject,
+            sessions_completed=1,
+            messages=messages,
+            minutes=minutes,
+            last_session_at=ended_at,
+            created_at=now,
+            updated_at=now,
+        )
+        stmt = stmt.on_conflict_do_update(
+            constraint="uq_subjectprogress_child_id_subject",
+            set_={
+                "sessions_completed": SubjectProgress.sessions_completed + 1,
+                "messages": SubjectProgress.messages + stmt.excluded.messages,
+                "minutes": SubjectProgress.minutes + stmt.excluded.minutes,
+                "last_session_at": func.greatest(SubjectProgress.last_session_at, stmt.excluded.last_session_at),
+                "updated_at": stmt.excluded.updated_at,
+            },
+        )
+        db.execute(stmt)
+
+
+# Create a singleton instance
+progress = CRUDProgress(SubjectProgress)
@@ -0,0 +1,191 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+from pydantic import BaseModel
+from sqlalchemy import select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.core.ids import uuid7
+from app.crud.base import CRUDBase
+from app.models.question_bank import BankQuestion, SeenQuestionFilter
+
+
+class CRUDQuestionBank(CRUDBase[BankQuestion, BaseModel, BaseModel]):
+    """
+    CRUD operations for the BankQuestion model and the per-child seen filters.
+    Deduplication and serving logic lives in `app.services.question_bank`.
+    """
+    
+    def get_multi_by_slot(
+        self,
+        db: Session,
+        *,
+        subject: str,
+        topic: str,
+        grade: str,
+        difficulty: str,
+        skip: int = 0,
+        limit: int = 100,
+    ) -> List[BankQuestion]:
+        """
+        Get active bank questions of one slot in serving order: highest quality
+        first, then least served first.
+        
+        Args:
+            db: Database session
+            subject: Quiz subject
+            topic: Quiz topic
+            grade: Child grade
+            difficulty: Quiz difficulty level
+            skip: Number of records to skip
+            limit: Maximum number of records to return
+            
+        Returns:
+            List of BankQuestion objects
+        """
+        return list(db.execute(
+            select(BankQuestion)
+            .where(
+                BankQuestion.subject == subject,
+                BankQuestion.topic == topic,
+                BankQuestion.grade == grade,
+                BankQuestion.difficulty == difficulty,
+                BankQuestion.is_active.is_(True),
+            )
+            .order_by(BankQuestion.quality.desc(), BankQuestion.times_served, BankQuestion.id)
+            .offset(skip)
+            .limit(limit)
+        ).scalars())
+    
+    def get_by_buckets(
+        self, db: Session, *, subject: str, topic: str, buckets: List[int]
+    ) -> List[BankQuestion]:
+        """
+        Get the bank questions of a subject and topic that share at least one
+        LSH bucket with a signature, i.e. the near-duplicate candidates.
+        
+        Args:
+            db: Database session
+            subject: Question subject
+            topic: Question topic
+            buckets: LSH bucket ids of the new question
+            
+        Returns:
+            List of BankQuestion objects, active or not
+        """
+        return list(db.execute(
+            select(BankQuestion).where(
+                BankQuestion.lsh_buckets.overlap(buckets),
+                BankQuestion.subject == subject,
+                BankQuestion.topic == topic,
+            )
+        ).scalars())
+    
+    def create_many(self, db: Session, *, rows: List[Dict[str, Any]]) -> List[Optional[UUID]]:
+        """
+        Insert bank questions with one multi-row `INSERT ... ON CONFLICT DO NOTHING`
+        and commit. Rows whose content hash is already in the subject and topic,
+        e.g. added concurrently by another quiz, are skipped in favour of the
+        existing question.
+        
+        Args:
+            db: Database session
+            rows: Column values of each question, including content_hash
+            
+        Returns:
+            ID of each inserted question in input order; for a skipped row, the
+            ID of the existing question, or None if that one is inactive
+        """
+        if not rows:
+            return []
+        now = datetime.utcnow()
+        rows = [{"id": uuid7(), "created_at": now, "updated_at": now, **row} for row in rows]
+        inserted = set(db.execute(
+            pg_insert(BankQuestion)
+            .values(rows)
+            .on_conflict_do_nothing(index_elements=["subject", "topic", "content_hash"])
+            .returning(BankQuestion.id)
+        ).scalars())
+        skipped = [(row["subject"], row["topic"], row["content_hash"]) for row in rows if row["id"] not in inserted]
+        existing: Dict[Any, UUID] = {}
+        if skipped:
+            existing = {
+                (subject, topic, digest): question_id
+                for subject, topic, digest, question_id in db.execute(
+                    select(BankQuestion.subject, BankQuestion.topic, BankQuestion.content_hash, BankQuestion.id)
+                    .where(
+                        tuple_(BankQuestion.subject, BankQuestion.topic, BankQuestion.content_hash).in_(skipped),
+                        BankQuestion.is_active.is_(True),
+                    )
+                )
+            }
+        db.commit()
+        return [
+            row["id"] if row["id"] in inserted
+            else existing.get((row["subject"], row["topic"], row["content_hash"]))
+            for row in rows
+        ]
+    
+    def increment_served(self, db: Session, *, ids: List[UUID]) -> None:
+        """
+        Count one more serving of each question. Does not commit.
+        
+        Args:
+            db: Database session
+            ids: IDs of the served bank questions
+        """
+        if ids:
+            db.execute(
+                update(BankQuestion)
+                .where(BankQuestion.id.in_(ids))
+                .values(times_served=BankQuestion.times_served + 1)
+            )
+    
+    def get_seen_filter(self, db: Session, *, child_id: UUID) -> Optional[SeenQuestionFilter]:
+        """
+        Get a child's seen-questions filter without locking it.
+        
+        Args:
+            db: Database session
+            child_id: ID of the child
+            
+        Returns:
+            SeenQuestionFilter object or None if the child was never served bank questions
+        """
+        return db.execute(
+            select(SeenQuestionFilter).where(SeenQuestionFilter.child_id == child_id)
+        ).scalar_one_or_none()
+    
+    def get_seen_filter_for_update(
+        self, db: Session, *, child_id: UUID, empty: bytes
+    ) -> SeenQuestionFilter:
+        """
+        Get a child's seen-questions filter, creating it if needed, and lock
+        the row until the transaction ends.
+        
+        Args:
+            db: Database session
+            child_id: ID of the child
+            empty: Serialized empty filter stored for a new row
+            
+        Returns:
+            Locked SeenQuestionFilter object
+        """
+        now = datetime.utcnow()
+        db.execute(
+            pg_insert(SeenQuestionFilter)
+            .values(id=uuid7(), child_id=child_id, bloom=empty, items=0, created_at=now, updated_at=now)
+            .on_conflict_do_nothing(index_elements=["child_id"])
+        )
+        return db.execute(
+            select(SeenQuestionFilter)
+            .where(SeenQuestionFilter.child_id == child_id)
+            .with_for_update()
+            .execution_options(populate_existing=True)
+        ).scalar_one()
+
+
+# Create a singleton instance
+question_bank = CRUDQuestionBank(BankQuestion)
@@ -0,0 +1,143 @@
+from datetime import datetime
+from typing import List, Optional
+from uuid import UUID
+
+from sqlalchemy import exists, func, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.core.ids import uuid7
+from app.crud.base import CRUDBase
+from app.models.child import Child
+from app.models.session import Message, SessionFollowUp, SessionStatus
+from app.models.session import Session as LearningSession
+from app.schemas.session import SessionCreate, SessionUpdate
+
+
+class CRUDSession(CRUDBase[LearningSession, SessionCreate, SessionUpdate]):
+    """
+    CRUD operations for learning Session model.
+    Extends the base CRUD operations with parent ownership checks.
+    """
+    
+    def get_by_id_and_parent(
+        self, db: Session, *, id: UUID, parent_id: UUID
+    ) -> Optional[LearningSession]:
+        """
+        Get a learning session by ID, only if it belongs to one of the parent's children.
+        
+        Args:
+            db: Database session
+            id: Session ID
+            parent_id: ID of the parent user
+            
+        Returns:
+            Session object if found and accessible to the parent, None otherwise
+        """
+        return (
+            db.query(self.model)
+            .join(Child, LearningSession.child_id == Child.id)
+            .filter(LearningSession.id == id, Child.parent_id == parent_id)
+            .first()
+        )
+
+    
+    def get_active_by_child(self, db: Session, *, child_id: UUID) -> Optional[LearningSession]:
+        """
+        Get a child's current (most recently started active) session.
+        Served by the partial index on active sessions.
+        
+        Args:
+            db: Database session
+            child_id: ID of the child
+            
+        Returns:
+            The active session, or None if the child has none
+        """
+        return db.execute(
+            select(LearningSession)
+            .where(LearningSession.child_id == child_id, LearningSession.status == SessionStatus.ACTIVE)
+            .order_by(LearningSession.created_at.desc())
+            .limit(1)
+        ).scalar_one_or_none()
+    
+    def complete_idle(self, db: Session, *, idle_since: datetime, batch_size: int) -> List[UUID]:
+        """
+        Complete one batch of active sessions without messages since `idle_since`
+        and queue their follow-ups, in one transaction.
+        
+        Sessions are locked with SKIP LOCKED so several reapers can run at once.
+        `ended_at` is set to the session's last message, or its start if it has none.
+        
+        Args:
+            db: Database session
+            idle_since: Sessions started before and silent since this time are completed
+            batch_size: Maximum number of sessions to complete
+            
+        Returns:
+            IDs of the completed sessions
+        """
+        idle = (
+            select(LearningSession.id)
+            .where(
+                LearningSession.status == SessionStatus.ACTIVE,
+                LearningSession.created_at < idle_since,
+                ~exists().where(Message.session_id == LearningSession.id, Message.created_at >= idle_since),
+            )
+            .order_by(LearningSession.created_at)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        last_message_at = (
+            select(func.max(Message.created_at))
+            .where(Message.session_id == LearningSession.id)
+            .scalar_subquery()
+        )
+        session_ids = db.execute(
+            update(LearningSession)
+            .where(LearningSession.id.in_(idle))
+            .values(
+                status=SessionStatus.COMPLETED,
+                ended_at=func.coalesce(last_message_at, LearningSession.created_at),
+                updated_at=datetime.utcnow(),
+            )
+            .returning(LearningSession.id)
+            .execution_options(synchronize_session=False)
+        ).scalars().all()
+        if session_ids:
+            now = datetime.utcnow()
+            db.execute(
+                insert(SessionFollowUp)
+                .values([
+                    {"id": uuid7(), "session_id": id, "attempts": 0, "available_at": now,
+                     "created_at": now, "updated_at": now}
+                    for id in session_ids
+                ])
+                .on_conflict_do_nothing(index_elements=["session_id"])
+            )
+        db.commit()
+        return list(session_ids)
+    
+    def claim_follow_ups(self, db: Session, *, limit: int) -> List[SessionFollowUp]:
+        """
+        Lock up to `limit` due follow-ups, oldest first, skipping those claimed by other workers.
+        The locks are held until the caller commits.
+        
+        Args:
+            db: Database session
+            limit: Maximum number of follow-ups to claim
+            
+        Returns:
+            List of SessionFollowUp objects
+        """
+        return db.execute(
+            select(SessionFollowUp)
+            .where(SessionFollowUp.available_at <= datetime.utcnow())
+            .order_by(SessionFollowUp.available_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        ).scalars().all()
+
+
+# Create a singleton instance
+session = CRUDSession(LearningSession)
@@ -0,0 +1,176 @@
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from uuid import UUID
+
+from pydantic import BaseModel
+from sqlalchemy import delete, insert, select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.core.ids import uuid7
+from app.crud.base import CRUDBase
+from app.models.quiz import Answer, Quiz, QuizAttempt
+from app.models.skill import SkillEstimate
+
+# Rows per multi-row INSERT when replacing all estimates
+INSERT_CHUNK_ROWS = 1000
+
+
+class CRUDSkill(CRUDBase[SkillEstimate, BaseModel, BaseModel]):
+    """
+    CRUD operations for the SkillEstimate model.
+    Ratings are computed by `app.services.skill`; this module only stores them.
+    """
+    
+    def get_by_child(self, db: Session, *, child_id: UUID) -> List[SkillEstimate]:
+        """
+        Get all skill estimates of a child.
+        
+        Args:
+            db: Database session
+            child_id: ID of the child
+        
+        Returns:
+            List of SkillEstimate objects ordered by subject and topic
+        """
+        return (
+            db.query(self.model)
+            .filter(SkillEstimate.child_id == child_id)
+            .order_by(SkillEstimate.subject, SkillEstimate.topic)
+            .all()
+        )
+    
+    def get_by_child_and_topic(
+        self, db: Session, *, child_id: UUID, subject: str, topic: str
+    ) -> Optional[SkillEstimate]:
+        """
+        Get a child's skill estimate for one topic.
+        
+        Args:
+            db: Database session
+            child_id: ID of the child
+            subject: Subject of the topic
+            topic: Topic name
+        
+        Returns:
+            SkillEstimate object or None if the child has no graded answers on the topic
+        """
+        return db.execute(
+            select(SkillEstimate).where(
+                SkillEstimate.child_id == child_id,
+                SkillEstimate.subject == subject,
+                SkillEstimate.topic == topic,
+            )
+        ).scalar_one_or_none()
+    
+    def get_for_update(
+        self, db: Session, *, child_id: UUID, subject: str, topic: str, initial_rating: float = 0.0
+    ) -> SkillEstimate:
+        """
+        Get a child's skill estimate for one topic, creating it if needed, and
+        lock the row until the transaction ends.
+        
+        Args:
+            db: Database session
+            child_id: ID of the child
+            subject: Subject of the topic
+            topic: Topic name
+            initial_rating: Rating of a newly created estimate
+        
+        Returns:
+            Locked SkillEstimate object
+        """
+        now = datetime.utcnow()
+        db.execute(
+            pg_insert(SkillEstimate)
+            .values(
+                id=uuid7(), child_id=child_id, subject=subject, topic=topic,
+                rating=initial_rating, answers=0, created_at=now, updated_at=now,
+            )
+            .on_conflict_do_nothing(constraint="uq_skillestimate_child_id_subject_topic")
+        )
+        return db.execute(
+            select(SkillEstimate)
+            .where(
+                SkillEstimate.child_id == child_id,
+                SkillEstimate.subject == subject,
+                SkillEstimate.topic == topic,
+            )
+            .with_for_update()
+            .execution_options(populate_existing=True)
+        ).scalar_one()
+    
+    def lock_all(self, db: Session) -> None:
+        """
+        Lock the skill estimates against concurrent updates until the transaction ends.
+        
+        `get_for_update` waits for the lock, so estimates being rebuilt from
+        the history cannot be overwritten by, or overwrite, a concurrent
+        attempt. Reads are not blocked.
+        
+        Args:
+            db: Database session
+        """
+        db.execute(text(f"LOCK TABLE {SkillEstimate.__tablename__} IN EXCLUSIVE MODE"))
+    
+    def iter_history(
+        self, db: Session, *, batch_size: int = 10_000
+    ) -> Iterator[Tuple[UUID, str, str, str, bool, datetime]]:
+        """
+        Stream every graded answer in the order skill estimates are built from.
+        
+        Args:
+            db: Database session
+            batch_size: Rows fetched per round trip
+        
+        Returns:
+            Iterator of (child_id, subject, topic, quiz difficulty, is_correct,
+            answered at) tuples, grouped by (child_id, subject, topic) and in
+            chronological order within each group
+        """
+        stmt = (
+            select(
+                QuizAttempt.child_id,
+                Quiz.subject,
+                Quiz.topic,
+                Quiz.difficulty,
+                Answer.is_correct,
+                Answer.created_at,
+            )
+            .join(Answer.attempt)
+            .join(QuizAttempt.quiz)
+            .order_by(QuizAttempt.child_id, Quiz.subject, Quiz.topic, Answer.created_at, Answer.id)
+            .execution_options(yield_per=batch_size)
+        )
+        for row in db.execute(stmt):
+            yield tuple(row)
+    
+    def replace_all(self, db: Session, *, estimates: List[Dict[str, Any]]) -> None:
+        """
+        Replace every skill estimate in one transaction. Call `lock_all` in the
+        same transaction before reading the history the estimates come from.
+        
+        Args:
+            db: Database session
+            estimates: Dictionaries with child_id, subject, topic, rating,
+                answers and last_answer_at
+        """
+        now = datetime.utcnow()
+        try:
+            db.execute(delete(SkillEstimate))
+            for start in range(0, len(estimates), INSERT_CHUNK_ROWS):
+                db.execute(
+                    insert(SkillEstimate),
+                    [
+                        {**row, "id": uuid7(), "created_at": now, "updated_at": now}
+                        for row in estimates[start:start + INSERT_CHUNK_ROWS]
+                    ],
+                )
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+
+# Create a singleton instance
+skill = CRUDSkill(SkillEstimate)
@@ -0,0 +1,79 @@
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import UUID
+
+from pydantic import BaseModel
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.core.ids import uuid7
+from app.crud.base import CRUDBase
+from app.models.usage import Usage
+from app.models.user import User
+
+
+class CRUDUsage(CRUDBase[Usage, BaseModel, BaseModel]):
+    """
+    CRUD operations for the Usage model.
+    Usage rows are only ever incremented, in batches.
+    """
+    
+    def add_increments(self, db: Session, *, increments: List[Dict[str, Any]]) -> None:
+        """
+        Add usage increments with a single `INSERT ... ON CONFLICT DO UPDATE` and commit.
+        
+        Args:
+            db: Database session
+            increments: Dictionaries with parent_id, day, model, requests,
+                prompt_tokens, completion_tokens and cost_usd; at most one per
+                (parent_id, day, model)
+        """
+        if not increments:
+            return
+        now = datetime.utcnow()
+        stmt = insert(Usage).values(
+            [{**row, "id": uuid7(), "created_at": now, "updated_at": now} for row in increments]
+        )
+        stmt = stmt.on_conflict_do_update(
+            constraint="uq_usage_parent_id_day_model",
+            set_={
+                "requests": Usage.requests + stmt.excluded.requests,
+                "prompt_tokens": Usage.prompt_tokens + stmt.excluded.prompt_tokens,
+                "completion_tokens": Usage.completion_tokens + stmt.excluded.completion_tokens,
+                "cost_usd": Usage.cost_usd + stmt.excluded.cost_usd,
+                "updated_at": stmt.excluded.updated_at,
+            },
+        )
+        db.execute(stmt)
+        db.commit()
+    
+    def get_spend_and_budget(
+        self, db: Session, *, parent_id: UUID, since: date
+    ) -> Tuple[float, Optional[float]]:
+        """
+        Get a parent's LLM spending since a date and their own budget, in one query.
+        
+        Args:
+            db: Database session
+            parent_id: ID of the parent user
+            since: First day to include, e.g. the first of the month
+            
+        Returns:
+            Tuple of (cost in USD, parent's budget in USD or None for the default)
+        """
+        spent = (
+            select(func.coalesce(func.sum(Usage.cost_usd), 0))
+            .where(Usage.parent_id == parent_id, Usage.day >= since)
+            .scalar_subquery()
+        )
+        row = db.execute(
+            select(spent, User.llm_monthly_budget_usd).where(User.id == parent_id)
+        ).one_or_none()
+        if row is None:
+            return 0.0, None
+        return float(row[0]), float(row[1]) if row[1] is not None else None
+
+
+# Create a singleton instance
+usage = CRUDUsage(Usage)
@@ -1,8 +1,12 @@
-from typing import Any, Dict, Optional, Union, List
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple, Union, List
 
+from sqlalchemy import Boolean, String, cast, column, func, lambda_stmt, select, update, values
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID, insert
 from sqlalchemy.orm import Session
 from uuid import UUID
 
+from app.core.ids import uuid7
 from app.core.security import get_password_hash, verify_password
 from app.crud.base import CRUDBase
 from app.models.user import User
@@ -15,6 +19,8 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
     Extends the base CRUD operations with user-specific functionality.
     """
     
+    invalidates_cache = True
+    
     def get_by_email(self, db: Session, *, email: str) -> Optional[User]:
         """
         Get a user by email.
@@ -26,7 +32,7 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
         Returns:
             User object if found, None otherwise
         """
-        return db.query(User).filter(User.email == email).first()
+        return db.scalars(lambda_stmt(lambda: select(User).where(User.email == email).limit(1))).first()
     
     def create(self, db: Session, *, obj_in: UserCreate) -> User:
         """
@@ -132,6 +138,101 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
         """
         return db.query(User).filter(User.id.in_(user_ids)).all()
 
+    
+    def get_ids_by_emails(self, db: Session, *, emails: List[str]) -> Dict[str, UUID]:
+        """
+        Map emails to user IDs with a single query.
+        
+        Args:
+            db: Database session
+            emails: Emails to look up
+            
+        Returns:
+            Dictionary of email to user ID for the emails that exist
+        """
+        if not emails:
+            return {}
+        rows = db.execute(select(User.email, User.id).where(User.email.in_(emails)))
+        return {email: id for email, id in rows}
+    
+    def get_accounts_by_emails(self, db: Session, *, emails: List[str]) -> Dict[str, Tuple[UUID, bool]]:
+        """
+        Map emails to user IDs and superuser flags with a single query.
+        
+        Args:
+            db: Database session
+            emails: Emails to look up
+            
+        Returns:
+            Dictionary of email to (id, is_superuser) for the emails that exist
+        """
+        if not emails:
+            return {}
+        rows = db.execute(select(User.email, User.id, User.is_superuser).where(User.email.in_(emails)))
+        return {email: (id, is_superuser) for email, id, is_superuser in rows}
+    
+    def upsert_many(
+        self, db: Session, *, rows: List[Dict[str, Any]]
+    ) -> List[Tuple[UUID, str, bool]]:
+        """
+        Create new users and update existing ones, with one statement each, and commit.
+        
+        Rows without an `id` are new accounts, inserted with
+        `INSERT ... ON CONFLICT (email) DO NOTHING`. Rows with an `id` update
+        that account's name, and its active flag unless `is_active` is None,
+        with one `UPDATE ... FROM (VALUES ...)`; passwords are kept and
+        superuser accounts are never changed. Emails must be unique within `rows`.
+        
+        Args:
+            db: Database session
+            rows: Dictionaries with email, name and is_active, plus
+                hashed_password for new accounts or id for existing ones
+            
+        Returns:
+            List of (id, email, inserted) tuples for the rows applied; rows whose
+            email was registered meanwhile, or whose account is a superuser, are missing
+        """
+        now = datetime.utcnow()
+        table = User.__table__
+        new = [
+            {**row, "is_active": row.get("is_active") is not False, "id": uuid7(), "created_at": now, "updated_at": now}
+            for row in rows if "id" not in row
+        ]
+        existing = [row for row in rows if "id" in row]
+        results: List[Tuple[UUID, str, bool]] = []
+        if new:
+            # A Core insert, so skipped rows are simply not returned
+            stmt = (
+                insert(table)
+                .values(new)
+                .on_conflict_do_nothing(index_elements=[table.c.email])
+                .returning(table.c.id, table.c.email)
+            )
+            results.extend((id, email, True) for id, email in db.execute(stmt))
+        if existing:
+            changes = values(
+                column("id", String), column("name", String), column("is_active", Boolean), name="changes"
+            ).data([(str(row["id"]), row["name"], row.get("is_active")) for row in existing])
+            stmt = (
+                update(table)
+                .where(table.c.id == cast(changes.c.id, PG_UUID(as_uuid=True)), table.c.is_superuser.is_(False))
+                .values(
+                    name=changes.c.name,
+                    is_active=func.coalesce(cast(changes.c.is_active, Boolean), table.c.is_active),
+                    updated_at=now,
+                )
+                .returning(table.c.id, table.c.email)
+            )
+            updated = [(id, email, False) for id, email in db.execute(stmt)]
+            for id, _, _ in updated:
+                self._queue_invalidation(db, id)
+            results.extend(updated)
+        db.commit()
+        for id, _, inserted in results:
+            if not inserted:
+                self._evict_local(id)
+        return results
+
 
 # Create a singleton instance
 user = CRUDUser(User)
@@ -0,0 +1,80 @@
+"""
+Encoding of archived session messages.
+
+An archive payload is the session's messages serialized as JSON lines, in
+chronological order, and compressed with zstd. Payloads are decoded as a
+stream, so reading a page of an archive stops decompressing once the page is
+complete and only parses the lines it returns.
+"""
+import io
+import json
+from datetime import datetime
+from itertools import islice
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+from uuid import UUID
+
+from app.core.config import settings
+from app.core.lazy import lazy_import
+
+# Only needed when reading or writing archives
+zstandard = lazy_import("zstandard", install_hint="zstandard")
+
+ARCHIVE_CODEC = "zstd"
+
+
+def compress_messages(messages: Sequence[Dict[str, Any]], level: Optional[int] = None) -> bytes:
+    """
+    Serialize messages as JSON lines and compress them with zstd.
+
+    Args:
+        messages: Message dicts with the archived fields
+        level: zstd compression level, defaults to the configured level
+
+    Returns:
+        Compressed payload
+    """
+    if level is None:
+        level = settings.MESSAGE_ARCHIVE_ZSTD_LEVEL
+    lines = "\n".join(json.dumps(m, default=str, separators=(",", ":")) for m in messages)
+    return zstandard.ZstdCompressor(level=level).compress(lines.encode())
+
+
+def iter_messages(payload: bytes, start: int = 0, stop: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Decode the messages `start` to `stop` of a payload produced by `compress_messages`.
+
+    Lines before `start` are skipped without being parsed and nothing after
+    `stop` is decompressed.
+
+    Args:
+        payload: Compressed payload
+        start: Index of the first message to decode
+        stop: Index after the last message to decode, defaults to the end
+
+    Yields:
+        Message dicts in their original order, with UUIDs and datetimes restored
+    """
+    reader = io.TextIOWrapper(zstandard.ZstdDecompressor().stream_reader(payload), encoding="utf-8")
+    with reader:
+        for line in islice(reader, start, stop):
+            message = json.loads(line)
+            message["id"] = UUID(message["id"])
+            message["session_id"] = UUID(message["session_id"])
+            message["created_at"] = datetime.fromisoformat(message["created_at"])
+            message["updated_at"] = datetime.fromisoformat(message["updated_at"])
+            yield message
+
+
+def decompress_messages(payload: bytes, start: int = 0, stop: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Decompress the messages `start` to `stop` of a payload produced by `compress_messages`.
+
+    Args:
+        payload: Compressed payload
+        start: Index of the first message to return
+        stop: Index after the last message to return, defaults to the end
+
+    Returns:
+        Message dicts in their original order, with UUIDs and datetimes restored
+    """
+    return list(iter_messages(payload, start, stop))
@@ -0,0 +1,198 @@
+"""
+Cross-worker cache invalidation over PostgreSQL LISTEN/NOTIFY.
+
+CRUD write paths call `notify_invalidation` inside their transaction; PostgreSQL
+only delivers the notification once the transaction commits, so no worker can
+evict before the new data is visible. Every worker runs an `InvalidationListener`
+thread that evicts the matching keys from the caches in `cache_registry`.
+
+Caches register at import time, so every worker has the same registry. Entity
+types without a registered cache are never notified, and a worker without any
+registered cache does not start the listener or hold its LISTEN connection.
+"""
+import json
+import logging
+import select
+import threading
+import time
+from typing import Any, Dict, Optional
+from uuid import UUID
+
+import psycopg2
+from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.core.cache import CacheRegistry, cache_registry
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (ms) of the lag histogram buckets; the last bucket is open ended
+LAG_BUCKETS_MS = (1, 5, 10, 50, 100, 500, 1000, 5000)
+
+
+def notify_invalidation(db: Session, entity_type: str, id: Any) -> None:
+    """
+    Queue an invalidation message for `entity_type` row `id` in the current transaction.
+
+    Args:
+        db: Database session with the pending write
+        entity_type: Table name of the changed entity
+        id: ID of the changed entity
+    """
+    if not settings.CACHE_INVALIDATION_ENABLED or not cache_registry.has(entity_type):
+        return
+    payload = json.dumps({"type": entity_type, "id": str(id), "ts": time.time()})
+    db.execute(
+        text("SELECT pg_notify(:channel, :payload)"),
+        {"channel": settings.CACHE_INVALIDATION_CHANNEL, "payload": payload},
+    )
+
+
+class InvalidationMetrics:
+    """
+    Counters and a fixed-size lag histogram for the invalidation listener.
+    """
+
+    def __init__(self):
+        self.received = 0
+        self.evicted = 0
+        self.malformed = 0
+        self.reconnects = 0
+        self.full_flushes = 0
+        self.last_lag_ms = 0.0
+        self.max_lag_ms = 0.0
+        self.lag_buckets = [0] * (len(LAG_BUCKETS_MS) + 1)
+
+    def observe_lag(self, lag_ms: float) -> None:
+        """Record the commit-to-eviction lag of one message."""
+        self.last_lag_ms = lag_ms
+        self.max_lag_ms = max(self.max_lag_ms, lag_ms)
+        for index, bound in enumerate(LAG_BUCKETS_MS):
+            if lag_ms <= bound:
+                self.lag_buckets[index] += 1
+                return
+        self.lag_buckets[-1] += 1
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return a snapshot suitable for a metrics endpoint or log line."""
+        buckets = {f"le_{bound}ms": count for bound, count in zip(LAG_BUCKETS_MS, self.lag_buckets)}
+        buckets["gt_max"] = self.lag_buckets[-1]
+        return {
+            "received": self.received,
+            "evicted": self.evicted,
+            "malformed": self.malformed,
+            "reconnects": self.reconnects,
+            "full_flushes": self.full_flushes,
+            "last_lag_ms": self.last_lag_ms,
+            "max_lag_ms": self.max_lag_ms,
+            "lag_buckets": buckets,
+        }
+
+
+class InvalidationListener:
+    """
+    Background thread that LISTENs on the invalidation channel and evicts cache keys.
+
+    If the connection drops, or a message arrives later than
+    `CACHE_INVALIDATION_MAX_LAG_MS`, messages may have been missed, so all
+    registered caches are cleared. The cache TTL bounds staleness otherwise.
+    """
+
+    def __init__(
+        self,
+        dsn: Optional[str] = None,
+        *,
+        channel: Optional[str] = None,
+        registry: CacheRegistry = cache_registry,
+        max_lag_ms: Optional[int] = None,
+    ):
+        self.dsn = dsn or settings.SQLALCHEMY_DATABASE_URI
+        self.channel = channel or settings.CACHE_INVALIDATION_CHANNEL
+        self.registry = registry
+        self.max_lag_ms = max_lag_ms if max_lag_ms is not None else settings.CACHE_INVALIDATION_MAX_LAG_MS
+        self.metrics = InvalidationMetrics()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Start the listener thread, unless no cache is registered."""
+        if self._thread is not None:
+            return
+        if not len(self.registry):
+            logger.info("No caches registered; cache invalidation listener not started")
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="cache-invalidation", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Stop the listener thread and wait for it to exit."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def handle(self, payload: str) -> None:
+        """
+        Apply one invalidation message.
+
+        Args:
+            payload: JSON payload produced by `notify_invalidation`
+        """
+        try:
+            message = json.loads(payload)
+            entity_type, id, sent_at = message["type"], UUID(message["id"]), float(message["ts"])
+        except (ValueError, KeyError, TypeError):
+            self.metrics.malformed += 1
+            logger.warning("Ignoring malformed cache invalidation payload: %r", payload)
+            return
+
+        self.metrics.received += 1
+        self.metrics.evicted += self.registry.evict(entity_type, id)
+        lag_ms = max((time.time() - sent_at) * 1000, 0.0)
+        self.metrics.observe_lag(lag_ms)
+        if lag_ms > self.max_lag_ms:
+            # Messages this late suggest we fell behind; start from a clean slate
+            self._flush_all()
+
+    def _flush_all(self) -> None:
+        self.metrics.full_flushes += 1
+        self.registry.clear_all()
+
+    def _run(self) -> None:
+        backoff = 1.0
+        while not self._stop.is_set():
+            try:
+                conn = psycopg2.connect(self.dsn)
+            except psycopg2.Error as exc:
+                logger.warning("Cache invalidation listener cannot connect: %s", exc)
+                self._stop.wait(backoff)
+                backoff = min(backoff * 2, 30.0)
+                continue
+            try:
+                conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+                with conn.cursor() as cursor:
+                    cursor.execute(f'LISTEN "{self.channel}"')
+                backoff = 1.0
+                # Anything may have changed while we were not listening
+                self._flush_all()
+                self._listen(conn)
+            except (psycopg2.Error, OSError) as exc:
+                logger.warning("Cache invalidation listener disconnected: %s", exc)
+                self.metrics.reconnects += 1
+            finally:
+                conn.close()
+
+    def _listen(self, conn) -> None:
+        while not self._stop.is_set():
+            if select.select([conn], [], [], 1.0) == ([], [], []):
+                continue
+            conn.poll()
+            while conn.notifies:
+                self.handle(conn.notifies.pop(0).payload)
+
+
+# Process-wide listener started by the application
+listener = InvalidationListener()
@@ -0,0 +1,119 @@
+"""
+Read replica routing with read-your-writes stickiness.
+
+Read-only dependencies get sessions from `ReadSessionLocal` (the replica),
+writes always go through `SessionLocal` (the primary). When a request commits
+a write, the primary's WAL position (LSN) is returned to the client in a
+short-lived cookie and `X-Min-LSN` header. Later reads carrying that LSN only
+use the replica once it has replayed past it, and the primary otherwise.
+"""
+import logging
+import re
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import ORMExecuteState, Session
+
+from app.db.session import ReadSessionLocal, SessionLocal, engine, replica_engine
+
+logger = logging.getLogger(__name__)
+
+LSN_COOKIE = "min_lsn"
+LSN_HEADER = "X-Min-LSN"
+
+_LSN_RE = re.compile(r"^[0-9A-Fa-f]{1,8}/[0-9A-Fa-f]{1,8}$")
+
+
+class RoutingState:
+    """
+    Per-request routing state shared between the middleware and the
+    dependencies, which may run in a worker thread with a copied context.
+    """
+    __slots__ = ("min_lsn", "wrote")
+
+    def __init__(self, min_lsn: Optional[str] = None):
+        self.min_lsn = min_lsn
+        self.wrote = False
+
+
+_routing_state: ContextVar[Optional[RoutingState]] = ContextVar("replica_routing_state", default=None)
+
+
+def begin_request(min_lsn: Optional[str]) -> RoutingState:
+    """
+    Start routing state for a request.
+
+    Args:
+        min_lsn: LSN the client must observe, from its cookie or header
+
+    Returns:
+        The state, to inspect after the request completes
+    """
+    state = RoutingState(min_lsn if min_lsn and _LSN_RE.match(min_lsn) else None)
+    _routing_state.set(state)
+    return state
+
+
+def current_primary_lsn() -> str:
+    """Return the primary's current WAL position, which covers every committed write."""
+    with engine.connect() as conn:
+        return conn.execute(text("SELECT pg_current_wal_lsn()::text")).scalar_one()
+
+
+def _replica_caught_up(db: Session, min_lsn: str) -> bool:
+    # pg_last_wal_replay_lsn() is NULL on a primary, which is always current
+    return db.execute(
+        text("SELECT coalesce(pg_last_wal_replay_lsn() >= CAST(:lsn AS pg_lsn), true)"),
+        {"lsn": min_lsn},
+    ).scalar_one()
+
+
+def open_read_session() -> Session:
+    """
+    Open a session for read-only work.
+
+    Returns:
+        A replica session, or a primary session if no replica is configured,
+        the replica is unreachable, or it has not replayed the client's last write
+    """
+    if replica_engine is engine:
+        return SessionLocal()
+
+    db = ReadSessionLocal()
+    state = _routing_state.get()
+    min_lsn = state.min_lsn if state is not None else None
+    try:
+        # Checking out a (pre-pinged) connection fails fast when the replica is down
+        db.connection()
+        if min_lsn is None or _replica_caught_up(db, min_lsn):
+            return db
+    except DBAPIError as exc:
+        logger.warning("Replica unreachable or lag check failed, reading from primary: %s", exc)
+    db.close()
+    return SessionLocal()
+
+
+def _mark_write() -> None:
+    state = _routing_state.get()
+    if state is not None:
+        state.wrote = True
+
+
+@event.listens_for(SessionLocal, "after_flush")
+def _after_flush(session: Session, flush_context) -> None:
+    session.info["has_writes"] = True
+
+
+@event.listens_for(SessionLocal, "do_orm_execute")
+def _on_execute(orm_execute_state: ORMExecuteState) -> None:
+    # Bulk UPDATE/DELETE/INSERT statements bypass the flush
+    if orm_execute_state.is_update or orm_execute_state.is_delete or orm_execute_state.is_insert:
+        orm_execute_state.session.info["has_writes"] = True
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _after_commit(session: Session) -> None:
+    if session.info.pop("has_writes", False):
+        _mark_write()
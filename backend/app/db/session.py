@@ -4,11 +4,18 @@ from sqlalchemy.orm import sessionmaker
 
 from app.core.config import settings
 
-# Create SQLAlchemy engine
+# Create SQLAlchemy engine for the primary (all writes)
 engine = create_engine(settings.SQLALCHEMY_DATABASE_URI, pool_pre_ping=True)
 
-# Create sessionmaker
+# Engine for read-only traffic; falls back to the primary without a replica
+if settings.SQLALCHEMY_REPLICA_URI:
+    replica_engine = create_engine(settings.SQLALCHEMY_REPLICA_URI, pool_pre_ping=True)
+else:
+    replica_engine = engine
+
+# Create sessionmakers
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=replica_engine)
 
 # Base class for all models
 Base = declarative_base()
@@ -0,0 +1,260 @@
+"""
+Slow query log with sampled EXPLAIN capture.
+
+Cursor events on the primary and replica engines time every statement. Those
+slower than `SLOW_QUERY_THRESHOLD_MS` are recorded in a bounded per-worker ring
+buffer with a fingerprint (the SQL with literals, bind parameters and IN lists
+replaced by "?"), the CRUD method that issued it and the route of the request.
+Bind parameters are never stored, since they hold children's messages and
+other personal data.
+
+With `SLOW_QUERY_EXPLAIN_ENABLED`, a `SLOW_QUERY_EXPLAIN_SAMPLE_RATE` fraction
+of slow SELECTs is re-run with `EXPLAIN (ANALYZE, BUFFERS)` on a background
+thread, in a rolled back transaction with `SLOW_QUERY_EXPLAIN_TIMEOUT_MS`
+statement timeout, and the plan is attached to the entry. Statements that
+write are never explained, as ANALYZE executes them.
+"""
+import hashlib
+import logging
+import random
+import re
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DBAPIError
+
+from app.core.config import settings
+from app.db.session import engine, replica_engine
+
+logger = logging.getLogger(__name__)
+
+_APP_ROOT = str(Path(__file__).resolve().parent.parent)
+_CRUD_ROOT = str(Path(_APP_ROOT) / "crud")
+_DB_ROOT = str(Path(_APP_ROOT) / "db")
+# Execution option that keeps the EXPLAIN connection out of the log
+_LOG_OPTION = "slow_query_log"
+# Slow statements waiting for EXPLAIN beyond this are not explained
+_MAX_PENDING_EXPLAINS = 8
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+_PARAM_RE = re.compile(r"%\(\w+\)s|%s|\$\d+|:\w+\b")
+_LIST_RE = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_SPACE_RE = re.compile(r"\s+")
+# Only plain reads are explained; a data-modifying CTE or row lock would take effect
+_READ_RE = re.compile(r"^\s*(?:SELECT|WITH)\b", re.IGNORECASE)
+_WRITE_RE = re.compile(r"\b(?:INSERT|UPDATE|DELETE|MERGE|FOR\s+(?:NO\s+KEY\s+)?(?:UPDATE|SHARE))\b", re.IGNORECASE)
+
+_request_route: ContextVar[Optional[Dict[str, Any]]] = ContextVar("slow_query_request_scope", default=None)
+
+
+@lru_cache(maxsize=2048)
+def fingerprint(statement: str) -> Tuple[str, str]:
+    """
+    Normalize a statement so that executions differing only in values group together.
+
+    Returns:
+        A short hash of the normalized SQL and the normalized SQL itself
+    """
+    sql = _STRING_RE.sub("?", statement)
+    sql = _PARAM_RE.sub("?", sql)
+    sql = _NUMBER_RE.sub("?", sql)
+    sql = _LIST_RE.sub("(...)", sql)
+    sql = _SPACE_RE.sub(" ", sql).strip()
+    return hashlib.blake2b(sql.encode(), digest_size=8).hexdigest(), sql
+
+
+def begin_request(scope: Dict[str, Any]) -> None:
+    """Remember the ASGI scope of the current request; the router fills in its route later."""
+    _request_route.set(scope)
+
+
+def _current_route() -> Optional[str]:
+    scope = _request_route.get()
+    if scope is None:
+        return None
+    route = scope.get("route")
+    path = getattr(route, "path", None) or scope.get("path")
+    return f"{scope.get('method', 'WS')} {path}"
+
+
+def _call_site() -> Optional[str]:
+    """Name the CRUD method, or else the first application function outside `app.db`, running the query."""
+    fallback = None
+    frame = sys._getframe(1)
+    while frame is not None:
+        code = frame.f_code
+        filename = code.co_filename
+        # co_qualname is new in Python 3.11
+        name = getattr(code, "co_qualname", code.co_name)
+        if filename.startswith(_CRUD_ROOT):
+            return f"{Path(filename).stem}.{name}"
+        if fallback is None and filename.startswith(_APP_ROOT) and not filename.startswith(_DB_ROOT):
+            fallback = f"{Path(filename).stem}.{name}"
+        frame = frame.f_back
+    return fallback
+
+
+class SlowQueryLog:
+    """
+    Ring buffer of slow statements and the listeners that fill it.
+    """
+
+    def __init__(
+        self,
+        threshold_ms: Optional[float] = None,
+        size: Optional[int] = None,
+        explain: Optional[bool] = None,
+        explain_sample_rate: Optional[float] = None,
+    ):
+        """
+        Args:
+            threshold_ms: Minimum duration recorded, defaults to `SLOW_QUERY_THRESHOLD_MS`
+            size: Entries kept, defaults to `SLOW_QUERY_LOG_SIZE`
+            explain: Whether to capture plans, defaults to `SLOW_QUERY_EXPLAIN_ENABLED`
+            explain_sample_rate: Fraction of slow SELECTs explained, defaults to `SLOW_QUERY_EXPLAIN_SAMPLE_RATE`
+        """
+        self.threshold_ms = settings.SLOW_QUERY_THRESHOLD_MS if threshold_ms is None else threshold_ms
+        self.explain = settings.SLOW_QUERY_EXPLAIN_ENABLED if explain is None else explain
+        self.explain_sample_rate = (
+            settings.SLOW_QUERY_EXPLAIN_SAMPLE_RATE if explain_sample_rate is None else explain_sample_rate
+        )
+        self.entries: Deque[Dict[str, Any]] = deque(maxlen=size or settings.SLOW_QUERY_LOG_SIZE)
+        self.recorded = 0
+        self.explained = 0
+        self._pending: Set[str] = set()
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def attach(self, target: Engine) -> None:
+        """Time every statement executed by `target`."""
+        event.listen(target, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(target, "after_cursor_execute", self._after_cursor_execute)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        # Kept on the statement's own context, so a statement that raises
+        # leaves nothing behind on the connection
+        if context is not None:
+            context._slow_query_start = time.perf_counter()
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        start = getattr(context, "_slow_query_start", None)
+        if start is None:
+            return
+        duration_ms = (time.perf_counter() - start) * 1000
+        if duration_ms < self.threshold_ms or not conn.get_execution_options().get(_LOG_OPTION, True):
+            return
+        entry = self.record(statement, duration_ms, _call_site(), _current_route())
+        if self.explain and not executemany and random.random() < self.explain_sample_rate:
+            self._submit_explain(conn.engine, entry, statement, parameters)
+
+    def record(
+        self, statement: str, duration_ms: float, call_site: Optional[str], route: Optional[str]
+    ) -> Dict[str, Any]:
+        """
+        Add a slow statement to the ring buffer, evicting the oldest entry when full.
+
+        Returns:
+            The new entry
+        """
+        digest, sql = fingerprint(statement)
+        entry = {
+            "fingerprint": digest,
+            "sql": sql,
+            "duration_ms": round(duration_ms, 2),
+            "at": datetime.utcnow().isoformat(),
+            "call_site": call_site,
+            "route": route,
+            "plan": None,
+        }
+        self.entries.append(entry)
+        self.recorded += 1
+        logger.info("Slow query %s (%.0f ms) from %s: %s", digest, duration_ms, call_site, sql[:200])
+        return entry
+
+    def _submit_explain(self, target: Engine, entry: Dict[str, Any], statement: str, parameters: Any) -> None:
+        if not _READ_RE.match(statement) or _WRITE_RE.search(statement):
+            return
+        with self._lock:
+            if entry["fingerprint"] in self._pending or len(self._pending) >= _MAX_PENDING_EXPLAINS:
+                return
+            self._pending.add(entry["fingerprint"])
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="slow-query-explain")
+        self._executor.submit(self._explain, target, entry, statement, parameters)
+
+    def _explain(self, target: Engine, entry: Dict[str, Any], statement: str, parameters: Any) -> None:
+        try:
+            with target.connect() as conn:
+                conn = conn.execution_options(**{_LOG_OPTION: False})
+                with conn.begin() as transaction:
+                    conn.exec_driver_sql(f"SET LOCAL statement_timeout = {int(settings.SLOW_QUERY_EXPLAIN_TIMEOUT_MS)}")
+                    plan = conn.exec_driver_sql(
+                        "EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + statement, parameters or None
+                    ).scalar_one()
+                    transaction.rollback()
+            entry["plan"] = plan
+            self.explained += 1
+        except DBAPIError as exc:
+            logger.warning("EXPLAIN of slow query %s failed: %s", entry["fingerprint"], exc)
+            entry["plan"] = {"error": str(exc.orig)}
+        finally:
+            with self._lock:
+                self._pending.discard(entry["fingerprint"])
+
+    def snapshot(self, limit: int = 50) -> Dict[str, Any]:
+        """
+        Return the newest entries and a per-fingerprint summary of the whole buffer.
+
+        Args:
+            limit: Maximum number of entries returned
+        """
+        entries = list(self.entries)
+        summary: Dict[str, Dict[str, Any]] = {}
+        for entry in entries:
+            group = summary.setdefault(
+                entry["fingerprint"],
+                {"fingerprint": entry["fingerprint"], "sql": entry["sql"], "count": 0, "total_ms": 0.0,
+                 "max_ms": 0.0, "call_sites": set(), "routes": set()},
+            )
+            group["count"] += 1
+            group["total_ms"] += entry["duration_ms"]
+            group["max_ms"] = max(group["max_ms"], entry["duration_ms"])
+            group["call_sites"].add(entry["call_site"])
+            group["routes"].add(entry["route"])
+        fingerprints: List[Dict[str, Any]] = sorted(summary.values(), key=lambda group: -group["total_ms"])
+        for group in fingerprints:
+            group["total_ms"] = round(group["total_ms"], 2)
+            group["call_sites"] = sorted(site for site in group["call_sites"] if site)
+            group["routes"] = sorted(route for route in group["routes"] if route)
+        return {
+            "threshold_ms": self.threshold_ms,
+            "recorded": self.recorded,
+            "explained": self.explained,
+            "fingerprints": fingerprints,
+            "entries": entries[::-1][:limit],
+        }
+
+    def shutdown(self) -> None:
+        """Stop the EXPLAIN thread, dropping plans not captured yet."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+# Process-wide log, attached to every engine the workers use
+slow_query_log = SlowQueryLog()
+if settings.SLOW_QUERY_LOG_ENABLED:
+    slow_query_log.attach(engine)
+    if replica_engine is not engine:
+        slow_query_log.attach(replica_engine)
@@ -0,0 +1,276 @@
+"""
+Per-worker write-behind buffer for small, append-only inserts.
+
+Chat and quiz flows produce many single-row inserts (messages, answers,
+feedback). Instead of one transaction per row, `write_buffer.submit` (or
+`submit_async` in coroutines) queues the row and a background thread writes everything queued within
+`WRITE_BEHIND_FLUSH_MS` (or as soon as `WRITE_BEHIND_MAX_BATCH` rows are
+waiting) with one multi-row INSERT per table in a single transaction.
+
+Durability: a row is durable only once its `PendingWrite` has completed,
+i.e. after the batch containing it has committed. Callers that acknowledge a
+write to a client must wait for it first (`await pending` or
+`pending.result()`). Rows not yet flushed are lost if the process is killed;
+on graceful shutdown `stop()` flushes everything queued. If a batch fails, its
+rows are retried one by one so a single bad row only fails its own write.
+"""
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import Future
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.ids import uuid7
+from app.db.session import SessionLocal
+from app.models.base import Base
+
+logger = logging.getLogger(__name__)
+
+
+class PendingWrite:
+    """
+    Handle to a queued row. Completes with the row id once the row is committed,
+    or with the exception that prevented it.
+    """
+    __slots__ = ("model", "row", "future")
+
+    def __init__(self, model: Type[Base], row: Dict[str, Any]):
+        self.model = model
+        self.row = row
+        self.future: Future = Future()
+
+    @property
+    def id(self) -> Any:
+        """ID assigned to the row when it was queued."""
+        return self.row["id"]
+
+    def done(self) -> bool:
+        """Return True once the row is committed or has failed."""
+        return self.future.done()
+
+    def result(self, timeout: Optional[float] = None) -> Any:
+        """Block until the row is committed and return its id; raises if the write failed."""
+        return self.future.result(timeout)
+
+    def __await__(self):
+        return asyncio.wrap_future(self.future).__await__()
+
+
+class WriteBehindBuffer:
+    """
+    Thread-safe buffer flushed by a background thread in batched transactions.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        *,
+        flush_interval_ms: Optional[int] = None,
+        max_batch: Optional[int] = None,
+        max_pending: Optional[int] = None,
+        enabled: Optional[bool] = None,
+    ):
+        """
+        Initialize an empty buffer. The flush thread starts on first use.
+
+        Args:
+            session_factory: Creates the sessions batches are written with
+            flush_interval_ms: Longest a row waits for more rows, defaults to `WRITE_BEHIND_FLUSH_MS`
+            max_batch: Rows per transaction, defaults to `WRITE_BEHIND_MAX_BATCH`
+            max_pending: Queued rows at which `submit` blocks, defaults to `WRITE_BEHIND_MAX_PENDING`
+            enabled: Buffer writes, defaults to `WRITE_BEHIND_ENABLED`; when
+                disabled, `submit` writes the row immediately
+        """
+        self.session_factory = session_factory
+        self.flush_interval = (
+            flush_interval_ms if flush_interval_ms is not None else settings.WRITE_BEHIND_FLUSH_MS
+        ) / 1000
+        self.max_batch = max_batch or settings.WRITE_BEHIND_MAX_BATCH
+        self.max_pending = max_pending or settings.WRITE_BEHIND_MAX_PENDING
+        self.enabled = settings.WRITE_BEHIND_ENABLED if enabled is None else enabled
+        self.stats = {"flushes": 0, "rows": 0, "failed_rows": 0, "largest_batch": 0}
+        self._pending: List[PendingWrite] = []
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+        self._flush_requested = False
+
+    def submit(self, model: Type[Base], row: Dict[str, Any]) -> PendingWrite:
+        """
+        Queue a row for insertion.
+
+        Missing `id`, `created_at` and `updated_at` values are filled in here,
+        so the id can be returned to clients before the row is written. Blocks
+        while `max_pending` rows are already queued; coroutines must use
+        `submit_async` instead.
+
+        Args:
+            model: Model class of the row's table
+            row: Column values
+
+        Returns:
+            Handle that completes when the row is committed
+        """
+        pending = self._prepare(model, row)
+        if not self.enabled:
+            self._flush_batch([pending])
+            return pending
+        self._enqueue(pending, block=True)
+        return pending
+
+    async def submit_async(self, model: Type[Base], row: Dict[str, Any]) -> PendingWrite:
+        """
+        Queue a row for insertion without blocking the event loop.
+
+        Same as `submit`, but a full buffer, or the immediate write of a
+        disabled buffer, is waited for in a worker thread.
+
+        Args:
+            model: Model class of the row's table
+            row: Column values
+
+        Returns:
+            Handle that completes when the row is committed
+        """
+        pending = self._prepare(model, row)
+        if not self.enabled:
+            await asyncio.to_thread(self._flush_batch, [pending])
+        elif not self._enqueue(pending, block=False):
+            await asyncio.to_thread(self._enqueue, pending, block=True)
+        return pending
+
+    def _prepare(self, model: Type[Base], row: Dict[str, Any]) -> PendingWrite:
+        now = datetime.utcnow()
+        row = {"id": uuid7(), "created_at": now, **row}
+        row.setdefault("updated_at", row["created_at"])
+        return PendingWrite(model, row)
+
+    def _enqueue(self, pending: PendingWrite, *, block: bool) -> bool:
+        with self._cond:
+            while len(self._pending) >= self.max_pending:
+                if not block:
+                    return False
+                self._cond.wait()
+            self._pending.append(pending)
+            # Wake the flush thread for the first row of a batch and for a full batch
+            if len(self._pending) == 1 or len(self._pending) >= self.max_batch:
+                self._cond.notify_all()
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+                self._thread.start()
+        return True
+
+    def flush(self, timeout: Optional[float] = None) -> None:
+        """
+        Wait until every row queued so far has been written or has failed.
+        """
+        with self._cond:
+            if not self._pending:
+                return
+            last = self._pending[-1]
+            self._flush_requested = True
+            self._cond.notify_all()
+        try:
+            last.future.exception(timeout)
+        except Exception:
+            pass
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """
+        Flush all queued rows and stop the flush thread, e.g. on shutdown.
+        The buffer stays usable and restarts its thread on the next submit.
+        """
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+            if thread.is_alive():
+                logger.error("Write-behind buffer did not flush within %.1f s", timeout)
+                return
+        with self._cond:
+            self._closed = False
+            self._thread = None
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                # Give other rows a short window to join the batch
+                deadline = time.monotonic() + self.flush_interval
+                while (not self._closed and not self._flush_requested
+                       and len(self._pending) < self.max_batch):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                if not self._pending and self._closed:
+                    return
+                batch = self._pending[:self.max_batch]
+                del self._pending[:self.max_batch]
+                if not self._pending:
+                    self._flush_requested = False
+                # Wake submitters blocked on a full buffer
+                self._cond.notify_all()
+            self._flush_batch(batch)
+
+    def _flush_batch(self, batch: List[PendingWrite]) -> None:
+        try:
+            self._write(_group_by_table(batch))
+        except Exception:
+            logger.exception("Write-behind batch of %d rows failed, retrying rows one by one", len(batch))
+            for pending in batch:
+                try:
+                    self._write([(pending.model, [pending.row])])
+                except Exception as exc:
+                    self.stats["failed_rows"] += 1
+                    pending.future.set_exception(exc)
+                else:
+                    self._record(1)
+                    pending.future.set_result(pending.id)
+            return
+        self._record(len(batch))
+        for pending in batch:
+            pending.future.set_result(pending.id)
+
+    def _record(self, rows: int) -> None:
+        self.stats["flushes"] += 1
+        self.stats["rows"] += rows
+        self.stats["largest_batch"] = max(self.stats["largest_batch"], rows)
+
+    def _write(self, groups: List[Tuple[Type[Base], List[Dict[str, Any]]]]) -> None:
+        db = self.session_factory()
+        try:
+            for model, rows in groups:
+                # executemany of an INSERT is sent as multi-row VALUES statements
+                db.execute(insert(model), rows)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+
+def _group_by_table(batch: List[PendingWrite]) -> List[Tuple[Type[Base], List[Dict[str, Any]]]]:
+    """
+    Group rows by model, keeping submission order within a table and writing
+    parent tables first so rows may reference rows of the same batch.
+    """
+    groups: Dict[Type[Base], List[Dict[str, Any]]] = {}
+    for pending in batch:
+        groups.setdefault(pending.model, []).append(pending.row)
+    order = {table: index for index, table in enumerate(Base.metadata.sorted_tables)}
+    return sorted(groups.items(), key=lambda item: order.get(item[0].__table__, 0))
+
+
+# Process-wide buffer, flushed on application shutdown
+write_buffer = WriteBehindBuffer()
@@ -1,33 +1,25 @@
+from typing import Optional
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 
 from app.api.api_v1.api import api_router
-from app.core.config import settings
-
-# Create FastAPI application
-app = FastAPI(
-    title=settings.PROJECT_NAME,
-    openapi_url=f"{settings.API_V1_PREFIX}/openapi.json",
-    docs_url="/docs",
-    redoc_url="/redoc",
+from app.api.middleware import (
+    IdempotencyMiddleware,
+    ProfilingMiddleware,
+    QueryRouteMiddleware,
+    ReplicaStickinessMiddleware,
 )
+from app.core.config import settings
+from app.db.invalidation import listener as invalidation_listener
+from app.db.slow_query import slow_query_log
+from app.db.write_behind import write_buffer
+from app.services.embedding import embedding_batcher
+from app.services.provisioning import shutdown_hash_pool
+from app.services.usage import usage_tracker
 
-# Set up CORS middleware
-if settings.BACKEND_CORS_ORIGINS:
-    app.add_middleware(
-        CORSMiddleware,
-        allow_origins=[str(origin) for origin in settings.BACKEND_CORS_ORIGINS],
-        allow_credentials=True,
-        allow_methods=["*"],
-        allow_headers=["*"],
-    )
-
-# Include API router
-app.include_router(api_router, prefix=settings.API_V1_PREFIX)
 
-# Health check endpoint
-@app.get("/health")
 def health_check():
     """
     Health check endpoint to verify the API is running properly.
@@ -35,7 +27,101 @@ def health_check():
     """
     return JSONResponse(content={"status": "ok"})
 
-# Custom exception handlers can be added here
+
+def create_app(*, enable_ai: Optional[bool] = None) -> FastAPI:
+    """
+    Build the FastAPI application.
+    
+    Workers that only serve non-AI routes can be started with AI features
+    disabled, in which case the AI routers and their heavy dependencies are
+    never imported:
+    
+        ENABLE_AI_FEATURES=false uvicorn app.main:create_app --factory
+    
+    Args:
+        enable_ai: Mount AI-backed routes, defaults to `settings.ENABLE_AI_FEATURES`
+        
+    Returns:
+        Configured FastAPI application
+    """
+    if enable_ai is None:
+        enable_ai = settings.ENABLE_AI_FEATURES
+    
+    # Create FastAPI application
+    application = FastAPI(
+        title=settings.PROJECT_NAME,
+        openapi_url=f"{settings.API_V1_PREFIX}/openapi.json",
+        docs_url="/docs",
+        redoc_url="/redoc",
+    )
+    
+    # Idempotency-Key replay for retried POSTs
+    if settings.IDEMPOTENCY_ENABLED:
+        application.add_middleware(IdempotencyMiddleware)
+    
+    # Read-your-writes stickiness for read replica routing
+    if settings.SQLALCHEMY_REPLICA_URI:
+        application.add_middleware(ReplicaStickinessMiddleware)
+    
+    # Route names for the slow query log
+    if settings.SLOW_QUERY_LOG_ENABLED:
+        application.add_middleware(QueryRouteMiddleware)
+    
+    # On-demand (superuser "X-Profile" header) and sampled request profiling
+    application.add_middleware(ProfilingMiddleware)
+    
+    # Set up CORS middleware, added last so it is outermost and the responses
+    # of the middlewares above (e.g. idempotency 409s) carry CORS headers too
+    if settings.BACKEND_CORS_ORIGINS:
+        application.add_middleware(
+            CORSMiddleware,
+            allow_origins=[str(origin) for origin in settings.BACKEND_CORS_ORIGINS],
+            allow_credentials=True,
+            allow_methods=["*"],
+            allow_headers=["*"],
+        )
+    
+    # Include API routers
+    application.include_router(api_router, prefix=settings.API_V1_PREFIX)
+    if enable_ai:
+        # Imported here so non-AI workers never load AI modules
+        from app.api.api_v1.api import build_ai_router
+        from app.services.safety import content_filter
+        application.include_router(build_ai_router(), prefix=settings.API_V1_PREFIX)
+        # Compile the reply safety filter before the first reply
+        if settings.SAFETY_FILTER_ENABLED:
+            application.add_event_handler("startup", content_filter.load)
+    
+    # Health check endpoint
+    application.get("/health")(health_check)
+    
+    # Cross-worker cache invalidation listener
+    if settings.CACHE_INVALIDATION_ENABLED:
+        application.add_event_handler("startup", invalidation_listener.start)
+        application.add_event_handler("shutdown", invalidation_listener.stop)
+    
+    # Flush buffered inserts before the worker exits
+    application.add_event_handler("shutdown", write_buffer.stop)
+    
+    # Write out LLM usage counters
+    application.add_event_handler("shutdown", usage_tracker.stop)
+    
+    # Password hashing processes used by bulk provisioning
+    application.add_event_handler("shutdown", shutdown_hash_pool)
+    
+    # Local embedding model processes, if EMBEDDING_BACKEND is "local"
+    application.add_event_handler("shutdown", embedding_batcher.shutdown)
+    
+    # Slow query EXPLAIN thread
+    application.add_event_handler("shutdown", slow_query_log.shutdown)
+    
+    # Custom exception handlers can be added here
+    
+    return application
+
+
+# Default application instance used by `uvicorn app.main:app` and the tests
+app = create_app()
 
 if __name__ == "__main__":
     # For local development only - use uvicorn in production
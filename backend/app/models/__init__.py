@@ -1,7 +1,12 @@
 from app.models.base import Base
 from app.models.user import User
 from app.models.child import Child
-from app.models.session import Session, Message, Feedback
+from app.models.session import Session, Message, MessageArchive, Feedback, SessionFollowUp
 from app.models.quiz import Quiz, Question, QuizAttempt, Answer
 
 # These imports are needed so SQLAlchemy can discover all models
+from app.models.usage import Usage
+from app.models.skill import SkillEstimate
+from app.models.progress import SubjectProgress
+from app.models.question_bank import BankQuestion, SeenQuestionFilter
+from app.models.idempotency import IdempotencyKey
@@ -6,6 +6,8 @@ from sqlalchemy import DateTime, MetaData
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, declared_attr
 from sqlalchemy.dialects.postgresql import UUID
 
+from app.core.ids import uuid7
+
 
 class Base(DeclarativeBase):
     """
@@ -22,6 +24,7 @@ class Base(DeclarativeBase):
         return cls.__name__.lower()
     
     # Common columns for all tables
-    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    # Time-ordered UUIDv7 keys keep primary key and foreign key indexes append-mostly
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid7)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
     updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -1,8 +1,8 @@
 import uuid
 from typing import Dict, List, Any, Optional
 
-from sqlalchemy import String, ForeignKey, JSON, ARRAY
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import String, ForeignKey, ARRAY, Index
+from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models.base import Base
@@ -15,14 +15,23 @@ class Child(Base):
     a personalized learning experience.
     """
     __tablename__ = "child"
+    __table_args__ = (
+        # jsonb_path_ops supports containment (@>) lookups with a compact index
+        Index(
+            "ix_child_preferences",
+            "preferences",
+            postgresql_using="gin",
+            postgresql_ops={"preferences": "jsonb_path_ops"},
+        ),
+    )
     
     name: Mapped[str] = mapped_column(String, nullable=False)
     grade: Mapped[str] = mapped_column(String, nullable=False)
     subjects: Mapped[List[str]] = mapped_column(ARRAY(String), nullable=False)
     learning_style: Mapped[Optional[str]] = mapped_column(String, nullable=True)
     
-    # Preferences stored as JSON for flexibility
-    preferences: Mapped[Dict[str, Any]] = mapped_column(JSON, default={})
+    # Preferences stored as JSONB for flexibility, partial updates and indexed lookups
+    preferences: Mapped[Dict[str, Any]] = mapped_column(JSONB, default={})
     
     # Foreign key to parent user
     parent_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("user.id"), nullable=False)
@@ -31,3 +40,5 @@ class Child(Base):
     parent = relationship("User", back_populates="children")
     sessions = relationship("Session", back_populates="child", cascade="all, delete-orphan")
     quizzes = relationship("Quiz", back_populates="child", cascade="all, delete-orphan")
+    skills = relationship("SkillEstimate", back_populates="child", cascade="all, delete-orphan", passive_deletes=True)
+    progress = relationship("SubjectProgress", back_populates="child", cascade="all, delete-orphan", passive_deletes=True)
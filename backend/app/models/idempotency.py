@@ -0,0 +1,36 @@
+import uuid
+from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy import DateTime, Integer, LargeBinary, String, UniqueConstraint
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base
+
+
+class IdempotencyKey(Base):
+    """
+    IdempotencyKey model storing the response to a POST made with an `Idempotency-Key` header.
+    A row without a status code is a request still in flight.
+    """
+    __tablename__ = "idempotencykey"
+    __table_args__ = (
+        # Claim target: keys are only unique per user
+        UniqueConstraint("user_id", "key", name="uq_idempotencykey_user_id_key"),
+    )
+    
+    key: Mapped[str] = mapped_column(String(255), nullable=False)
+    # Not a foreign key: rows are written outside the request's transaction and expire on their own
+    user_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), nullable=False)
+    # 16-byte BLAKE2b digest of the method, path, query string and body
+    request_hash: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    
+    # Stored response, NULL while the first request is in flight
+    status_code: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    response_headers: Mapped[Optional[List[List[str]]]] = mapped_column(JSONB, nullable=True)
+    response_body: Mapped[Optional[bytes]] = mapped_column(LargeBinary, nullable=True)
+    
+    # In-flight claims can be taken over after this, e.g. if the worker died
+    locked_until: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    expires_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, index=True)
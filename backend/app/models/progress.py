@@ -0,0 +1,32 @@
+import uuid
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import DateTime, Float, ForeignKey, Integer, String, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+
+from app.models.base import Base
+
+
+class SubjectProgress(Base):
+    """
+    SubjectProgress model aggregating a child's completed sessions per subject.
+    Incremented once per session by the post-session follow-up, never recomputed.
+    """
+    __tablename__ = "subjectprogress"
+    __table_args__ = (
+        # Upsert target for increments; also serves lookups of all of a child's subjects
+        UniqueConstraint("child_id", "subject", name="uq_subjectprogress_child_id_subject"),
+    )
+    
+    subject: Mapped[str] = mapped_column(String, nullable=False)
+    sessions_completed: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    messages: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    minutes: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    last_session_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    
+    # Foreign key to child
+    child_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("child.id", ondelete="CASCADE"), nullable=False)
+    
+    # Relationships
+    child = relationship("Child", back_populates="progress")
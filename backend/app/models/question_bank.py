@@ -0,0 +1,77 @@
+import uuid
+from typing import TYPE_CHECKING, List, Optional
+
+from sqlalchemy import ARRAY, BigInteger, Boolean, Float, ForeignKey, Index, Integer, LargeBinary, String, text
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+
+from app.models.base import Base
+
+if TYPE_CHECKING:
+    from app.models.quiz import Question
+
+
+class BankQuestion(Base):
+    """
+    BankQuestion model for the shared, reusable question bank.
+    Quizzes are filled from the bank first; LLM-generated questions are added to it
+    unless they are near-duplicates of a question already there.
+    """
+    __tablename__ = "bankquestion"
+    __table_args__ = (
+        # Serving order within one bank slot: best questions first, least served first
+        Index(
+            "ix_bankquestion_slot",
+            "subject", "topic", "grade", "difficulty", "quality",
+            postgresql_where=text("is_active"),
+        ),
+        # Overlap (&&) lookups of LSH buckets for near-duplicate candidates
+        Index("ix_bankquestion_lsh_buckets", "lsh_buckets", postgresql_using="gin"),
+        # Exact duplicates are rejected by the database, even when inserted concurrently
+        Index("uq_bankquestion_content_hash", "subject", "topic", "content_hash", unique=True),
+    )
+    
+    # Bank slot
+    subject: Mapped[str] = mapped_column(String, nullable=False)
+    topic: Mapped[str] = mapped_column(String, nullable=False)
+    grade: Mapped[str] = mapped_column(String, nullable=False)
+    difficulty: Mapped[str] = mapped_column(String, nullable=False)  # 'easy', 'medium', 'hard'
+    
+    # Question details, copied into `Question` rows when served
+    text: Mapped[str] = mapped_column(String, nullable=False)
+    type: Mapped[str] = mapped_column(String, nullable=False)  # 'multiple_choice', 'true_false', 'open_ended'
+    options: Mapped[Optional[List[str]]] = mapped_column(ARRAY(String), nullable=True)
+    correct_answer: Mapped[str] = mapped_column(String, nullable=False)
+    
+    # MD5 of the normalized text and answer, see `app.services.question_bank.content_hash`;
+    # NULL only for exact duplicates that were already in the bank when it was added
+    content_hash: Mapped[Optional[str]] = mapped_column(String(32), nullable=True)
+    
+    # MinHash signature of the normalized text and its LSH band buckets
+    minhash: Mapped[List[int]] = mapped_column(ARRAY(BigInteger), nullable=False)
+    lsh_buckets: Mapped[List[int]] = mapped_column(ARRAY(BigInteger), nullable=False)
+    
+    # Editorial score in [0, 1]; higher quality questions are served first
+    quality: Mapped[float] = mapped_column(Float, nullable=False, default=0.5)
+    times_served: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    is_active: Mapped[bool] = mapped_column(Boolean, nullable=False, default=True)
+    source: Mapped[str] = mapped_column(String, nullable=False, default="llm")  # 'llm', 'import'
+    
+    # Relationships
+    questions: Mapped[List["Question"]] = relationship("Question", back_populates="bank_question")
+
+
+class SeenQuestionFilter(Base):
+    """
+    SeenQuestionFilter model holding a Bloom filter of the bank questions a child
+    has been served, so quizzes do not repeat questions.
+    """
+    __tablename__ = "seenquestionfilter"
+    
+    bloom: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    # Questions added since the filter was (re)started
+    items: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    
+    # Foreign key to child, one filter per child
+    child_id: Mapped[uuid.UUID] = mapped_column(
+        ForeignKey("child.id", ondelete="CASCADE"), nullable=False, unique=True
+    )
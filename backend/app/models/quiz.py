@@ -1,5 +1,5 @@
 import uuid
-from typing import Optional, List
+from typing import TYPE_CHECKING, Optional, List
 
 from sqlalchemy import String, ForeignKey, Float, Boolean, ARRAY
 from sqlalchemy.dialects.postgresql import UUID
@@ -7,6 +7,10 @@ from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models.base import Base
 
+if TYPE_CHECKING:
+    from app.models.child import Child
+    from app.models.question_bank import BankQuestion
+
 
 class Quiz(Base):
     """
@@ -43,9 +47,14 @@ class Question(Base):
     
     # Foreign key to quiz
     quiz_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("quiz.id"), nullable=False)
+    # Bank question this question was served from, if any
+    bank_question_id: Mapped[Optional[uuid.UUID]] = mapped_column(
+        ForeignKey("bankquestion.id", ondelete="SET NULL"), nullable=True
+    )
     
     # Relationships
     quiz: Mapped["Quiz"] = relationship("Quiz", back_populates="questions")
+    bank_question: Mapped[Optional["BankQuestion"]] = relationship("BankQuestion", back_populates="questions")
     answers: Mapped[List["Answer"]] = relationship("Answer", back_populates="question", cascade="all, delete-orphan")
 
 
@@ -1,15 +1,20 @@
 import uuid
 from datetime import datetime
-from typing import Optional, List
+from typing import Any, Dict, Optional, List
 import enum
 
-from sqlalchemy import String, ForeignKey, Enum, DateTime
-from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy import DDL, String, ForeignKey, Enum, DateTime, Computed, Index, Integer, LargeBinary, PrimaryKeyConstraint, event, text
+from sqlalchemy.dialects.postgresql import TSVECTOR, UUID
+from sqlalchemy.orm import Mapped, declared_attr, mapped_column, relationship
 
 from app.models.base import Base
 
 
+# Text search configuration used for the generated message search vector.
+# Queries must use the same configuration to hit the GIN index.
+SEARCH_CONFIG = "english"
+
+
 class SessionStatus(str, enum.Enum):
     """Enum for session status to ensure data integrity."""
     ACTIVE = "active"
@@ -22,6 +27,11 @@ class Session(Base):
     Each session is focused on a specific subject and topic.
     """
     __tablename__ = "session"
+    __table_args__ = (
+        # Only active sessions are indexed, so current-session lookups and the
+        # idle session reaper stay fast however many sessions have completed
+        Index("ix_session_child_id_active", "child_id", "created_at", postgresql_where=text("status = 'ACTIVE'")),
+    )
     
     # Session details
     subject: Mapped[str] = mapped_column(String, nullable=False)
@@ -29,31 +39,120 @@ class Session(Base):
     status: Mapped[SessionStatus] = mapped_column(Enum(SessionStatus), default=SessionStatus.ACTIVE)
     ended_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
     
+    # Filled in by the post-session follow-up once the session is completed
+    message_count: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    summary: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    
     # Foreign key to child
     child_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("child.id"), nullable=False)
     
     # Relationships
     child: Mapped["Child"] = relationship("Child", back_populates="sessions")
     messages: Mapped[List["Message"]] = relationship("Message", back_populates="session", cascade="all, delete-orphan")
+    archive: Mapped[Optional["MessageArchive"]] = relationship("MessageArchive", back_populates="session", uselist=False, cascade="all, delete-orphan")
+    follow_up: Mapped[Optional["SessionFollowUp"]] = relationship("SessionFollowUp", back_populates="session", uselist=False, passive_deletes=True)
+
+
+class SessionFollowUp(Base):
+    """
+    Queued post-session work (progress aggregates, summary) for a completed session.
+    Inserted in the same transaction that completes the session and deleted once done.
+    """
+    __tablename__ = "sessionfollowup"
+    
+    # Failed runs are retried after a growing delay
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    available_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.utcnow, index=True)
+    last_error: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    
+    # Completed session, at most one pending follow-up per session
+    session_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("session.id", ondelete="CASCADE"), nullable=False, unique=True)
+    
+    # Relationships
+    session: Mapped["Session"] = relationship("Session", back_populates="follow_up")
 
 
 class Message(Base):
     """
     Message model representing individual messages in a session.
     Includes both user (child) messages and AI responses.
+    
+    The table is range partitioned by month on `created_at`, so its primary key
+    is (id, created_at). The mapper still identifies rows by `id` alone.
+    Messages of completed sessions past the retention window are moved into
+    `MessageArchive` by the archival job.
     """
     __tablename__ = "message"
+    __table_args__ = (
+        # Partition key must be part of the primary key
+        PrimaryKeyConstraint("id", "created_at"),
+        Index("ix_message_search_vector", "search_vector", postgresql_using="gin"),
+        Index("ix_message_session_id_created_at", "session_id", "created_at"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+    
+    @declared_attr.directive
+    @classmethod
+    def __mapper_args__(cls) -> Dict[str, Any]:
+        return {"primary_key": [cls.__table__.c.id]}
+    
+    # Partition key, part of the table's primary key
+    created_at: Mapped[datetime] = mapped_column(DateTime, primary_key=True, default=datetime.utcnow)
     
     # Message content
     content: Mapped[str] = mapped_column(String, nullable=False)
     role: Mapped[str] = mapped_column(String, nullable=False)  # 'user', 'assistant', 'system'
     
+    # Full-text search vector, generated and stored by PostgreSQL from content
+    search_vector: Mapped[Optional[str]] = mapped_column(
+        TSVECTOR,
+        Computed(f"to_tsvector('{SEARCH_CONFIG}'::regconfig, content)", persisted=True),
+        nullable=True,
+    )
+    
     # Foreign key to session
     session_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("session.id"), nullable=False)
     
     # Relationships
     session: Mapped["Session"] = relationship("Session", back_populates="messages")
-    feedback: Mapped[Optional["Feedback"]] = relationship("Feedback", back_populates="message", uselist=False, cascade="all, delete-orphan")
+    feedback: Mapped[Optional["Feedback"]] = relationship(
+        "Feedback",
+        primaryjoin="Message.id == foreign(Feedback.message_id)",
+        back_populates="message",
+        uselist=False,
+        cascade="all, delete-orphan",
+    )
+
+
+# Catch-all partition so rows outside the monthly partitions are never rejected.
+# Monthly partitions are created by the migrations and `create_message_partitions()`.
+event.listen(
+    Message.__table__,
+    "after_create",
+    DDL("CREATE TABLE IF NOT EXISTS message_default PARTITION OF message DEFAULT"),
+)
+
+
+class MessageArchive(Base):
+    """
+    Cold storage for the messages of a completed session.
+    All messages of the session are serialized as JSON lines and compressed
+    with zstd into a single blob, one row per session.
+    """
+    __tablename__ = "messagearchive"
+    
+    # Archived session, one archive row per session
+    session_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("session.id"), nullable=False, unique=True)
+    
+    # Archive details
+    message_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    first_message_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    last_message_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    codec: Mapped[str] = mapped_column(String, nullable=False, default="zstd")
+    payload: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    
+    # Relationships
+    session: Mapped["Session"] = relationship("Session", back_populates="archive")
 
 
 class Feedback(Base):
@@ -67,8 +166,14 @@ class Feedback(Base):
     rating: Mapped[str] = mapped_column(String, nullable=False)  # 'thumbs_up', 'thumbs_down'
     comment: Mapped[Optional[str]] = mapped_column(String, nullable=True)
     
-    # Foreign key to message
-    message_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("message.id"), nullable=False, unique=True)
+    # Reference to message. No database foreign key: a key on the partitioned
+    # message table would have to include created_at, and feedback is kept
+    # when its message is moved to the archive.
+    message_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), nullable=False, unique=True)
     
     # Relationships
-    message: Mapped["Message"] = relationship("Message", back_populates="feedback")
+    message: Mapped["Message"] = relationship(
+        "Message",
+        primaryjoin="foreign(Feedback.message_id) == Message.id",
+        back_populates="feedback",
+    )
@@ -0,0 +1,34 @@
+import uuid
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import DateTime, Float, ForeignKey, Integer, String, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+
+from app.models.base import Base
+
+
+class SkillEstimate(Base):
+    """
+    SkillEstimate model holding a child's estimated ability on one subject and topic.
+    Updated incrementally from graded answers and used to pick quiz difficulty.
+    """
+    __tablename__ = "skillestimate"
+    __table_args__ = (
+        # One estimate per topic; also serves lookups of all of a child's estimates
+        UniqueConstraint("child_id", "subject", "topic", name="uq_skillestimate_child_id_subject_topic"),
+    )
+    
+    subject: Mapped[str] = mapped_column(String, nullable=False)
+    topic: Mapped[str] = mapped_column(String, nullable=False)
+    # Ability on the logit scale of the difficulty levels (0 = "medium")
+    rating: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    # Graded answers seen so far; later answers move the rating less
+    answers: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    last_answer_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    
+    # Foreign key to child
+    child_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("child.id", ondelete="CASCADE"), nullable=False)
+    
+    # Relationships
+    child = relationship("Child", back_populates="skills")
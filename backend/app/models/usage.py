@@ -0,0 +1,33 @@
+import uuid
+from datetime import date
+from decimal import Decimal
+
+from sqlalchemy import BigInteger, Date, ForeignKey, Integer, Numeric, String, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+
+from app.models.base import Base
+
+
+class Usage(Base):
+    """
+    Usage model aggregating LLM token usage and cost per parent, day and model.
+    Rows are incremented in batches by the usage tracker, never per call.
+    """
+    __tablename__ = "usage"
+    __table_args__ = (
+        # Upsert target for batched increments; also serves month-to-date sums per parent
+        UniqueConstraint("parent_id", "day", "model", name="uq_usage_parent_id_day_model"),
+    )
+    
+    day: Mapped[date] = mapped_column(Date, nullable=False)
+    model: Mapped[str] = mapped_column(String, nullable=False)
+    requests: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    prompt_tokens: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    completion_tokens: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    cost_usd: Mapped[Decimal] = mapped_column(Numeric(12, 6), nullable=False, default=0)
+    
+    # Foreign key to the parent account being billed
+    parent_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("user.id", ondelete="CASCADE"), nullable=False)
+    
+    # Relationships
+    parent = relationship("User", back_populates="usage")
@@ -1,4 +1,7 @@
-from sqlalchemy import Boolean, String
+from decimal import Decimal
+from typing import Optional
+
+from sqlalchemy import Boolean, Numeric, String
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models.base import Base
@@ -16,5 +19,9 @@ class User(Base):
     is_active: Mapped[bool] = mapped_column(Boolean(), default=True)
     is_superuser: Mapped[bool] = mapped_column(Boolean(), default=False)
     
+    # Monthly LLM spending cap; NULL uses LLM_MONTHLY_BUDGET_USD
+    llm_monthly_budget_usd: Mapped[Optional[Decimal]] = mapped_column(Numeric(10, 2), nullable=True)
+    
     # Relationships
     children = relationship("Child", back_populates="parent", cascade="all, delete-orphan")
+    usage = relationship("Usage", back_populates="parent", cascade="all, delete-orphan", passive_deletes=True)
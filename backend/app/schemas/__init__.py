@@ -12,4 +12,24 @@ from app.schemas.child import (
     ChildCreate,
     ChildUpdate,
     ChildDetail,
-)
\ No newline at end of file
+)
+from app.schemas.session import (
+    Session,
+    SessionCreate,
+    SessionUpdate,
+    Message,
+    MessageCreate,
+    MessageUpdate,
+    ChatMessageCreate,
+    MessageSearchResult,
+    MessageSearchPage,
+)
+from app.schemas.provisioning import (
+    BulkUserRow,
+    BulkChildRow,
+    BulkRowResult,
+    BulkSummary,
+)
+from app.schemas.skill import SkillEstimate
+from app.schemas.progress import SubjectProgress
+from app.schemas.question_bank import BankQuestionIn
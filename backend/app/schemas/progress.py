@@ -0,0 +1,16 @@
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class SubjectProgress(BaseModel):
+    """Schema for a child's aggregated progress in one subject."""
+    subject: str
+    sessions_completed: int
+    messages: int
+    minutes: float
+    last_session_at: Optional[datetime] = None
+    
+    class Config:
+        orm_mode = True
@@ -0,0 +1,40 @@
+from typing import Any, Optional
+from uuid import UUID
+
+from pydantic import BaseModel, EmailStr, Field
+
+from app.schemas.child import ChildBase
+
+
+class BulkUserRow(BaseModel):
+    """Schema for one parent account row of a bulk provisioning upload."""
+    email: EmailStr
+    name: str
+    # Only used for new accounts; existing accounts keep their password
+    password: str = Field(..., min_length=8)
+    # New accounts default to active; existing accounts keep their flag when omitted
+    is_active: Optional[bool] = None
+
+
+class BulkChildRow(ChildBase):
+    """Schema for one child profile row of a bulk provisioning upload."""
+    parent_email: EmailStr
+
+
+class BulkRowResult(BaseModel):
+    """Schema for the outcome of one uploaded row, streamed as an NDJSON line."""
+    line: int
+    status: str  # 'created', 'updated' or 'error'
+    id: Optional[UUID] = None
+    email: Optional[str] = None
+    detail: Optional[Any] = None
+
+
+class BulkSummary(BaseModel):
+    """Schema for the final NDJSON line of a bulk provisioning response."""
+    rows: int = 0
+    created: int = 0
+    updated: int = 0
+    failed: int = 0
+    elapsed_seconds: float = 0.0
+    rows_per_second: float = 0.0
@@ -0,0 +1,31 @@
+from typing import List, Optional
+
+from pydantic import BaseModel, validator
+
+QUESTION_TYPES = ("multiple_choice", "true_false", "open_ended")
+
+
+class BankQuestionIn(BaseModel):
+    """Schema for a question added to the question bank, e.g. parsed from LLM output."""
+    text: str
+    type: str
+    options: Optional[List[str]] = None
+    correct_answer: str
+    
+    @validator("text", "correct_answer")
+    def check_not_blank(cls, v):
+        if not v.strip():
+            raise ValueError("must not be blank")
+        return v.strip()
+    
+    @validator("type")
+    def check_type(cls, v):
+        if v not in QUESTION_TYPES:
+            raise ValueError(f"must be one of {', '.join(QUESTION_TYPES)}")
+        return v
+    
+    @validator("options", always=True)
+    def check_options(cls, v, values):
+        if values.get("type") == "multiple_choice" and not v:
+            raise ValueError("multiple choice questions need options")
+        return v
@@ -0,0 +1,76 @@
+from datetime import datetime
+from typing import List, Optional
+from uuid import UUID
+
+from pydantic import BaseModel, Field
+
+from app.models.session import SessionStatus
+from app.schemas.base import BaseSchema
+
+
+class SessionBase(BaseModel):
+    """Base schema for learning session data."""
+    subject: str
+    topic: str
+
+
+class SessionCreate(SessionBase):
+    """Schema for starting a new learning session."""
+    child_id: UUID
+
+
+class SessionUpdate(BaseModel):
+    """Schema for updating an existing learning session."""
+    topic: Optional[str] = None
+    status: Optional[SessionStatus] = None
+    ended_at: Optional[datetime] = None
+
+
+class Session(SessionBase, BaseSchema):
+    """Schema for returning learning session data in API responses."""
+    child_id: UUID
+    status: SessionStatus
+    ended_at: Optional[datetime] = None
+
+
+class MessageBase(BaseModel):
+    """Base schema for session message data."""
+    content: str
+    role: str  # 'user', 'assistant', 'system'
+
+
+class MessageCreate(MessageBase):
+    """Schema for creating a new message in a session."""
+    session_id: UUID
+
+
+class MessageUpdate(BaseModel):
+    """Schema for updating an existing message."""
+    content: Optional[str] = None
+
+
+class Message(MessageBase, BaseSchema):
+    """Schema for returning message data in API responses."""
+    session_id: UUID
+
+
+class ChatMessageCreate(BaseModel):
+    """Schema for a child's chat message to the tutor."""
+    content: str = Field(..., min_length=1, max_length=4000)
+
+
+class MessageSearchResult(BaseModel):
+    """A single ranked full-text search hit with a highlighted snippet."""
+    id: UUID
+    session_id: UUID
+    child_id: UUID
+    role: str
+    created_at: datetime
+    rank: float
+    headline: str
+
+
+class MessageSearchPage(BaseModel):
+    """A page of message search results with an opaque keyset cursor."""
+    results: List[MessageSearchResult]
+    next_cursor: Optional[str] = None
@@ -0,0 +1,15 @@
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class SkillEstimate(BaseModel):
+    """Schema for a child's estimated skill on one topic."""
+    subject: str
+    topic: str
+    rating: float
+    answers: int
+    last_answer_at: Optional[datetime] = None
+    # Difficulty level the next quiz on this topic will be generated with
+    recommended_difficulty: str
@@ -0,0 +1,212 @@
+"""
+Single-flight coalescing of identical concurrent LLM calls.
+
+When many children hit the same prompt at once (e.g. a class generating quiz
+questions for the same grade, subject and topic), only the first caller, the
+leader, calls the LLM; callers arriving while that call is in flight share its
+result instead of making their own. Calls are matched by `coalesce_key`: the
+model, completion parameters and messages with whitespace collapsed and case
+folded. Prompts that differ in any other way, such as the child's name or
+conversation history in tutor prompts, are never shared.
+
+Streamed calls are fanned out: the reply is read from the LLM once, in a
+background task, into a buffer that every subscriber reads at its own pace,
+so a subscriber that joins late first catches up on the tokens sent so far.
+A subscriber that stops reading (client disconnected, reply blocked by the
+safety filter) only stops its own copy; the LLM stream is cancelled once the
+last subscriber has stopped. Non-streamed calls work the same way with a
+shared task.
+
+Nothing is cached: once a call finishes, the next identical prompt calls the
+LLM again.
+"""
+import asyncio
+import hashlib
+import json
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+def coalesce_key(model: str, messages: List[Dict[str, str]], params: Dict[str, Any]) -> str:
+    """
+    Key of a chat completion call; calls with equal keys get the same reply.
+
+    Args:
+        model: Chat model name
+        messages: Chat messages as {"role": ..., "content": ...} dicts
+        params: Extra completion parameters (temperature, max_tokens, ...)
+
+    Returns:
+        Hex digest
+    """
+    normalized = [(m["role"], " ".join(m["content"].split()).casefold()) for m in messages]
+    payload = json.dumps([model, sorted(params.items()), normalized], default=str, separators=(",", ":"))
+    return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+
+class _Flight:
+    """One in-flight call and the callers sharing it."""
+
+    def __init__(self):
+        self.task: Optional["asyncio.Task[Any]"] = None
+        self.waiters = 0
+        # Streamed calls only
+        self.chunks: List[str] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.changed = asyncio.Event()
+
+    def notify(self) -> None:
+        event, self.changed = self.changed, asyncio.Event()
+        event.set()
+
+
+class SingleFlight:
+    """
+    Registry of in-flight calls of one worker, with coalescing metrics.
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, _Flight] = {}
+        self._streams: Dict[str, _Flight] = {}
+        self.calls = 0
+        self.coalesced = 0
+        self.cancelled = 0
+        self.tokens_saved = 0
+
+    async def do(
+        self,
+        key: str,
+        call: Callable[[], Awaitable[T]],
+        *,
+        tokens: Callable[[T], int] = lambda result: 0,
+    ) -> T:
+        """
+        Run `call`, or wait for the identical call already in flight.
+
+        The result object is shared by all callers and must not be modified.
+        If every caller is cancelled, the call is cancelled too.
+
+        Args:
+            key: Call key from `coalesce_key`
+            call: Makes the call; only invoked by the leader
+            tokens: Token count of a result, for the tokens saved metric
+
+        Returns:
+            The call's result; its exception is raised to every caller
+        """
+        flight = self._calls.get(key)
+        leader = flight is None
+        if leader:
+            flight = self._calls[key] = _Flight()
+            flight.task = asyncio.ensure_future(call())
+            flight.task.add_done_callback(lambda _: self._forget(self._calls, key, flight))
+            self.calls += 1
+        else:
+            self.coalesced += 1
+        flight.waiters += 1
+        try:
+            result = await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                flight.task.cancel()
+                self.cancelled += 1
+        if not leader:
+            self.tokens_saved += tokens(result)
+        return result
+
+    async def stream(
+        self,
+        key: str,
+        call: Callable[[], AsyncIterator[str]],
+        *,
+        prompt_tokens: int = 0,
+    ) -> AsyncIterator[str]:
+        """
+        Yield the chunks of `call`, or of the identical stream already in flight.
+
+        Args:
+            key: Call key from `coalesce_key`
+            call: Opens the stream; only invoked by the leader
+            prompt_tokens: Prompt token count, for the tokens saved metric
+
+        Yields:
+            Every chunk of the stream, from the first
+
+        Raises:
+            The stream's exception, once its chunks before it have been yielded
+        """
+        flight = self._streams.get(key)
+        leader = flight is None
+        if leader:
+            flight = self._streams[key] = _Flight()
+            flight.task = asyncio.ensure_future(self._produce(key, flight, call))
+            self.calls += 1
+        else:
+            self.coalesced += 1
+        flight.waiters += 1
+        position = 0
+        try:
+            while True:
+                changed = flight.changed
+                while position < len(flight.chunks):
+                    yield flight.chunks[position]
+                    position += 1
+                if flight.done:
+                    if flight.error is not None:
+                        raise flight.error
+                    break
+                await changed.wait()
+            if not leader:
+                self.tokens_saved += prompt_tokens + len(flight.chunks)
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.done:
+                # Nobody is reading any more: stop the LLM stream
+                self._forget(self._streams, key, flight)
+                flight.task.cancel()
+                self.cancelled += 1
+
+    async def _produce(self, key: str, flight: _Flight, call: Callable[[], AsyncIterator[str]]) -> None:
+        stream = call()
+        try:
+            async for chunk in stream:
+                flight.chunks.append(chunk)
+                flight.notify()
+        except Exception as exc:
+            flight.error = exc
+        finally:
+            flight.done = True
+            self._forget(self._streams, key, flight)
+            flight.notify()
+            await stream.aclose()
+
+    def _forget(self, flights: Dict[str, _Flight], key: str, flight: _Flight) -> None:
+        # A newer call with the same key may have taken this one's place
+        if flights.get(key) is flight:
+            del flights[key]
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return coalescing metrics and the number of calls in flight.
+
+        Returns:
+            Dictionary with "calls" made to the LLM, "coalesced" calls saved by
+            sharing one in flight, "cancelled" calls abandoned by all callers,
+            estimated "tokens_saved" and "in_flight"
+        """
+        total = self.calls + self.coalesced
+        return {
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+            "coalesced_ratio": round(self.coalesced / total, 4) if total else 0.0,
+            "cancelled": self.cancelled,
+            "tokens_saved": self.tokens_saved,
+            "in_flight": len(self._calls) + len(self._streams),
+        }
+
+
+# Shared registry of the worker's LLM calls
+llm_flights = SingleFlight()
@@ -0,0 +1,329 @@
+"""
+Micro-batching of embedding requests.
+
+Every child question is embedded (for retrieval), usually one text at a time
+from many concurrent requests. `embedding_batcher.embed` queues the text and
+the queue is sent to the embedding backend as one call once
+`EMBEDDING_MAX_BATCH` texts are waiting or the oldest has waited
+`EMBEDDING_BATCH_WAIT_MS`. Identical texts in a batch are embedded once.
+
+Backends (`EMBEDDING_BACKEND`):
+
+- "openai": `LLMClient.embed` with `OPENAI_EMBEDDING_MODEL`. A batch is one
+  unbilled API call; each parent is then billed for their own texts, with
+  tokens estimated from text length.
+- "local": a sentence-transformers model (`EMBEDDING_LOCAL_MODEL`) run on CPU
+  in `EMBEDDING_LOCAL_WORKERS` worker processes, so model inference does not
+  block the event loop. Requires the `sentence-transformers` package.
+
+Vectors from different backends or models are not comparable: the retrieval
+index must be built with the backend used for queries.
+
+Batch sizes and queue waits are kept as histograms; see `EmbeddingBatcher.stats`.
+"""
+import asyncio
+import logging
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Any, Dict, List, Optional, Set
+from uuid import UUID
+
+from app.core.config import settings
+from app.core.lazy import lazy_import
+from app.services.llm import get_llm_client
+from app.services.usage import UsageTracker, estimate_tokens, usage_tracker
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds of the histogram buckets; the last bucket is open ended
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128)
+QUEUE_WAIT_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100)
+
+# Model loaded once per worker process of the local backend
+_local_model: Any = None
+
+
+def _embed_locally(model_name: str, texts: List[str]) -> List[List[float]]:
+    """Embed texts with a sentence-transformers model; runs in a worker process."""
+    global _local_model
+    if _local_model is None:
+        sentence_transformers = lazy_import("sentence_transformers", install_hint="sentence-transformers")
+        _local_model = sentence_transformers.SentenceTransformer(model_name, device="cpu")
+    return _local_model.encode(texts, batch_size=len(texts), normalize_embeddings=True).tolist()
+
+
+class RemoteEmbeddingBackend:
+    """
+    Embeddings from the OpenAI API, billed per parent by the batcher.
+    """
+    billed = True
+
+    def __init__(self, llm: Any = None):
+        """
+        Args:
+            llm: LLM client, defaults to the process-wide client
+        """
+        self._llm = llm
+        self.model = settings.OPENAI_EMBEDDING_MODEL
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        """Embed texts in one API call."""
+        if self._llm is None:
+            self._llm = get_llm_client()
+        return await self._llm.embed(texts)
+
+    def shutdown(self) -> None:
+        """Nothing to release."""
+
+
+class LocalEmbeddingBackend:
+    """
+    Embeddings from a local sentence-transformers model in a process pool.
+    """
+    billed = False
+
+    def __init__(self, model: Optional[str] = None, workers: Optional[int] = None):
+        """
+        Initialize the backend. Worker processes start, and load the model, on first use.
+
+        Args:
+            model: sentence-transformers model name, defaults to `EMBEDDING_LOCAL_MODEL`
+            workers: Worker processes, defaults to `EMBEDDING_LOCAL_WORKERS`
+        """
+        self.model = model or settings.EMBEDDING_LOCAL_MODEL
+        self.workers = workers or settings.EMBEDDING_LOCAL_WORKERS
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        """Embed texts in one call to a worker process."""
+        with self._lock:
+            if self._pool is None:
+                # Spawn rather than fork: the server process runs background threads
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            pool = self._pool
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(pool, partial(_embed_locally, self.model, texts))
+
+    def shutdown(self) -> None:
+        """Stop the worker processes."""
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(cancel_futures=True)
+                self._pool = None
+
+
+def create_backend(name: Optional[str] = None) -> Any:
+    """
+    Create the embedding backend named by `EMBEDDING_BACKEND`.
+
+    Raises:
+        ValueError: If the backend name is unknown
+    """
+    name = name or settings.EMBEDDING_BACKEND
+    if name == "openai":
+        return RemoteEmbeddingBackend()
+    if name == "local":
+        return LocalEmbeddingBackend()
+    raise ValueError(f"Unknown embedding backend '{name}', expected 'openai' or 'local'")
+
+
+class BatcherMetrics:
+    """
+    Counters and fixed-size histograms of batch sizes and queue waits.
+    """
+
+    def __init__(self):
+        self.requests = 0
+        self.batches = 0
+        self.batched_requests = 0
+        self.texts_embedded = 0
+        self.failed_batches = 0
+        self.max_wait_ms = 0.0
+        self.batch_sizes = [0] * (len(BATCH_SIZE_BUCKETS) + 1)
+        self.queue_waits = [0] * (len(QUEUE_WAIT_BUCKETS_MS) + 1)
+
+    @staticmethod
+    def _observe(buckets: List[int], bounds: tuple, value: float) -> None:
+        for index, bound in enumerate(bounds):
+            if value <= bound:
+                buckets[index] += 1
+                return
+        buckets[-1] += 1
+
+    def observe_batch(self, size: int, unique: int, waits_ms: List[float]) -> None:
+        """Record a batch of `size` requests, `unique` distinct texts, and each request's queue wait."""
+        self.batches += 1
+        self.batched_requests += size
+        self.texts_embedded += unique
+        self._observe(self.batch_sizes, BATCH_SIZE_BUCKETS, size)
+        for wait_ms in waits_ms:
+            self._observe(self.queue_waits, QUEUE_WAIT_BUCKETS_MS, wait_ms)
+            self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return a snapshot suitable for a metrics endpoint or log line."""
+        sizes = {f"le_{bound}": count for bound, count in zip(BATCH_SIZE_BUCKETS, self.batch_sizes)}
+        sizes["gt_max"] = self.batch_sizes[-1]
+        waits = {f"le_{bound}ms": count for bound, count in zip(QUEUE_WAIT_BUCKETS_MS, self.queue_waits)}
+        waits["gt_max"] = self.queue_waits[-1]
+        return {
+            "requests": self.requests,
+            "batches": self.batches,
+            "batched_requests": self.batched_requests,
+            "texts_embedded": self.texts_embedded,
+            "failed_batches": self.failed_batches,
+            "mean_batch_size": round(self.batched_requests / self.batches, 2) if self.batches else 0.0,
+            "max_wait_ms": round(self.max_wait_ms, 3),
+            "batch_sizes": sizes,
+            "queue_wait": waits,
+        }
+
+
+class _Request:
+    __slots__ = ("text", "parent_id", "future", "queued_at")
+
+    def __init__(self, text: str, parent_id: Optional[UUID], future: asyncio.Future):
+        self.text = text
+        self.parent_id = parent_id
+        self.future = future
+        self.queued_at = time.perf_counter()
+
+
+class EmbeddingBatcher:
+    """
+    Collects concurrent embedding requests on the event loop into batched backend calls.
+    """
+
+    def __init__(
+        self,
+        backend: Any = None,
+        *,
+        max_wait_ms: Optional[int] = None,
+        max_batch: Optional[int] = None,
+        usage: UsageTracker = usage_tracker,
+    ):
+        """
+        Initialize the batcher. The backend is created on first use.
+
+        Args:
+            backend: Embedding backend, defaults to `create_backend()`
+            max_wait_ms: Longest a request waits for others, defaults to `EMBEDDING_BATCH_WAIT_MS`
+            max_batch: Texts per backend call, defaults to `EMBEDDING_MAX_BATCH`
+            usage: Tracker that budgets and records billed calls
+        """
+        self._backend = backend
+        self.max_wait = (max_wait_ms if max_wait_ms is not None else settings.EMBEDDING_BATCH_WAIT_MS) / 1000
+        self.max_batch = max_batch or settings.EMBEDDING_MAX_BATCH
+        self.usage = usage
+        self.metrics = BatcherMetrics()
+        self._queue: List[_Request] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set[asyncio.Task] = set()
+
+    @property
+    def backend(self) -> Any:
+        """The embedding backend, created on first access."""
+        if self._backend is None:
+            self._backend = create_backend()
+        return self._backend
+
+    async def embed(self, text: str, *, parent_id: Optional[UUID] = None) -> List[float]:
+        """
+        Embed one text as part of the next batch.
+
+        Args:
+            text: Text to embed
+            parent_id: Parent billed for the embedding; unbilled calls skip budgeting
+
+        Returns:
+            The embedding
+
+        Raises:
+            BudgetExceeded: If the parent's monthly budget is used up
+        """
+        backend = self.backend
+        if parent_id is not None and backend.billed:
+            self.usage.check(parent_id)
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # Requests of a previous event loop (e.g. a finished test) can never complete
+            self._queue, self._timer, self._loop = [], None, loop
+        request = _Request(text, parent_id, loop.create_future())
+        self._queue.append(request)
+        self.metrics.requests += 1
+        if len(self._queue) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+        return await request.future
+
+    async def embed_many(self, texts: List[str], *, parent_id: Optional[UUID] = None) -> List[List[float]]:
+        """Embed several texts, batched with concurrent requests; results are in input order."""
+        return list(await asyncio.gather(*(self.embed(text, parent_id=parent_id) for text in texts)))
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return batching metrics and the current queue length.
+
+        Returns:
+            Dictionary of counters plus the "batch_sizes" histogram, keyed
+            "le_<size>", and the "queue_wait" histogram, keyed "le_<ms>ms",
+            each with a "gt_max" overflow bucket
+        """
+        return {**self.metrics.as_dict(), "queued": len(self._queue)}
+
+    def shutdown(self) -> None:
+        """Release backend resources, e.g. local worker processes, on shutdown."""
+        if self._backend is not None:
+            self._backend.shutdown()
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._queue = self._queue[:self.max_batch], self._queue[self.max_batch:]
+        if self._queue:
+            self._timer = self._loop.call_later(self.max_wait, self._flush)
+        if batch:
+            task = self._loop.create_task(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: List[_Request]) -> None:
+        started = time.perf_counter()
+        texts = list(dict.fromkeys(request.text for request in batch))
+        self.metrics.observe_batch(
+            len(batch), len(texts), [(started - request.queued_at) * 1000 for request in batch]
+        )
+        backend = self.backend
+        try:
+            vectors = dict(zip(texts, await backend.embed(texts)))
+        except Exception as exc:
+            self.metrics.failed_batches += 1
+            logger.warning("Embedding batch of %d texts failed: %s", len(texts), exc)
+            for request in batch:
+                if not request.future.done():
+                    request.future.set_exception(exc)
+            return
+        for request in batch:
+            try:
+                if not request.future.done():
+                    request.future.set_result(vectors[request.text])
+                if request.parent_id is not None and backend.billed:
+                    self.usage.record(request.parent_id, backend.model, estimate_tokens(request.text), 0)
+            except Exception as exc:
+                # E.g. a backend returning fewer vectors than texts; only this request fails
+                logger.warning("Embedding request in a batch of %d texts failed: %r", len(texts), exc)
+                if not request.future.done():
+                    request.future.set_exception(exc)
+
+
+# Process-wide batcher
+embedding_batcher = EmbeddingBatcher()
@@ -0,0 +1,226 @@
+"""
+Streaming export of a child's learning history.
+
+The child's sessions, messages (archived and hot), quizzes, quiz attempts and
+answers are read with `yield_per`, which makes psycopg2 use a server-side
+cursor and fetch `EXPORT_YIELD_PER` rows at a time. Only plain columns are
+selected, so rows never enter the ORM identity map. Each row is encoded as
+soon as it arrives, as NDJSON (one object with a "type" key per line) or CSV
+(one header with the union of all record fields), into chunks of about
+`EXPORT_CHUNK_BYTES`, optionally gzip-compressed on the fly. Memory use is
+bounded by one batch of rows and one chunk, whatever the size of the history.
+Archived messages are decompressed one session at a time.
+"""
+import csv
+import enum
+import io
+import json
+import zlib
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.archive_codec import iter_messages
+from app.db.routing import open_read_session
+from app.models.child import Child
+from app.models.quiz import Answer, Question, Quiz, QuizAttempt
+from app.models.session import Message, MessageArchive
+from app.models.session import Session as LearningSession
+from app.services.provisioning import CSV_LIST_SEPARATOR
+
+EXPORT_FORMATS = ("ndjson", "csv")
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+# Field order of each record type
+RECORD_FIELDS: Dict[str, tuple] = {
+    "child": ("id", "name", "grade", "subjects", "learning_style", "created_at"),
+    "session": ("id", "subject", "topic", "status", "created_at", "ended_at", "message_count", "summary"),
+    "message": ("id", "session_id", "role", "content", "created_at"),
+    "quiz": ("id", "subject", "topic", "difficulty", "created_at"),
+    "quiz_attempt": ("id", "quiz_id", "score", "feedback", "created_at"),
+    "answer": (
+        "id", "attempt_id", "question_id", "question", "selected_option", "correct_answer", "is_correct", "created_at",
+    ),
+}
+# CSV columns: the record type, then every field of any record type
+CSV_FIELDS = ("type",) + tuple(dict.fromkeys(field for fields in RECORD_FIELDS.values() for field in fields))
+
+Record = Dict[str, Any]
+
+
+def _plain(value: Any) -> Any:
+    """Convert a column value to a JSON-compatible value."""
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    return value
+
+
+def _stream(db: Session, record_type: str, stmt: Any) -> Iterator[Record]:
+    rows = db.execute(stmt.execution_options(yield_per=settings.EXPORT_YIELD_PER))
+    for row in rows:
+        record = {"type": record_type}
+        for field, value in zip(RECORD_FIELDS[record_type], row):
+            record[field] = _plain(value)
+        yield record
+
+
+def iter_records(db: Session, child_id: UUID) -> Iterator[Record]:
+    """
+    Read a child's history, one record type after another.
+
+    Args:
+        db: Database session, used for one query at a time
+        child_id: ID of the child, whose ownership the caller has checked
+
+    Returns:
+        Iterator of records, starting with the child's profile
+    """
+    yield from _stream(
+        db, "child", select(*(getattr(Child, f) for f in RECORD_FIELDS["child"])).where(Child.id == child_id)
+    )
+
+    sessions = select(LearningSession.id).where(LearningSession.child_id == child_id)
+    yield from _stream(
+        db,
+        "session",
+        select(*(getattr(LearningSession, f) for f in RECORD_FIELDS["session"]))
+        .where(LearningSession.child_id == child_id)
+        .order_by(LearningSession.created_at),
+    )
+
+    # Archived messages are older than the hot ones of the same session
+    archives = db.execute(
+        select(MessageArchive.payload)
+        .where(MessageArchive.session_id.in_(sessions))
+        .order_by(MessageArchive.first_message_at)
+        .execution_options(yield_per=1)
+    )
+    for (payload,) in archives:
+        for message in iter_messages(payload):
+            yield {"type": "message", **{field: _plain(message[field]) for field in RECORD_FIELDS["message"]}}
+    yield from _stream(
+        db,
+        "message",
+        select(*(getattr(Message, f) for f in RECORD_FIELDS["message"]))
+        .join(LearningSession, Message.session_id == LearningSession.id)
+        .where(LearningSession.child_id == child_id)
+        .order_by(Message.session_id, Message.created_at),
+    )
+
+    yield from _stream(
+        db,
+        "quiz",
+        select(*(getattr(Quiz, f) for f in RECORD_FIELDS["quiz"]))
+        .where(Quiz.child_id == child_id)
+        .order_by(Quiz.created_at),
+    )
+    yield from _stream(
+        db,
+        "quiz_attempt",
+        select(*(getattr(QuizAttempt, f) for f in RECORD_FIELDS["quiz_attempt"]))
+        .where(QuizAttempt.child_id == child_id)
+        .order_by(QuizAttempt.created_at),
+    )
+    yield from _stream(
+        db,
+        "answer",
+        select(
+            Answer.id, Answer.attempt_id, Answer.question_id, Question.text, Answer.selected_option,
+            Question.correct_answer, Answer.is_correct, Answer.created_at,
+        )
+        .join(Question, Answer.question_id == Question.id)
+        .join(QuizAttempt, Answer.attempt_id == QuizAttempt.id)
+        .where(QuizAttempt.child_id == child_id)
+        .order_by(Answer.attempt_id, Answer.created_at),
+    )
+
+
+def _encode_ndjson(records: Iterable[Record]) -> Iterator[str]:
+    for record in records:
+        yield json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+
+
+def _encode_csv(records: Iterable[Record]) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=CSV_FIELDS)
+    writer.writeheader()
+    for record in records:
+        for field, value in record.items():
+            if isinstance(value, list):
+                record[field] = CSV_LIST_SEPARATOR.join(value)
+        writer.writerow(record)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+
+_ENCODERS: Dict[str, Callable[[Iterable[Record]], Iterator[str]]] = {"ndjson": _encode_ndjson, "csv": _encode_csv}
+
+
+def encode(
+    records: Iterable[Record], fmt: str, *, gzip: bool = False, chunk_bytes: Optional[int] = None
+) -> Iterator[bytes]:
+    """
+    Encode records into chunks of about `chunk_bytes`.
+
+    Args:
+        records: Records from `iter_records`
+        fmt: "ndjson" or "csv"
+        gzip: Compress the output as a gzip stream
+        chunk_bytes: Uncompressed chunk size, defaults to `EXPORT_CHUNK_BYTES`
+
+    Returns:
+        Iterator of encoded chunks
+    """
+    chunk_bytes = chunk_bytes or settings.EXPORT_CHUNK_BYTES
+    compressor = zlib.compressobj(settings.EXPORT_GZIP_LEVEL, zlib.DEFLATED, 31) if gzip else None
+    parts, size = [], 0
+    for text in _ENCODERS[fmt](records):
+        parts.append(text)
+        size += len(text)
+        if size >= chunk_bytes:
+            chunk = "".join(parts).encode()
+            parts, size = [], 0
+            chunk = compressor.compress(chunk) if compressor else chunk
+            if chunk:
+                yield chunk
+    chunk = "".join(parts).encode()
+    if compressor:
+        chunk = compressor.compress(chunk) + compressor.flush()
+    if chunk:
+        yield chunk
+
+
+def export_history(child_id: UUID, fmt: str, *, gzip: bool = False) -> Iterator[bytes]:
+    """
+    Stream a child's full history from a read session held for the duration of the export.
+
+    All queries run in one REPEATABLE READ, READ ONLY transaction, so they see
+    one snapshot: a session archived between the archive and the message
+    query would otherwise be in neither result.
+
+    Args:
+        child_id: ID of the child, whose ownership the caller has checked
+        fmt: "ndjson" or "csv"
+        gzip: Compress the output as a gzip stream
+
+    Returns:
+        Iterator of encoded chunks
+    """
+    db = open_read_session()
+    try:
+        # Ends the replica lag check's transaction, if any, so the next one gets the isolation level
+        db.rollback()
+        db.connection(execution_options={"isolation_level": "REPEATABLE READ", "postgresql_readonly": True})
+        yield from encode(iter_records(db, child_id), fmt, gzip=gzip)
+    finally:
+        db.close()
@@ -0,0 +1,192 @@
+"""
+LLM client used by the AI features.
+
+The OpenAI SDK is imported lazily on the first call, so importing this module
+(and the app) stays cheap for workers and test runs that never talk to the LLM.
+Identical concurrent chat completions share one call (see `app.services.coalescing`).
+"""
+from functools import lru_cache
+from typing import Any, AsyncIterator, Dict, List, Optional
+from uuid import UUID
+
+from app.core.config import settings
+from app.core.lazy import lazy_import
+from app.services.coalescing import SingleFlight, coalesce_key, llm_flights
+from app.services.usage import UsageTracker, estimate_tokens, usage_tracker
+
+openai = lazy_import("openai", install_hint="openai==0.27.8")
+
+
+class LLMClient:
+    """
+    Thin async wrapper around the OpenAI chat completion API.
+
+    Calls made on behalf of a parent (`parent_id`) are checked against the
+    parent's monthly budget first and their token usage is recorded after.
+    A chat completion that shares another caller's in-flight call is still
+    budget-checked, but only the caller that made the call is billed for it.
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        model: Optional[str] = None,
+        usage: UsageTracker = usage_tracker,
+        flights: SingleFlight = llm_flights,
+    ):
+        """
+        Initialize the client. No network or SDK work happens here.
+
+        Args:
+            api_key: OpenAI API key, defaults to the configured key
+            model: Chat model name, defaults to the configured model
+            usage: Tracker that budgets and records calls
+            flights: Registry of in-flight chat completions to share
+        """
+        self.api_key = api_key or settings.OPENAI_API_KEY
+        self.model = model or settings.OPENAI_MODEL
+        self.usage = usage
+        self.flights = flights
+
+    async def chat(
+        self, messages: List[Dict[str, str]], *, parent_id: Optional[UUID] = None, **kwargs: Any
+    ) -> Dict[str, Any]:
+        """
+        Run a chat completion and return the full response.
+
+        Args:
+            messages: Chat messages as {"role": ..., "content": ...} dicts
+            parent_id: Parent billed for the call; unbilled calls skip budgeting
+            **kwargs: Extra completion parameters (temperature, max_tokens, ...)
+
+        Returns:
+            The completion response
+
+        Raises:
+            BudgetExceeded: If the parent's monthly budget is used up
+        """
+        if parent_id is not None:
+            self.usage.check(parent_id)
+        model = kwargs.pop("model", self.model)
+        if not settings.LLM_COALESCING_ENABLED:
+            return await self._chat(messages, parent_id, model, kwargs)
+        return await self.flights.do(
+            coalesce_key(model, messages, kwargs),
+            lambda: self._chat(messages, parent_id, model, kwargs),
+            tokens=lambda response: (response.get("usage") or {}).get("total_tokens", 0),
+        )
+
+    async def _chat(
+        self, messages: List[Dict[str, str]], parent_id: Optional[UUID], model: str, kwargs: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        response = await openai.ChatCompletion.acreate(
+            api_key=self.api_key,
+            model=model,
+            messages=messages,
+            **kwargs,
+        )
+        if parent_id is not None:
+            usage = response.get("usage") or {}
+            self.usage.record(
+                parent_id,
+                response.get("model", model),
+                usage.get("prompt_tokens", 0),
+                usage.get("completion_tokens", 0),
+            )
+        return response
+
+    async def stream_chat(
+        self, messages: List[Dict[str, str]], *, parent_id: Optional[UUID] = None, **kwargs: Any
+    ) -> AsyncIterator[str]:
+        """
+        Run a chat completion and yield content tokens as they arrive.
+
+        Streamed responses carry no usage data, so tokens are estimated: the
+        prompt from its length and the completion as one token per chunk.
+        Usage is recorded even if the stream is abandoned part way.
+
+        Args:
+            messages: Chat messages as {"role": ..., "content": ...} dicts
+            parent_id: Parent billed for the call; unbilled calls skip budgeting
+            **kwargs: Extra completion parameters (temperature, max_tokens, ...)
+
+        Yields:
+            Content deltas of the assistant reply
+
+        Raises:
+            BudgetExceeded: If the parent's monthly budget is used up
+        """
+        if parent_id is not None:
+            self.usage.check(parent_id)
+        model = kwargs.pop("model", self.model)
+        if settings.LLM_COALESCING_ENABLED:
+            stream = self.flights.stream(
+                coalesce_key(model, messages, kwargs),
+                lambda: self._stream_chat(messages, parent_id, model, kwargs),
+                prompt_tokens=sum(estimate_tokens(m["content"]) for m in messages),
+            )
+        else:
+            stream = self._stream_chat(messages, parent_id, model, kwargs)
+        try:
+            async for content in stream:
+                yield content
+        finally:
+            await stream.aclose()
+
+    async def _stream_chat(
+        self, messages: List[Dict[str, str]], parent_id: Optional[UUID], model: str, kwargs: Dict[str, Any]
+    ) -> AsyncIterator[str]:
+        response = await openai.ChatCompletion.acreate(
+            api_key=self.api_key,
+            model=model,
+            messages=messages,
+            stream=True,
+            **kwargs,
+        )
+        chunks = 0
+        try:
+            async for chunk in response:
+                content = chunk["choices"][0]["delta"].get("content")
+                if content:
+                    chunks += 1
+                    yield content
+        finally:
+            if parent_id is not None:
+                prompt_tokens = sum(estimate_tokens(m["content"]) for m in messages)
+                self.usage.record(parent_id, model, prompt_tokens, chunks)
+
+    async def embed(self, texts: List[str], *, parent_id: Optional[UUID] = None) -> List[List[float]]:
+        """
+        Embed texts with the configured embedding model.
+
+        Args:
+            texts: Texts to embed, in one API request
+            parent_id: Parent billed for the call; unbilled calls skip budgeting
+
+        Returns:
+            One embedding per text, in input order
+
+        Raises:
+            BudgetExceeded: If the parent's monthly budget is used up
+        """
+        if parent_id is not None:
+            self.usage.check(parent_id)
+        response = await openai.Embedding.acreate(
+            api_key=self.api_key,
+            model=settings.OPENAI_EMBEDDING_MODEL,
+            input=texts,
+        )
+        if parent_id is not None:
+            usage = response.get("usage") or {}
+            self.usage.record(
+                parent_id, response.get("model", settings.OPENAI_EMBEDDING_MODEL), usage.get("prompt_tokens", 0), 0
+            )
+        return [item["embedding"] for item in sorted(response["data"], key=lambda item: item["index"])]
+
+
+@lru_cache()
+def get_llm_client() -> LLMClient:
+    """
+    Dependency returning the process-wide LLM client.
+    """
+    return LLMClient()
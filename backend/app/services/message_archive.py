@@ -0,0 +1,116 @@
+"""
+Message partition maintenance and cold archival.
+
+Hot messages live in the monthly partitions of the `message` table. Once a
+session is completed and older than the retention window, its messages are
+serialized as JSON lines, compressed with zstd into one `MessageArchive` row
+per session (see `app.db.archive_codec`) and removed from the hot table.
+`crud.message.get_multi_by_session` reads both transparently.
+"""
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import delete, exists, select, text
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.archive_codec import ARCHIVE_CODEC, compress_messages, decompress_messages
+from app.models.session import Message, MessageArchive, SessionStatus
+from app.models.session import Session as LearningSession
+
+# Fields kept for every archived message
+_ARCHIVED_FIELDS = ("id", "session_id", "role", "content", "created_at", "updated_at")
+
+
+def ensure_partitions(db: Session, months_ahead: Optional[int] = None) -> int:
+    """
+    Create the monthly message partitions for the current and upcoming months.
+
+    Args:
+        db: Database session
+        months_ahead: Number of future months to cover, defaults to the configured value
+
+    Returns:
+        Number of partitions created
+    """
+    if months_ahead is None:
+        months_ahead = settings.MESSAGE_PARTITION_MONTHS_AHEAD
+    created = db.execute(
+        text("SELECT create_message_partitions(:months_ahead)"),
+        {"months_ahead": months_ahead},
+    ).scalar_one()
+    db.commit()
+    return created
+
+
+def archive_completed_sessions(
+    db: Session,
+    *,
+    retention_days: Optional[int] = None,
+    batch_size: Optional[int] = None,
+) -> int:
+    """
+    Move the messages of one batch of old completed sessions into the archive.
+
+    Sessions are locked with SKIP LOCKED so several workers can run the job
+    concurrently. Each batch is committed as a single transaction.
+    Feedback rows are kept; they reference messages by id only.
+
+    Args:
+        db: Database session
+        retention_days: Days after `ended_at` before a session is archived
+        batch_size: Maximum number of sessions to archive
+
+    Returns:
+        Number of sessions archived
+    """
+    if retention_days is None:
+        retention_days = settings.MESSAGE_RETENTION_DAYS
+    if batch_size is None:
+        batch_size = settings.MESSAGE_ARCHIVE_BATCH_SIZE
+    cutoff = datetime.utcnow() - timedelta(days=retention_days)
+
+    session_ids = db.execute(
+        select(LearningSession.id)
+        .where(
+            LearningSession.status == SessionStatus.COMPLETED,
+            LearningSession.ended_at < cutoff,
+            exists().where(Message.session_id == LearningSession.id),
+        )
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    ).scalars().all()
+
+    for session_id in session_ids:
+        rows = db.execute(
+            select(*(getattr(Message, field) for field in _ARCHIVED_FIELDS))
+            .where(Message.session_id == session_id)
+            .order_by(Message.created_at, Message.id)
+        ).mappings().all()
+        messages = [dict(row) for row in rows]
+
+        archive = db.execute(
+            select(MessageArchive).where(MessageArchive.session_id == session_id)
+        ).scalar_one_or_none()
+        if archive is None:
+            archive = MessageArchive(session_id=session_id, codec=ARCHIVE_CODEC)
+            db.add(archive)
+        else:
+            # Late messages of an already archived session are appended
+            messages = decompress_messages(archive.payload) + messages
+
+        archive.payload = compress_messages(messages)
+        archive.message_count = len(messages)
+        archive.first_message_at = messages[0]["created_at"]
+        archive.last_message_at = messages[-1]["created_at"]
+
+        # Bounding created_at lets PostgreSQL prune untouched partitions
+        db.execute(
+            delete(Message).where(
+                Message.session_id == session_id,
+                Message.created_at.between(rows[0]["created_at"], rows[-1]["created_at"]),
+            )
+        )
+
+    db.commit()
+    return len(session_ids)
@@ -0,0 +1,263 @@
+"""
+Prompt template registry.
+
+Templates are plain-text files in `app/prompts` (or `PROMPT_TEMPLATE_DIR`)
+with `{name}` placeholders. They are read and compiled once, on first use,
+into literal and placeholder segments, so rendering is a single join.
+
+The static part of the tutor system prompt depends only on the child's
+grade, the subject, the learning style and the preferences. It is built once
+per combination and kept in an LRU cache of `PROMPT_PREFIX_CACHE_SIZE`
+entries. Per-session details (child name, topic) go after the prefix, which
+also keeps the prefix identical across sessions for provider-side prompt
+caching.
+
+Render counts and times per template and prefix cache hits are kept in
+memory; see `PromptRegistry.stats`.
+"""
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from string import Formatter
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+
+DEFAULT_TEMPLATE_DIR = Path(__file__).resolve().parent.parent / "prompts"
+
+# Grade numbers in Child.grade, and subject names turned into template names
+_GRADE_NUMBER = re.compile(r"\d+")
+_SUBJECT_SLUG = re.compile(r"[^a-z0-9]+")
+
+
+class CompiledTemplate:
+    """
+    Template parsed once into alternating literal text and placeholder names.
+    """
+    __slots__ = ("name", "segments", "fields")
+
+    def __init__(self, name: str, source: str):
+        """
+        Compile a template.
+
+        Args:
+            name: Template name, the file name without extension
+            source: Template text with `{name}` placeholders; `{{` and `}}` are literal braces
+
+        Raises:
+            ValueError: If a placeholder uses a format spec, conversion or attribute access
+        """
+        self.name = name
+        segments: List[Tuple[str, Optional[str]]] = []
+        for literal, field, spec, conversion in Formatter().parse(source):
+            if field is not None and (spec or conversion or not field.isidentifier()):
+                raise ValueError(f"Template '{name}': only plain {{name}} placeholders are supported")
+            segments.append((literal, field))
+        self.segments = tuple(segments)
+        self.fields = frozenset(field for _, field in segments if field is not None)
+
+    def render(self, values: Dict[str, Any]) -> str:
+        """
+        Substitute the placeholders.
+
+        Raises:
+            KeyError: If a placeholder has no value
+        """
+        parts = []
+        for literal, field in self.segments:
+            parts.append(literal)
+            if field is not None:
+                parts.append(str(values[field]))
+        return "".join(parts)
+
+
+class _RenderStats:
+    __slots__ = ("renders", "total_ns", "max_ns")
+
+    def __init__(self):
+        self.renders = 0
+        self.total_ns = 0
+        self.max_ns = 0
+
+
+def grade_band(grade: str) -> Optional[str]:
+    """
+    Map a free-form grade ("K", "3rd grade", "Grade 10", ...) to a guidance band.
+
+    Returns:
+        'early', 'elementary', 'middle' or 'high', or None if the grade is not recognized
+    """
+    text = grade.strip().lower()
+    if text.startswith(("k", "pre")):
+        return "early"
+    match = _GRADE_NUMBER.search(text)
+    if match is None:
+        return None
+    number = int(match.group())
+    if number <= 2:
+        return "early"
+    if number <= 5:
+        return "elementary"
+    if number <= 8:
+        return "middle"
+    return "high"
+
+
+class PromptRegistry:
+    """
+    Loads, compiles and renders prompt templates, caching tutor prompt prefixes.
+    """
+
+    def __init__(self, directory: Optional[Path] = None, *, prefix_cache_size: Optional[int] = None):
+        """
+        Initialize the registry. Templates are loaded on first use.
+
+        Args:
+            directory: Template directory, defaults to `PROMPT_TEMPLATE_DIR` or `app/prompts`
+            prefix_cache_size: Cached tutor prompt prefixes, defaults to `PROMPT_PREFIX_CACHE_SIZE`
+        """
+        self.directory = Path(directory or settings.PROMPT_TEMPLATE_DIR or DEFAULT_TEMPLATE_DIR)
+        self.prefix_cache_size = prefix_cache_size or settings.PROMPT_PREFIX_CACHE_SIZE
+        self._templates: Optional[Dict[str, CompiledTemplate]] = None
+        self._prefixes: "OrderedDict[Tuple[str, str, str, str], str]" = OrderedDict()
+        self._stats: Dict[str, _RenderStats] = {}
+        self._prefix_hits = 0
+        self._prefix_misses = 0
+        self._lock = threading.Lock()
+
+    @property
+    def templates(self) -> Dict[str, CompiledTemplate]:
+        """All compiled templates by name, loading them on first access."""
+        if self._templates is None:
+            with self._lock:
+                if self._templates is None:
+                    self._templates = {
+                        path.stem: CompiledTemplate(path.stem, path.read_text(encoding="utf-8").rstrip("\n"))
+                        for path in sorted(self.directory.glob("*.txt"))
+                    }
+        return self._templates
+
+    def render(self, name: str, /, **values: Any) -> str:
+        """
+        Render a template and record its render time.
+
+        Args:
+            name: Template name (positional, so templates may use a `{name}` placeholder)
+            **values: Placeholder values
+
+        Returns:
+            Rendered text
+
+        Raises:
+            KeyError: If the template or one of its placeholder values is missing
+        """
+        template = self.templates[name]
+        start = time.perf_counter_ns()
+        text = template.render(values)
+        elapsed = time.perf_counter_ns() - start
+        with self._lock:
+            stats = self._stats.get(name)
+            if stats is None:
+                stats = self._stats[name] = _RenderStats()
+            stats.renders += 1
+            stats.total_ns += elapsed
+            stats.max_ns = max(stats.max_ns, elapsed)
+        return text
+
+    def tutor_prefix(
+        self,
+        grade: str,
+        subject: str,
+        learning_style: Optional[str] = None,
+        preferences: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        """
+        Return the static part of the tutor system prompt, from the LRU cache when possible.
+
+        Args:
+            grade: Child grade
+            subject: Session subject
+            learning_style: Child learning style
+            preferences: Child preferences
+
+        Returns:
+            Prompt prefix text
+        """
+        key = (grade, subject, learning_style or "", json.dumps(preferences or {}, sort_keys=True, default=str))
+        with self._lock:
+            prefix = self._prefixes.get(key)
+            if prefix is not None:
+                self._prefixes.move_to_end(key)
+                self._prefix_hits += 1
+                return prefix
+            self._prefix_misses += 1
+        prefix = self.build_tutor_prefix(grade, subject, learning_style, preferences)
+        with self._lock:
+            self._prefixes[key] = prefix
+            self._prefixes.move_to_end(key)
+            while len(self._prefixes) > self.prefix_cache_size:
+                self._prefixes.popitem(last=False)
+        return prefix
+
+    def build_tutor_prefix(
+        self,
+        grade: str,
+        subject: str,
+        learning_style: Optional[str] = None,
+        preferences: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        """Render the tutor prompt prefix without the cache; see `tutor_prefix`."""
+        templates = self.templates
+        lines = [self.render("tutor_persona", grade=grade)]
+        band = grade_band(grade)
+        if band is not None and f"grade_{band}" in templates:
+            lines.append(self.render(f"grade_{band}"))
+        subject_template = "subject_" + _SUBJECT_SLUG.sub("_", subject.strip().lower()).strip("_")
+        if subject_template not in templates:
+            subject_template = "subject_default"
+        lines.append(self.render(subject_template, subject=subject))
+        if learning_style:
+            lines.append(self.render("learning_style", learning_style=learning_style))
+        for key, value in sorted((preferences or {}).items()):
+            lines.append(self.render("preference", key=key.replace("_", " "), value=value))
+        return "\n".join(lines)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return render metrics per template and prefix cache counters.
+
+        Returns:
+            Dictionary with "templates" ({name: {renders, mean_us, max_us}})
+            and "prefix_cache" ({size, hits, misses})
+        """
+        with self._lock:
+            return {
+                "templates": {
+                    name: {
+                        "renders": stats.renders,
+                        "mean_us": round(stats.total_ns / stats.renders / 1000, 3),
+                        "max_us": round(stats.max_ns / 1000, 3),
+                    }
+                    for name, stats in sorted(self._stats.items())
+                },
+                "prefix_cache": {
+                    "size": len(self._prefixes),
+                    "hits": self._prefix_hits,
+                    "misses": self._prefix_misses,
+                },
+            }
+
+    def clear(self) -> None:
+        """Reload templates on next use and drop cached prefixes and metrics."""
+        with self._lock:
+            self._templates = None
+            self._prefixes.clear()
+            self._stats.clear()
+            self._prefix_hits = self._prefix_misses = 0
+
+
+# Process-wide registry
+prompt_registry = PromptRegistry()
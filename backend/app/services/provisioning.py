@@ -0,0 +1,341 @@
+"""
+Bulk provisioning of parent accounts and child profiles for school onboarding.
+
+Uploads are NDJSON (one JSON object per line) or CSV with a header row. Rows
+are validated and processed in chunks of `BULK_PROVISION_CHUNK_SIZE`: bcrypt
+hashing runs in a process pool, each chunk is written with one multi-row
+statement and one commit, and the results of its rows are yielded in upload
+order as soon as the chunk is done, followed by a summary with the throughput.
+"""
+import csv
+import io
+import json
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Type
+
+from pydantic import BaseModel, ValidationError
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app import crud
+from app.core.config import settings
+from app.core.security import get_password_hash
+from app.schemas.provisioning import BulkChildRow, BulkRowResult, BulkSummary, BulkUserRow
+
+logger = logging.getLogger(__name__)
+
+NDJSON_MEDIA_TYPES = ("application/x-ndjson", "application/jsonl", "application/json")
+CSV_MEDIA_TYPES = ("text/csv", "application/csv")
+
+# CSV cells holding lists use this separator, e.g. "Math;Science"
+CSV_LIST_SEPARATOR = ";"
+
+# (line number, parsed row or None, parse error or None)
+RawRow = Tuple[int, Optional[Dict[str, Any]], Optional[str]]
+
+_hash_pool: Optional[ProcessPoolExecutor] = None
+_hash_workers = 0
+_hash_pool_lock = threading.Lock()
+
+
+def get_hash_pool() -> ProcessPoolExecutor:
+    """Return the process pool used for password hashing, starting it on first use."""
+    global _hash_pool, _hash_workers
+    with _hash_pool_lock:
+        if _hash_pool is None:
+            _hash_workers = settings.BULK_PROVISION_HASH_WORKERS or os.cpu_count() or 1
+            # Spawn rather than fork: the server process runs background threads
+            # (e.g. the cache invalidation listener) whose locks must not be copied
+            _hash_pool = ProcessPoolExecutor(
+                max_workers=_hash_workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return _hash_pool
+
+
+def shutdown_hash_pool() -> None:
+    """Stop the password hashing processes, e.g. on application shutdown."""
+    global _hash_pool
+    with _hash_pool_lock:
+        if _hash_pool is not None:
+            _hash_pool.shutdown(cancel_futures=True)
+            _hash_pool = None
+
+
+def hash_passwords(passwords: List[str]) -> List[str]:
+    """
+    Hash passwords in parallel; bcrypt is CPU bound, so threads would not help.
+
+    Args:
+        passwords: Plain text passwords
+
+    Returns:
+        Hashes in the order of `passwords`
+    """
+    if len(passwords) <= 1:
+        return [get_password_hash(password) for password in passwords]
+    pool = get_hash_pool()
+    chunksize = max(1, len(passwords) // (_hash_workers * 4))
+    return list(pool.map(get_password_hash, passwords, chunksize=chunksize))
+
+
+def parse_upload(body: bytes, media_type: str) -> Iterator[RawRow]:
+    """
+    Parse an NDJSON or CSV upload into rows without validating them.
+
+    Args:
+        body: Raw request body, UTF-8 encoded
+        media_type: Content type without parameters
+
+    Returns:
+        Iterator of (line, row, error) tuples; blank lines are skipped
+
+    Raises:
+        ValueError: If the media type is not supported
+    """
+    text = body.decode("utf-8-sig")
+    if media_type in NDJSON_MEDIA_TYPES:
+        return _parse_ndjson(text)
+    if media_type in CSV_MEDIA_TYPES:
+        return _parse_csv(text)
+    raise ValueError(f"Unsupported content type {media_type!r}, use NDJSON or CSV")
+
+
+def _parse_ndjson(text: str) -> Iterator[RawRow]:
+    for line_no, line in enumerate(text.splitlines(), start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError as exc:
+            yield line_no, None, f"Invalid JSON: {exc.msg}"
+            continue
+        if not isinstance(row, dict):
+            yield line_no, None, "Each line must be a JSON object"
+            continue
+        yield line_no, row, None
+
+
+def _parse_csv(text: str) -> Iterator[RawRow]:
+    reader = csv.DictReader(io.StringIO(text))
+    for row in reader:
+        # Physical line of the row's end, so quoted newlines don't skew numbering
+        line_no = reader.line_num
+        if not any(row.values()):
+            continue
+        parsed: Dict[str, Any] = {key: value for key, value in row.items() if key and value != ""}
+        try:
+            if "subjects" in parsed:
+                parsed["subjects"] = [s.strip() for s in parsed["subjects"].split(CSV_LIST_SEPARATOR) if s.strip()]
+            if "preferences" in parsed:
+                parsed["preferences"] = json.loads(parsed["preferences"])
+        except json.JSONDecodeError as exc:
+            yield line_no, None, f"Invalid preferences JSON: {exc.msg}"
+            continue
+        yield line_no, parsed, None
+
+
+def _chunks(rows: Iterable[RawRow], size: int) -> Iterator[List[RawRow]]:
+    chunk: List[RawRow] = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class _Progress:
+    """Running counters for one upload."""
+
+    def __init__(self):
+        self.summary = BulkSummary()
+        self.started = time.perf_counter()
+
+    def record(self, result: BulkRowResult) -> Dict[str, Any]:
+        self.summary.rows += 1
+        if result.status == "created":
+            self.summary.created += 1
+        elif result.status == "updated":
+            self.summary.updated += 1
+        else:
+            self.summary.failed += 1
+        return result.dict(exclude_none=True)
+
+    def finish(self, kind: str) -> Dict[str, Any]:
+        elapsed = time.perf_counter() - self.started
+        self.summary.elapsed_seconds = round(elapsed, 3)
+        self.summary.rows_per_second = round(self.summary.rows / elapsed, 1) if elapsed > 0 else 0.0
+        logger.info(
+            "Bulk provisioned %s: %d rows (%d created, %d updated, %d failed) at %.1f rows/s",
+            kind, self.summary.rows, self.summary.created, self.summary.updated,
+            self.summary.failed, self.summary.rows_per_second,
+        )
+        return {"summary": self.summary.dict()}
+
+
+def _validate(
+    chunk: List[RawRow], schema: Type[BaseModel]
+) -> Tuple[List[Tuple[int, Any]], List[BulkRowResult]]:
+    valid, errors = [], []
+    for line, row, error in chunk:
+        if error is not None:
+            errors.append(BulkRowResult(line=line, status="error", detail=error))
+            continue
+        try:
+            valid.append((line, schema(**row)))
+        except ValidationError as exc:
+            errors.append(BulkRowResult(
+                line=line, status="error", email=row.get("email"), detail=exc.errors()
+            ))
+    return valid, errors
+
+
+def _in_upload_order(progress: _Progress, results: List[BulkRowResult]) -> Iterator[Dict[str, Any]]:
+    for result in sorted(results, key=lambda result: result.line):
+        yield progress.record(result)
+
+
+def _upsert_users(db: Session, batch: List[Tuple[int, BulkUserRow]]) -> List[BulkRowResult]:
+    accounts = crud.user.get_accounts_by_emails(db, emails=[user_row.email for _, user_row in batch])
+    results, pending = [], []
+    for line, user_row in batch:
+        if accounts.get(user_row.email, (None, False))[1]:
+            results.append(BulkRowResult(
+                line=line, status="error", email=user_row.email, detail="Superuser accounts cannot be provisioned"
+            ))
+        else:
+            pending.append((line, user_row))
+    if not pending:
+        return results
+
+    # Only new accounts need a password hash; existing ones keep theirs
+    new = [user_row for _, user_row in pending if user_row.email not in accounts]
+    hashes = hash_passwords([user_row.password for user_row in new])
+    values = [
+        {"email": user_row.email, "name": user_row.name, "hashed_password": hashed, "is_active": user_row.is_active}
+        for user_row, hashed in zip(new, hashes)
+    ] + [
+        {"id": accounts[user_row.email][0], "email": user_row.email, "name": user_row.name, "is_active": user_row.is_active}
+        for _, user_row in pending if user_row.email in accounts
+    ]
+    try:
+        upserted = crud.user.upsert_many(db, rows=values)
+    except SQLAlchemyError as exc:
+        db.rollback()
+        logger.exception("Bulk user chunk failed")
+        return results + [
+            BulkRowResult(line=line, status="error", email=user_row.email, detail=str(exc.__cause__ or exc))
+            for line, user_row in pending
+        ]
+
+    by_email = {email: (id, inserted) for id, email, inserted in upserted}
+    for line, user_row in pending:
+        if user_row.email not in by_email:
+            # Registered, or made a superuser, since the lookup
+            results.append(BulkRowResult(
+                line=line, status="error", email=user_row.email, detail="Account changed during the upload, retry"
+            ))
+            continue
+        id, inserted = by_email[user_row.email]
+        results.append(BulkRowResult(
+            line=line, status="created" if inserted else "updated", id=id, email=user_row.email
+        ))
+    return results
+
+
+def provision_users(
+    db: Session, rows: Iterable[RawRow], *, chunk_size: Optional[int] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    Create or update parent accounts, upserting on email.
+
+    Args:
+        db: Database session
+        rows: Parsed upload rows, see `parse_upload`
+        chunk_size: Rows per statement, defaults to `BULK_PROVISION_CHUNK_SIZE`
+
+    Returns:
+        Iterator of per-row result dictionaries, then a final {"summary": ...}
+    """
+    progress = _Progress()
+    seen_emails = set()
+    for chunk in _chunks(rows, chunk_size or settings.BULK_PROVISION_CHUNK_SIZE):
+        valid, results = _validate(chunk, BulkUserRow)
+
+        # A row may only be upserted once per statement, and later duplicates
+        # would silently overwrite earlier ones
+        batch: List[Tuple[int, BulkUserRow]] = []
+        for line, user_row in valid:
+            if user_row.email in seen_emails:
+                results.append(BulkRowResult(
+                    line=line, status="error", email=user_row.email, detail="Duplicate email in upload"
+                ))
+                continue
+            seen_emails.add(user_row.email)
+            batch.append((line, user_row))
+        if batch:
+            results.extend(_upsert_users(db, batch))
+        yield from _in_upload_order(progress, results)
+    yield progress.finish("users")
+
+
+def _create_children(db: Session, valid: List[Tuple[int, BulkChildRow]]) -> List[BulkRowResult]:
+    parent_ids = crud.user.get_ids_by_emails(
+        db, emails=list({child_row.parent_email for _, child_row in valid})
+    )
+    results, batch = [], []
+    for line, child_row in valid:
+        parent_id = parent_ids.get(child_row.parent_email)
+        if parent_id is None:
+            results.append(BulkRowResult(
+                line=line, status="error", email=child_row.parent_email, detail="Unknown parent_email"
+            ))
+            continue
+        values = child_row.dict(exclude={"parent_email"})
+        values["preferences"] = values["preferences"] or {}
+        batch.append((line, child_row, {**values, "parent_id": parent_id}))
+    if not batch:
+        return results
+
+    try:
+        ids = crud.child.create_many(db, rows=[values for _, _, values in batch])
+    except SQLAlchemyError as exc:
+        db.rollback()
+        logger.exception("Bulk child chunk failed")
+        return results + [
+            BulkRowResult(line=line, status="error", email=child_row.parent_email, detail=str(exc.__cause__ or exc))
+            for line, child_row, _ in batch
+        ]
+
+    for (line, child_row, _), id in zip(batch, ids):
+        results.append(BulkRowResult(line=line, status="created", id=id, email=child_row.parent_email))
+    return results
+
+
+def provision_children(
+    db: Session, rows: Iterable[RawRow], *, chunk_size: Optional[int] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    Create child profiles for existing parent accounts, identified by `parent_email`.
+
+    Args:
+        db: Database session
+        rows: Parsed upload rows, see `parse_upload`
+        chunk_size: Rows per statement, defaults to `BULK_PROVISION_CHUNK_SIZE`
+
+    Returns:
+        Iterator of per-row result dictionaries, then a final {"summary": ...}
+    """
+    progress = _Progress()
+    for chunk in _chunks(rows, chunk_size or settings.BULK_PROVISION_CHUNK_SIZE):
+        valid, results = _validate(chunk, BulkChildRow)
+        if valid:
+            results.extend(_create_children(db, valid))
+        yield from _in_upload_order(progress, results)
+    yield progress.finish("children")
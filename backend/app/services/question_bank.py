@@ -0,0 +1,338 @@
+"""
+Shared question bank for quiz generation.
+
+Many children in the same grade study the same topics, so quizzes are filled
+from a bank of questions indexed by (subject, topic, grade, difficulty) and
+the LLM is only asked for the shortfall. Generated questions are added to
+the bank, unless they are near-duplicates of a question already there:
+same answer and a MinHash estimate of text similarity of at least
+`QUESTION_BANK_DUPLICATE_THRESHOLD`, with candidates found through LSH band
+buckets (`app.core.minhash`) instead of comparing against the whole slot.
+
+Each child has a Bloom filter of the bank questions they were served, so
+quizzes do not repeat questions. A false positive only skips a question the
+child has not seen. Once `QUESTION_BANK_SEEN_CAPACITY` questions were added,
+the filter restarts empty and old questions may come back.
+"""
+import hashlib
+import json
+import logging
+from typing import Any, Dict, List, Optional, Sequence, Union
+from uuid import UUID
+
+from pydantic import ValidationError
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app import crud
+from app.core.bloom import BloomFilter
+from app.core.config import settings
+from app.core.minhash import lsh_buckets, signature, similarity
+from app.models.child import Child
+from app.models.question_bank import BankQuestion
+from app.schemas.question_bank import BankQuestionIn
+from app.services.prompts import prompt_registry
+from app.services.skill import next_quiz_difficulty
+
+logger = logging.getLogger(__name__)
+
+_QUESTION_FIELDS = ("text", "type", "options", "correct_answer")
+
+
+def _new_seen_filter(data: Optional[bytes] = None) -> BloomFilter:
+    return BloomFilter(settings.QUESTION_BANK_SEEN_CAPACITY, settings.QUESTION_BANK_SEEN_ERROR_RATE, data)
+
+
+def _normalize_answer(answer: str) -> str:
+    return " ".join(answer.lower().split())
+
+
+def content_hash(text: str, correct_answer: str) -> str:
+    """
+    Hash of a question's case- and whitespace-normalized text and answer.
+
+    The bank has a unique index on it per subject and topic, so exact
+    duplicates are rejected even when two quizzes add them concurrently.
+    The migration adding the column computes the same value in SQL.
+
+    Returns:
+        MD5 hex digest
+    """
+    normalized = f"{_normalize_answer(text)}\n{_normalize_answer(correct_answer)}"
+    return hashlib.md5(normalized.encode(), usedforsecurity=False).hexdigest()
+
+
+def add_questions(
+    db: Session,
+    *,
+    subject: str,
+    topic: str,
+    grade: str,
+    difficulty: str,
+    questions: Sequence[BankQuestionIn],
+    source: str = "llm",
+) -> List[Optional[UUID]]:
+    """
+    Add questions to a bank slot, skipping near-duplicates of questions already
+    in the bank (in any grade or difficulty of the topic) or earlier in `questions`.
+    Exact duplicates added concurrently by another caller are skipped by the
+    bank's unique content hash.
+
+    A skipped question is matched to the bank question it duplicates, so the
+    caller can still serve it; e.g. coalesced quizzes get the same generated
+    questions, and only the first one adds them.
+
+    Args:
+        db: Database session
+        subject: Question subject
+        topic: Question topic
+        grade: Grade the questions are written for
+        difficulty: Difficulty level of the questions
+        questions: Questions to add
+        source: Where the questions come from, 'llm' or 'import'
+
+    Returns:
+        ID of each added question or of the bank question it duplicates; None
+        for duplicates of inactive questions
+    """
+    threshold = settings.QUESTION_BANK_DUPLICATE_THRESHOLD
+    accepted: List[Dict[str, Any]] = []
+    # Per question: the index of its row in `accepted`, or the matched bank question
+    slots: List[Union[int, BankQuestion]] = []
+    for question in questions:
+        sig = signature(question.text)
+        buckets = lsh_buckets(sig)
+        answer = _normalize_answer(question.correct_answer)
+        candidates = crud.question_bank.get_by_buckets(db, subject=subject, topic=topic, buckets=buckets)
+        match = next((
+            candidate for candidate in candidates
+            if _normalize_answer(candidate.correct_answer) == answer and similarity(sig, candidate.minhash) >= threshold
+        ), None)
+        if match is None:
+            match = next((
+                slot for slot, row in enumerate(accepted)
+                if _normalize_answer(row["correct_answer"]) == answer and similarity(sig, row["minhash"]) >= threshold
+            ), None)
+        if match is not None:
+            slots.append(match)
+            continue
+        slots.append(len(accepted))
+        accepted.append({
+            **question.dict(include=set(_QUESTION_FIELDS)),
+            "subject": subject,
+            "topic": topic,
+            "grade": grade,
+            "difficulty": difficulty,
+            "content_hash": content_hash(question.text, question.correct_answer),
+            "minhash": sig,
+            "lsh_buckets": buckets,
+            "quality": 0.5,
+            "times_served": 0,
+            "is_active": True,
+            "source": source,
+        })
+    ids = crud.question_bank.create_many(db, rows=accepted)
+    return [
+        ids[slot] if isinstance(slot, int) else slot.id if slot.is_active else None
+        for slot in slots
+    ]
+
+
+def load_seen_filter(db: Session, *, child_id: UUID) -> BloomFilter:
+    """
+    Get the filter of the bank questions served to a child, without locking it.
+
+    Args:
+        db: Database session
+        child_id: ID of the child
+
+    Returns:
+        Bloom filter of served question IDs as strings, empty for a new child
+    """
+    stored = crud.question_bank.get_seen_filter(db, child_id=child_id)
+    return _new_seen_filter(stored.bloom if stored is not None else None)
+
+
+def select_unseen(
+    db: Session, *, child_id: UUID, subject: str, topic: str, grade: str, difficulty: str, count: int
+) -> List[BankQuestion]:
+    """
+    Pick up to `count` bank questions of a slot that the child has not been served.
+
+    Scans the slot in serving order, at most `QUESTION_BANK_MAX_SCAN` rows.
+
+    Args:
+        db: Database session
+        child_id: ID of the child
+        subject: Quiz subject
+        topic: Quiz topic
+        grade: Child grade
+        difficulty: Quiz difficulty level
+        count: Questions wanted
+
+    Returns:
+        List of BankQuestion objects, possibly fewer than `count`
+    """
+    seen = load_seen_filter(db, child_id=child_id)
+    selected: List[BankQuestion] = []
+    page = max(count * 4, 20)
+    for skip in range(0, settings.QUESTION_BANK_MAX_SCAN, page):
+        rows = crud.question_bank.get_multi_by_slot(
+            db, subject=subject, topic=topic, grade=grade, difficulty=difficulty,
+            skip=skip, limit=min(page, settings.QUESTION_BANK_MAX_SCAN - skip),
+        )
+        selected.extend(row for row in rows if str(row.id) not in seen)
+        if len(selected) >= count or len(rows) < page:
+            break
+    return selected[:count]
+
+
+def mark_served(db: Session, *, child_id: UUID, question_ids: Sequence[UUID]) -> None:
+    """
+    Record that bank questions were served to a child, and commit.
+
+    Args:
+        db: Database session
+        child_id: ID of the child
+        question_ids: IDs of the served bank questions
+    """
+    if not question_ids:
+        return
+    # The row stays locked until commit, so concurrent quizzes do not lose each other's updates
+    stored = crud.question_bank.get_seen_filter_for_update(
+        db, child_id=child_id, empty=_new_seen_filter().to_bytes()
+    )
+    seen, items = _new_seen_filter(stored.bloom), stored.items
+    if items + len(question_ids) > settings.QUESTION_BANK_SEEN_CAPACITY:
+        seen, items = _new_seen_filter(), 0
+    for question_id in question_ids:
+        seen.add(str(question_id))
+    stored.bloom = seen.to_bytes()
+    stored.items = items + len(question_ids)
+    crud.question_bank.increment_served(db, ids=list(question_ids))
+    db.commit()
+
+
+def parse_generated_questions(content: str) -> List[BankQuestionIn]:
+    """
+    Parse the LLM's JSON reply into questions, dropping malformed entries.
+
+    Args:
+        content: Reply expected to contain a JSON array of question objects
+
+    Returns:
+        Valid questions
+    """
+    start, end = content.find("["), content.rfind("]")
+    if start == -1 or end < start:
+        return []
+    try:
+        items = json.loads(content[start:end + 1])
+    except ValueError:
+        return []
+    questions = []
+    for item in items if isinstance(items, list) else []:
+        try:
+            questions.append(BankQuestionIn.parse_obj(item))
+        except (ValidationError, TypeError):
+            continue
+    return questions
+
+
+async def generate_questions(
+    llm: Any,
+    *,
+    subject: str,
+    topic: str,
+    grade: str,
+    difficulty: str,
+    count: int,
+    parent_id: Optional[UUID] = None,
+) -> List[BankQuestionIn]:
+    """
+    Ask the LLM for new quiz questions.
+
+    Args:
+        llm: LLM client
+        subject: Quiz subject
+        topic: Quiz topic
+        grade: Grade to write for
+        difficulty: Difficulty level
+        count: Questions wanted
+        parent_id: Parent billed for the call
+
+    Returns:
+        Valid generated questions, possibly fewer than `count`
+    """
+    prompt = prompt_registry.render(
+        "quiz_questions", count=count, difficulty=difficulty, subject=subject, topic=topic, grade=grade
+    )
+    response = await llm.chat([{"role": "user", "content": prompt}], parent_id=parent_id)
+    return parse_generated_questions(response["choices"][0]["message"]["content"])[:count]
+
+
+async def get_quiz_questions(
+    db: Session,
+    llm: Any,
+    *,
+    child: Child,
+    subject: str,
+    topic: str,
+    count: int,
+    difficulty: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Pick the questions of a new quiz: unseen bank questions first, then newly
+    generated ones for the shortfall, which are added to the bank.
+
+    Args:
+        db: Database session
+        llm: LLM client, only called when the bank runs short
+        child: Child the quiz is for
+        subject: Quiz subject
+        topic: Quiz topic
+        count: Questions wanted
+        difficulty: Quiz difficulty level, defaults to the child's adaptive
+            difficulty on the topic; callers storing the quiz pass the level
+            they store it with
+
+    Returns:
+        Column values for `Question` rows (without quiz_id), including
+        bank_question_id; fewer than `count` if generated questions turned out
+        to be duplicates of questions the child was served or already in the quiz
+
+    Raises:
+        BudgetExceeded: If generation was needed and the parent's budget is used up
+    """
+    if difficulty is None:
+        difficulty = await run_in_threadpool(
+            next_quiz_difficulty, db, child_id=child.id, subject=subject, topic=topic
+        )
+    slot = {"subject": subject, "topic": topic, "grade": child.grade, "difficulty": difficulty}
+    selected = await run_in_threadpool(select_unseen, db, child_id=child.id, count=count, **slot)
+    rows = [
+        {**{field: getattr(question, field) for field in _QUESTION_FIELDS}, "bank_question_id": question.id}
+        for question in selected
+    ]
+
+    shortfall = count - len(rows)
+    if shortfall > 0:
+        generated = await generate_questions(llm, count=shortfall, parent_id=child.parent_id, **slot)
+        ids = await run_in_threadpool(add_questions, db, questions=generated, **slot)
+        seen = await run_in_threadpool(load_seen_filter, db, child_id=child.id)
+        taken = {row["bank_question_id"] for row in rows}
+        for question, question_id in zip(generated, ids):
+            # Duplicates are served as the bank question they matched, unless the child already had it
+            if question_id is None or question_id in taken or str(question_id) in seen:
+                continue
+            taken.add(question_id)
+            rows.append({**question.dict(include=set(_QUESTION_FIELDS)), "bank_question_id": question_id})
+        logger.info(
+            "Quiz for child %s: %d questions from the bank, %d generated, %d duplicates dropped",
+            child.id, len(selected), len(generated), len(selected) + len(generated) - len(rows),
+        )
+
+    await run_in_threadpool(
+        mark_served, db, child_id=child.id, question_ids=[row["bank_question_id"] for row in rows]
+    )
+    return rows
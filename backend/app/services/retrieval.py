@@ -0,0 +1,127 @@
+"""
+Retrieval of reference material for tutoring prompts.
+
+Curriculum snippets and well-rated past answers are embedded into a
+memory-mapped vector index (`app.core.vector_index`) built by
+`scripts/build_retrieval_index.py`. For each question the tutor embeds the
+question, looks up the nearest snippets of the session's subject and adds
+the close matches to the prompt. Retrieval is disabled while
+`RETRIEVAL_INDEX_DIR` is unset or holds no index.
+"""
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.vector_index import META_FILE, VectorIndex
+from app.services.embedding import embedding_batcher
+from app.services.tutor import TutorContext
+from app.services.usage import BudgetExceeded
+
+logger = logging.getLogger(__name__)
+
+_index: Optional[VectorIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_index() -> Optional[VectorIndex]:
+    """
+    Return the process-wide retrieval index, opening it on first use.
+
+    Returns:
+        The index, or None if retrieval is not configured
+    """
+    global _index
+    if _index is None and settings.RETRIEVAL_INDEX_DIR:
+        with _index_lock:
+            directory = Path(settings.RETRIEVAL_INDEX_DIR)
+            if _index is None and (directory / META_FILE).exists():
+                _index = VectorIndex(directory)
+    return _index
+
+
+def search(
+    embedding: List[float], *, subject: Optional[str] = None, k: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """
+    Find the stored snippets closest to an embedding.
+
+    Args:
+        embedding: Query embedding
+        subject: Only return snippets of this subject (snippets without one always match)
+        k: Maximum results, defaults to `RETRIEVAL_TOP_K`
+
+    Returns:
+        Snippet payloads with their "score", best first, all at least `RETRIEVAL_MIN_SCORE`
+    """
+    index = get_index()
+    if index is None:
+        return []
+    k = k or settings.RETRIEVAL_TOP_K
+    results = []
+    # Over-fetch, since some hits are filtered out by subject
+    for score, doc in index.search_docs(embedding, k * 4, nprobe=settings.RETRIEVAL_NPROBE):
+        if score < settings.RETRIEVAL_MIN_SCORE:
+            break
+        if subject and doc.get("subject") and doc["subject"].lower() != subject.lower():
+            continue
+        results.append({**doc, "score": round(score, 4)})
+        if len(results) == k:
+            break
+    return results
+
+
+async def retrieve(
+    query: str, *, subject: Optional[str] = None, parent_id: Optional[UUID] = None
+) -> List[Dict[str, Any]]:
+    """
+    Embed a question, batched with concurrent questions, and return the closest reference snippets.
+
+    Args:
+        query: The child's question
+        subject: Session subject
+        parent_id: Parent billed for the embedding
+
+    Returns:
+        Snippet payloads, empty if retrieval is disabled
+
+    Raises:
+        BudgetExceeded: If the parent's monthly budget is used up
+    """
+    if get_index() is None:
+        return []
+    embedding = await embedding_batcher.embed(query, parent_id=parent_id)
+    return await run_in_threadpool(search, embedding, subject=subject)
+
+
+def format_reference(snippets: List[Dict[str, Any]]) -> Optional[str]:
+    """Render snippets as a system message, or None if there are none."""
+    if not snippets:
+        return None
+    lines = ["Reference material that may help with the next question (use it only if relevant):"]
+    lines.extend(f"- {snippet['text']}" for snippet in snippets)
+    return "\n".join(lines)
+
+
+async def reference_for(context: TutorContext, question: str) -> Optional[str]:
+    """
+    Retrieval step of the tutoring prompt: reference material for a question.
+
+    Failures other than an exhausted budget are logged and answered without
+    reference material rather than failing the turn.
+
+    Raises:
+        BudgetExceeded: If the parent's monthly budget is used up
+    """
+    try:
+        snippets = await retrieve(question, subject=context.subject, parent_id=context.parent_id)
+    except BudgetExceeded:
+        raise
+    except Exception:
+        logger.exception("Retrieval failed for session %s", context.session_id)
+        return None
+    return format_reference(snippets)
@@ -0,0 +1,235 @@
+"""
+Content safety filter for tutor replies.
+
+Replies are checked against a term list (`app/safety/blocklist.txt`, or
+`SAFETY_TERMS_FILE`) compiled once into an Aho-Corasick automaton
+(`app.core.aho_corasick`), so checking costs the same however many terms
+there are. Terms match case-insensitively as whole words. Each term's
+section decides the action: "mask" replaces the term with asterisks, "block"
+replaces the whole reply with `SAFETY_FALLBACK_REPLY`.
+
+Streamed replies go through a `StreamFilter`, which scans each token as it
+arrives and holds back only the last few characters (the longest term's
+length), since a term may still be completed by the next token. Held text is
+released as soon as no term can start in it, so streaming is delayed by a
+few characters, not by the whole reply.
+
+This is a last line of defence for text the tutor prompt failed to prevent,
+not a moderation model: it knows nothing of context or deliberate misspelling.
+"""
+import logging
+import threading
+from pathlib import Path
+from typing import List, NamedTuple, Optional, Tuple
+
+from app.core.aho_corasick import Automaton
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TERMS_FILE = Path(__file__).resolve().parent.parent / "safety" / "blocklist.txt"
+SAFETY_ACTIONS = ("mask", "block")
+
+# Typographic apostrophes are matched like plain ones
+_FOLD = str.maketrans({"’": "'", "‘": "'"})
+
+
+class Term(NamedTuple):
+    text: str
+    category: str
+    action: str
+
+
+class SafetyMatch(NamedTuple):
+    start: int
+    end: int
+    term: Term
+
+
+def _fold(text: str) -> str:
+    """Lowercase text for matching, keeping one character per input character."""
+    folded = text.translate(_FOLD).lower()
+    if len(folded) != len(text):
+        # A few characters lowercase to several, which would shift offsets
+        folded = "".join(char.lower()[0] for char in text.translate(_FOLD))
+    return folded
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char == "_"
+
+
+def load_terms(path: Path) -> List[Term]:
+    """
+    Parse a term list file.
+
+    Returns:
+        Terms in file order
+
+    Raises:
+        ValueError: If a section header is malformed or a term precedes the first section
+    """
+    terms: List[Term] = []
+    section: Optional[Tuple[str, str]] = None
+    for number, line in enumerate(path.read_text(encoding="utf-8").splitlines(), 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        if line.startswith("["):
+            parts = line.strip("[]").split()
+            if len(parts) != 2 or parts[1] not in SAFETY_ACTIONS:
+                raise ValueError(f"{path}:{number}: expected [category mask|block]")
+            section = (parts[0], parts[1])
+        elif section is None:
+            raise ValueError(f"{path}:{number}: term outside a [category action] section")
+        else:
+            terms.append(Term(" ".join(_fold(line).split()), *section))
+    return terms
+
+
+class StreamFilter:
+    """
+    Incremental filter for one reply. Feed chunks in order, then call `finish`.
+    """
+
+    def __init__(self, automaton: Automaton):
+        self._automaton = automaton
+        self._hold = automaton.max_length
+        self._state = 0
+        self._scanned = 0
+        # Characters not released yet, starting at stream offset `_released`
+        self._pending = ""
+        self._released = 0
+        self._last_released = ""
+        # Matches at the very end of the scanned text, waiting for the next character
+        self._open: List[Tuple[int, int, Term]] = []
+        self.matches: List[SafetyMatch] = []
+        self.blocked: Optional[SafetyMatch] = None
+
+    def feed(self, chunk: str) -> str:
+        """
+        Scan a chunk of the reply.
+
+        Returns:
+            Text that is safe to send now, possibly empty; always empty once blocked
+        """
+        if self.blocked is not None or not chunk:
+            return ""
+        offset = self._scanned
+        self._pending += chunk
+        self._state, found = self._automaton.scan(_fold(chunk), self._state, offset)
+        self._scanned += len(chunk)
+        if self._open or found:
+            candidates, self._open = self._open + found, []
+            for end, length, term in candidates:
+                if end == self._scanned:
+                    self._open.append((end, length, term))
+                elif not _is_word_char(self._char(end)):
+                    self._confirm(end - length, end, term)
+        return self._release(self._scanned - self._hold)
+
+    def finish(self) -> str:
+        """
+        End the reply: confirm matches at its very end and release all held text.
+
+        Returns:
+            The remaining safe text; empty if the reply was blocked
+        """
+        for end, length, term in self._open:
+            self._confirm(end - length, end, term)
+        self._open = []
+        if self.blocked is not None:
+            return ""
+        return self._release(self._scanned)
+
+    def _char(self, offset: int) -> str:
+        if offset < self._released:
+            return self._last_released
+        return self._pending[offset - self._released]
+
+    def _confirm(self, start: int, end: int, term: Term) -> None:
+        if self.blocked is not None or (start > 0 and _is_word_char(self._char(start - 1))):
+            return
+        match = SafetyMatch(start, end, term)
+        self.matches.append(match)
+        if term.action == "block":
+            self.blocked = match
+            self._pending = ""
+            return
+        start, end = start - self._released, end - self._released
+        self._pending = self._pending[:start] + "*" * (end - start) + self._pending[end:]
+
+    def _release(self, until: int) -> str:
+        if self.blocked is not None:
+            return ""
+        count = until - self._released
+        if count <= 0:
+            return ""
+        text, self._pending = self._pending[:count], self._pending[count:]
+        self._last_released = text[-1]
+        self._released += count
+        return text
+
+
+def log_matches(session_id: object, stream: StreamFilter) -> None:
+    """Log the categories a reply was masked or blocked for, without the text itself."""
+    if stream.matches:
+        logger.warning(
+            "Safety filter %s a reply in session %s (%s)",
+            "blocked" if stream.blocked is not None else "masked",
+            session_id,
+            ", ".join(sorted({match.term.category for match in stream.matches})),
+        )
+
+
+class ContentFilter:
+    """
+    Compiled term list shared by all replies of the worker.
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        """
+        Initialize the filter. Terms are compiled by `load` or on first use.
+
+        Args:
+            path: Term list file, defaults to `SAFETY_TERMS_FILE` or `app/safety/blocklist.txt`
+        """
+        self.path = Path(path or settings.SAFETY_TERMS_FILE or DEFAULT_TERMS_FILE)
+        self._automaton: Optional[Automaton] = None
+        self._lock = threading.Lock()
+
+    @property
+    def automaton(self) -> Automaton:
+        """The compiled automaton, built on first access."""
+        if self._automaton is None:
+            with self._lock:
+                if self._automaton is None:
+                    terms = load_terms(self.path)
+                    self._automaton = Automaton((term.text, term) for term in terms)
+                    logger.info("Compiled %d safety terms from %s", len(terms), self.path)
+        return self._automaton
+
+    def load(self) -> None:
+        """Compile the term list now, e.g. at startup, instead of on the first reply."""
+        self.automaton
+
+    def stream(self) -> StreamFilter:
+        """Start filtering a streamed reply."""
+        return StreamFilter(self.automaton)
+
+    def filter_text(self, text: str) -> Tuple[str, StreamFilter]:
+        """
+        Filter a complete reply.
+
+        Returns:
+            The filtered text (the fallback reply if blocked) and the filter with its matches
+        """
+        stream = self.stream()
+        filtered = stream.feed(text) + stream.finish()
+        if stream.blocked is not None:
+            filtered = settings.SAFETY_FALLBACK_REPLY
+        return filtered, stream
+
+
+# Process-wide filter, compiled at startup by AI workers
+content_filter = ContentFilter()
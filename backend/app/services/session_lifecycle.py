@@ -0,0 +1,152 @@
+"""
+Learning session lifecycle: idle session completion and post-session work.
+
+Nothing in a conversation marks its end, so `complete_idle_sessions` completes
+active sessions without a message for `SESSION_IDLE_MINUTES`, a batch at a
+time in one set-based UPDATE. The same transaction queues a `SessionFollowUp`
+row per completed session, so follow-up work is never lost or duplicated.
+
+`process_follow_ups` claims due follow-ups with SKIP LOCKED and, for each
+session, records its message count, adds it to the child's `SubjectProgress`
+and, with `SESSION_SUMMARY_ENABLED`, stores a short LLM summary for the parent.
+Follow-ups are claimed and committed one at a time, so a slow LLM call only
+keeps its own follow-up locked. Each follow-up commits or fails as a unit;
+failures are retried with a doubling delay, up to
+`SESSION_FOLLOW_UP_MAX_ATTEMPTS` attempts.
+
+Both are run periodically by `scripts/maintain_sessions.py`.
+"""
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app import crud
+from app.core.config import settings
+from app.models.session import Message, MessageArchive, SessionFollowUp
+from app.services.prompts import prompt_registry
+from app.services.usage import BudgetExceeded
+
+logger = logging.getLogger(__name__)
+
+
+def complete_idle_sessions(
+    db: Session,
+    *,
+    idle_minutes: Optional[int] = None,
+    batch_size: Optional[int] = None,
+) -> int:
+    """
+    Complete active sessions that have been idle for `idle_minutes`, in batches.
+
+    Args:
+        db: Database session
+        idle_minutes: Minutes without a message, defaults to `SESSION_IDLE_MINUTES`
+        batch_size: Sessions completed per transaction, defaults to `SESSION_REAP_BATCH_SIZE`
+
+    Returns:
+        Number of sessions completed
+    """
+    if idle_minutes is None:
+        idle_minutes = settings.SESSION_IDLE_MINUTES
+    if batch_size is None:
+        batch_size = settings.SESSION_REAP_BATCH_SIZE
+    idle_since = datetime.utcnow() - timedelta(minutes=idle_minutes)
+
+    total = 0
+    while True:
+        completed = crud.session.complete_idle(db, idle_since=idle_since, batch_size=batch_size)
+        total += len(completed)
+        if len(completed) < batch_size:
+            return total
+
+
+def retry_delay(attempts: int) -> timedelta:
+    """Delay before retrying a follow-up that has failed `attempts` times."""
+    return timedelta(seconds=settings.SESSION_FOLLOW_UP_RETRY_SECONDS * 2 ** (attempts - 1))
+
+
+def _count_messages(db: Session, session_id: Any) -> int:
+    hot = db.execute(select(func.count()).where(Message.session_id == session_id)).scalar_one()
+    archived = db.execute(
+        select(MessageArchive.message_count).where(MessageArchive.session_id == session_id)
+    ).scalar_one_or_none()
+    return hot + (archived or 0)
+
+
+async def _summarize(db: Session, session: Any, llm: Any) -> Optional[str]:
+    """Ask the LLM for a parent-facing summary; None if the parent's budget is used up."""
+    messages = crud.message.get_multi_by_session(
+        db, session_id=session.id, limit=settings.SESSION_SUMMARY_MAX_MESSAGES
+    )
+    if not messages:
+        return None
+    child = session.child
+    prompt = prompt_registry.render(
+        "session_summary",
+        name=child.name,
+        subject=session.subject,
+        topic=session.topic,
+        transcript="\n".join(f"{message.role}: {message.content}" for message in messages),
+    )
+    try:
+        response = await llm.chat([{"role": "user", "content": prompt}], parent_id=child.parent_id)
+    except BudgetExceeded:
+        logger.info("Skipping summary of session %s: parent's AI budget is used up", session.id)
+        return None
+    return response["choices"][0]["message"]["content"].strip()
+
+
+async def _run_follow_up(db: Session, follow_up: SessionFollowUp, llm: Any) -> None:
+    session = follow_up.session
+    session.message_count = _count_messages(db, session.id)
+    crud.progress.add_session(
+        db,
+        child_id=session.child_id,
+        subject=session.subject,
+        messages=session.message_count,
+        minutes=(session.ended_at - session.created_at).total_seconds() / 60,
+        ended_at=session.ended_at,
+    )
+    if llm is not None:
+        session.summary = await _summarize(db, session, llm)
+    db.delete(follow_up)
+
+
+async def process_follow_ups(db: Session, *, batch_size: Optional[int] = None, llm: Any = None) -> int:
+    """
+    Run one batch of due post-session follow-ups, committing after each.
+
+    Args:
+        db: Database session
+        batch_size: Follow-ups run, defaults to `SESSION_FOLLOW_UP_BATCH_SIZE`
+        llm: LLM client for summaries; no summaries are written without one
+
+    Returns:
+        Number of follow-ups claimed, whether they succeeded or not
+    """
+    if batch_size is None:
+        batch_size = settings.SESSION_FOLLOW_UP_BATCH_SIZE
+    claimed = 0
+    while claimed < batch_size:
+        # One at a time: the lock is held while the summary is written
+        follow_up = next(iter(crud.session.claim_follow_ups(db, limit=1)), None)
+        if follow_up is None:
+            break
+        claimed += 1
+        try:
+            with db.begin_nested():
+                await _run_follow_up(db, follow_up, llm)
+        except Exception as exc:
+            follow_up.attempts += 1
+            follow_up.last_error = f"{type(exc).__name__}: {exc}"[:1000]
+            if follow_up.attempts >= settings.SESSION_FOLLOW_UP_MAX_ATTEMPTS:
+                logger.error("Giving up on follow-up of session %s: %s", follow_up.session_id, exc)
+                db.delete(follow_up)
+            else:
+                logger.warning("Follow-up of session %s failed, retrying: %s", follow_up.session_id, exc)
+                follow_up.available_at = datetime.utcnow() + retry_delay(follow_up.attempts)
+        db.commit()
+    return claimed
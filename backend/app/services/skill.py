@@ -0,0 +1,265 @@
+"""
+Adaptive difficulty: per-child, per-topic skill estimates.
+
+Each child has one rating per (subject, topic) on the logit scale of a
+one-parameter IRT model: a child with rating `r` answers a question of
+difficulty `b` correctly with probability `1 / (1 + exp(b - r))`. Quiz
+difficulty levels map to fixed `b` values (`DIFFICULTY_LEVELS`).
+
+Ratings are updated Elo-style from each graded answer in O(1):
+`r += k * (correct - expected)`, where the step size `k` shrinks with the
+number of answers seen, so early answers move a new estimate quickly and
+established estimates settle. Only `(rating, answers)` is stored per topic.
+
+When the parameters change, `recompute` replays the whole answer history with
+NumPy, updating every (child, topic) at once per answer position, and
+`recompute_all` writes the results back.
+"""
+import logging
+import math
+from datetime import datetime
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy.orm import Session
+
+from app import crud
+from app.core.config import settings
+from app.core.lazy import lazy_import
+from app.models.quiz import QuizAttempt
+
+np = lazy_import("numpy", install_hint="numpy")
+
+logger = logging.getLogger(__name__)
+
+# Question difficulty `b` of each quiz difficulty level
+DIFFICULTY_LEVELS: Dict[str, float] = {"easy": -1.0, "medium": 0.0, "hard": 1.0}
+# Quiz.difficulty is a free string; anything unrecognized counts as medium
+DEFAULT_DIFFICULTY = "medium"
+
+
+class SkillParams(NamedTuple):
+    """Parameters of the rating update."""
+    k_initial: float
+    k_min: float
+    k_decay: float
+    initial_rating: float = 0.0
+
+    @classmethod
+    def from_settings(cls) -> "SkillParams":
+        """Build the parameters configured by the `SKILL_*` settings."""
+        return cls(settings.SKILL_K_INITIAL, settings.SKILL_K_MIN, settings.SKILL_K_DECAY)
+
+
+def difficulty_value(difficulty: Optional[str]) -> float:
+    """Return the difficulty `b` of a quiz difficulty level."""
+    key = (difficulty or "").strip().lower()
+    return DIFFICULTY_LEVELS.get(key, DIFFICULTY_LEVELS[DEFAULT_DIFFICULTY])
+
+
+def expected_score(rating: float, difficulty: float) -> float:
+    """Probability that a child with `rating` answers a question of `difficulty` correctly."""
+    return 1.0 / (1.0 + math.exp(difficulty - rating))
+
+
+def step_size(answers: int, params: SkillParams) -> float:
+    """Rating step size after `answers` graded answers."""
+    return max(params.k_min, params.k_initial / (1.0 + params.k_decay * answers))
+
+
+def update(
+    rating: float, answers: int, difficulty: float, correct: bool, params: SkillParams
+) -> Tuple[float, int]:
+    """
+    Apply one graded answer to a skill estimate.
+
+    Args:
+        rating: Current rating
+        answers: Graded answers already applied
+        difficulty: Difficulty `b` of the answered question
+        correct: Whether the answer was correct
+        params: Update parameters
+
+    Returns:
+        Tuple of (new rating, new answer count)
+    """
+    k = step_size(answers, params)
+    return rating + k * (float(correct) - expected_score(rating, difficulty)), answers + 1
+
+
+def choose_difficulty(rating: Optional[float], target: Optional[float] = None) -> str:
+    """
+    Pick the difficulty level for a child's next quiz on a topic.
+
+    Args:
+        rating: Current rating, None for a topic without answers yet
+        target: Desired success rate, defaults to `SKILL_TARGET_SUCCESS`
+
+    Returns:
+        Difficulty level whose expected success rate is closest to the target
+    """
+    if rating is None:
+        rating = 0.0
+    target = settings.SKILL_TARGET_SUCCESS if target is None else target
+    return min(
+        DIFFICULTY_LEVELS,
+        key=lambda level: abs(expected_score(rating, DIFFICULTY_LEVELS[level]) - target),
+    )
+
+
+def recompute(
+    groups: "np.ndarray",
+    difficulties: "np.ndarray",
+    correct: "np.ndarray",
+    n_groups: int,
+    params: SkillParams,
+) -> Tuple["np.ndarray", "np.ndarray"]:
+    """
+    Replay a full answer history and return the resulting estimates.
+
+    Answers are processed by position within their group: step `i` applies the
+    `i`-th answer of every group in one vectorized update, so the Python loop
+    runs once per answer of the longest history instead of once per answer.
+    Produces the same ratings as applying `update` answer by answer.
+
+    Args:
+        groups: Group index (0 .. n_groups-1) of each answer, e.g. one per
+            (child, subject, topic); answers of a group must be in chronological order
+        difficulties: Difficulty `b` of each answered question
+        correct: Whether each answer was correct
+        n_groups: Number of groups
+        params: Update parameters
+
+    Returns:
+        Tuple of (rating per group, answer count per group)
+    """
+    groups = np.asarray(groups, dtype=np.int64)
+    difficulties = np.asarray(difficulties, dtype=np.float64)
+    correct = np.asarray(correct, dtype=np.float64)
+    ratings = np.full(n_groups, params.initial_rating, dtype=np.float64)
+    counts = np.bincount(groups, minlength=n_groups)
+    if groups.size == 0:
+        return ratings, counts
+
+    # Position of each answer within its group, keeping input order
+    order = np.argsort(groups, kind="stable")
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    positions = np.empty_like(groups)
+    positions[order] = np.arange(groups.size) - starts[groups[order]]
+
+    # Bring all i-th answers together; each step touches every group at most once
+    by_position = np.argsort(positions, kind="stable")
+    bounds = np.searchsorted(positions[by_position], np.arange(int(counts.max()) + 1))
+    for step in range(len(bounds) - 1):
+        index = by_position[bounds[step]:bounds[step + 1]]
+        group = groups[index]
+        current = ratings[group]
+        k = max(params.k_min, params.k_initial / (1.0 + params.k_decay * step))
+        expected = 1.0 / (1.0 + np.exp(difficulties[index] - current))
+        ratings[group] = current + k * (correct[index] - expected)
+    return ratings, counts
+
+
+def record_attempt(db: Session, *, attempt: QuizAttempt, params: Optional[SkillParams] = None) -> None:
+    """
+    Update the child's estimate for the attempt's topic from its graded answers.
+    Called once an attempt has been graded.
+
+    Args:
+        db: Database session
+        attempt: Graded quiz attempt with its quiz and answers
+        params: Update parameters, defaults to the `SKILL_*` settings
+    """
+    if not attempt.answers:
+        return
+    params = params or SkillParams.from_settings()
+    quiz = attempt.quiz
+    difficulty = difficulty_value(quiz.difficulty)
+    # The row stays locked until commit, so concurrent attempts on a topic apply in turn
+    estimate = crud.skill.get_for_update(
+        db, child_id=attempt.child_id, subject=quiz.subject, topic=quiz.topic,
+        initial_rating=params.initial_rating,
+    )
+    # Answers a recompute already replayed are not counted again
+    new_answers = [
+        answer for answer in attempt.answers
+        if estimate.last_answer_at is None or answer.created_at is None
+        or answer.created_at > estimate.last_answer_at
+    ]
+    if not new_answers:
+        db.commit()
+        return
+    rating, answers = estimate.rating, estimate.answers
+    for answer in sorted(new_answers, key=lambda answer: answer.created_at or datetime.min):
+        rating, answers = update(rating, answers, difficulty, answer.is_correct, params)
+    estimate.rating = rating
+    estimate.answers = answers
+    estimate.last_answer_at = max(answer.created_at or datetime.utcnow() for answer in new_answers)
+    db.commit()
+
+
+def next_quiz_difficulty(db: Session, *, child_id: UUID, subject: str, topic: str) -> str:
+    """
+    Difficulty level to generate the child's next quiz on a topic with.
+
+    Args:
+        db: Database session
+        child_id: ID of the child
+        subject: Quiz subject
+        topic: Quiz topic
+
+    Returns:
+        One of `DIFFICULTY_LEVELS`
+    """
+    estimate = crud.skill.get_by_child_and_topic(db, child_id=child_id, subject=subject, topic=topic)
+    return choose_difficulty(estimate.rating if estimate is not None else None)
+
+
+def recompute_all(db: Session, *, params: Optional[SkillParams] = None) -> int:
+    """
+    Rebuild every skill estimate from the stored answer history, e.g. after
+    changing the `SKILL_*` parameters.
+
+    The estimates are locked before the history is read and until the new
+    ones are committed, so attempts recorded meanwhile wait and are applied
+    on top of the rebuilt estimates instead of being lost.
+
+    Args:
+        db: Database session
+        params: Update parameters, defaults to the `SKILL_*` settings
+
+    Returns:
+        Number of estimates written
+    """
+    params = params or SkillParams.from_settings()
+    crud.skill.lock_all(db)
+    keys: Dict[Tuple[UUID, str, str], int] = {}
+    last_answer_at: List[Optional[datetime]] = []
+    groups: List[int] = []
+    difficulties: List[float] = []
+    correct: List[bool] = []
+    for child_id, subject, topic, difficulty, is_correct, created_at in crud.skill.iter_history(db):
+        group = keys.setdefault((child_id, subject, topic), len(keys))
+        if group == len(last_answer_at):
+            last_answer_at.append(created_at)
+        else:
+            last_answer_at[group] = created_at
+        groups.append(group)
+        difficulties.append(difficulty_value(difficulty))
+        correct.append(is_correct)
+
+    ratings, counts = recompute(groups, difficulties, correct, len(keys), params)
+    estimates = [
+        {
+            "child_id": child_id,
+            "subject": subject,
+            "topic": topic,
+            "rating": float(ratings[group]),
+            "answers": int(counts[group]),
+            "last_answer_at": last_answer_at[group],
+        }
+        for (child_id, subject, topic), group in keys.items()
+    ]
+    crud.skill.replace_all(db, estimates=estimates)
+    logger.info("Recomputed %d skill estimates from %d answers", len(estimates), len(groups))
+    return len(estimates)
@@ -0,0 +1,120 @@
+"""
+Conversation state for tutoring sessions.
+
+`TutorContext` holds everything needed to prompt the LLM for a session: the
+system prompt built from the child profile and a bounded window of recent
+messages. HTTP turns rebuild it from the database on every request, while a
+WebSocket connection builds it once and keeps it for its lifetime.
+"""
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional
+from uuid import UUID
+
+from sqlalchemy.orm import Session
+
+from app import crud
+from app.core.config import settings
+from app.core.ids import uuid7
+from app.models.child import Child
+from app.models.session import Session as LearningSession
+from app.services.prompts import prompt_registry
+
+
+def build_system_prompt(child: Child, session: LearningSession) -> str:
+    """
+    Build the system prompt personalizing the tutor for a child and session.
+    The profile-dependent prefix is cached; only the session details are rendered per call.
+
+    Args:
+        child: Child profile
+        session: Learning session
+
+    Returns:
+        System prompt text
+    """
+    prefix = prompt_registry.tutor_prefix(child.grade, session.subject, child.learning_style, child.preferences)
+    return prefix + "\n" + prompt_registry.render(
+        "tutor_session", name=child.name, subject=session.subject, topic=session.topic
+    )
+
+
+class TutorContext:
+    """
+    LLM context of one tutoring session: system prompt and recent messages.
+    """
+
+    def __init__(
+        self,
+        session_id: UUID,
+        system_prompt: str,
+        history: Optional[List[Dict[str, str]]] = None,
+        parent_id: Optional[UUID] = None,
+        subject: Optional[str] = None,
+    ):
+        """
+        Initialize the context.
+
+        Args:
+            session_id: ID of the learning session
+            system_prompt: Prompt from `build_system_prompt`
+            history: Recent messages as {"role": ..., "content": ...} dicts, oldest first
+            parent_id: Parent billed for the session's LLM usage
+            subject: Session subject, used to filter retrieved reference material
+        """
+        self.session_id = session_id
+        self.parent_id = parent_id
+        self.subject = subject
+        self.system_prompt = system_prompt
+        self.history: Deque[Dict[str, str]] = deque(history or [], maxlen=settings.TUTOR_CONTEXT_MESSAGES)
+
+    @classmethod
+    def load(cls, db: Session, session: LearningSession) -> "TutorContext":
+        """
+        Build the context of a session from the database.
+
+        Args:
+            db: Database session
+            session: Learning session, with its child accessible
+
+        Returns:
+            Context holding the latest `TUTOR_CONTEXT_MESSAGES` messages
+        """
+        recent = crud.message.get_recent_by_session(
+            db, session_id=session.id, limit=settings.TUTOR_CONTEXT_MESSAGES
+        )
+        return cls(
+            session.id,
+            build_system_prompt(session.child, session),
+            [{"role": m.role, "content": m.content} for m in recent],
+            parent_id=session.child.parent_id,
+            subject=session.subject,
+        )
+
+    def prompt(self, user_content: str, reference: Optional[str] = None) -> List[Dict[str, str]]:
+        """
+        Return the chat messages to send for a new user message.
+
+        Args:
+            user_content: The new user message
+            reference: Retrieved reference material, sent as a system message
+                right before the user message (see `app.services.retrieval`)
+        """
+        messages = [{"role": "system", "content": self.system_prompt}, *self.history]
+        if reference:
+            messages.append({"role": "system", "content": reference})
+        messages.append({"role": "user", "content": user_content})
+        return messages
+
+    def append(self, role: str, content: str) -> Dict[str, Any]:
+        """
+        Add a message to the window and return it as a row for `crud.message.create_buffered_async`.
+        """
+        self.history.append({"role": role, "content": content})
+        return {
+            "id": uuid7(),
+            "session_id": self.session_id,
+            "role": role,
+            "content": content,
+            "created_at": datetime.utcnow(),
+        }
@@ -0,0 +1,255 @@
+"""
+LLM token usage accounting and per-parent monthly budgets.
+
+`LLMClient` reports every call to `usage_tracker.record`, which only updates
+in-memory counters; a background thread adds them to the `usage` table in one
+upsert every `USAGE_FLUSH_SECONDS`. Budget checks read a per-parent cache of
+month-to-date spending that is refreshed from the database in the background
+every `USAGE_BUDGET_REFRESH_SECONDS`, so `check` never waits on the database.
+
+Enforcement is approximate by design: spending in other workers becomes
+visible after their next flush and this worker's next refresh, and a parent's
+first call after a worker starts is allowed while their budget loads.
+"""
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+from typing import Callable, Dict, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy.orm import Session
+
+from app import crud
+from app.core.config import settings
+from app.db.session import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+# USD per 1K (prompt, completion) tokens, matched by model name prefix
+MODEL_PRICES_PER_1K_TOKENS: Dict[str, Tuple[float, float]] = {
+    "gpt-4o-mini": (0.00015, 0.0006),
+    "gpt-4o": (0.005, 0.015),
+    "gpt-4-turbo": (0.01, 0.03),
+    "gpt-4": (0.03, 0.06),
+    "gpt-3.5-turbo": (0.0015, 0.002),
+    "text-embedding-ada-002": (0.0001, 0.0),
+    "text-embedding-3-small": (0.00002, 0.0),
+}
+# Unknown models are charged at the highest known price rather than for free
+FALLBACK_PRICE_PER_1K_TOKENS = max(MODEL_PRICES_PER_1K_TOKENS.values(), key=sum)
+
+
+class BudgetExceeded(Exception):
+    """Raised before an LLM call when the parent has used up their monthly budget."""
+
+    def __init__(self, parent_id: UUID, spent: float, budget: float):
+        super().__init__(f"Monthly LLM budget of ${budget:.2f} reached (${spent:.2f} used)")
+        self.parent_id = parent_id
+        self.spent = spent
+        self.budget = budget
+
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    """
+    Price a call from its token counts.
+
+    Args:
+        model: Model name as reported by the API, e.g. "gpt-3.5-turbo-0613"
+        prompt_tokens: Input tokens
+        completion_tokens: Output tokens
+
+    Returns:
+        Cost in USD
+    """
+    prefix = max((p for p in MODEL_PRICES_PER_1K_TOKENS if model.startswith(p)), key=len, default=None)
+    prompt_price, completion_price = (
+        MODEL_PRICES_PER_1K_TOKENS[prefix] if prefix else FALLBACK_PRICE_PER_1K_TOKENS
+    )
+    return (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1000
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count for text whose usage the API does not report (~4 characters per token)."""
+    return max(1, len(text) // 4)
+
+
+class _Budget:
+    """Cached month-to-date spending and budget of one parent."""
+    __slots__ = ("spent", "budget", "refreshed_at")
+
+    def __init__(self, spent: float, budget: float, refreshed_at: float):
+        self.spent = spent
+        self.budget = budget
+        self.refreshed_at = refreshed_at
+
+
+class UsageTracker:
+    """
+    Aggregates LLM usage in memory and enforces monthly budgets from a cache.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        *,
+        flush_interval: Optional[float] = None,
+        refresh_interval: Optional[float] = None,
+    ):
+        """
+        Initialize an empty tracker. Background threads start on first use.
+
+        Args:
+            session_factory: Creates the sessions used to flush and refresh
+            flush_interval: Seconds between flushes, defaults to `USAGE_FLUSH_SECONDS`
+            refresh_interval: Seconds a cached budget is trusted, defaults to `USAGE_BUDGET_REFRESH_SECONDS`
+        """
+        self.session_factory = session_factory
+        self.flush_interval = flush_interval if flush_interval is not None else settings.USAGE_FLUSH_SECONDS
+        self.refresh_interval = (
+            refresh_interval if refresh_interval is not None else settings.USAGE_BUDGET_REFRESH_SECONDS
+        )
+        # (parent_id, day, model) -> [requests, prompt_tokens, completion_tokens, cost_usd]
+        self._counters: Dict[Tuple[UUID, date, str], List[float]] = {}
+        self._budgets: Dict[UUID, _Budget] = {}
+        self._refreshing: set = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+        self._refresher: Optional[ThreadPoolExecutor] = None
+
+    def check(self, parent_id: UUID) -> None:
+        """
+        Verify a parent may make another LLM call, using only cached data.
+
+        Raises:
+            BudgetExceeded: If the cached spending has reached the parent's budget
+        """
+        entry = self._budgets.get(parent_id)
+        if entry is None or time.monotonic() - entry.refreshed_at > self.refresh_interval:
+            self._schedule_refresh(parent_id)
+        if entry is not None and entry.spent >= entry.budget:
+            raise BudgetExceeded(parent_id, entry.spent, entry.budget)
+
+    def record(self, parent_id: UUID, model: str, prompt_tokens: int, completion_tokens: int) -> float:
+        """
+        Count one LLM call against a parent.
+
+        Args:
+            parent_id: ID of the parent being billed
+            model: Model that served the call
+            prompt_tokens: Input tokens
+            completion_tokens: Output tokens
+
+        Returns:
+            Cost of the call in USD
+        """
+        cost = estimate_cost(model, prompt_tokens, completion_tokens)
+        key = (parent_id, datetime.utcnow().date(), model)
+        with self._lock:
+            counters = self._counters.setdefault(key, [0, 0, 0, 0.0])
+            counters[0] += 1
+            counters[1] += prompt_tokens
+            counters[2] += completion_tokens
+            counters[3] += cost
+            entry = self._budgets.get(parent_id)
+            if entry is not None:
+                entry.spent += cost
+            if self._flusher is None:
+                self._stop.clear()
+                self._flusher = threading.Thread(target=self._run, name="usage-flush", daemon=True)
+                self._flusher.start()
+        return cost
+
+    def flush(self) -> None:
+        """Write the counters accumulated so far to the `usage` table."""
+        with self._lock:
+            counters, self._counters = self._counters, {}
+        if not counters:
+            return
+        increments = [
+            {
+                "parent_id": parent_id,
+                "day": day,
+                "model": model,
+                "requests": int(values[0]),
+                "prompt_tokens": int(values[1]),
+                "completion_tokens": int(values[2]),
+                "cost_usd": round(values[3], 6),
+            }
+            for (parent_id, day, model), values in counters.items()
+        ]
+        db = self.session_factory()
+        try:
+            crud.usage.add_increments(db, increments=increments)
+        except Exception:
+            logger.exception("Failed to flush LLM usage for %d keys, will retry", len(increments))
+            db.rollback()
+            self._merge_back(counters)
+        finally:
+            db.close()
+
+    def refresh(self, parent_id: UUID) -> None:
+        """Reload a parent's month-to-date spending and budget from the database."""
+        month_start = datetime.utcnow().date().replace(day=1)
+        db = self.session_factory()
+        try:
+            spent, budget = crud.usage.get_spend_and_budget(db, parent_id=parent_id, since=month_start)
+        finally:
+            db.close()
+        with self._lock:
+            # Usage recorded here but not flushed yet is not in the database
+            spent += sum(
+                values[3] for (pid, day, _), values in self._counters.items()
+                if pid == parent_id and day >= month_start
+            )
+            self._budgets[parent_id] = _Budget(
+                spent, budget if budget is not None else settings.LLM_MONTHLY_BUDGET_USD, time.monotonic()
+            )
+
+    def stop(self) -> None:
+        """Stop the background threads and flush the remaining counters, e.g. on shutdown."""
+        self._stop.set()
+        with self._lock:
+            flusher, self._flusher = self._flusher, None
+            refresher, self._refresher = self._refresher, None
+        if flusher is not None:
+            flusher.join()
+        if refresher is not None:
+            refresher.shutdown(wait=True)
+        self.flush()
+
+    def _merge_back(self, counters: Dict[Tuple[UUID, date, str], List[float]]) -> None:
+        with self._lock:
+            for key, values in counters.items():
+                current = self._counters.setdefault(key, [0, 0, 0, 0.0])
+                for index, value in enumerate(values):
+                    current[index] += value
+
+    def _schedule_refresh(self, parent_id: UUID) -> None:
+        with self._lock:
+            if parent_id in self._refreshing:
+                return
+            self._refreshing.add(parent_id)
+            if self._refresher is None:
+                self._refresher = ThreadPoolExecutor(max_workers=1, thread_name_prefix="usage-refresh")
+            refresher = self._refresher
+        refresher.submit(self._refresh_in_background, parent_id)
+
+    def _refresh_in_background(self, parent_id: UUID) -> None:
+        try:
+            self.refresh(parent_id)
+        except Exception:
+            logger.exception("Failed to refresh LLM budget of parent %s", parent_id)
+        finally:
+            with self._lock:
+                self._refreshing.discard(parent_id)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+
+# Process-wide tracker used by the LLM client
+usage_tracker = UsageTracker()
@@ -0,0 +1,36 @@
+"""message full text search
+
+Revision ID: 3f9a2c7d41b8
+Revises: 58ee16b0d664
+Create Date: 2026-10-19 09:12:40.118204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '3f9a2c7d41b8'
+down_revision = '58ee16b0d664'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Generated column is computed by PostgreSQL for existing and new rows
+    op.add_column('message', sa.Column(
+        'search_vector',
+        postgresql.TSVECTOR(),
+        sa.Computed("to_tsvector('english'::regconfig, content)", persisted=True),
+        nullable=True,
+    ))
+    op.create_index(
+        'ix_message_search_vector', 'message', ['search_vector'],
+        unique=False, postgresql_using='gin'
+    )
+
+
+def downgrade():
+    op.drop_index('ix_message_search_vector', table_name='message', postgresql_using='gin')
+    op.drop_column('message', 'search_vector')
@@ -0,0 +1,142 @@
+"""partition message by month and add message archive
+
+Revision ID: 9c41e7b2d5a0
+Revises: 3f9a2c7d41b8
+Create Date: 2026-10-19 10:41:05.532817
+
+"""
+from datetime import date
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '9c41e7b2d5a0'
+down_revision = '3f9a2c7d41b8'
+branch_labels = None
+depends_on = None
+
+
+# Creates the partitions for the current month and `months_ahead` following
+# months. Called by this migration and by scripts/maintain_messages.py.
+CREATE_PARTITIONS_FUNCTION = """
+CREATE OR REPLACE FUNCTION create_message_partitions(months_ahead integer DEFAULT 3)
+RETURNS integer AS $$
+DECLARE
+    month_start date := date_trunc('month', now())::date;
+    partition_name text;
+    created integer := 0;
+BEGIN
+    FOR i IN 0..months_ahead LOOP
+        partition_name := 'message_y' || to_char(month_start, 'YYYY') || 'm' || to_char(month_start, 'MM');
+        IF to_regclass(partition_name) IS NULL THEN
+            EXECUTE format(
+                'CREATE TABLE %I PARTITION OF message FOR VALUES FROM (%L) TO (%L)',
+                partition_name, month_start, (month_start + interval '1 month')::date
+            );
+            created := created + 1;
+        END IF;
+        month_start := (month_start + interval '1 month')::date;
+    END LOOP;
+    RETURN created;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+
+def _create_month_partition(month_start: date) -> None:
+    month_end = date(month_start.year + month_start.month // 12, month_start.month % 12 + 1, 1)
+    op.execute(
+        f"CREATE TABLE message_y{month_start:%Y}m{month_start:%m} PARTITION OF message "
+        f"FOR VALUES FROM ('{month_start}') TO ('{month_end}')"
+    )
+
+
+def upgrade():
+    conn = op.get_bind()
+
+    # Feedback can no longer reference message.id alone once the primary key
+    # includes the partition key
+    op.drop_constraint('feedback_message_id_fkey', 'feedback', type_='foreignkey')
+    op.execute('ALTER TABLE message RENAME TO message_unpartitioned')
+    op.execute('ALTER INDEX ix_message_search_vector RENAME TO ix_message_unpartitioned_search_vector')
+    op.execute('ALTER TABLE message_unpartitioned RENAME CONSTRAINT message_pkey TO message_unpartitioned_pkey')
+
+    op.create_table('message',
+    sa.Column('content', sa.String(), nullable=False),
+    sa.Column('role', sa.String(), nullable=False),
+    sa.Column('search_vector', postgresql.TSVECTOR(), sa.Computed("to_tsvector('english'::regconfig, content)", persisted=True), nullable=True),
+    sa.Column('session_id', sa.UUID(), nullable=False),
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['session_id'], ['session.id'], ),
+    sa.PrimaryKeyConstraint('id', 'created_at'),
+    postgresql_partition_by='RANGE (created_at)'
+    )
+    op.create_index('ix_message_search_vector', 'message', ['search_vector'], unique=False, postgresql_using='gin')
+    op.create_index('ix_message_session_id_created_at', 'message', ['session_id', 'created_at'], unique=False)
+    op.execute('CREATE TABLE message_default PARTITION OF message DEFAULT')
+
+    # Partitions for the months already holding data, then the future ones
+    oldest = conn.execute(sa.text('SELECT min(created_at) FROM message_unpartitioned')).scalar()
+    current = date.today().replace(day=1)
+    if oldest is not None:
+        month_start = oldest.date().replace(day=1)
+        while month_start < current:
+            _create_month_partition(month_start)
+            month_start = date(month_start.year + month_start.month // 12, month_start.month % 12 + 1, 1)
+    op.execute(CREATE_PARTITIONS_FUNCTION)
+    op.execute('SELECT create_message_partitions(3)')
+
+    op.execute("""
+        INSERT INTO message (content, role, session_id, id, created_at, updated_at)
+        SELECT content, role, session_id, id, created_at, updated_at FROM message_unpartitioned
+    """)
+    op.drop_table('message_unpartitioned')
+
+    op.create_table('messagearchive',
+    sa.Column('session_id', sa.UUID(), nullable=False),
+    sa.Column('message_count', sa.Integer(), nullable=False),
+    sa.Column('first_message_at', sa.DateTime(), nullable=False),
+    sa.Column('last_message_at', sa.DateTime(), nullable=False),
+    sa.Column('codec', sa.String(), nullable=False),
+    sa.Column('payload', sa.LargeBinary(), nullable=False),
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['session_id'], ['session.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('session_id')
+    )
+
+
+def downgrade():
+    # Archived messages are not restored; run downgrade only on unarchived data
+    op.drop_table('messagearchive')
+
+    op.execute('ALTER TABLE message RENAME TO message_partitioned')
+    op.execute('ALTER INDEX ix_message_search_vector RENAME TO ix_message_partitioned_search_vector')
+    op.execute('ALTER INDEX ix_message_session_id_created_at RENAME TO ix_message_partitioned_session_id_created_at')
+    op.execute('ALTER TABLE message_partitioned RENAME CONSTRAINT message_pkey TO message_partitioned_pkey')
+    op.create_table('message',
+    sa.Column('content', sa.String(), nullable=False),
+    sa.Column('role', sa.String(), nullable=False),
+    sa.Column('search_vector', postgresql.TSVECTOR(), sa.Computed("to_tsvector('english'::regconfig, content)", persisted=True), nullable=True),
+    sa.Column('session_id', sa.UUID(), nullable=False),
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['session_id'], ['session.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_message_search_vector', 'message', ['search_vector'], unique=False, postgresql_using='gin')
+    op.execute("""
+        INSERT INTO message (content, role, session_id, id, created_at, updated_at)
+        SELECT content, role, session_id, id, created_at, updated_at FROM message_partitioned
+    """)
+    op.execute('DROP TABLE message_partitioned')
+    op.execute('DROP FUNCTION create_message_partitions(integer)')
+    op.create_foreign_key('feedback_message_id_fkey', 'feedback', 'message', ['message_id'], ['id'])
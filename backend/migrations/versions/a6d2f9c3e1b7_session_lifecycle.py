@@ -0,0 +1,59 @@
+"""session lifecycle
+
+Revision ID: a6d2f9c3e1b7
+Revises: f2c8d6a1b4e9
+Create Date: 2026-10-19 18:12:44.803215
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a6d2f9c3e1b7'
+down_revision = 'f2c8d6a1b4e9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('session', sa.Column('message_count', sa.Integer(), nullable=True))
+    op.add_column('session', sa.Column('summary', sa.String(), nullable=True))
+    op.create_index('ix_session_child_id_active', 'session', ['child_id', 'created_at'],
+                    postgresql_where=sa.text("status = 'ACTIVE'"))
+    op.create_table('sessionfollowup',
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('available_at', sa.DateTime(), nullable=False),
+    sa.Column('last_error', sa.String(), nullable=True),
+    sa.Column('session_id', sa.UUID(), nullable=False),
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['session_id'], ['session.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('session_id')
+    )
+    op.create_index('ix_sessionfollowup_available_at', 'sessionfollowup', ['available_at'])
+    op.create_table('subjectprogress',
+    sa.Column('subject', sa.String(), nullable=False),
+    sa.Column('sessions_completed', sa.Integer(), nullable=False),
+    sa.Column('messages', sa.Integer(), nullable=False),
+    sa.Column('minutes', sa.Float(), nullable=False),
+    sa.Column('last_session_at', sa.DateTime(), nullable=True),
+    sa.Column('child_id', sa.UUID(), nullable=False),
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['child_id'], ['child.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('child_id', 'subject', name='uq_subjectprogress_child_id_subject')
+    )
+
+
+def downgrade():
+    op.drop_table('subjectprogress')
+    op.drop_index('ix_sessionfollowup_available_at', table_name='sessionfollowup')
+    op.drop_table('sessionfollowup')
+    op.drop_index('ix_session_child_id_active', table_name='session')
+    op.drop_column('session', 'summary')
+    op.drop_column('session', 'message_count')
@@ -0,0 +1,46 @@
+"""bank question content hash
+
+Revision ID: a9d4c2e8f1b3
+Revises: e7f1a3c5b9d2
+Create Date: 2026-10-20 09:26:41.318570
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a9d4c2e8f1b3'
+down_revision = 'e7f1a3c5b9d2'
+branch_labels = None
+depends_on = None
+
+
+# Same normalization as app.services.question_bank.content_hash
+def _normalized(column: str) -> str:
+    return f"lower(btrim(regexp_replace({column}, '\\s+', ' ', 'g')))"
+
+
+def upgrade():
+    op.add_column('bankquestion', sa.Column('content_hash', sa.String(length=32), nullable=True))
+    content_hash = f"md5({_normalized('text')} || E'\\n' || {_normalized('correct_answer')})"
+    # Exact duplicates already in the bank keep a NULL hash and are retired
+    op.execute(f"""
+        UPDATE bankquestion SET content_hash = hashed.content_hash
+        FROM (
+            SELECT id, {content_hash} AS content_hash,
+                   row_number() OVER (
+                       PARTITION BY subject, topic, {content_hash} ORDER BY created_at, id
+                   ) AS copy
+            FROM bankquestion
+        ) AS hashed
+        WHERE bankquestion.id = hashed.id AND hashed.copy = 1
+    """)
+    op.execute('UPDATE bankquestion SET is_active = false WHERE content_hash IS NULL')
+    op.create_index('uq_bankquestion_content_hash', 'bankquestion',
+                    ['subject', 'topic', 'content_hash'], unique=True)
+
+
+def downgrade():
+    op.drop_index('uq_bankquestion_content_hash', table_name='bankquestion')
+    op.drop_column('bankquestion', 'content_hash')
@@ -0,0 +1,37 @@
+"""child preferences jsonb
+
+Revision ID: b7d3e05a9f12
+Revises: 9c41e7b2d5a0
+Create Date: 2026-10-19 11:58:22.904113
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7d3e05a9f12'
+down_revision = '9c41e7b2d5a0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.alter_column('child', 'preferences',
+               existing_type=sa.JSON(),
+               type_=postgresql.JSONB(astext_type=sa.Text()),
+               existing_nullable=False,
+               postgresql_using='preferences::jsonb')
+    op.create_index('ix_child_preferences', 'child', ['preferences'], unique=False,
+               postgresql_using='gin', postgresql_ops={'preferences': 'jsonb_path_ops'})
+
+
+def downgrade():
+    op.drop_index('ix_child_preferences', table_name='child',
+               postgresql_using='gin', postgresql_ops={'preferences': 'jsonb_path_ops'})
+    op.alter_column('child', 'preferences',
+               existing_type=postgresql.JSONB(astext_type=sa.Text()),
+               type_=sa.JSON(),
+               existing_nullable=False,
+               postgresql_using='preferences::json')
@@ -0,0 +1,41 @@
+"""idempotency keys
+
+Revision ID: c8e4a1f7b2d9
+Revises: a6d2f9c3e1b7
+Create Date: 2026-10-19 21:37:05.129684
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'c8e4a1f7b2d9'
+down_revision = 'a6d2f9c3e1b7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('idempotencykey',
+    sa.Column('key', sa.String(length=255), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('request_hash', sa.LargeBinary(), nullable=False),
+    sa.Column('status_code', sa.Integer(), nullable=True),
+    sa.Column('response_headers', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    sa.Column('response_body', sa.LargeBinary(), nullable=True),
+    sa.Column('locked_until', sa.DateTime(), nullable=False),
+    sa.Column('expires_at', sa.DateTime(), nullable=False),
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id', 'key', name='uq_idempotencykey_user_id_key')
+    )
+    op.create_index('ix_idempotencykey_expires_at', 'idempotencykey', ['expires_at'])
+
+
+def downgrade():
+    op.drop_index('ix_idempotencykey_expires_at', table_name='idempotencykey')
+    op.drop_table('idempotencykey')
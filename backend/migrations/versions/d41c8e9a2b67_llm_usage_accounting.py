@@ -0,0 +1,40 @@
+"""llm usage accounting
+
+Revision ID: d41c8e9a2b67
+Revises: b7d3e05a9f12
+Create Date: 2026-10-19 15:12:47.318260
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd41c8e9a2b67'
+down_revision = 'b7d3e05a9f12'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('usage',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('model', sa.String(), nullable=False),
+    sa.Column('requests', sa.Integer(), nullable=False),
+    sa.Column('prompt_tokens', sa.BigInteger(), nullable=False),
+    sa.Column('completion_tokens', sa.BigInteger(), nullable=False),
+    sa.Column('cost_usd', sa.Numeric(precision=12, scale=6), nullable=False),
+    sa.Column('parent_id', sa.UUID(), nullable=False),
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['parent_id'], ['user.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('parent_id', 'day', 'model', name='uq_usage_parent_id_day_model')
+    )
+    op.add_column('user', sa.Column('llm_monthly_budget_usd', sa.Numeric(precision=10, scale=2), nullable=True))
+
+
+def downgrade():
+    op.drop_column('user', 'llm_monthly_budget_usd')
+    op.drop_table('usage')
@@ -0,0 +1,37 @@
+"""skill estimates
+
+Revision ID: e5a7b3c9d2f4
+Revises: d41c8e9a2b67
+Create Date: 2026-10-19 16:03:21.509117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5a7b3c9d2f4'
+down_revision = 'd41c8e9a2b67'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('skillestimate',
+    sa.Column('subject', sa.String(), nullable=False),
+    sa.Column('topic', sa.String(), nullable=False),
+    sa.Column('rating', sa.Float(), nullable=False),
+    sa.Column('answers', sa.Integer(), nullable=False),
+    sa.Column('last_answer_at', sa.DateTime(), nullable=True),
+    sa.Column('child_id', sa.UUID(), nullable=False),
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['child_id'], ['child.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('child_id', 'subject', 'topic', name='uq_skillestimate_child_id_subject_topic')
+    )
+
+
+def downgrade():
+    op.drop_table('skillestimate')
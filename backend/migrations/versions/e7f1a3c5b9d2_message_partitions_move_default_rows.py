@@ -0,0 +1,93 @@
+"""move default partition rows into new message partitions
+
+Revision ID: e7f1a3c5b9d2
+Revises: c8e4a1f7b2d9
+Create Date: 2026-10-19 23:12:48.604193
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'e7f1a3c5b9d2'
+down_revision = 'c8e4a1f7b2d9'
+branch_labels = None
+depends_on = None
+
+
+# Creating a partition fails while the default partition holds rows of its
+# range. Such rows are moved: the default partition is detached, the new
+# partition created, the rows copied into it and the default re-attached.
+# DETACH locks `message`, so writers wait instead of failing meanwhile.
+CREATE_PARTITIONS_FUNCTION = """
+CREATE OR REPLACE FUNCTION create_message_partitions(months_ahead integer DEFAULT 3)
+RETURNS integer AS $$
+DECLARE
+    month_start date := date_trunc('month', now())::date;
+    month_end date;
+    partition_name text;
+    created integer := 0;
+BEGIN
+    FOR i IN 0..months_ahead LOOP
+        month_end := (month_start + interval '1 month')::date;
+        partition_name := 'message_y' || to_char(month_start, 'YYYY') || 'm' || to_char(month_start, 'MM');
+        IF to_regclass(partition_name) IS NULL THEN
+            IF EXISTS (
+                SELECT 1 FROM message_default WHERE created_at >= month_start AND created_at < month_end
+            ) THEN
+                ALTER TABLE message DETACH PARTITION message_default;
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF message FOR VALUES FROM (%L) TO (%L)',
+                    partition_name, month_start, month_end
+                );
+                INSERT INTO message (content, role, session_id, id, created_at, updated_at)
+                SELECT content, role, session_id, id, created_at, updated_at FROM message_default
+                WHERE created_at >= month_start AND created_at < month_end;
+                DELETE FROM message_default WHERE created_at >= month_start AND created_at < month_end;
+                ALTER TABLE message ATTACH PARTITION message_default DEFAULT;
+            ELSE
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF message FOR VALUES FROM (%L) TO (%L)',
+                    partition_name, month_start, month_end
+                );
+            END IF;
+            created := created + 1;
+        END IF;
+        month_start := month_end;
+    END LOOP;
+    RETURN created;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+PREVIOUS_PARTITIONS_FUNCTION = """
+CREATE OR REPLACE FUNCTION create_message_partitions(months_ahead integer DEFAULT 3)
+RETURNS integer AS $$
+DECLARE
+    month_start date := date_trunc('month', now())::date;
+    partition_name text;
+    created integer := 0;
+BEGIN
+    FOR i IN 0..months_ahead LOOP
+        partition_name := 'message_y' || to_char(month_start, 'YYYY') || 'm' || to_char(month_start, 'MM');
+        IF to_regclass(partition_name) IS NULL THEN
+            EXECUTE format(
+                'CREATE TABLE %I PARTITION OF message FOR VALUES FROM (%L) TO (%L)',
+                partition_name, month_start, (month_start + interval '1 month')::date
+            );
+            created := created + 1;
+        END IF;
+        month_start := (month_start + interval '1 month')::date;
+    END LOOP;
+    RETURN created;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+
+def upgrade():
+    op.execute(CREATE_PARTITIONS_FUNCTION)
+
+
+def downgrade():
+    op.execute(PREVIOUS_PARTITIONS_FUNCTION)
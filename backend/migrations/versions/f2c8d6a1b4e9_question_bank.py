@@ -0,0 +1,68 @@
+"""question bank
+
+Revision ID: f2c8d6a1b4e9
+Revises: e5a7b3c9d2f4
+Create Date: 2026-10-19 16:48:09.274531
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2c8d6a1b4e9'
+down_revision = 'e5a7b3c9d2f4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('bankquestion',
+    sa.Column('subject', sa.String(), nullable=False),
+    sa.Column('topic', sa.String(), nullable=False),
+    sa.Column('grade', sa.String(), nullable=False),
+    sa.Column('difficulty', sa.String(), nullable=False),
+    sa.Column('text', sa.String(), nullable=False),
+    sa.Column('type', sa.String(), nullable=False),
+    sa.Column('options', postgresql.ARRAY(sa.String()), nullable=True),
+    sa.Column('correct_answer', sa.String(), nullable=False),
+    sa.Column('minhash', postgresql.ARRAY(sa.BigInteger()), nullable=False),
+    sa.Column('lsh_buckets', postgresql.ARRAY(sa.BigInteger()), nullable=False),
+    sa.Column('quality', sa.Float(), nullable=False),
+    sa.Column('times_served', sa.Integer(), nullable=False),
+    sa.Column('is_active', sa.Boolean(), nullable=False),
+    sa.Column('source', sa.String(), nullable=False),
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_bankquestion_slot', 'bankquestion',
+                    ['subject', 'topic', 'grade', 'difficulty', 'quality'],
+                    postgresql_where=sa.text('is_active'))
+    op.create_index('ix_bankquestion_lsh_buckets', 'bankquestion', ['lsh_buckets'],
+                    postgresql_using='gin')
+    op.create_table('seenquestionfilter',
+    sa.Column('bloom', sa.LargeBinary(), nullable=False),
+    sa.Column('items', sa.Integer(), nullable=False),
+    sa.Column('child_id', sa.UUID(), nullable=False),
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['child_id'], ['child.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('child_id')
+    )
+    op.add_column('question', sa.Column('bank_question_id', sa.UUID(), nullable=True))
+    op.create_foreign_key('question_bank_question_id_fkey', 'question', 'bankquestion',
+                          ['bank_question_id'], ['id'], ondelete='SET NULL')
+
+
+def downgrade():
+    op.drop_constraint('question_bank_question_id_fkey', 'question', type_='foreignkey')
+    op.drop_column('question', 'bank_question_id')
+    op.drop_table('seenquestionfilter')
+    op.drop_index('ix_bankquestion_lsh_buckets', table_name='bankquestion')
+    op.drop_index('ix_bankquestion_slot', table_name='bankquestion')
+    op.drop_table('bankquestion')
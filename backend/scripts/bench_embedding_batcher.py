@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Embedding micro-batcher benchmark.
+Simulates concurrent chat requests that each embed one question against a
+backend with a fixed round-trip time plus a per-text cost, once with one
+backend call per request and once through the micro-batcher, and prints
+throughput, per-request latency, backend calls and the batcher's histograms.
+No database or API key is needed.
+
+Usage:
+    python scripts/bench_embedding_batcher.py --requests 5000 --concurrency 200 --rtt-ms 40 --wait-ms 5
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+
+# Add parent directory to path so we can import app modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services.embedding import EmbeddingBatcher
+
+
+class SimulatedBackend:
+    """Backend whose calls take rtt + per_text * len(texts) and at most `limit` run at once."""
+    billed = False
+    model = "simulated"
+
+    def __init__(self, rtt_ms: float, per_text_ms: float, limit: int):
+        self.rtt = rtt_ms / 1000
+        self.per_text = per_text_ms / 1000
+        self.limit = limit
+        self.calls = 0
+        self._slots = None
+
+    async def embed(self, texts):
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.limit)
+        async with self._slots:
+            self.calls += 1
+            await asyncio.sleep(self.rtt + self.per_text * len(texts))
+        return [[0.0] for _ in texts]
+
+    def shutdown(self):
+        pass
+
+
+async def run(embed, requests: int, concurrency: int) -> list:
+    """Issue `requests` single-text embeds from `concurrency` clients; return latencies in ms."""
+    latencies = []
+    counter = iter(range(requests))
+
+    async def client():
+        for i in counter:
+            start = time.perf_counter()
+            await embed(f"question {i}")
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return latencies
+
+
+def report(name: str, latencies: list, elapsed: float, calls: int) -> None:
+    """Print throughput and latency of one run."""
+    latencies.sort()
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(f"{name:<10} {len(latencies) / elapsed:8.0f} req/s   {calls:6d} backend calls   "
+          f"median {statistics.median(latencies):7.2f} ms   p95 {p95:7.2f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--rtt-ms", type=float, default=40.0)
+    parser.add_argument("--per-text-ms", type=float, default=0.1)
+    parser.add_argument("--backend-limit", type=int, default=32, help="Concurrent backend calls allowed")
+    parser.add_argument("--wait-ms", type=int, default=5)
+    parser.add_argument("--max-batch", type=int, default=64)
+    args = parser.parse_args()
+
+    print(f"{args.requests} requests from {args.concurrency} clients, backend rtt {args.rtt_ms} ms, "
+          f"at most {args.backend_limit} concurrent backend calls")
+
+    backend = SimulatedBackend(args.rtt_ms, args.per_text_ms, args.backend_limit)
+
+    async def unbatched(text):
+        return (await backend.embed([text]))[0]
+
+    start = time.perf_counter()
+    latencies = asyncio.run(run(unbatched, args.requests, args.concurrency))
+    report("unbatched", latencies, time.perf_counter() - start, backend.calls)
+
+    backend = SimulatedBackend(args.rtt_ms, args.per_text_ms, args.backend_limit)
+    batcher = EmbeddingBatcher(backend, max_wait_ms=args.wait_ms, max_batch=args.max_batch)
+    start = time.perf_counter()
+    latencies = asyncio.run(run(batcher.embed, args.requests, args.concurrency))
+    report("batched", latencies, time.perf_counter() - start, backend.calls)
+    print(json.dumps(batcher.stats(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
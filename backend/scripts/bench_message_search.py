@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Message search benchmark.
+Seeds synthetic messages and compares ILIKE scans with the GIN-indexed
+full-text search used by `crud.message.search_by_parent`.
+
+All seeded rows are written inside a single transaction that is rolled back
+at the end, so the script can be pointed at a development database.
+Requires the schema to be migrated (`alembic upgrade head`).
+
+Usage:
+    python scripts/bench_message_search.py --messages 1000000 --repeat 20
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+
+# Add parent directory to path so we can import app modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import crud
+from app.core.config import settings
+
+WORDS = [
+    "fractions", "volcano", "photosynthesis", "multiply", "dinosaur", "planet",
+    "spelling", "river", "triangle", "magnet", "history", "ocean", "energy",
+    "poem", "division", "weather", "rocket", "habitat", "grammar", "decimal",
+]
+
+
+def seed(conn, parents: int, messages: int) -> str:
+    """
+    Seed parents, one child and session per parent, and random messages.
+
+    Returns:
+        ID of the first seeded parent, used for the scoped queries
+    """
+    conn.execute(text("""
+        INSERT INTO "user" (id, email, name, hashed_password, is_active, is_superuser, created_at, updated_at)
+        SELECT gen_random_uuid(), 'bench-' || g || '@example.com', 'Bench', 'x', true, false, now(), now()
+        FROM generate_series(1, :parents) g
+    """), {"parents": parents})
+    conn.execute(text("""
+        INSERT INTO child (id, name, grade, subjects, preferences, parent_id, created_at, updated_at)
+        SELECT gen_random_uuid(), 'Bench Child', '3rd grade', ARRAY['Math'], '{}', id, now(), now()
+        FROM "user" WHERE email LIKE 'bench-%@example.com'
+    """))
+    conn.execute(text("""
+        INSERT INTO session (id, subject, topic, status, child_id, created_at, updated_at)
+        SELECT gen_random_uuid(), 'Math', 'Bench', 'ACTIVE', c.id, now(), now()
+        FROM child c JOIN "user" u ON u.id = c.parent_id
+        WHERE u.email LIKE 'bench-%@example.com'
+    """))
+    conn.execute(text("""
+        WITH s AS (
+            SELECT array_agg(s.id) AS ids FROM session s
+            JOIN child c ON c.id = s.child_id
+            JOIN "user" u ON u.id = c.parent_id
+            WHERE u.email LIKE 'bench-%@example.com'
+        )
+        INSERT INTO message (id, content, role, session_id, created_at, updated_at)
+        SELECT gen_random_uuid(),
+               (SELECT string_agg((:words)[1 + floor(random() * array_length(:words, 1))::int], ' ')
+                FROM generate_series(1, 12 + (g % 3))),
+               'user',
+               s.ids[1 + (g % array_length(s.ids, 1))],
+               now(), now()
+        FROM generate_series(1, :messages) g, s
+    """), {"messages": messages, "words": WORDS})
+    conn.execute(text("ANALYZE message"))
+    return conn.execute(text(
+        "SELECT id FROM \"user\" WHERE email = 'bench-1@example.com'"
+    )).scalar_one()
+
+
+def timed(fn, repeat: int) -> list:
+    """Run `fn` `repeat` times and return the latencies in milliseconds."""
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def report(name: str, latencies: list) -> None:
+    """Print median and p95 latency."""
+    latencies = sorted(latencies)
+    p95 = latencies[int(len(latencies) * 0.95) - 1] if len(latencies) > 1 else latencies[0]
+    print(f"{name:<24} median {statistics.median(latencies):8.2f} ms   p95 {p95:8.2f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--database-uri", default=settings.SQLALCHEMY_DATABASE_URI)
+    parser.add_argument("--parents", type=int, default=1000)
+    parser.add_argument("--messages", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--term", default="volcano")
+    args = parser.parse_args()
+
+    engine = create_engine(args.database_uri)
+    with engine.connect() as conn:
+        transaction = conn.begin()
+        try:
+            start = time.perf_counter()
+            parent_id = seed(conn, args.parents, args.messages)
+            print(f"Seeded {args.messages} messages in {time.perf_counter() - start:.1f} s")
+
+            db = Session(bind=conn)
+
+            def ilike():
+                conn.execute(text("""
+                    SELECT m.id FROM message m
+                    JOIN session s ON s.id = m.session_id
+                    JOIN child c ON c.id = s.child_id
+                    WHERE c.parent_id = :parent_id AND m.content ILIKE :pattern
+                    ORDER BY m.id DESC LIMIT 20
+                """), {"parent_id": parent_id, "pattern": f"%{args.term}%"}).all()
+
+            def fts_first_page():
+                crud.message.search_by_parent(db, parent_id=parent_id, query=args.term)
+
+            _, cursor = crud.message.search_by_parent(db, parent_id=parent_id, query=args.term)
+
+            def fts_next_page():
+                crud.message.search_by_parent(
+                    db, parent_id=parent_id, query=args.term, cursor=cursor
+                )
+
+            report("ILIKE scan", timed(ilike, args.repeat))
+            report("FTS first page", timed(fts_first_page, args.repeat))
+            report("FTS keyset next page", timed(fts_next_page, args.repeat))
+
+            plan = conn.execute(text("""
+                EXPLAIN (ANALYZE, BUFFERS)
+                SELECT id FROM message
+                WHERE search_vector @@ websearch_to_tsquery('english', :term)
+            """), {"term": args.term}).scalars().all()
+            print("\n".join(plan))
+        finally:
+            transaction.rollback()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Prompt template benchmark.
+Builds tutor system prompts for a stream of sessions drawn from a fixed set of
+child profiles, first rendering every template per prompt (no prefix cache),
+then with the prefix LRU cache, and prints per-prompt latency and the
+registry's per-template render metrics. No database is needed.
+
+Usage:
+    python scripts/bench_prompts.py --prompts 100000 --profiles 500 --cache-size 1024
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from types import SimpleNamespace
+
+# Add parent directory to path so we can import app modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services.prompts import PromptRegistry
+
+GRADES = ["Kindergarten", "1st grade", "3rd grade", "5th grade", "7th grade", "10th grade"]
+SUBJECTS = ["Math", "Science", "English", "History", "Geography"]
+STYLES = [None, "visual", "auditory", "kinesthetic"]
+PREFERENCES = [{}, {"response_style": "concise"}, {"response_style": "detailed", "examples_type": "real-world"}]
+
+
+def make_profiles(count: int, rng: random.Random) -> list:
+    """Random child profiles and session subjects."""
+    return [
+        SimpleNamespace(
+            name=f"Child {i}", grade=rng.choice(GRADES), subject=rng.choice(SUBJECTS),
+            learning_style=rng.choice(STYLES), preferences=rng.choice(PREFERENCES),
+        )
+        for i in range(count)
+    ]
+
+
+def run(name: str, build, profiles: list, prompts: int, rng: random.Random) -> None:
+    """Build `prompts` prompts for randomly picked profiles and print latency."""
+    latencies = []
+    for _ in range(prompts):
+        profile = rng.choice(profiles)
+        start = time.perf_counter_ns()
+        build(profile)
+        latencies.append((time.perf_counter_ns() - start) / 1000)
+    latencies.sort()
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(f"{name:<18} median {statistics.median(latencies):7.2f} us   p95 {p95:7.2f} us")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--prompts", type=int, default=100_000)
+    parser.add_argument("--profiles", type=int, default=500)
+    parser.add_argument("--cache-size", type=int, default=1024)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    profiles = make_profiles(args.profiles, rng)
+    registry = PromptRegistry(prefix_cache_size=args.cache_size)
+
+    def uncached(profile) -> str:
+        prefix = registry.build_tutor_prefix(
+            profile.grade, profile.subject, profile.learning_style, profile.preferences
+        )
+        return prefix + "\n" + registry.render(
+            "tutor_session", name=profile.name, subject=profile.subject, topic="Practice"
+        )
+
+    def cached(profile) -> str:
+        prefix = registry.tutor_prefix(profile.grade, profile.subject, profile.learning_style, profile.preferences)
+        return prefix + "\n" + registry.render(
+            "tutor_session", name=profile.name, subject=profile.subject, topic="Practice"
+        )
+
+    print(f"{args.prompts} prompts over {args.profiles} profiles, prefix cache size {args.cache_size}")
+    run("no prefix cache", uncached, profiles, args.prompts, rng)
+    run("prefix LRU cache", cached, profiles, args.prompts, rng)
+
+    stats = registry.stats()
+    print(f"prefix cache: {stats['prefix_cache']}")
+    for name, values in stats["templates"].items():
+        print(f"  {name:<18} {values['renders']:8d} renders   "
+              f"mean {values['mean_us']:6.2f} us   max {values['max_us']:8.2f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Tutoring transport benchmark.
+Compares chat turns over HTTP (`POST /sessions/{id}/chat`, which authenticates
+and rebuilds the session context on every request) with one WebSocket
+connection (`/sessions/{id}/ws`, authenticated once, streamed replies).
+
+The LLM is replaced by a fake that streams a fixed reply with a configurable
+per-token delay, so the numbers isolate transport and database overhead.
+A parent, child and session are created for the run and deleted afterwards.
+Requires the schema to be migrated (`alembic upgrade head`).
+
+Usage:
+    python scripts/bench_tutor_transport.py --turns 200 --token-delay-ms 0
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from uuid import uuid4
+
+from fastapi.testclient import TestClient
+
+# Add parent directory to path so we can import app modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import crud, schemas
+from app.core.config import settings
+from app.core.security import create_access_token
+from app.db.session import SessionLocal
+from app.main import create_app
+from app.models.session import Session as LearningSession
+from app.services.llm import get_llm_client
+
+REPLY_TOKENS = ["Fractions ", "are ", "parts ", "of ", "a ", "whole", ". "] * 8
+
+
+class FakeLLMClient:
+    """Streams `REPLY_TOKENS` with a fixed delay between tokens."""
+
+    def __init__(self, token_delay: float):
+        self.token_delay = token_delay
+
+    async def chat(self, messages, **kwargs):
+        await asyncio.sleep(self.token_delay * len(REPLY_TOKENS))
+        return {"choices": [{"message": {"role": "assistant", "content": "".join(REPLY_TOKENS)}}]}
+
+    async def stream_chat(self, messages, **kwargs):
+        for token in REPLY_TOKENS:
+            await asyncio.sleep(self.token_delay)
+            yield token
+
+
+def seed() -> tuple:
+    """Create a parent, child and active session; returns (parent id, session id)."""
+    db = SessionLocal()
+    try:
+        parent = crud.user.create(db, obj_in=schemas.UserCreate(
+            email=f"bench-{uuid4().hex[:8]}@example.com", name="Bench", password="bench-password",
+        ))
+        child = crud.child.create_with_parent(db, obj_in=schemas.ChildCreate(
+            name="Bench Child", grade="3rd grade", subjects=["Math"],
+        ), parent_id=parent.id)
+        session = LearningSession(subject="Math", topic="Fractions", child_id=child.id)
+        db.add(session)
+        db.commit()
+        return parent.id, session.id
+    finally:
+        db.close()
+
+
+def cleanup(parent_id) -> None:
+    """Delete the seeded parent with its child, session and messages."""
+    db = SessionLocal()
+    try:
+        crud.user.remove(db, id=parent_id)
+    finally:
+        db.close()
+
+
+def report(name: str, latencies: list) -> None:
+    """Print median and p95 latency."""
+    latencies = sorted(latencies)
+    p95 = latencies[int(len(latencies) * 0.95) - 1] if len(latencies) > 1 else latencies[0]
+    print(f"{name:<28} median {statistics.median(latencies):8.2f} ms   p95 {p95:8.2f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--turns", type=int, default=200)
+    parser.add_argument("--token-delay-ms", type=float, default=0.0)
+    args = parser.parse_args()
+
+    app = create_app(enable_ai=True)
+    llm = FakeLLMClient(args.token_delay_ms / 1000)
+    app.dependency_overrides[get_llm_client] = lambda: llm
+
+    parent_id, session_id = seed()
+    token = create_access_token(parent_id)
+    prefix = f"{settings.API_V1_PREFIX}/sessions/{session_id}"
+    try:
+        with TestClient(app) as client:
+            headers = {"Authorization": f"Bearer {token}"}
+            http_turns = []
+            for i in range(args.turns):
+                start = time.perf_counter()
+                response = client.post(f"{prefix}/chat", headers=headers, json={"content": f"Question {i}"})
+                response.raise_for_status()
+                http_turns.append((time.perf_counter() - start) * 1000)
+
+            ws_turns, ws_first_token = [], []
+            start = time.perf_counter()
+            with client.websocket_connect(f"{prefix}/ws?token={token}") as websocket:
+                websocket.receive_json()
+                connect_ms = (time.perf_counter() - start) * 1000
+                for i in range(args.turns):
+                    start = time.perf_counter()
+                    websocket.send_json({"type": "message", "content": f"Question {i}"})
+                    first = None
+                    while (frame := websocket.receive_json())["type"] != "done":
+                        if first is None and frame["type"] == "token":
+                            first = (time.perf_counter() - start) * 1000
+                    ws_turns.append((time.perf_counter() - start) * 1000)
+                    ws_first_token.append(first)
+
+        print(f"{args.turns} turns, {len(REPLY_TOKENS)} tokens per reply, "
+              f"{args.token_delay_ms} ms per token")
+        report("HTTP turn (full reply)", http_turns)
+        report("WebSocket turn (full reply)", ws_turns)
+        report("WebSocket first token", ws_first_token)
+        print(f"{'WebSocket connect + auth':<28} {connect_ms:8.2f} ms (once)")
+    finally:
+        cleanup(parent_id)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Primary key insert benchmark.
+Compares random UUIDv4 keys with time-ordered UUIDv7 keys (`app.core.ids.uuid7`)
+on a message-shaped table: insert throughput, primary key index size and
+WAL generated.
+
+Creates regular (WAL-logged) `bench_uuid4`/`bench_uuid7` tables and drops
+them when done.
+
+Usage:
+    python scripts/bench_uuid_inserts.py --rows 1000000 --batch-size 1000
+"""
+
+import argparse
+import os
+import sys
+import time
+import uuid
+from datetime import datetime
+
+from sqlalchemy import create_engine, text
+
+# Add parent directory to path so we can import app modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.core.config import settings
+from app.core.ids import uuid7
+
+GENERATORS = {"uuid4": uuid.uuid4, "uuid7": uuid7}
+
+
+def run(conn, name: str, generate, rows: int, batch_size: int) -> None:
+    """Insert `rows` rows keyed by `generate()` and print the results."""
+    table = f"bench_{name}"
+    conn.execute(text(f"DROP TABLE IF EXISTS {table}"))
+    conn.execute(text(f"""
+        CREATE TABLE {table} (
+            id uuid PRIMARY KEY,
+            session_id uuid NOT NULL,
+            content varchar NOT NULL,
+            created_at timestamp NOT NULL
+        )
+    """))
+    conn.execute(text(f"CREATE INDEX ON {table} (session_id)"))
+    conn.commit()
+
+    insert = text(
+        f"INSERT INTO {table} (id, session_id, content, created_at) "
+        "VALUES (:id, :session_id, :content, :created_at)"
+    )
+    session_ids = [generate() for _ in range(1000)]
+    wal_start = conn.execute(text("SELECT pg_current_wal_insert_lsn()")).scalar_one()
+    start = time.perf_counter()
+    for offset in range(0, rows, batch_size):
+        conn.execute(insert, [
+            {
+                "id": generate(),
+                "session_id": session_ids[(offset + i) % len(session_ids)],
+                "content": "How do I add fractions with different denominators?",
+                "created_at": datetime.utcnow(),
+            }
+            for i in range(min(batch_size, rows - offset))
+        ])
+        conn.commit()
+    elapsed = time.perf_counter() - start
+    wal_bytes = conn.execute(
+        text("SELECT pg_wal_lsn_diff(pg_current_wal_insert_lsn(), :start)"),
+        {"start": wal_start},
+    ).scalar_one()
+    index_bytes = conn.execute(
+        text(f"SELECT pg_relation_size('{table}_pkey')")
+    ).scalar_one()
+
+    conn.execute(text(f"DROP TABLE {table}"))
+    conn.commit()
+
+    print(
+        f"{name}: {rows / elapsed:10.0f} rows/s   "
+        f"pkey index {index_bytes / 2**20:8.1f} MiB   "
+        f"WAL {float(wal_bytes) / 2**20:8.1f} MiB"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare UUIDv4 and UUIDv7 insert performance")
+    parser.add_argument("--database-uri", default=settings.SQLALCHEMY_DATABASE_URI)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    engine = create_engine(args.database_uri)
+    with engine.connect() as conn:
+        for name, generate in GENERATORS.items():
+            run(conn, name, generate, args.rows, args.batch_size)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Vector index benchmark.
+Builds an index of synthetic clustered embeddings in a temporary directory
+and prints the build time, the index size on disk and, per nprobe, recall@k
+against an exact brute-force search and the search latency. Then appends
+vectors with `add` and measures search again before and after `compact`.
+No database or API key is needed; requires numpy.
+
+Usage:
+    python scripts/bench_vector_index.py --vectors 1000000 --dim 384 --nlist 1024 --queries 200
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+# Add parent directory to path so we can import app modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.core.vector_index import VectorIndex, normalize
+
+
+def make_vectors(count: int, dim: int, clusters: int, noise: float, rng: np.random.Generator) -> np.ndarray:
+    """Embedding-like data: points scattered around random topic directions."""
+    centers = rng.standard_normal((clusters, dim), dtype=np.float32)
+    vectors = np.empty((count, dim), dtype=np.float32)
+    for start in range(0, count, 100_000):
+        end = min(count, start + 100_000)
+        assigned = rng.integers(0, clusters, end - start)
+        vectors[start:end] = centers[assigned] + noise * rng.standard_normal((end - start, dim), dtype=np.float32)
+    return vectors
+
+
+def exact_top_k(index: VectorIndex, queries: np.ndarray, k: int, batch: int = 25) -> list:
+    """Brute-force top-k rows of each query over all stored vectors."""
+    truth = []
+    for first in range(0, len(queries), batch):
+        block = queries[first:first + batch]
+        scores = np.empty((len(block), len(index)), dtype=np.float32)
+        for start in range(0, len(index), 100_000):
+            chunk = np.asarray(index.vectors[start:start + 100_000], dtype=np.float32)
+            scores[:, start:start + len(chunk)] = block @ chunk.T
+        truth.extend(set(np.argpartition(-row, k - 1)[:k].tolist()) for row in scores)
+    return truth
+
+
+def measure(index: VectorIndex, queries: np.ndarray, truth: list, k: int, nprobe: int) -> None:
+    """Print recall@k and latency for one nprobe setting."""
+    latencies, hits = [], 0
+    for query, expected in zip(queries, truth):
+        start = time.perf_counter()
+        found = index.search(query, k, nprobe=nprobe)
+        latencies.append((time.perf_counter() - start) * 1000)
+        hits += len(expected & {row for _, row in found})
+    latencies.sort()
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(f"  nprobe {nprobe:4d}   recall@{k} {hits / (k * len(queries)):.3f}   "
+          f"median {statistics.median(latencies):7.2f} ms   p95 {p95:7.2f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--vectors", type=int, default=1_000_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--nlist", type=int, default=1024)
+    parser.add_argument("--clusters", type=int, default=2000, help="Topic clusters in the synthetic data")
+    parser.add_argument("--noise", type=float, default=1.0, help="Spread around cluster centers; higher is harder")
+    parser.add_argument("--dtype", choices=["float16", "float32"], default="float16")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[4, 16, 32, 64])
+    parser.add_argument("--add", type=int, default=10_000, help="Vectors appended after the build")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    vectors = make_vectors(args.vectors + args.add + args.queries, args.dim, args.clusters, args.noise, rng)
+    base, extra = vectors[:args.vectors], vectors[args.vectors:args.vectors + args.add]
+    queries = normalize(vectors[args.vectors + args.add:])
+
+    with tempfile.TemporaryDirectory() as directory:
+        start = time.perf_counter()
+        index = VectorIndex.create(
+            directory, base, [{"i": i} for i in range(args.vectors)], nlist=args.nlist, dtype=args.dtype
+        )
+        size = sum(entry.stat().st_size for entry in os.scandir(directory))
+        print(f"Built {len(index)} x {args.dim} ({args.dtype}, nlist {args.nlist}) in "
+              f"{time.perf_counter() - start:.1f} s, {size / 2**20:.0f} MiB on disk")
+        truth = exact_top_k(index, queries, args.k)
+        for nprobe in args.nprobe:
+            measure(index, queries, truth, args.k, nprobe)
+
+        if args.add:
+            start = time.perf_counter()
+            index.add(extra, [{"i": args.vectors + i} for i in range(args.add)])
+            print(f"Appended {args.add} vectors in {(time.perf_counter() - start) * 1000:.0f} ms")
+            truth = exact_top_k(index, queries, args.k)
+            for nprobe in args.nprobe:
+                measure(index, queries, truth, args.k, nprobe)
+
+            start = time.perf_counter()
+            index.compact()
+            print(f"Compacted in {time.perf_counter() - start:.1f} s")
+            truth = exact_top_k(index, queries, args.k)
+            for nprobe in args.nprobe:
+                measure(index, queries, truth, args.k, nprobe)
+
+
+if __name__ == "__main__":
+    main()
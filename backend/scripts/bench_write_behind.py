@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Write-behind buffer benchmark.
+Inserts the same number of messages from concurrent writer threads, first
+with one commit per row (`crud.message.create`), then through the
+write-behind buffer with each writer waiting for its row to be durable, as a
+request handler acknowledging the write would.
+
+A parent, child and session are created for the run and deleted afterwards.
+Requires the schema to be migrated (`alembic upgrade head`).
+
+Usage:
+    python scripts/bench_write_behind.py --rows 5000 --writers 16 --flush-ms 20
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from uuid import uuid4
+
+# Add parent directory to path so we can import app modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import crud, schemas
+from app.db.session import SessionLocal
+from app.db.write_behind import WriteBehindBuffer
+from app.models.session import Message, Session as LearningSession
+
+
+def seed():
+    """Create a parent, child and session; returns (parent id, session id)."""
+    db = SessionLocal()
+    try:
+        parent = crud.user.create(db, obj_in=schemas.UserCreate(
+            email=f"bench-{uuid4().hex[:8]}@example.com", name="Bench", password="bench-password",
+        ))
+        child = crud.child.create_with_parent(db, obj_in=schemas.ChildCreate(
+            name="Bench Child", grade="3rd grade", subjects=["Math"],
+        ), parent_id=parent.id)
+        session = LearningSession(subject="Math", topic="Bench", child_id=child.id)
+        db.add(session)
+        db.commit()
+        return parent.id, session.id
+    finally:
+        db.close()
+
+
+def run(name: str, write, rows: int, writers: int) -> None:
+    """Call `write(i)` for every row from `writers` threads and print throughput and latency."""
+    latencies = []
+
+    def timed_write(i: int) -> None:
+        start = time.perf_counter()
+        write(i)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=writers) as pool:
+        list(pool.map(timed_write, range(rows)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(f"{name:<22} {rows / elapsed:9.0f} rows/s   "
+          f"median {statistics.median(latencies):7.2f} ms   p95 {p95:7.2f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--writers", type=int, default=16)
+    parser.add_argument("--flush-ms", type=int, default=20)
+    parser.add_argument("--max-batch", type=int, default=500)
+    args = parser.parse_args()
+
+    parent_id, session_id = seed()
+    buffer = WriteBehindBuffer(flush_interval_ms=args.flush_ms, max_batch=args.max_batch, enabled=True)
+    try:
+        def per_row_commit(i: int) -> None:
+            db = SessionLocal()
+            try:
+                crud.message.create(db, obj_in=schemas.MessageCreate(
+                    content=f"Message {i}", role="user", session_id=session_id,
+                ))
+            finally:
+                db.close()
+
+        def buffered(i: int) -> None:
+            buffer.submit(Message, {
+                "content": f"Message {i}", "role": "user", "session_id": session_id,
+            }).result()
+
+        print(f"{args.rows} rows from {args.writers} writers")
+        run("per-row commit", per_row_commit, args.rows, args.writers)
+        run("write-behind (acked)", buffered, args.rows, args.writers)
+        buffer.stop()
+        print(f"write-behind: {buffer.stats['flushes']} transactions, "
+              f"largest batch {buffer.stats['largest_batch']} rows")
+    finally:
+        db = SessionLocal()
+        try:
+            crud.user.remove(db, id=parent_id)
+        finally:
+            db.close()
+
+
+if __name__ == "__main__":
+    main()
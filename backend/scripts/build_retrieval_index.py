@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Retrieval index builder.
+Embeds curriculum snippets from a JSON Lines file ({"text", "subject", "topic"}
+per line) and tutor answers rated thumbs-up by families, and writes them to
+the vector index in RETRIEVAL_INDEX_DIR (or --index-dir).
+
+Usage:
+    python build_retrieval_index.py create --curriculum curriculum.jsonl [--nlist N]
+    python build_retrieval_index.py add --curriculum new_snippets.jsonl [--no-answers]
+    python build_retrieval_index.py compact
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional
+
+# Add parent directory to path so we can import app modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.core.vector_index import VectorIndex
+from app.db.session import SessionLocal
+from app.models.session import Feedback, Message, Session as LearningSession
+from app.services.embedding import create_backend
+
+
+def read_curriculum(path: str) -> Iterator[Dict[str, Any]]:
+    """Yield snippet payloads from a JSON Lines file."""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                item = json.loads(line)
+                yield {"kind": "curriculum", "text": item["text"], "subject": item.get("subject"),
+                       "topic": item.get("topic")}
+
+
+def read_rated_answers(since: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """Yield payloads of assistant messages rated thumbs-up, in rating order."""
+    query = (
+        select(
+            Message.id, Message.content, LearningSession.subject, LearningSession.topic,
+            Feedback.created_at.label("rated_at"),
+        )
+        .join(Feedback, Feedback.message_id == Message.id)
+        .join(LearningSession, LearningSession.id == Message.session_id)
+        .where(Message.role == "assistant", Feedback.rating == "thumbs_up")
+        .order_by(Feedback.created_at)
+        .execution_options(yield_per=1000)
+    )
+    if since:
+        query = query.where(Feedback.created_at > datetime.fromisoformat(since))
+    db = SessionLocal()
+    try:
+        for row in db.execute(query):
+            yield {"kind": "answer", "text": row.content, "subject": row.subject, "topic": row.topic,
+                   "message_id": str(row.id), "rated_at": row.rated_at.isoformat()}
+    finally:
+        db.close()
+
+
+async def embed_all(docs: List[Dict[str, Any]], batch_size: int) -> List[List[float]]:
+    """Embed document texts in batches with the configured EMBEDDING_BACKEND."""
+    backend = create_backend()
+    vectors: List[List[float]] = []
+    try:
+        for start in range(0, len(docs), batch_size):
+            batch = docs[start:start + batch_size]
+            vectors.extend(await backend.embed([doc["text"] for doc in batch]))
+            print(f"Embedded {len(vectors)}/{len(docs)}", end="\r")
+    finally:
+        backend.shutdown()
+    print()
+    return vectors
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build or update the tutor retrieval index")
+    parser.add_argument("command", choices=["create", "add", "compact"])
+    parser.add_argument("--index-dir", default=settings.RETRIEVAL_INDEX_DIR)
+    parser.add_argument("--curriculum", help="JSON Lines file of curriculum snippets")
+    parser.add_argument("--no-answers", action="store_true", help="Skip thumbs-up rated tutor answers")
+    parser.add_argument("--nlist", type=int, default=0, help="Inverted lists, defaults to about sqrt(count)")
+    parser.add_argument("--dtype", choices=["float16", "float32"], default="float16")
+    parser.add_argument("--batch-size", type=int, default=256)
+    args = parser.parse_args()
+    if not args.index_dir:
+        parser.error("Set RETRIEVAL_INDEX_DIR or pass --index-dir")
+
+    start = time.perf_counter()
+    if args.command == "compact":
+        index = VectorIndex(args.index_dir)
+        index.compact()
+        print(f"Compacted {len(index)} vector(s) in {time.perf_counter() - start:.2f} s.")
+        return
+
+    index = VectorIndex(args.index_dir) if args.command == "add" else None
+    docs = list(read_curriculum(args.curriculum)) if args.curriculum else []
+    if not args.no_answers:
+        # Only answers rated since the last run
+        since = index.meta.get("answers_until") if index is not None else None
+        docs.extend(read_rated_answers(since))
+    if not docs:
+        print("Nothing to index.")
+        return
+
+    vectors = asyncio.run(embed_all(docs, args.batch_size))
+    if index is None:
+        nlist = args.nlist or max(1, int(len(docs) ** 0.5))
+        index = VectorIndex.create(args.index_dir, vectors, docs, nlist=nlist, dtype=args.dtype)
+    else:
+        index.add(vectors, docs)
+    answers_until = max((doc["rated_at"] for doc in docs if doc["kind"] == "answer"), default=None)
+    if answers_until:
+        index.update_meta(answers_until=answers_until)
+    print(f"Indexed {len(docs)} document(s), {len(index)} in total, in {time.perf_counter() - start:.2f} s.")
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except Exception as e:
+        print(f"Error: {e}")
+        sys.exit(1)
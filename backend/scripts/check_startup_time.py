@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Startup time budget check.
+Imports the application in fresh interpreters with `python -X importtime`,
+reports the slowest imports and fails if the cold start import time exceeds
+the budget (`STARTUP_IMPORT_BUDGET_MS`).
+
+Usage:
+    python check_startup_time.py [--module app.main] [--budget-ms 1500] [--runs 3] [--top 15]
+
+Exit status is 1 when the budget is exceeded, so it can run in CI.
+"""
+
+import os
+import sys
+import argparse
+import subprocess
+from typing import Dict, List, Tuple
+
+# Add parent directory to path so we can import app modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.core.config import settings
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+
+def parse_importtime(output: str) -> List[Tuple[str, int, int, int]]:
+    """
+    Parse `-X importtime` output.
+
+    Args:
+        output: stderr of an interpreter run with `-X importtime`
+
+    Returns:
+        List of (module, self_us, cumulative_us, depth) in import order
+    """
+    entries = []
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        depth = (len(name) - len(name.lstrip())) // 2
+        entries.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return entries
+
+
+def measure(module: str) -> Tuple[int, List[Tuple[str, int, int, int]]]:
+    """
+    Import `module` in a fresh interpreter.
+
+    Returns:
+        Tuple of (total import time in microseconds, parsed entries)
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        # importtime lines are also on stderr; show only the traceback part
+        errors = "\n".join(l for l in result.stderr.splitlines() if not l.startswith("import time:"))
+        raise RuntimeError(f"Importing {module} failed:\n{errors}")
+    entries = parse_importtime(result.stderr)
+    total = sum(cumulative for _, _, cumulative, depth in entries if depth == 0)
+    return total, entries
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Check the application import time budget")
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--budget-ms", type=int, default=settings.STARTUP_IMPORT_BUDGET_MS)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    # Keep the fastest run; slower ones mostly measure a cold disk cache
+    best_total, best_entries = min(
+        (measure(args.module) for _ in range(args.runs)), key=lambda run: run[0]
+    )
+
+    # Attribute self time to distributions by top-level package name
+    packages: Dict[str, int] = {}
+    for name, self_us, _, _ in best_entries:
+        top_level = name.split(".")[0]
+        packages[top_level] = packages.get(top_level, 0) + self_us
+
+    print(f"Slowest packages importing {args.module} (self time):")
+    for name, self_us in sorted(packages.items(), key=lambda p: -p[1])[:args.top]:
+        print(f"  {self_us / 1000:9.1f} ms  {name}")
+
+    total_ms = best_total / 1000
+    print(f"Total import time: {total_ms:.1f} ms (budget {args.budget_ms} ms)")
+    if total_ms > args.budget_ms:
+        print("Startup import budget exceeded.")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
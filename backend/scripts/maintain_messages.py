@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Message table maintenance job.
+Creates upcoming monthly message partitions and archives the messages of
+completed sessions older than the retention window.
+Intended to run periodically (e.g. daily from cron).
+
+Usage:
+    python maintain_messages.py [--months-ahead N] [--retention-days N] [--batch-size N]
+"""
+
+import os
+import sys
+import argparse
+
+# Add parent directory to path so we can import app modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.services import message_archive
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Maintain message partitions and archive")
+    parser.add_argument("--months-ahead", type=int, default=settings.MESSAGE_PARTITION_MONTHS_AHEAD)
+    parser.add_argument("--retention-days", type=int, default=settings.MESSAGE_RETENTION_DAYS)
+    parser.add_argument("--batch-size", type=int, default=settings.MESSAGE_ARCHIVE_BATCH_SIZE)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        created = message_archive.ensure_partitions(db, months_ahead=args.months_ahead)
+        print(f"Created {created} message partition(s).")
+
+        total = 0
+        while True:
+            archived = message_archive.archive_completed_sessions(
+                db, retention_days=args.retention_days, batch_size=args.batch_size
+            )
+            total += archived
+            if archived < args.batch_size:
+                break
+        print(f"Archived messages of {total} session(s).")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except Exception as e:
+        print(f"Error: {e}")
+        sys.exit(1)
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Learning session maintenance job.
+Completes active sessions that have been idle for too long, then runs the
+queued post-session follow-ups (message counts, subject progress and, with
+SESSION_SUMMARY_ENABLED, parent summaries).
+Intended to run periodically (e.g. every 5 minutes from cron).
+
+Usage:
+    python maintain_sessions.py [--idle-minutes N] [--batch-size N] [--follow-up-batch-size N]
+"""
+
+import os
+import sys
+import argparse
+import asyncio
+
+# Add parent directory to path so we can import app modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.services import session_lifecycle
+from app.services.usage import usage_tracker
+
+
+async def run_follow_ups(db, batch_size: int) -> int:
+    """Process due follow-ups until none are left."""
+    llm = None
+    if settings.SESSION_SUMMARY_ENABLED:
+        from app.services.llm import get_llm_client
+        llm = get_llm_client()
+    total = 0
+    while True:
+        claimed = await session_lifecycle.process_follow_ups(db, batch_size=batch_size, llm=llm)
+        total += claimed
+        if claimed < batch_size:
+            return total
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Complete idle learning sessions and run their follow-ups")
+    parser.add_argument("--idle-minutes", type=int, default=settings.SESSION_IDLE_MINUTES)
+    parser.add_argument("--batch-size", type=int, default=settings.SESSION_REAP_BATCH_SIZE)
+    parser.add_argument("--follow-up-batch-size", type=int, default=settings.SESSION_FOLLOW_UP_BATCH_SIZE)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        completed = session_lifecycle.complete_idle_sessions(
+            db, idle_minutes=args.idle_minutes, batch_size=args.batch_size
+        )
+        print(f"Completed {completed} idle session(s).")
+
+        processed = asyncio.run(run_follow_ups(db, args.follow_up_batch_size))
+        print(f"Processed {processed} session follow-up(s).")
+    finally:
+        db.close()
+        # Write out the LLM usage of the summaries
+        usage_tracker.stop()
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except Exception as e:
+        print(f"Error: {e}")
+        sys.exit(1)
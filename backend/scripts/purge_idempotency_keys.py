@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Idempotency key cleanup job.
+Deletes stored POST responses older than IDEMPOTENCY_TTL_SECONDS. Expired keys
+are already ignored and reclaimed by new requests; this only reclaims space.
+Intended to run periodically (e.g. hourly from cron).
+
+Usage:
+    python purge_idempotency_keys.py [--batch-size N]
+"""
+
+import os
+import sys
+import argparse
+
+# Add parent directory to path so we can import app modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import crud
+from app.db.session import SessionLocal
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Delete expired idempotency keys")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        total = 0
+        while True:
+            deleted = crud.idempotency_key.remove_expired(db, batch_size=args.batch_size)
+            total += deleted
+            if deleted < args.batch_size:
+                break
+        print(f"Deleted {total} expired idempotency key(s).")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except Exception as e:
+        print(f"Error: {e}")
+        sys.exit(1)
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Skill estimate rebuild job.
+Replays every graded answer with the given update parameters and replaces all
+skill estimates, e.g. after changing the SKILL_* settings. Set the new values
+in the environment (or .env) as well, so incremental updates continue with them.
+
+Usage:
+    python recompute_skills.py [--k-initial X] [--k-min X] [--k-decay X]
+"""
+
+import os
+import sys
+import time
+import argparse
+
+# Add parent directory to path so we can import app modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.services import skill
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Rebuild skill estimates from answer history")
+    parser.add_argument("--k-initial", type=float, default=settings.SKILL_K_INITIAL)
+    parser.add_argument("--k-min", type=float, default=settings.SKILL_K_MIN)
+    parser.add_argument("--k-decay", type=float, default=settings.SKILL_K_DECAY)
+    args = parser.parse_args()
+
+    params = skill.SkillParams(args.k_initial, args.k_min, args.k_decay)
+    db = SessionLocal()
+    try:
+        start = time.perf_counter()
+        written = skill.recompute_all(db, params=params)
+        print(f"Rebuilt {written} skill estimate(s) in {time.perf_counter() - start:.2f} s.")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except Exception as e:
+        print(f"Error: {e}")
+        sys.exit(1)
@@ -4,6 +4,7 @@ setup(
     name="ai_teacher",
     version="0.1.0",
     packages=find_packages(),
+    package_data={"app": ["prompts/*.txt", "safety/*.txt"]},
     install_requires=[
         "fastapi",
         "uvicorn",
@@ -15,6 +16,8 @@ setup(
         "python-multipart",
         "pydantic",
         "email-validator",
-        "python-dotenv"
+        "python-dotenv",
+        "zstandard",
+        "numpy"
     ],
 )
@@ -0,0 +1,172 @@
+"""
+Integration tests for admin bulk provisioning endpoints.
+"""
+import json
+import uuid
+from datetime import datetime
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.api.deps import get_current_active_superuser, get_db
+from app.core.config import settings
+from app.models.user import User
+from app.services import provisioning
+
+
+@pytest.fixture(scope="function")
+def mock_superuser(app: FastAPI):
+    """Authenticate admin endpoints as a superuser."""
+    def mock_get_current_active_superuser():
+        return User(
+            id=uuid.uuid4(),
+            email="admin@example.com",
+            name="Admin",
+            hashed_password="mock_hashed_password",
+            is_active=True,
+            is_superuser=True,
+            created_at=datetime.utcnow(),
+            updated_at=datetime.utcnow(),
+        )
+    
+    app.dependency_overrides[get_current_active_superuser] = mock_get_current_active_superuser
+    yield
+    app.dependency_overrides.pop(get_current_active_superuser, None)
+
+
+def read_ndjson(content: bytes) -> list:
+    """Helper function to decode a streamed NDJSON response."""
+    return [json.loads(line) for line in content.decode().splitlines() if line]
+
+
+def test_bulk_provision_users_and_children(client: TestClient, db: Session, mock_superuser) -> None:
+    """Test bulk upserting parents from NDJSON and creating children from CSV."""
+    school = uuid.uuid4().hex[:8]
+    first, second = f"p1-{school}@example.com", f"p2-{school}@example.com"
+    upload = "\n".join([
+        json.dumps({"email": first, "name": "Parent One", "password": "password-1"}),
+        json.dumps({"email": second, "name": "Parent Two", "password": "password-2"}),
+        json.dumps({"email": first, "name": "Duplicate", "password": "password-3"}),
+        json.dumps({"email": "not-an-email", "name": "Bad", "password": "password-4"}),
+    ])
+    response = client.post(
+        f"{settings.API_V1_PREFIX}/admin/users/bulk",
+        content=upload,
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+    
+    # Verify per-row results and summary
+    assert response.status_code == 200
+    results = read_ndjson(response.content)
+    by_line = {r["line"]: r for r in results if "line" in r}
+    assert by_line[1]["status"] == "created"
+    assert by_line[2]["status"] == "created"
+    assert by_line[3]["detail"] == "Duplicate email in upload"
+    assert by_line[4]["status"] == "error"
+    summary = results[-1]["summary"]
+    assert summary["rows"] == 4
+    assert summary["created"] == 2
+    assert summary["failed"] == 2
+    assert summary["rows_per_second"] > 0
+    
+    # Re-uploading an account updates it and keeps the password
+    response2 = client.post(
+        f"{settings.API_V1_PREFIX}/admin/users/bulk",
+        content=json.dumps({"email": first, "name": "Renamed", "password": "other-password"}),
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+    assert read_ndjson(response2.content)[0]["status"] == "updated"
+    login = client.post(
+        f"{settings.API_V1_PREFIX}/auth/login",
+        data={"username": first, "password": "password-1"},
+    )
+    assert login.status_code == 200
+    
+    # Children are attached by parent email
+    csv_upload = (
+        "parent_email,name,grade,subjects\n"
+        f"{first},Kid One,3rd grade,Math;Science\n"
+        f"missing-{school}@example.com,Kid Two,2nd grade,Art\n"
+    )
+    response3 = client.post(
+        f"{settings.API_V1_PREFIX}/admin/children/bulk",
+        content=csv_upload,
+        headers={"Content-Type": "text/csv"},
+    )
+    results3 = read_ndjson(response3.content)
+    assert results3[0]["line"] == 2 and results3[0]["status"] == "created"
+    assert results3[1]["detail"] == "Unknown parent_email"
+    assert results3[-1]["summary"]["created"] == 1
+
+
+def test_bulk_provision_updates_only_supplied_fields(
+    app: FastAPI, client: TestClient, db: Session, mock_superuser, monkeypatch
+) -> None:
+    """Test that re-uploads keep deactivated accounts inactive, skip superusers and hash only new rows."""
+    school = uuid.uuid4().hex[:8]
+    parent = User(
+        email=f"inactive-{school}@example.com", name="Parent", hashed_password="x", is_active=False
+    )
+    admin = User(
+        email=f"admin-{school}@example.com", name="Admin", hashed_password="x", is_active=True, is_superuser=True
+    )
+    db.add_all([parent, admin])
+    db.commit()
+    hashed = []
+    hash_passwords = provisioning.hash_passwords
+    
+    def recording_hash_passwords(passwords):
+        hashed.extend(passwords)
+        return hash_passwords(passwords)
+    
+    monkeypatch.setattr(provisioning, "hash_passwords", recording_hash_passwords)
+    app.dependency_overrides[get_db] = lambda: db
+    upload = "\n".join([
+        json.dumps({"email": parent.email, "name": "Renamed", "password": "password-1"}),
+        json.dumps({"email": admin.email, "name": "Hijacked", "password": "password-2", "is_active": False}),
+        json.dumps({"email": f"new-{school}@example.com", "name": "New", "password": "password-3"}),
+    ])
+    response = client.post(
+        f"{settings.API_V1_PREFIX}/admin/users/bulk",
+        content=upload,
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+    
+    by_line = {r["line"]: r for r in read_ndjson(response.content) if "line" in r}
+    assert [by_line[line]["status"] for line in (1, 2, 3)] == ["updated", "error", "created"]
+    assert by_line[2]["detail"] == "Superuser accounts cannot be provisioned"
+    assert hashed == ["password-3"]
+    db.refresh(parent)
+    db.refresh(admin)
+    assert (parent.name, parent.is_active) == ("Renamed", False)
+    assert (admin.name, admin.is_active) == ("Admin", True)
+
+
+def test_bulk_provision_reports_unexpected_errors(
+    client: TestClient, mock_superuser, monkeypatch
+) -> None:
+    """Test that an unexpected error ends the stream with an error line."""
+    def upsert_many(db, rows):
+        raise RuntimeError("boom")
+    
+    monkeypatch.setattr(provisioning.crud.user, "upsert_many", upsert_many)
+    response = client.post(
+        f"{settings.API_V1_PREFIX}/admin/users/bulk",
+        content=json.dumps({"email": "parent@example.com", "name": "Parent", "password": "password-1"}),
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+    
+    assert response.status_code == 200
+    assert list(read_ndjson(response.content)[-1]) == ["error"]
+
+
+def test_bulk_provision_rejects_unknown_content_type(client: TestClient, mock_superuser) -> None:
+    """Test that uploads other than NDJSON or CSV are rejected."""
+    response = client.post(
+        f"{settings.API_V1_PREFIX}/admin/users/bulk",
+        content="<users/>",
+        headers={"Content-Type": "application/xml"},
+    )
+    assert response.status_code == 415
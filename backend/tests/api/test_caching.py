@@ -0,0 +1,37 @@
+"""
+Unit tests for the conditional GET helpers.
+"""
+from datetime import datetime
+from uuid import uuid4
+
+from app.api.caching import compute_etag, etag_matches, not_modified
+
+
+def test_compute_etag_is_stable_and_quoted() -> None:
+    """Test that equal version components give the same strong ETag."""
+    id = uuid4()
+    updated_at = datetime(2025, 1, 1, 12, 0, 0, 123456)
+    etag = compute_etag(id, updated_at)
+    assert etag == compute_etag(id, updated_at)
+    assert etag.startswith('"') and etag.endswith('"')
+    assert etag != compute_etag(id, updated_at.replace(microsecond=123457))
+
+
+def test_etag_matches() -> None:
+    """Test If-None-Match parsing, including lists, weak tags and the wildcard."""
+    etag = compute_etag("a", 1)
+    assert etag_matches(etag, etag)
+    assert etag_matches(f'"other", {etag}', etag)
+    assert etag_matches(f"W/{etag}", etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches(None, etag)
+    assert not etag_matches('"other"', etag)
+
+
+def test_not_modified_response() -> None:
+    """Test that a 304 carries the validators and no body."""
+    response = not_modified('"abc"', "private, no-cache")
+    assert response.status_code == 304
+    assert response.body == b""
+    assert response.headers["ETag"] == '"abc"'
+    assert response.headers["Cache-Control"] == "private, no-cache"
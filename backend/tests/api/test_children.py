@@ -1,13 +1,22 @@
 """
 Integration tests for child profile API endpoints.
 """
+import csv
+import gzip
+import io
+import json
+from datetime import datetime, timedelta
+
 import pytest
+from fastapi import FastAPI
 from fastapi.testclient import TestClient
 from sqlalchemy.orm import Session
 from uuid import uuid4
 
 from app import crud
+from app.api.deps import get_read_db
 from app.core.config import settings
+from app.models.session import Session as LearningSession
 from app.schemas.user import UserCreate
 from app.schemas.child import ChildCreate
 
@@ -339,3 +348,226 @@ def test_delete_child(client: TestClient, db: Session) -> None:
         headers=headers,
     )
     assert get_response2.status_code == 404
+
+
+def test_patch_child_preferences(client: TestClient, db: Session) -> None:
+    """Test partially updating child preferences and filtering by them."""
+    # Create parent user through the API
+    user_data = create_test_user(client)
+    headers = get_auth_headers(client, user_data["email"], user_data["password"])
+    
+    # Create a child with preferences
+    child_data = {
+        "name": "Patch Test Child",
+        "grade": "3rd grade",
+        "subjects": ["Math"],
+        "preferences": {"response_style": "concise", "examples_type": "abstract"},
+    }
+    response = client.post(
+        f"{settings.API_V1_PREFIX}/children/",
+        headers=headers,
+        json=child_data,
+    )
+    child_id = response.json()["id"]
+    
+    # Set one key, remove another, keep the rest
+    response2 = client.patch(
+        f"{settings.API_V1_PREFIX}/children/{child_id}/preferences",
+        headers=headers,
+        json={"response_style": "detailed", "examples_type": None, "pace": "slow"},
+    )
+    
+    # Verify response
+    assert response2.status_code == 200
+    assert response2.json()["preferences"] == {"response_style": "detailed", "pace": "slow"}
+    
+    # Filter children by preference
+    response3 = client.get(
+        f"{settings.API_V1_PREFIX}/children/",
+        headers=headers,
+        params={"preference": "response_style=detailed"},
+    )
+    assert response3.status_code == 200
+    assert [c["id"] for c in response3.json()] == [child_id]
+    
+    response4 = client.get(
+        f"{settings.API_V1_PREFIX}/children/",
+        headers=headers,
+        params={"preference": "response_style=concise"},
+    )
+    assert response4.json() == []
+    
+    # Filter values are matched as JSON, so booleans and numbers match too
+    client.patch(
+        f"{settings.API_V1_PREFIX}/children/{child_id}/preferences",
+        headers=headers,
+        json={"show_hints": True, "level": 3},
+    )
+    response5 = client.get(
+        f"{settings.API_V1_PREFIX}/children/",
+        headers=headers,
+        params={"preference": ["show_hints=true", "level=3", "pace=slow"]},
+    )
+    assert [c["id"] for c in response5.json()] == [child_id]
+    
+    response6 = client.get(
+        f"{settings.API_V1_PREFIX}/children/",
+        headers=headers,
+        params={"preference": 'level="3"'},
+    )
+    assert response6.json() == []
+    
+    # Another parent cannot patch the child
+    other_user = create_test_user(client)
+    other_headers = get_auth_headers(client, other_user["email"], other_user["password"])
+    response7 = client.patch(
+        f"{settings.API_V1_PREFIX}/children/{child_id}/preferences",
+        headers=other_headers,
+        json={"response_style": "concise"},
+    )
+    assert response7.status_code == 404
+
+
+def test_conditional_get_child(client: TestClient, db: Session) -> None:
+    """Test ETag revalidation of a child profile and the children list."""
+    # Create parent user and child through the API
+    user_data = create_test_user(client)
+    headers = get_auth_headers(client, user_data["email"], user_data["password"])
+    response = client.post(
+        f"{settings.API_V1_PREFIX}/children/",
+        headers=headers,
+        json={"name": "ETag Test Child", "grade": "2nd grade", "subjects": ["Reading"]},
+    )
+    child_id = response.json()["id"]
+    
+    # First fetch returns the body with validators
+    response2 = client.get(f"{settings.API_V1_PREFIX}/children/{child_id}", headers=headers)
+    assert response2.status_code == 200
+    etag = response2.headers["ETag"]
+    assert response2.headers["Cache-Control"] == "private, no-cache"
+    
+    # Revalidating an unchanged profile returns an empty 304
+    response3 = client.get(
+        f"{settings.API_V1_PREFIX}/children/{child_id}",
+        headers={**headers, "If-None-Match": etag},
+    )
+    assert response3.status_code == 304
+    assert response3.content == b""
+    assert response3.headers["ETag"] == etag
+    
+    list_response = client.get(f"{settings.API_V1_PREFIX}/children/", headers=headers)
+    list_etag = list_response.headers["ETag"]
+    response4 = client.get(
+        f"{settings.API_V1_PREFIX}/children/",
+        headers={**headers, "If-None-Match": list_etag},
+    )
+    assert response4.status_code == 304
+    
+    # An update changes both ETags
+    client.put(
+        f"{settings.API_V1_PREFIX}/children/{child_id}",
+        headers=headers,
+        json={"grade": "3rd grade"},
+    )
+    response5 = client.get(
+        f"{settings.API_V1_PREFIX}/children/{child_id}",
+        headers={**headers, "If-None-Match": etag},
+    )
+    assert response5.status_code == 200
+    assert response5.headers["ETag"] != etag
+    response6 = client.get(
+        f"{settings.API_V1_PREFIX}/children/",
+        headers={**headers, "If-None-Match": list_etag},
+    )
+    assert response6.status_code == 200
+    
+    # Another parent gets a 404, not a 304
+    other_user = create_test_user(client)
+    other_headers = get_auth_headers(client, other_user["email"], other_user["password"])
+    response7 = client.get(
+        f"{settings.API_V1_PREFIX}/children/{child_id}",
+        headers={**other_headers, "If-None-Match": etag},
+    )
+    assert response7.status_code == 404
+
+
+def test_export_child_history(client: TestClient, db: Session) -> None:
+    """Test streaming a child's history as NDJSON and gzip-compressed CSV."""
+    # Create parent user and child through the API
+    user_data = create_test_user(client)
+    headers = get_auth_headers(client, user_data["email"], user_data["password"])
+    response = client.post(
+        f"{settings.API_V1_PREFIX}/children/",
+        headers=headers,
+        json={"name": "Export Test Child", "grade": "4th grade", "subjects": ["Math", "Science"]},
+    )
+    child_id = response.json()["id"]
+    
+    # NDJSON starts with the child's profile
+    response2 = client.get(f"{settings.API_V1_PREFIX}/children/{child_id}/export", headers=headers)
+    assert response2.status_code == 200
+    assert response2.headers["Content-Type"].startswith("application/x-ndjson")
+    assert "attachment" in response2.headers["Content-Disposition"]
+    records = [json.loads(line) for line in response2.text.splitlines()]
+    assert records[0]["type"] == "child"
+    assert records[0]["id"] == child_id
+    assert records[0]["subjects"] == ["Math", "Science"]
+    
+    # CSV can be gzip-compressed
+    response3 = client.get(
+        f"{settings.API_V1_PREFIX}/children/{child_id}/export",
+        headers=headers,
+        params={"format": "csv", "gzip": True},
+    )
+    assert response3.status_code == 200
+    rows = list(csv.DictReader(io.StringIO(gzip.decompress(response3.content).decode())))
+    assert rows[0]["type"] == "child"
+    assert rows[0]["subjects"] == "Math;Science"
+    
+    # Another parent gets a 404
+    other_user = create_test_user(client)
+    other_headers = get_auth_headers(client, other_user["email"], other_user["password"])
+    response4 = client.get(f"{settings.API_V1_PREFIX}/children/{child_id}/export", headers=other_headers)
+    assert response4.status_code == 404
+
+
+def test_current_session_and_progress(app: FastAPI, client: TestClient, db: Session) -> None:
+    """Test reading a child's active session and per-subject progress."""
+    user_data = create_test_user(client)
+    headers = get_auth_headers(client, user_data["email"], user_data["password"])
+    response = client.post(
+        f"{settings.API_V1_PREFIX}/children/",
+        headers=headers,
+        json={"name": "Session Test Child", "grade": "3rd grade", "subjects": ["Math"]},
+    )
+    child_id = response.json()["id"]
+    
+    # Nothing yet
+    assert client.get(f"{settings.API_V1_PREFIX}/children/{child_id}/sessions/current", headers=headers).status_code == 404
+    assert client.get(f"{settings.API_V1_PREFIX}/children/{child_id}/progress", headers=headers).json() == []
+    
+    started = datetime.utcnow() - timedelta(hours=1)
+    db.add_all([
+        LearningSession(subject="Math", topic="Fractions", child_id=child_id, created_at=started),
+        LearningSession(subject="Science", topic="Volcanoes", child_id=child_id, created_at=started + timedelta(minutes=5)),
+    ])
+    crud.progress.add_session(db, child_id=child_id, subject="Math", messages=12, minutes=20.0, ended_at=started)
+    db.commit()
+    # The rows are only visible in the test's transaction
+    app.dependency_overrides[get_read_db] = lambda: db
+    
+    response2 = client.get(f"{settings.API_V1_PREFIX}/children/{child_id}/sessions/current", headers=headers)
+    assert response2.status_code == 200
+    assert (response2.json()["topic"], response2.json()["status"]) == ("Volcanoes", "active")
+    
+    response3 = client.get(f"{settings.API_V1_PREFIX}/children/{child_id}/progress", headers=headers)
+    assert response3.json() == [{
+        "subject": "Math", "sessions_completed": 1, "messages": 12, "minutes": 20.0,
+        "last_session_at": started.isoformat(),
+    }]
+    
+    # Another parent gets a 404
+    other_user = create_test_user(client)
+    other_headers = get_auth_headers(client, other_user["email"], other_user["password"])
+    response4 = client.get(f"{settings.API_V1_PREFIX}/children/{child_id}/progress", headers=other_headers)
+    assert response4.status_code == 404
@@ -0,0 +1,203 @@
+"""
+Tests for Idempotency-Key handling of POST requests.
+"""
+import asyncio
+from types import SimpleNamespace
+from uuid import uuid4
+
+import httpx
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from app.api.idempotency import IdempotencyStore, request_hash
+from app.api.middleware import IdempotencyMiddleware
+from app.core import security
+from app.core.config import settings
+from app.main import create_app
+
+
+class MemoryStore(IdempotencyStore):
+    """In-memory stand-in for the database-backed store."""
+    
+    def __init__(self):
+        self.keys = {}
+    
+    def claim(self, user_id, key, digest):
+        if (user_id, key) in self.keys:
+            return None
+        stored = self.keys[(user_id, key)] = SimpleNamespace(
+            id=uuid4(), request_hash=digest, status_code=None, response_headers=None, response_body=None
+        )
+        return stored.id
+    
+    def take_over(self, user_id, key):
+        """Claim a key as if its lock had run out."""
+        self.keys[(user_id, key)].id = uuid4()
+    
+    def get(self, user_id, key):
+        return self.keys.get((user_id, key))
+    
+    def _owned(self, user_id, key, claim_id):
+        stored = self.keys.get((user_id, key))
+        return stored is not None and stored.id == claim_id
+    
+    def complete(self, user_id, key, claim_id, status_code, headers, body):
+        if self._owned(user_id, key, claim_id):
+            self.keys[(user_id, key)].__dict__.update(
+                status_code=status_code, response_headers=headers, response_body=body
+            )
+    
+    def release(self, user_id, key, claim_id):
+        if self._owned(user_id, key, claim_id):
+            del self.keys[(user_id, key)]
+
+
+def _app(store: MemoryStore):
+    """App with a POST endpoint counting its calls."""
+    calls = []
+    application = FastAPI()
+    
+    @application.post("/children/")
+    async def create_child(payload: dict):
+        calls.append(payload)
+        await asyncio.sleep(payload.get("delay", 0))
+        if payload.get("take_over"):
+            store.take_over(*next(iter(store.keys)))
+        if payload.get("fail"):
+            raise HTTPException(status_code=503, detail="Try again")
+        return {"id": len(calls), **payload}
+    
+    application.add_middleware(IdempotencyMiddleware, store=store)
+    return application, calls
+
+
+def _headers(key: str = "key-1") -> dict:
+    return {"Authorization": f"Bearer {security.create_access_token(uuid4())}", "Idempotency-Key": key}
+
+
+def test_request_hash_covers_path_query_and_body() -> None:
+    """Test that requests differing in any part get different digests."""
+    base = request_hash("POST", "/children/", b"", b"{}")
+    
+    assert request_hash("POST", "/children/", b"", b"{}") == base
+    assert request_hash("POST", "/children", b"/", b"{}") != base
+    assert request_hash("POST", "/children/", b"a=1", b"{}") != base
+    assert request_hash("POST", "/children/", b"", b"{ }") != base
+
+
+def test_retry_replays_stored_response() -> None:
+    """Test that a retried POST gets the first response without running the endpoint again."""
+    store = MemoryStore()
+    application, calls = _app(store)
+    headers = _headers()
+    
+    with TestClient(application) as client:
+        first = client.post("/children/", json={"name": "Ada"}, headers=headers)
+        retry = client.post("/children/", json={"name": "Ada"}, headers=headers)
+        reused = client.post("/children/", json={"name": "Bob"}, headers=headers)
+    
+    assert len(calls) == 1
+    assert retry.status_code == first.status_code == 200
+    assert retry.json() == first.json() == {"id": 1, "name": "Ada"}
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert "Idempotent-Replayed" not in first.headers
+    assert reused.status_code == 422
+
+
+def test_keys_are_scoped_to_users_and_need_a_token() -> None:
+    """Test that other users' keys and anonymous requests are independent."""
+    store = MemoryStore()
+    application, calls = _app(store)
+    
+    with TestClient(application) as client:
+        client.post("/children/", json={"name": "Ada"}, headers=_headers())
+        client.post("/children/", json={"name": "Ada"}, headers=_headers())
+        for _ in range(2):
+            client.post("/children/", json={"name": "Ada"}, headers={"Idempotency-Key": "key-1"})
+        too_long = client.post("/children/", json={"name": "Ada"}, headers=_headers("k" * 256))
+    
+    assert len(calls) == 4
+    assert too_long.status_code == 400
+
+
+def test_server_error_releases_key() -> None:
+    """Test that a 5xx response is not stored, so the retry runs the request again."""
+    store = MemoryStore()
+    application, calls = _app(store)
+    headers = _headers()
+    
+    with TestClient(application) as client:
+        first = client.post("/children/", json={"fail": True}, headers=headers)
+        retry = client.post("/children/", json={"fail": True}, headers=headers)
+    
+    assert first.status_code == retry.status_code == 503
+    assert len(calls) == 2
+    assert store.keys == {}
+
+
+def test_concurrent_duplicates_wait_for_first_response() -> None:
+    """Test that duplicates arriving while the first request runs get its response."""
+    store = MemoryStore()
+    application, calls = _app(store)
+    headers = _headers()
+    
+    async def send_all():
+        async with httpx.AsyncClient(app=application, base_url="http://test") as client:
+            return await asyncio.gather(*(
+                client.post("/children/", json={"name": "Ada", "delay": 0.2}, headers=headers) for _ in range(5)
+            ))
+    
+    responses = asyncio.run(send_all())
+    
+    assert len(calls) == 1
+    assert {response.json()["id"] for response in responses} == {1}
+    assert sum(response.headers.get("Idempotent-Replayed") == "true" for response in responses) == 4
+
+
+def test_taken_over_request_does_not_store_its_response() -> None:
+    """Test that a request whose claim was taken over leaves the key to the new owner."""
+    store = MemoryStore()
+    application, calls = _app(store)
+    
+    with TestClient(application) as client:
+        response = client.post("/children/", json={"take_over": True}, headers=_headers())
+    
+    assert response.status_code == 200
+    assert [stored.status_code for stored in store.keys.values()] == [None]
+
+
+def test_waiting_duplicates_leave_no_events_behind() -> None:
+    """Test that duplicates remove their wake-up events, also when they give up waiting."""
+    store = MemoryStore()
+    endpoint = FastAPI()
+    
+    @endpoint.post("/children/")
+    async def create_child():
+        await asyncio.sleep(0.2)
+        return {"id": 1}
+    
+    middleware = IdempotencyMiddleware(endpoint, store=store)
+    headers = _headers()
+    
+    async def run():
+        async with httpx.AsyncClient(app=middleware, base_url="http://test") as client:
+            await asyncio.gather(*(client.post("/children/", headers=headers) for _ in range(3)))
+        # A duplicate of a request in flight elsewhere that is not finished in time
+        await middleware._wait(uuid4(), "key-2", 0.01)
+    
+    asyncio.run(run())
+    
+    assert middleware._finished == {}
+
+
+def test_idempotency_errors_carry_cors_headers() -> None:
+    """Test that responses made by the middleware itself are readable by browser clients."""
+    origin = settings.BACKEND_CORS_ORIGINS[0]
+    
+    with TestClient(create_app(enable_ai=False)) as client:
+        response = client.post(
+            f"{settings.API_V1_PREFIX}/children/", json={}, headers={**_headers("k" * 256), "Origin": origin}
+        )
+    
+    assert response.status_code == 400
+    assert response.headers["access-control-allow-origin"] == origin
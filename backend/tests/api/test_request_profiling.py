@@ -0,0 +1,42 @@
+"""
+Tests for on-demand and sampled request profiling.
+"""
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api import middleware
+from app.core.config import settings
+from app.core.profiling import profile_store
+
+
+def test_superuser_header_profiles_request(app: FastAPI, tmp_path, monkeypatch) -> None:
+    """Test that a superuser's X-Profile request is profiled and its profile stored."""
+    monkeypatch.setattr(profile_store, "directory", tmp_path)
+    monkeypatch.setattr(middleware, "_is_superuser", lambda authorization: authorization == "Bearer admin")
+    
+    with TestClient(app) as client:
+        response = client.get("/health", headers={"X-Profile": "1", "Authorization": "Bearer admin"})
+        assert response.status_code == 200
+        profile_id = response.headers["X-Profile-Id"]
+        
+        ignored = client.get("/health", headers={"X-Profile": "1", "Authorization": "Bearer parent"})
+        assert "X-Profile-Id" not in ignored.headers
+    
+    [meta] = profile_store.list()
+    assert meta["id"] == profile_id
+    assert meta["path"] == "/health"
+    assert meta["trigger"] == "header"
+    assert meta["status_code"] == 200
+    assert profile_store.get(profile_id) is not None
+
+
+def test_sampled_profiles_without_header(app: FastAPI, tmp_path, monkeypatch) -> None:
+    """Test always-on sampling: stored profiles but no profile header on the response."""
+    monkeypatch.setattr(profile_store, "directory", tmp_path)
+    monkeypatch.setattr(settings, "PROFILE_SAMPLE_RATE", 1.0)
+    
+    with TestClient(app) as client:
+        response = client.get("/health")
+    
+    assert "X-Profile-Id" not in response.headers
+    assert [meta["trigger"] for meta in profile_store.list()] == ["sampled"]
@@ -0,0 +1,142 @@
+"""
+Tests for the tutoring chat endpoints over HTTP and WebSocket.
+"""
+import asyncio
+from types import SimpleNamespace
+from typing import Any, AsyncIterator, Dict, List
+from uuid import uuid4
+
+import pytest
+from fastapi import FastAPI, WebSocketDisconnect
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketState
+
+from app.api.api_v1.endpoints import tutor
+from app.core.config import settings
+from app.db.write_behind import write_buffer
+from app.services.llm import get_llm_client
+from app.services.tutor import TutorContext
+
+
+class FakeLLMClient:
+    """LLM client replying with a fixed token stream and recording prompts."""
+    
+    def __init__(self, tokens: List[str]):
+        self.tokens = tokens
+        self.prompts: List[List[Dict[str, str]]] = []
+    
+    async def chat(self, messages: List[Dict[str, str]], **kwargs: Any) -> Dict[str, Any]:
+        self.prompts.append(messages)
+        return {"choices": [{"message": {"role": "assistant", "content": "".join(self.tokens)}}]}
+    
+    async def stream_chat(self, messages: List[Dict[str, str]], **kwargs: Any) -> AsyncIterator[str]:
+        self.prompts.append(messages)
+        for token in self.tokens:
+            yield token
+
+
+@pytest.fixture(scope="function")
+def fake_llm(app: FastAPI):
+    """Replace the LLM client dependency with a fake."""
+    llm = FakeLLMClient(["Lava ", "rises ", "because ", "of ", "pressure."])
+    app.dependency_overrides[get_llm_client] = lambda: llm
+    yield llm
+    app.dependency_overrides.pop(get_llm_client, None)
+
+
+def test_websocket_streams_reply_and_keeps_context(app: FastAPI, fake_llm, monkeypatch) -> None:
+    """Test that a connection authenticates once, streams replies and persists in the background."""
+    session_id = uuid4()
+    opened: List[str] = []
+    written: List[Dict[str, Any]] = []
+    
+    def fake_open_connection(token: str, sid):
+        opened.append(token)
+        return TutorContext(sid, "You are a tutor.")
+    
+    monkeypatch.setattr(tutor, "_open_connection", fake_open_connection)
+    monkeypatch.setattr(
+        write_buffer, "_write", lambda groups: written.extend(row for _, rows in groups for row in rows)
+    )
+    monkeypatch.setattr(settings, "TUTOR_WS_FLUSH_CHARS", 10)
+    monkeypatch.setattr(settings, "TUTOR_WS_FLUSH_INTERVAL_MS", 10_000)
+    
+    with TestClient(app) as client:
+        with client.websocket_connect(
+            f"{settings.API_V1_PREFIX}/sessions/{session_id}/ws?token=abc"
+        ) as websocket:
+            assert websocket.receive_json() == {"type": "ready", "session_id": str(session_id)}
+            
+            for question in ("Why do volcanoes erupt?", "And why is lava hot?"):
+                websocket.send_json({"type": "message", "content": question})
+                tokens = []
+                while (frame := websocket.receive_json())["type"] == "token":
+                    tokens.append(frame["content"])
+                assert frame["type"] == "done"
+                # Small tokens are coalesced into fewer frames
+                assert "".join(tokens) == "Lava rises because of pressure."
+                assert len(tokens) < len(fake_llm.tokens)
+            
+            websocket.send_json({"type": "ping"})
+            assert websocket.receive_json() == {"type": "pong"}
+    
+    # Authenticated once, and the second prompt includes the first turn
+    assert opened == ["abc"]
+    assert [m["role"] for m in fake_llm.prompts[1]] == ["system", "user", "assistant", "user"]
+    # Each "done" frame was sent after its turn was written
+    assert [row["role"] for row in written] == ["user", "assistant", "user", "assistant"]
+    assert str(written[-1]["id"]) == frame["message_id"]
+
+
+def test_websocket_rejects_invalid_token(app: FastAPI, fake_llm) -> None:
+    """Test that a connection with an invalid token is closed after an error frame."""
+    with TestClient(app) as client:
+        with client.websocket_connect(
+            f"{settings.API_V1_PREFIX}/sessions/{uuid4()}/ws?token=not-a-jwt"
+        ) as websocket:
+            frame = websocket.receive_json()
+            assert frame["type"] == "error"
+            assert frame["detail"] == "Could not validate credentials"
+
+
+def test_websocket_replaces_blocked_reply(app: FastAPI, fake_llm, monkeypatch) -> None:
+    """Test that a term split across tokens is caught and the reply replaced before "done"."""
+    written: List[Dict[str, Any]] = []
+    fake_llm.tokens = ["Great question! ", "But don't te", "ll your par", "ents ", "about this."]
+    monkeypatch.setattr(tutor, "_open_connection", lambda token, sid: TutorContext(sid, "You are a tutor."))
+    monkeypatch.setattr(
+        write_buffer, "_write", lambda groups: written.extend(row for _, rows in groups for row in rows)
+    )
+    
+    with TestClient(app) as client:
+        with client.websocket_connect(
+            f"{settings.API_V1_PREFIX}/sessions/{uuid4()}/ws?token=abc"
+        ) as websocket:
+            websocket.receive_json()
+            websocket.send_json({"type": "message", "content": "Tell me a secret"})
+            frames = []
+            while (frame := websocket.receive_json())["type"] != "done":
+                frames.append(frame)
+    
+    streamed = "".join(f["content"] for f in frames if f["type"] == "token")
+    assert "don't" not in streamed
+    assert frames[-1] == {"type": "replace", "content": settings.SAFETY_FALLBACK_REPLY}
+    assert written[-1]["content"] == settings.SAFETY_FALLBACK_REPLY
+
+
+@pytest.mark.parametrize("state, expected", [
+    (WebSocketState.DISCONNECTED, WebSocketDisconnect),
+    (WebSocketState.CONNECTED, RuntimeError),
+])
+def test_send_treats_only_closed_socket_errors_as_disconnects(state, expected) -> None:
+    """Test that a RuntimeError from a send counts as a disconnect only once the socket is closed."""
+    async def send_json(frame):
+        raise RuntimeError("Cannot call \"send\" once a close message has been sent.")
+    
+    websocket = SimpleNamespace(
+        send_json=send_json, client_state=WebSocketState.CONNECTED, application_state=state
+    )
+    connection = tutor.TutorConnection(websocket, TutorContext(uuid4(), "You are a tutor."), FakeLLMClient([]))
+    
+    with pytest.raises(expected):
+        asyncio.run(connection.send({"type": "ping"}))
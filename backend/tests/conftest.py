@@ -19,7 +19,7 @@ load_dotenv('.env.test')
 from app.core.config import settings
 from app.db.session import Base, get_db
 from app.main import app as app_instance
-from app.api.deps import get_current_user
+from app.api.deps import get_current_read_user, get_current_user
 
 # Use the test database URI from .env.test
 TEST_SQLALCHEMY_DATABASE_URI = settings.SQLALCHEMY_DATABASE_URI
@@ -120,6 +120,7 @@ def mock_current_user(app):
         return user
     
     app.dependency_overrides[get_current_user] = mock_get_current_user
+    app.dependency_overrides[get_current_read_user] = mock_get_current_user
     
     yield
     
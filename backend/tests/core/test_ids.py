@@ -0,0 +1,44 @@
+"""
+Unit tests for time-ordered UUID generation.
+"""
+import time
+import uuid
+
+from app.core import ids
+from app.core.ids import uuid7, uuid7_timestamp
+from app.models.user import User
+
+
+def test_uuid7_version_and_variant() -> None:
+    """Test that generated ids are valid RFC 9562 version 7 UUIDs."""
+    value = uuid7()
+    
+    assert isinstance(value, uuid.UUID)
+    assert value.version == 7
+    assert value.variant == uuid.RFC_4122
+
+
+def test_uuid7_is_monotonic() -> None:
+    """Test that ids generated in a tight loop are unique and strictly increasing."""
+    ids = [uuid7() for _ in range(20000)]
+    
+    assert len(set(ids)) == len(ids)
+    assert ids == sorted(ids)
+
+
+def test_uuid7_embeds_timestamp(monkeypatch) -> None:
+    """Test that the embedded timestamp is the generation time."""
+    # Earlier bursts may have borrowed milliseconds ahead of the clock
+    monkeypatch.setattr(ids, "_last_ms", 0)
+    before = time.time()
+    value = uuid7()
+    after = time.time()
+    
+    assert before - 0.001 <= uuid7_timestamp(value) <= after + 0.001
+
+
+def test_base_model_uses_uuid7() -> None:
+    """Test that the shared Base model generates UUIDv7 primary keys."""
+    default = User.__table__.c.id.default
+    
+    assert default.arg.__name__ == "uuid7"
@@ -0,0 +1,38 @@
+"""
+Unit tests for lazy imports of heavy optional dependencies.
+"""
+import sys
+
+import pytest
+
+from app.core.lazy import LazyModule, is_loaded, lazy_import
+
+
+def test_lazy_import_defers_until_first_use(tmp_path, monkeypatch) -> None:
+    """Test that the module is only executed on first attribute access."""
+    (tmp_path / "heavy_fake_dep.py").write_text("LOADED = True\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.delitem(sys.modules, "heavy_fake_dep", raising=False)
+    
+    module = lazy_import("heavy_fake_dep")
+    
+    assert isinstance(module, LazyModule)
+    assert not is_loaded(module)
+    assert "heavy_fake_dep" not in sys.modules
+    
+    assert module.LOADED is True
+    assert is_loaded(module)
+    assert "heavy_fake_dep" in sys.modules
+
+
+def test_lazy_import_returns_loaded_module() -> None:
+    """Test that already imported modules are returned as is."""
+    assert lazy_import("json") is sys.modules["json"]
+
+
+def test_lazy_import_missing_dependency() -> None:
+    """Test that a missing dependency fails on use with an install hint."""
+    module = lazy_import("definitely_not_installed_dep", install_hint="not-installed==1.0")
+    
+    with pytest.raises(ImportError, match="pip install not-installed==1.0"):
+        module.anything
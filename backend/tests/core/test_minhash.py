@@ -0,0 +1,47 @@
+"""
+Unit tests for MinHash signatures, LSH buckets and the Bloom filter.
+"""
+from uuid import uuid4
+
+from app.core.bloom import BloomFilter
+from app.core.minhash import LSH_BANDS, NUM_PERMUTATIONS, lsh_buckets, shingles, signature, similarity
+
+
+def test_shingles_ignore_case_and_punctuation() -> None:
+    """Test that formatting differences do not change the shingle set."""
+    assert shingles("Which planet is closest to the Sun?") == shingles("which planet is closest to the sun")
+    assert shingles("2+2") == {"2 2"}
+
+
+def test_near_duplicates_are_similar_and_share_buckets() -> None:
+    """Test that reworded questions score high and share an LSH bucket, unrelated ones do not."""
+    a = signature("What is 3/4 plus 1/4? Choose the correct answer.")
+    b = signature("What is 3/4 plus 1/4? Choose the right answer.")
+    c = signature("Which planet is closest to the sun?")
+    
+    assert len(a) == NUM_PERMUTATIONS
+    assert similarity(a, a) == 1.0
+    assert similarity(a, b) >= 0.6
+    assert similarity(a, c) < 0.2
+    assert len(lsh_buckets(a)) == LSH_BANDS
+    assert set(lsh_buckets(a)) & set(lsh_buckets(b))
+    assert not set(lsh_buckets(a)) & set(lsh_buckets(c))
+
+
+def test_signature_is_deterministic() -> None:
+    """Test that signatures are stable, since they are stored in the bank."""
+    assert signature("What is 7 times 8?") == signature("What is 7 times 8?")
+    assert all(0 <= value < 2 ** 32 for value in signature("What is 7 times 8?"))
+
+
+def test_bloom_filter_has_no_false_negatives() -> None:
+    """Test membership of added keys, the false positive rate and serialization."""
+    bloom = BloomFilter(1000, 0.01)
+    added = [str(uuid4()) for _ in range(1000)]
+    for key in added:
+        bloom.add(key)
+    
+    restored = BloomFilter(1000, 0.01, bloom.to_bytes())
+    assert all(key in restored for key in added)
+    false_positives = sum(str(uuid4()) in restored for _ in range(10000))
+    assert false_positives < 300
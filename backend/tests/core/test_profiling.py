@@ -0,0 +1,58 @@
+"""
+Unit tests for the request profiler's stack sampler and profile store.
+"""
+import os
+import threading
+import time
+from collections import Counter
+
+from app.core import profiling
+from app.core.profiling import IDLE_STACK, ProfileStore, StackSampler, to_collapsed
+
+
+def busy_wait(seconds: float) -> None:
+    """Helper function that keeps the calling thread on-CPU in application code."""
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def test_sampler_records_application_stacks(monkeypatch) -> None:
+    """Test that samples of the watched thread name the running function, outermost first."""
+    # Treat this test module as application code
+    monkeypatch.setattr(profiling, "APP_ROOT", os.path.dirname(__file__))
+    sampler = StackSampler(threading.get_ident(), interval_ms=1)
+    sampler.start()
+    busy_wait(0.1)
+    stacks = sampler.stop()
+    
+    assert sampler.samples > 10
+    busy = [stack for stack in stacks if "busy_wait (" in stack]
+    assert busy and all(stack.startswith("loop;") for stack in busy)
+    assert busy[0].index("test_sampler_records_application_stacks") < busy[0].index("busy_wait")
+
+
+def test_sampler_marks_idle_loop() -> None:
+    """Test that a watched thread outside application code is recorded as idle."""
+    done = threading.Event()
+    thread = threading.Thread(target=done.wait)
+    thread.start()
+    sampler = StackSampler(thread.ident, interval_ms=1)
+    sampler.sample()
+    done.set()
+    thread.join()
+    
+    assert sampler.stacks == Counter({"loop;" + IDLE_STACK: 1})
+
+
+def test_store_keeps_newest_profiles(tmp_path) -> None:
+    """Test saving, listing newest first, fetching, pruning and rejecting odd IDs."""
+    store = ProfileStore(str(tmp_path), max_stored=2)
+    for profile_id in ("0001", "0002", "0003"):
+        store.save(profile_id, Counter({"loop;a (app/x.py);b (app/y.py)": 3, "loop;(idle)": 1}), {"path": "/"})
+    
+    assert [meta["id"] for meta in store.list()] == ["0003", "0002"]
+    assert store.get("0001") is None
+    assert store.get("0003") == "loop;a (app/x.py);b (app/y.py) 3\nloop;(idle) 1\n"
+    assert store.get("../0003") is None
+    assert to_collapsed(Counter()) == ""
@@ -0,0 +1,101 @@
+"""
+Unit tests for the memory-mapped vector index.
+"""
+import threading
+
+import numpy as np
+
+from app.core.vector_index import VectorIndex, normalize
+
+
+def _clustered(count: int, dim: int = 32) -> np.ndarray:
+    rng = np.random.default_rng(0)
+    centers = rng.standard_normal((20, dim))
+    return centers[rng.integers(0, 20, count)] + 0.3 * rng.standard_normal((count, dim))
+
+
+def _exact(vectors: np.ndarray, query: np.ndarray, k: int) -> set:
+    scores = normalize(vectors) @ normalize(query)
+    return set(np.argsort(-scores)[:k].tolist())
+
+
+def test_search_matches_brute_force(tmp_path) -> None:
+    """Test that searching all lists finds the exact neighbours, and a few lists most of them."""
+    vectors, queries = np.split(_clustered(2020), [2000])
+    docs = [{"i": i} for i in range(len(vectors))]
+    index = VectorIndex.create(tmp_path, vectors, docs, nlist=16, dtype="float32")
+
+    assert len(index) == 2000
+    recall = 0
+    for query in queries:
+        expected = _exact(vectors, query, 10)
+        exhaustive = index.search(query, 10, nprobe=16)
+        assert {index.doc(row)["i"] for _, row in exhaustive} == expected
+        assert [score for score, _ in exhaustive] == sorted((score for score, _ in exhaustive), reverse=True)
+        recall += len(expected & {index.doc(row)["i"] for _, row in index.search(query, 10, nprobe=4)})
+    assert recall / (10 * len(queries)) >= 0.9
+
+
+def test_added_vectors_are_found_before_and_after_compact(tmp_path) -> None:
+    """Test that appended rows are searchable right away and keep their payloads through compact."""
+    vectors, extra = np.split(_clustered(510), [500])
+    index = VectorIndex.create(tmp_path, vectors, [{"i": i} for i in range(500)], nlist=8)
+    index.add(extra, [{"text": f"new {i}"} for i in range(10)])
+
+    assert len(index) == 510
+    score, row = index.search(extra[3], 1, nprobe=8)[0]
+    assert index.doc(row) == {"text": "new 3"}
+    assert score > 0.99
+
+    index.compact()
+    assert index.meta["sorted_count"] == 510
+    score, row = index.search(extra[3], 1, nprobe=8)[0]
+    assert index.doc(row) == {"text": "new 3"}
+    assert sorted(path.name.split(".")[1] for path in tmp_path.glob("vectors.*")) == ["2"]
+
+
+def test_other_readers_see_writes(tmp_path) -> None:
+    """Test that a second process-like reader picks up adds, compaction and extra metadata."""
+    vectors, extra = np.split(_clustered(301), [300])
+    writer = VectorIndex.create(tmp_path, vectors, [{"i": i} for i in range(300)], nlist=4)
+    reader = VectorIndex(tmp_path)
+
+    writer.add(extra, [{"i": "added"}])
+    writer.update_meta(answers_until="2026-10-01T00:00:00")
+    writer.compact()
+
+    _, row = reader.search(extra[0], 1, nprobe=4)[0]
+    assert reader.doc(row) == {"i": "added"}
+    assert len(reader) == 301
+    assert reader.meta["answers_until"] == "2026-10-01T00:00:00"
+
+
+def test_searches_stay_consistent_while_the_index_changes(tmp_path) -> None:
+    """Test that threads searching a shared reader during adds and compactions see one generation each."""
+    vectors, extra = np.split(_clustered(400), [300])
+    writer = VectorIndex.create(tmp_path, vectors, [{"i": i} for i in range(300)], nlist=4)
+    reader = VectorIndex(tmp_path)
+    errors, stop = [], threading.Event()
+
+    def search():
+        while not stop.is_set():
+            try:
+                for query in extra[:5]:
+                    reader.search_docs(query, 5, nprobe=4)
+            except Exception as exc:
+                errors.append(exc)
+                return
+
+    threads = [threading.Thread(target=search) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for start in range(0, 100, 10):
+        writer.add(extra[start:start + 10], [{"i": f"added {start + i}"} for i in range(10)])
+        writer.compact()
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    score, doc = reader.search_docs(extra[42], 1, nprobe=4)[0]
+    assert doc == {"i": "added 42"}
@@ -0,0 +1,42 @@
+"""
+Unit tests for question bank CRUD operations.
+"""
+from uuid import uuid4
+
+from sqlalchemy.orm import Session
+
+from app import crud
+from app.core.minhash import lsh_buckets, signature
+from app.services.question_bank import content_hash
+
+
+def bank_row(topic: str, text: str, answer: str) -> dict:
+    """Helper function to build the column values of a bank question."""
+    sig = signature(text)
+    return {
+        "subject": "Math", "topic": topic, "grade": "3rd grade", "difficulty": "easy",
+        "text": text, "type": "open_ended", "options": None, "correct_answer": answer,
+        "content_hash": content_hash(text, answer), "minhash": sig, "lsh_buckets": lsh_buckets(sig),
+        "quality": 0.5, "times_served": 0, "is_active": True, "source": "llm",
+    }
+
+
+def test_create_many_skips_exact_duplicates(db: Session) -> None:
+    """Test that rows whose content hash is already in the topic return the existing question instead."""
+    topic = f"Fractions {uuid4()}"
+    
+    first = crud.question_bank.create_many(db, rows=[bank_row(topic, "What is 1/2 + 1/2?", "1")])
+    second = crud.question_bank.create_many(db, rows=[
+        bank_row(topic, "what is  1/2 + 1/2? ", " 1"),
+        bank_row(topic, "What is 1/2 + 1/4?", "3/4"),
+        bank_row(f"{topic} again", "What is 1/2 + 1/2?", "1"),
+    ])
+    
+    assert first[0] is not None
+    assert second[0] == first[0]
+    assert len({first[0], second[1], second[2]}) == 3
+    
+    # Inactive questions are not handed out in place of a duplicate
+    crud.question_bank.get(db, id=first[0]).is_active = False
+    db.commit()
+    assert crud.question_bank.create_many(db, rows=[bank_row(topic, "What is 1/2 + 1/2?", "1")]) == [None]
@@ -0,0 +1,49 @@
+"""
+Tests that the cached lookup statements bind each call's own values.
+Run against an in-memory SQLite copy of the user table, so no database is needed.
+"""
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+
+from app import crud
+
+
+@pytest.fixture
+def sqlite_db():
+    """Session over an in-memory user table holding two parents."""
+    engine = create_engine("sqlite://")
+    ids = [uuid4(), uuid4()]
+    with engine.begin() as conn:
+        conn.execute(text(
+            'CREATE TABLE "user" (id CHAR(32) PRIMARY KEY, email TEXT, name TEXT, hashed_password TEXT, '
+            'is_active BOOLEAN, is_superuser BOOLEAN, llm_monthly_budget_usd NUMERIC, '
+            'created_at TIMESTAMP, updated_at TIMESTAMP)'
+        ))
+        for index, id in enumerate(ids):
+            conn.execute(
+                text('INSERT INTO "user" (id, email, name, hashed_password) VALUES (:id, :email, :name, \'x\')'),
+                {"id": id.hex, "email": f"parent{index}@example.com", "name": f"Parent {index}"},
+            )
+    db = Session(engine)
+    yield db, ids
+    db.close()
+
+
+def test_get_binds_each_id(sqlite_db) -> None:
+    """Test that repeated primary key lookups return the requested rows."""
+    db, ids = sqlite_db
+    
+    assert [crud.user.get(db, id=id).name for id in ids] == ["Parent 0", "Parent 1"]
+    assert crud.user.get(db, id=uuid4()) is None
+
+
+def test_get_by_email_binds_each_email(sqlite_db) -> None:
+    """Test that repeated email lookups return the requested rows."""
+    db, ids = sqlite_db
+    
+    assert crud.user.get_by_email(db, email="parent1@example.com").id == ids[1]
+    assert crud.user.get_by_email(db, email="parent0@example.com").id == ids[0]
+    assert crud.user.get_by_email(db, email="nobody@example.com") is None
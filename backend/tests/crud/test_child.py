@@ -190,3 +190,51 @@ def test_remove_child(db: Session) -> None:
     # Verify child no longer exists
     retrieved_after = crud.child.get(db, id=child_id)
     assert retrieved_after is None
+
+
+def test_patch_preferences(db: Session) -> None:
+    """Test merging a partial preferences update server-side."""
+    parent = create_test_user(db)["user"]
+    child_in = ChildCreate(
+        name="Patch Test Child",
+        grade="3rd grade",
+        subjects=["Math"],
+        preferences={"response_style": "concise", "examples_type": "abstract"},
+    )
+    child = crud.child.create_with_parent(db=db, obj_in=child_in, parent_id=parent.id)
+    
+    patched = crud.child.patch_preferences(
+        db,
+        id=child.id,
+        parent_id=parent.id,
+        patch={"response_style": "detailed", "examples_type": None},
+    )
+    
+    assert patched is not None
+    assert patched.preferences == {"response_style": "detailed"}
+    
+    # Wrong parent does not match
+    other_parent = create_test_user(db)["user"]
+    assert crud.child.patch_preferences(
+        db, id=child.id, parent_id=other_parent.id, patch={"pace": "slow"}
+    ) is None
+
+
+def test_get_multi_by_preferences(db: Session) -> None:
+    """Test filtering children by preference key/value pairs."""
+    parent = create_test_user(db)["user"]
+    for style in ["concise", "detailed", "concise"]:
+        child_in = ChildCreate(
+            name=f"{style} child",
+            grade="3rd grade",
+            subjects=["Math"],
+            preferences={"response_style": style},
+        )
+        crud.child.create_with_parent(db=db, obj_in=child_in, parent_id=parent.id)
+    
+    children = crud.child.get_multi_by_preferences(
+        db, preferences={"response_style": "concise"}, parent_id=parent.id
+    )
+    
+    assert len(children) == 2
+    assert all(c.preferences["response_style"] == "concise" for c in children)
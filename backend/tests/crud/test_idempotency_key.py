@@ -0,0 +1,61 @@
+"""
+Unit tests for idempotency key CRUD operations.
+"""
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+from sqlalchemy.orm import Session
+
+from app import crud
+from app.models.idempotency import IdempotencyKey
+
+
+def test_claim_complete_and_reclaim(db: Session) -> None:
+    """Test that a key is claimed once, stores its response and is free again once expired."""
+    user_id = uuid4()
+    
+    claim_id = crud.idempotency_key.claim(db, user_id=user_id, key="k", request_hash=b"a" * 16)
+    assert claim_id is not None
+    assert crud.idempotency_key.claim(db, user_id=user_id, key="k", request_hash=b"a" * 16) is None
+    assert crud.idempotency_key.claim(db, user_id=uuid4(), key="k", request_hash=b"a" * 16) is not None
+    
+    crud.idempotency_key.complete(
+        db, user_id=user_id, key="k", claim_id=claim_id, status_code=201, headers=[["content-type", "application/json"]], body=b"{}"
+    )
+    stored = crud.idempotency_key.get_by_key(db, user_id=user_id, key="k")
+    assert (stored.status_code, stored.response_headers, stored.response_body) == (
+        201, [["content-type", "application/json"]], b"{}"
+    )
+    
+    # Completed keys are only released by expiry
+    crud.idempotency_key.release(db, user_id=user_id, key="k", claim_id=claim_id)
+    assert crud.idempotency_key.get_by_key(db, user_id=user_id, key="k") is not None
+    stored.expires_at = datetime.utcnow() - timedelta(seconds=1)
+    db.commit()
+    assert crud.idempotency_key.get_by_key(db, user_id=user_id, key="k") is None
+    assert crud.idempotency_key.claim(db, user_id=user_id, key="k", request_hash=b"b" * 16) is not None
+    assert crud.idempotency_key.get_by_key(db, user_id=user_id, key="k").status_code is None
+
+
+def test_stale_in_flight_claim_can_be_taken_over(db: Session) -> None:
+    """Test that an in-flight key whose lock ran out can be claimed, and only its new owner finishes it."""
+    user_id = uuid4()
+    stale_id = crud.idempotency_key.claim(db, user_id=user_id, key="k", request_hash=b"a" * 16)
+    db.query(IdempotencyKey).filter(IdempotencyKey.user_id == user_id).update(
+        {"locked_until": datetime.utcnow() - timedelta(seconds=1)}
+    )
+    db.commit()
+    
+    claim_id = crud.idempotency_key.claim(db, user_id=user_id, key="k", request_hash=b"a" * 16)
+    assert claim_id not in (None, stale_id)
+    
+    # The request that lost its claim can neither store its response nor release the key
+    crud.idempotency_key.complete(
+        db, user_id=user_id, key="k", claim_id=stale_id, status_code=201, headers=[], body=b"{}"
+    )
+    crud.idempotency_key.release(db, user_id=user_id, key="k", claim_id=stale_id)
+    stored = crud.idempotency_key.get_by_key(db, user_id=user_id, key="k")
+    assert (stored.id, stored.status_code) == (claim_id, None)
+    
+    crud.idempotency_key.release(db, user_id=user_id, key="k", claim_id=claim_id)
+    assert crud.idempotency_key.get_by_key(db, user_id=user_id, key="k") is None
@@ -0,0 +1,87 @@
+"""
+Unit tests for message CRUD operations and full-text search.
+"""
+import pytest
+from uuid import uuid4
+from typing import List
+
+from sqlalchemy.orm import Session
+
+from app import crud
+from app.models.child import Child
+from app.models.session import Message, Session as LearningSession
+from app.schemas.user import UserCreate
+
+
+def create_child_with_messages(db: Session, contents: List[str]) -> Child:
+    """Helper function to create a parent, child and one session of messages."""
+    user_in = UserCreate(
+        email=f"parent-{uuid4()}@example.com", password="testpass123", name="Test Parent"
+    )
+    parent = crud.user.create(db, obj_in=user_in)
+    child = Child(name="Search Child", grade="3rd grade", subjects=["Science"], parent_id=parent.id)
+    db.add(child)
+    db.flush()
+    session = LearningSession(subject="Science", topic="Earth", child_id=child.id)
+    db.add(session)
+    db.flush()
+    for content in contents:
+        db.add(Message(content=content, role="user", session_id=session.id))
+    db.commit()
+    return child
+
+
+def test_search_by_parent(db: Session) -> None:
+    """Test that search matches stemmed words and highlights them."""
+    child = create_child_with_messages(db, [
+        "Why do volcanoes erupt?",
+        "How do I add fractions with different denominators?",
+    ])
+
+    results, next_cursor = crud.message.search_by_parent(
+        db, parent_id=child.parent_id, query="volcano"
+    )
+
+    assert len(results) == 1
+    assert next_cursor is None
+    assert results[0]["child_id"] == child.id
+    assert "<mark>volcanoes</mark>" in results[0]["headline"]
+
+
+def test_search_is_scoped_to_parent(db: Session) -> None:
+    """Test that a parent never sees another family's messages."""
+    create_child_with_messages(db, ["Tell me about volcanoes"])
+    other = create_child_with_messages(db, ["What are fractions?"])
+
+    results, _ = crud.message.search_by_parent(
+        db, parent_id=other.parent_id, query="volcano"
+    )
+    assert results == []
+
+
+def test_search_keyset_pagination(db: Session) -> None:
+    """Test that paging with the cursor returns every hit exactly once."""
+    child = create_child_with_messages(
+        db, [f"Fractions question number {i}" for i in range(5)]
+    )
+
+    seen = []
+    cursor = None
+    while True:
+        results, cursor = crud.message.search_by_parent(
+            db, parent_id=child.parent_id, query="fractions", cursor=cursor, limit=2
+        )
+        seen.extend(r["id"] for r in results)
+        if cursor is None:
+            break
+
+    assert len(seen) == 5
+    assert len(set(seen)) == 5
+
+
+def test_search_invalid_cursor(db: Session) -> None:
+    """Test that a malformed cursor is rejected."""
+    with pytest.raises(ValueError):
+        crud.message.search_by_parent(
+            db, parent_id=uuid4(), query="fractions", cursor="not-a-cursor"
+        )
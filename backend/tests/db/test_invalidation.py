@@ -0,0 +1,100 @@
+"""
+Tests for in-process caches and the cross-worker invalidation bus.
+"""
+import json
+import time
+from types import SimpleNamespace
+from uuid import uuid4
+
+from app.core.cache import CacheRegistry, TTLCache
+from app.db import invalidation
+from app.db.invalidation import InvalidationListener, notify_invalidation
+
+
+def make_listener(max_lag_ms: int = 5000):
+    """Helper function to build a listener with its own registry and one cache."""
+    registry = CacheRegistry()
+    cache = registry.register("child", TTLCache("children", ttl=60))
+    listener = InvalidationListener("postgresql://unused", registry=registry, max_lag_ms=max_lag_ms)
+    return listener, cache
+
+
+def test_ttl_cache_expires_entries() -> None:
+    """Test that entries are dropped after their TTL."""
+    cache = TTLCache("test", ttl=0.01)
+    cache.set("key", "value")
+    assert cache.get("key") == "value"
+    
+    time.sleep(0.02)
+    assert cache.get("key") is None
+
+
+def test_ttl_cache_evicts_least_recently_used() -> None:
+    """Test that the cache stays within maxsize."""
+    cache = TTLCache("test", ttl=60, maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+
+def test_listener_evicts_matching_key() -> None:
+    """Test that a notification evicts only the changed entity."""
+    listener, cache = make_listener()
+    changed, unchanged = uuid4(), uuid4()
+    cache.set(changed, "stale")
+    cache.set(unchanged, "fresh")
+    
+    listener.handle(json.dumps({"type": "child", "id": str(changed), "ts": time.time()}))
+    
+    assert cache.get(changed) is None
+    assert cache.get(unchanged) == "fresh"
+    assert listener.metrics.received == 1
+    assert listener.metrics.evicted == 1
+
+
+def test_listener_flushes_when_lagging() -> None:
+    """Test that a message older than the lag bound clears all caches."""
+    listener, cache = make_listener(max_lag_ms=100)
+    cache.set(uuid4(), "maybe stale")
+    
+    listener.handle(json.dumps({"type": "user", "id": str(uuid4()), "ts": time.time() - 10}))
+    
+    assert len(cache) == 0
+    assert listener.metrics.full_flushes == 1
+    assert listener.metrics.max_lag_ms >= 10000
+
+
+def test_listener_ignores_malformed_payload() -> None:
+    """Test that malformed payloads are counted and ignored."""
+    listener, _ = make_listener()
+    
+    listener.handle("not json")
+    
+    assert listener.metrics.malformed == 1
+    assert listener.metrics.received == 0
+
+
+def test_nothing_runs_without_registered_caches(monkeypatch) -> None:
+    """Test that entity types without a cache are not notified and no listener starts."""
+    registry = CacheRegistry()
+    sent = []
+    db = SimpleNamespace(execute=lambda statement, params: sent.append(params))
+    monkeypatch.setattr(invalidation, "cache_registry", registry)
+    listener = InvalidationListener("postgresql://unused", registry=registry)
+    
+    notify_invalidation(db, "child", uuid4())
+    listener.start()
+    
+    assert sent == []
+    assert listener._thread is None
+    
+    registry.register("child", TTLCache("children", ttl=60))
+    notify_invalidation(db, "child", uuid4())
+    notify_invalidation(db, "user", uuid4())
+    
+    assert [json.loads(params["payload"])["type"] for params in sent] == ["child"]
@@ -0,0 +1,78 @@
+"""
+Tests for read replica routing and read-your-writes stickiness.
+"""
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db import routing
+
+
+def use_replica(monkeypatch, replica):
+    """Helper function to route reads to the given replica engine."""
+    monkeypatch.setattr(routing, "replica_engine", replica)
+    monkeypatch.setattr(routing, "ReadSessionLocal", sessionmaker(bind=replica))
+    return replica
+
+
+@pytest.fixture
+def fake_replica(monkeypatch):
+    """Route reads to a distinct engine on the test database."""
+    replica = create_engine(routing.engine.url)
+    yield use_replica(monkeypatch, replica)
+    replica.dispose()
+
+
+def test_begin_request_rejects_malformed_lsn() -> None:
+    """Test that only well-formed LSNs are used for routing."""
+    assert routing.begin_request("16/B374D848").min_lsn == "16/B374D848"
+    assert routing.begin_request("1; DROP TABLE user").min_lsn is None
+    assert routing.begin_request(None).min_lsn is None
+
+
+def test_reads_use_replica_without_recent_write(fake_replica) -> None:
+    """Test that reads go to the replica when the client has no pending write."""
+    routing.begin_request(None)
+    
+    db = routing.open_read_session()
+    
+    assert db.get_bind() is fake_replica
+    db.close()
+
+
+def test_reads_stick_to_primary_until_replica_catches_up(fake_replica, monkeypatch) -> None:
+    """Test read-your-writes: a lagging replica is skipped for recent writers."""
+    routing.begin_request("0/16B3748")
+    
+    monkeypatch.setattr(routing, "_replica_caught_up", lambda db, lsn: False)
+    db = routing.open_read_session()
+    assert db.get_bind() is routing.engine
+    db.close()
+    
+    monkeypatch.setattr(routing, "_replica_caught_up", lambda db, lsn: True)
+    db = routing.open_read_session()
+    assert db.get_bind() is fake_replica
+    db.close()
+
+
+def test_reads_fall_back_to_primary_when_replica_is_down(monkeypatch) -> None:
+    """Test that an unreachable replica is skipped even without a recent write."""
+    use_replica(monkeypatch, create_engine("postgresql://replica.invalid/ai_teacher"))
+    routing.begin_request(None)
+    
+    db = routing.open_read_session()
+    
+    assert db.get_bind() is routing.engine
+    db.close()
+
+
+def test_commit_with_writes_marks_request() -> None:
+    """Test that committing a session with writes flags the request."""
+    state = routing.begin_request(None)
+    db = routing.SessionLocal()
+    db.info["has_writes"] = True
+    
+    routing._after_commit(db)
+    
+    assert state.wrote is True
+    assert "has_writes" not in db.info
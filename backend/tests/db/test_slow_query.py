@@ -0,0 +1,108 @@
+"""
+Tests for the slow query log.
+"""
+import os
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from app.db import slow_query
+from app.db.slow_query import SlowQueryLog, fingerprint
+
+
+@pytest.fixture
+def sqlite_engine():
+    """In-memory SQLite engine with one table."""
+    engine = create_engine("sqlite://")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE child (id INTEGER PRIMARY KEY, name TEXT)"))
+    return engine
+
+
+def load_children(engine) -> None:
+    """Helper standing in for a CRUD method."""
+    with engine.connect() as conn:
+        conn.execute(text("SELECT name FROM child WHERE id IN (1, 2, 3) AND name = :name"), {"name": "Ada"})
+
+
+def test_fingerprint_ignores_values() -> None:
+    """Test that statements differing only in literals, parameters and list lengths share a fingerprint."""
+    first = fingerprint("SELECT * FROM child WHERE id IN (%(id_1_1)s, %(id_1_2)s) AND name = 'Ada'  LIMIT 10")
+    second = fingerprint("SELECT * FROM child\nWHERE id IN (%(id_1_1)s, %(id_1_2)s, %(id_1_3)s) AND name = 'O''Brien' LIMIT 5")
+    
+    assert first == second
+    assert first[1] == "SELECT * FROM child WHERE id IN (...) AND name = ? LIMIT ?"
+    assert fingerprint("SELECT * FROM child2")[0] != first[0]
+
+
+def test_records_statements_over_threshold(sqlite_engine, monkeypatch) -> None:
+    """Test that slow statements are recorded with their call site and route."""
+    # Treat this test module as CRUD code
+    monkeypatch.setattr(slow_query, "_CRUD_ROOT", os.path.dirname(__file__))
+    log = SlowQueryLog(threshold_ms=0, size=10, explain=False)
+    log.attach(sqlite_engine)
+    slow_query.begin_request({"type": "http", "method": "GET", "path": "/api/v1/children/"})
+    
+    load_children(sqlite_engine)
+    
+    entry = log.entries[-1]
+    assert entry["sql"] == "SELECT name FROM child WHERE id IN (...) AND name = ?"
+    assert entry["call_site"] == "test_slow_query.load_children"
+    assert entry["route"] == "GET /api/v1/children/"
+    assert entry["plan"] is None
+
+
+def test_fast_statements_are_ignored(sqlite_engine) -> None:
+    """Test that statements under the threshold are not recorded."""
+    log = SlowQueryLog(threshold_ms=60_000, size=10, explain=False)
+    log.attach(sqlite_engine)
+    
+    load_children(sqlite_engine)
+    
+    assert log.recorded == 0
+
+
+def test_failed_statements_leave_no_state(sqlite_engine) -> None:
+    """Test that a statement that raises leaves nothing on the connection and later ones are timed."""
+    log = SlowQueryLog(threshold_ms=0, size=10, explain=False)
+    log.attach(sqlite_engine)
+    
+    with sqlite_engine.connect() as conn:
+        with pytest.raises(Exception):
+            conn.execute(text("SELECT missing FROM child"))
+        conn.execute(text("SELECT name FROM child"))
+        info = dict(conn.info)
+    
+    assert info == {}
+    assert log.entries[-1]["sql"] == "SELECT name FROM child"
+
+
+def test_ring_buffer_and_summary() -> None:
+    """Test that the buffer keeps the newest entries and summarizes them per fingerprint."""
+    log = SlowQueryLog(threshold_ms=0, size=3, explain=False)
+    for duration in (500, 300, 400):
+        log.record("SELECT * FROM message WHERE session_id = %(id)s", duration, "crud_message.get", "GET /a")
+    log.record("SELECT * FROM child", 250, None, None)
+    
+    snapshot = log.snapshot(limit=2)
+    
+    assert snapshot["recorded"] == 4
+    assert [entry["duration_ms"] for entry in snapshot["entries"]] == [250, 400]
+    [messages, children] = snapshot["fingerprints"]
+    assert (messages["count"], messages["total_ms"], messages["max_ms"]) == (2, 700, 400)
+    assert messages["call_sites"] == ["crud_message.get"]
+    assert children["routes"] == []
+
+
+def test_writes_are_never_explained(sqlite_engine) -> None:
+    """Test that statements with side effects are not re-run by EXPLAIN ANALYZE."""
+    log = SlowQueryLog(threshold_ms=0, size=10, explain=True, explain_sample_rate=1.0)
+    for statement in (
+        "INSERT INTO child (name) VALUES ('Ada')",
+        "WITH moved AS (DELETE FROM child RETURNING id) SELECT count(*) FROM moved",
+        "SELECT * FROM child FOR UPDATE",
+    ):
+        entry = log.record(statement, 1000, None, None)
+        log._submit_explain(sqlite_engine, entry, statement, {})
+    
+    assert log._executor is None
@@ -0,0 +1,147 @@
+"""
+Tests for the write-behind insert buffer.
+"""
+import asyncio
+import threading
+import time
+from typing import Any, List
+
+import pytest
+
+from app.db.write_behind import WriteBehindBuffer
+from app.models.quiz import Answer, QuizAttempt
+from app.models.session import Message
+
+
+class RecordingSession:
+    """Session stand-in recording executed inserts; rows with content "bad" fail."""
+    
+    def __init__(self, log: List[Any]):
+        self.log = log
+        self.statements: List[Any] = []
+    
+    def execute(self, stmt, rows):
+        if any(row.get("content") == "bad" for row in rows):
+            raise ValueError("bad row")
+        self.statements.append((stmt.table.name, list(rows)))
+    
+    def commit(self):
+        self.log.append(self.statements)
+    
+    def rollback(self):
+        self.statements = []
+    
+    def close(self):
+        pass
+
+
+def make_buffer(**kwargs):
+    """Helper function to build a buffer writing to a list of committed transactions."""
+    transactions: List[Any] = []
+    buffer = WriteBehindBuffer(lambda: RecordingSession(transactions), enabled=True, **kwargs)
+    return buffer, transactions
+
+
+def test_rows_are_coalesced_into_one_transaction() -> None:
+    """Test that rows submitted within the flush interval share one transaction."""
+    buffer, transactions = make_buffer(flush_interval_ms=50)
+    pending = [buffer.submit(Message, {"content": f"m{i}", "role": "user"}) for i in range(5)]
+    
+    assert pending[-1].result(timeout=2) == pending[-1].id
+    assert len(transactions) == 1
+    [(table, rows)] = transactions[0]
+    assert table == "message"
+    assert [row["content"] for row in rows] == [f"m{i}" for i in range(5)]
+    # Ids and timestamps are assigned at submit time
+    assert all(row["id"] and row["created_at"] == row["updated_at"] for row in rows)
+    buffer.stop()
+
+
+def test_full_batch_flushes_without_waiting() -> None:
+    """Test that reaching max_batch triggers a flush before the interval."""
+    buffer, transactions = make_buffer(flush_interval_ms=10_000, max_batch=3)
+    start = time.monotonic()
+    pending = [buffer.submit(Message, {"content": "m", "role": "user"}) for _ in range(3)]
+    pending[-1].result(timeout=2)
+    
+    assert time.monotonic() - start < 1
+    buffer.stop()
+
+
+def test_parent_tables_are_written_first() -> None:
+    """Test that rows referencing other rows of the same batch are inserted after them."""
+    buffer, transactions = make_buffer(flush_interval_ms=50)
+    attempt_id = buffer.submit(QuizAttempt, {"quiz_id": None, "child_id": None}).id
+    buffer.submit(Answer, {"attempt_id": attempt_id, "selected_option": "a", "is_correct": True})
+    buffer.submit(QuizAttempt, {"quiz_id": None, "child_id": None})
+    buffer.flush(timeout=2)
+    
+    assert [table for table, _ in transactions[0]] == ["quizattempt", "answer"]
+    buffer.stop()
+
+
+def test_failed_batch_is_retried_row_by_row() -> None:
+    """Test that one bad row fails only its own write."""
+    buffer, transactions = make_buffer(flush_interval_ms=50)
+    good = buffer.submit(Message, {"content": "good", "role": "user"})
+    bad = buffer.submit(Message, {"content": "bad", "role": "user"})
+    
+    assert good.result(timeout=2) == good.id
+    with pytest.raises(ValueError):
+        bad.result(timeout=2)
+    assert buffer.stats["failed_rows"] == 1
+    buffer.stop()
+
+
+def test_stop_flushes_pending_rows_and_buffer_restarts() -> None:
+    """Test that stopping writes queued rows and later submits still work."""
+    buffer, transactions = make_buffer(flush_interval_ms=10_000)
+    pending = buffer.submit(Message, {"content": "m", "role": "user"})
+    buffer.stop()
+    assert pending.done()
+    
+    again = buffer.submit(Message, {"content": "m", "role": "user"})
+    buffer.flush(timeout=2)
+    assert again.done()
+    buffer.stop()
+
+
+def test_submit_blocks_when_buffer_is_full() -> None:
+    """Test backpressure: submitters wait while max_pending rows are queued."""
+    buffer, transactions = make_buffer(flush_interval_ms=200, max_pending=2, max_batch=100)
+    buffer.submit(Message, {"content": "1", "role": "user"})
+    buffer.submit(Message, {"content": "2", "role": "user"})
+    
+    third = []
+    thread = threading.Thread(
+        target=lambda: third.append(buffer.submit(Message, {"content": "3", "role": "user"}))
+    )
+    thread.start()
+    thread.join(0.05)
+    assert not third
+    
+    thread.join(2)
+    assert third and third[0].result(timeout=2)
+    buffer.stop()
+
+
+def test_submit_async_waits_for_full_buffer_off_the_event_loop() -> None:
+    """Test that a coroutine submitting to a full buffer leaves the event loop running."""
+    buffer, transactions = make_buffer(flush_interval_ms=200, max_pending=1, max_batch=100)
+    buffer.submit(Message, {"content": "1", "role": "user"})
+    ticks = []
+    
+    async def tick():
+        while True:
+            ticks.append(time.monotonic())
+            await asyncio.sleep(0.01)
+    
+    async def run():
+        ticker = asyncio.ensure_future(tick())
+        pending = await buffer.submit_async(Message, {"content": "2", "role": "user"})
+        ticker.cancel()
+        return await pending
+    
+    assert asyncio.run(run())
+    assert len(ticks) > 5
+    buffer.stop()
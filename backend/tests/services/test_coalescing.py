@@ -0,0 +1,186 @@
+"""
+Unit tests for single-flight coalescing of LLM calls.
+"""
+import asyncio
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+
+from app.services import llm as llm_module
+from app.services.coalescing import SingleFlight, coalesce_key
+from app.services.llm import LLMClient
+
+
+class FakeUpstream:
+    """Counts calls and streams fixed tokens with a short delay each."""
+    
+    def __init__(self, tokens=("Lava ", "rises ", "up.")):
+        self.tokens = tokens
+        self.calls = 0
+        self.closed = 0
+    
+    async def call(self):
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        return {"choices": [{"message": {"content": "".join(self.tokens)}}], "usage": {"total_tokens": 30}}
+    
+    async def stream(self):
+        self.calls += 1
+        try:
+            for token in self.tokens:
+                await asyncio.sleep(0.01)
+                yield token
+        finally:
+            self.closed += 1
+
+
+async def _collect(stream, limit=None):
+    tokens = []
+    async for token in stream:
+        tokens.append(token)
+        if len(tokens) == limit:
+            await stream.aclose()
+            break
+    return tokens
+
+
+def test_key_normalizes_whitespace_and_case() -> None:
+    """Test that only whitespace and case differences map to the same key."""
+    key = coalesce_key("gpt", [{"role": "user", "content": "Why do volcanoes erupt?"}], {})
+    
+    assert coalesce_key("gpt", [{"role": "user", "content": "  why do  VOLCANOES\nerupt? "}], {}) == key
+    assert coalesce_key("gpt", [{"role": "user", "content": "Why do volcanoes sleep?"}], {}) != key
+    assert coalesce_key("gpt", [{"role": "system", "content": "Why do volcanoes erupt?"}], {}) != key
+    assert coalesce_key("gpt", [{"role": "user", "content": "Why do volcanoes erupt?"}], {"temperature": 0}) != key
+    assert coalesce_key("gpt-4", [{"role": "user", "content": "Why do volcanoes erupt?"}], {}) != key
+
+
+def test_concurrent_calls_share_one_call() -> None:
+    """Test that concurrent identical calls make one call and count the saved ones."""
+    flights, upstream = SingleFlight(), FakeUpstream()
+    
+    async def run():
+        first = await asyncio.gather(*(
+            flights.do("k", upstream.call, tokens=lambda r: r["usage"]["total_tokens"]) for _ in range(5)
+        ))
+        # Nothing is cached once the call is over
+        await flights.do("k", upstream.call)
+        return first
+    
+    results = asyncio.run(run())
+    
+    assert upstream.calls == 2
+    assert all(result is results[0] for result in results)
+    assert flights.stats() == {
+        "calls": 2, "coalesced": 4, "coalesced_ratio": 0.6667, "cancelled": 0, "tokens_saved": 120, "in_flight": 0,
+    }
+
+
+def test_errors_reach_every_caller() -> None:
+    """Test that a failed call raises in all callers sharing it."""
+    flights = SingleFlight()
+    
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("LLM unavailable")
+    
+    async def run():
+        return await asyncio.gather(*(flights.do("k", fail) for _ in range(3)), return_exceptions=True)
+    
+    results = asyncio.run(run())
+    
+    assert [type(result) for result in results] == [RuntimeError] * 3
+
+
+def test_stream_fans_out_to_late_subscribers() -> None:
+    """Test that a subscriber joining mid-stream still gets every token from one call."""
+    flights, upstream = SingleFlight(), FakeUpstream()
+    
+    async def run():
+        leader = asyncio.ensure_future(_collect(flights.stream("k", upstream.stream)))
+        await asyncio.sleep(0.015)
+        late = await _collect(flights.stream("k", upstream.stream, prompt_tokens=10))
+        return await leader, late
+    
+    leader, late = asyncio.run(run())
+    
+    assert leader == late == ["Lava ", "rises ", "up."]
+    assert upstream.calls == 1
+    assert flights.stats()["tokens_saved"] == 13
+
+
+def test_leader_disconnect_keeps_stream_for_others() -> None:
+    """Test that the stream outlives a departing leader and stops with its last subscriber."""
+    flights, upstream = SingleFlight(), FakeUpstream(tokens=tuple(f"t{i} " for i in range(10)))
+    
+    async def run():
+        leader = asyncio.ensure_future(_collect(flights.stream("k", upstream.stream), limit=1))
+        follower = asyncio.ensure_future(_collect(flights.stream("k", upstream.stream)))
+        results = await asyncio.gather(leader, follower)
+        
+        # A stream everyone abandons is cancelled
+        await _collect(flights.stream("k", upstream.stream), limit=2)
+        await asyncio.sleep(0.05)
+        return results
+    
+    leader, follower = asyncio.run(run())
+    
+    assert leader == ["t0 "]
+    assert len(follower) == 10
+    assert upstream.calls == 2
+    assert upstream.closed == 2
+    assert flights.stats()["cancelled"] == 1
+    assert flights.stats()["in_flight"] == 0
+
+
+def test_client_bills_only_the_caller_making_the_call(monkeypatch) -> None:
+    """Test that LLMClient streams share one completion and only its caller is billed."""
+    created = []
+    
+    async def acreate(**kwargs):
+        created.append(kwargs)
+        
+        async def chunks():
+            for token in ("Two ", "halves."):
+                await asyncio.sleep(0.01)
+                yield {"choices": [{"delta": {"content": token}}]}
+        
+        return chunks()
+    
+    recorded = []
+    usage = SimpleNamespace(check=lambda parent_id: None, record=lambda *args: recorded.append(args))
+    monkeypatch.setattr(llm_module, "openai", SimpleNamespace(ChatCompletion=SimpleNamespace(acreate=acreate)))
+    client = LLMClient(api_key="test", model="gpt-test", usage=usage, flights=SingleFlight())
+    parents = [uuid4() for _ in range(3)]
+    
+    async def run():
+        return await asyncio.gather(*(
+            _collect(client.stream_chat([{"role": "user", "content": "What is a half?"}], parent_id=parent))
+            for parent in parents
+        ))
+    
+    replies = asyncio.run(run())
+    
+    assert replies == [["Two ", "halves."]] * 3
+    assert len(created) == 1
+    assert [args[0] for args in recorded] == [parents[0]]
+    assert client.flights.stats()["coalesced"] == 2
+
+
+@pytest.mark.parametrize("enabled, expected_calls", [(True, 1), (False, 3)])
+def test_coalescing_can_be_disabled(monkeypatch, enabled, expected_calls) -> None:
+    """Test that LLM_COALESCING_ENABLED switches sharing of chat completions."""
+    upstream = FakeUpstream()
+    monkeypatch.setattr(llm_module.settings, "LLM_COALESCING_ENABLED", enabled)
+    monkeypatch.setattr(
+        llm_module, "openai", SimpleNamespace(ChatCompletion=SimpleNamespace(acreate=lambda **kwargs: upstream.call()))
+    )
+    client = LLMClient(api_key="test", flights=SingleFlight())
+    
+    async def run():
+        await asyncio.gather(*(client.chat([{"role": "user", "content": "Hi"}]) for _ in range(3)))
+    
+    asyncio.run(run())
+    
+    assert upstream.calls == expected_calls
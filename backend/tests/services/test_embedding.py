@@ -0,0 +1,133 @@
+"""
+Unit tests for the embedding micro-batcher.
+"""
+import asyncio
+from uuid import uuid4
+
+import pytest
+
+from app.services.embedding import EmbeddingBatcher, create_backend
+
+
+class FakeBackend:
+    """Embedding backend stand-in that records its calls."""
+    billed = True
+    model = "text-embedding-ada-002"
+
+    def __init__(self, error=None):
+        self.error = error
+        self.calls = []
+
+    async def embed(self, texts):
+        self.calls.append(list(texts))
+        await asyncio.sleep(0)
+        if self.error is not None:
+            raise self.error
+        return [[float(len(text)), 1.0] for text in texts]
+
+    def shutdown(self):
+        pass
+
+
+class FakeUsage:
+    """Usage tracker stand-in recording billed parents."""
+
+    def __init__(self):
+        self.checked = []
+        self.recorded = []
+
+    def check(self, parent_id):
+        self.checked.append(parent_id)
+
+    def record(self, parent_id, model, prompt_tokens, completion_tokens):
+        self.recorded.append((parent_id, model, prompt_tokens))
+
+
+def test_concurrent_requests_share_one_call() -> None:
+    """Test that concurrent requests are batched, deduplicated and answered in order."""
+    backend = FakeBackend()
+    batcher = EmbeddingBatcher(backend, max_wait_ms=10, max_batch=64, usage=FakeUsage())
+
+    async def run():
+        return await asyncio.gather(
+            batcher.embed("a"), batcher.embed("bb"), batcher.embed("a"), batcher.embed_many(["ccc", "dddd"])
+        )
+
+    first, second, again, many = asyncio.run(run())
+    assert backend.calls == [["a", "bb", "ccc", "dddd"]]
+    assert (first, second, again) == ([1.0, 1.0], [2.0, 1.0], [1.0, 1.0])
+    assert many == [[3.0, 1.0], [4.0, 1.0]]
+
+    stats = batcher.stats()
+    assert stats["requests"] == 5
+    assert stats["batches"] == 1
+    assert stats["texts_embedded"] == 4
+    assert stats["batch_sizes"]["le_8"] == 1
+    assert sum(stats["queue_wait"].values()) == 5
+
+
+def test_full_batches_are_sent_without_waiting() -> None:
+    """Test that max_batch splits the queue and a full batch does not wait for the timer."""
+    backend = FakeBackend()
+    batcher = EmbeddingBatcher(backend, max_wait_ms=10_000, max_batch=2, usage=FakeUsage())
+
+    async def run():
+        return await asyncio.wait_for(batcher.embed_many(["a", "b", "c", "d"]), timeout=1)
+
+    assert len(asyncio.run(run())) == 4
+    assert backend.calls == [["a", "b"], ["c", "d"]]
+
+
+def test_failures_reach_every_caller() -> None:
+    """Test that a failed backend call fails all requests of the batch."""
+    batcher = EmbeddingBatcher(FakeBackend(error=RuntimeError("down")), max_wait_ms=0, usage=FakeUsage())
+
+    async def run():
+        return await asyncio.gather(batcher.embed("a"), batcher.embed("b"), return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert batcher.stats()["failed_batches"] == 1
+
+
+def test_missing_vector_fails_only_its_request() -> None:
+    """Test that a text the backend returned no vector for fails alone and the batcher keeps running."""
+    backend = FakeBackend()
+    batcher = EmbeddingBatcher(backend, max_wait_ms=0, usage=FakeUsage())
+    embed = backend.embed
+
+    async def short_embed(texts):
+        return (await embed(texts))[:-1]
+
+    async def run():
+        backend.embed = short_embed
+        first = await asyncio.gather(batcher.embed("a"), batcher.embed("bb"), return_exceptions=True)
+        backend.embed = embed
+        return first, await asyncio.wait_for(batcher.embed("ccc"), timeout=1)
+
+    (first, second), after = asyncio.run(run())
+    assert first == [1.0, 1.0]
+    assert isinstance(second, KeyError)
+    assert after == [3.0, 1.0]
+
+
+def test_billing_per_parent() -> None:
+    """Test that each parent is budget-checked and billed for their own texts only."""
+    usage = FakeUsage()
+    batcher = EmbeddingBatcher(FakeBackend(), max_wait_ms=0, usage=usage)
+    parent_a, parent_b = uuid4(), uuid4()
+
+    async def run():
+        await asyncio.gather(
+            batcher.embed("a" * 40, parent_id=parent_a), batcher.embed("b" * 8, parent_id=parent_b), batcher.embed("c")
+        )
+
+    asyncio.run(run())
+    assert usage.checked == [parent_a, parent_b]
+    assert usage.recorded == [(parent_a, "text-embedding-ada-002", 10), (parent_b, "text-embedding-ada-002", 2)]
+
+
+def test_unknown_backend() -> None:
+    """Test that a misconfigured backend name fails clearly."""
+    with pytest.raises(ValueError):
+        create_backend("word2vec")
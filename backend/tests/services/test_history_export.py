@@ -0,0 +1,99 @@
+"""
+Unit tests for the streaming history export encoders and its read transaction.
+"""
+import csv
+import gzip
+import io
+import json
+import os
+import subprocess
+import sys
+
+from sqlalchemy import text
+
+from app.services import history_export
+from app.services.history_export import CSV_FIELDS, encode
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+RECORDS = [
+    {"type": "child", "id": "c1", "name": "Ada", "grade": "3rd grade", "subjects": ["Math", "Science"],
+     "learning_style": None, "created_at": "2026-10-01T09:00:00"},
+    {"type": "message", "id": "m1", "session_id": "s1", "role": "user", "content": "Why, \"exactly\"?\nTell me",
+     "created_at": "2026-10-01T09:01:00"},
+]
+
+# Streams `rows` message records through the encoder and prints the growth of peak RSS in KiB
+MEMORY_PROBE = """
+import resource, sys
+from app.services.history_export import encode
+
+def records(count):
+    for i in range(count):
+        yield {"type": "message", "id": f"{i:032x}", "session_id": "s1", "role": "user",
+               "content": "Why do volcanoes erupt when pressure builds up?", "created_at": "2026-10-19T10:00:00"}
+
+before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+size = sum(len(chunk) for chunk in encode(records(int(sys.argv[1])), "ndjson", gzip=True))
+print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - before, size)
+"""
+
+
+def test_ndjson_round_trip() -> None:
+    """Test that NDJSON output has one parseable object per record."""
+    output = b"".join(encode(iter(RECORDS), "ndjson", chunk_bytes=16))
+    
+    assert [json.loads(line) for line in output.decode().splitlines()] == RECORDS
+
+
+def test_csv_uses_union_of_fields() -> None:
+    """Test that CSV output has one header and one row per record, with lists joined."""
+    output = b"".join(encode(iter([dict(record) for record in RECORDS]), "csv"))
+    
+    rows = list(csv.DictReader(io.StringIO(output.decode())))
+    assert tuple(rows[0]) == CSV_FIELDS
+    assert rows[0]["subjects"] == "Math;Science"
+    assert rows[1]["content"] == "Why, \"exactly\"?\nTell me"
+    assert rows[1]["name"] == ""
+
+
+def test_gzip_stream_is_chunked_and_valid() -> None:
+    """Test that gzip output arrives in several chunks that decompress to the plain export."""
+    records = [dict(RECORDS[1], id=f"m{i}") for i in range(5000)]
+    plain = b"".join(encode(iter(records), "ndjson"))
+    
+    chunks = list(encode(iter(records), "ndjson", gzip=True, chunk_bytes=4096))
+    
+    assert len(chunks) > 1
+    assert gzip.decompress(b"".join(chunks)) == plain
+
+
+def test_export_reads_one_snapshot(monkeypatch) -> None:
+    """Test that the export runs its queries in one repeatable read, read only transaction."""
+    def iter_records(db, child_id):
+        for setting in ("transaction_isolation", "transaction_read_only"):
+            yield {"type": "setting", "id": setting, "value": db.execute(text(f"SHOW {setting}")).scalar_one()}
+    
+    monkeypatch.setattr(history_export, "iter_records", iter_records)
+    
+    output = b"".join(history_export.export_history(None, "ndjson"))
+    
+    assert [json.loads(line)["value"] for line in output.splitlines()] == ["repeatable read", "on"]
+
+
+def test_peak_memory_is_flat_for_a_million_rows() -> None:
+    """Test that exporting 1M rows raises peak RSS by no more than exporting 10k rows does, give or take."""
+    def probe(rows: int):
+        result = subprocess.run(
+            [sys.executable, "-c", MEMORY_PROBE, str(rows)],
+            cwd=BACKEND_DIR, capture_output=True, text=True, check=True,
+        )
+        growth_kib, size = result.stdout.split()
+        return int(growth_kib), int(size)
+    
+    small_growth, _ = probe(10_000)
+    large_growth, large_size = probe(1_000_000)
+    
+    # Holding the rows or the output in memory would take hundreds of MiB
+    assert large_size > 1_000_000
+    assert large_growth < small_growth + 8 * 1024
@@ -0,0 +1,74 @@
+"""
+Tests for message archival and transparent reads of archived history.
+"""
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+from sqlalchemy.orm import Session
+
+from app import crud
+from app.models.child import Child
+from app.models.session import Message, MessageArchive, Session as LearningSession, SessionStatus
+from app.schemas.user import UserCreate
+from app.services import message_archive
+
+
+def test_compress_round_trip() -> None:
+    """Test that archived messages decompress to the original values."""
+    now = datetime.utcnow()
+    messages = [
+        {
+            "id": uuid4(),
+            "session_id": uuid4(),
+            "role": "user" if i % 2 == 0 else "assistant",
+            "content": f"Message {i} about fractions",
+            "created_at": now + timedelta(seconds=i),
+            "updated_at": now + timedelta(seconds=i),
+        }
+        for i in range(50)
+    ]
+
+    payload = message_archive.compress_messages(messages)
+
+    assert message_archive.decompress_messages(payload) == messages
+    assert message_archive.decompress_messages(payload, 10, 15) == messages[10:15]
+    assert message_archive.decompress_messages(payload, 45, 100) == messages[45:]
+    assert message_archive.decompress_messages(message_archive.compress_messages(messages, level=0)) == messages
+
+
+def test_archive_completed_sessions(db: Session) -> None:
+    """Test that old completed sessions move to the archive and stay readable."""
+    parent = crud.user.create(db, obj_in=UserCreate(
+        email=f"parent-{uuid4()}@example.com", password="testpass123", name="Test Parent"
+    ))
+    child = Child(name="Archive Child", grade="3rd grade", subjects=["Math"], parent_id=parent.id)
+    db.add(child)
+    db.flush()
+    ended_at = datetime.utcnow() - timedelta(days=200)
+    old = LearningSession(
+        subject="Math", topic="Fractions", child_id=child.id,
+        status=SessionStatus.COMPLETED, ended_at=ended_at,
+    )
+    recent = LearningSession(subject="Math", topic="Decimals", child_id=child.id)
+    db.add_all([old, recent])
+    db.flush()
+    for i in range(5):
+        db.add(Message(
+            content=f"Fractions step {i}", role="user", session_id=old.id,
+            created_at=ended_at - timedelta(minutes=10 - i),
+        ))
+    db.add(Message(content="Decimals", role="user", session_id=recent.id))
+    db.commit()
+
+    archived = message_archive.archive_completed_sessions(db, retention_days=90)
+
+    assert archived == 1
+    assert db.query(Message).filter(Message.session_id == old.id).count() == 0
+    assert db.query(Message).filter(Message.session_id == recent.id).count() == 1
+    archive = db.query(MessageArchive).filter(MessageArchive.session_id == old.id).one()
+    assert archive.message_count == 5
+
+    history = crud.message.get_multi_by_session(db, session_id=old.id)
+    assert [m.content for m in history] == [f"Fractions step {i}" for i in range(5)]
+    page = crud.message.get_multi_by_session(db, session_id=old.id, skip=3, limit=10)
+    assert [m.content for m in page] == ["Fractions step 3", "Fractions step 4"]
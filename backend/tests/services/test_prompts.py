@@ -0,0 +1,78 @@
+"""
+Unit tests for the prompt template registry.
+"""
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.prompts import CompiledTemplate, PromptRegistry, grade_band
+from app.services.tutor import build_system_prompt
+
+
+def make_registry(tmp_path, **templates) -> PromptRegistry:
+    """Helper function to build a registry over a temporary template directory."""
+    for name, source in templates.items():
+        (tmp_path / f"{name}.txt").write_text(source + "\n")
+    return PromptRegistry(tmp_path, prefix_cache_size=2)
+
+
+def test_compiled_template_renders_placeholders() -> None:
+    """Test substitution, literal braces and rejection of format specs."""
+    template = CompiledTemplate("t", "Hi {name}, {{literal}} {name}!")
+    assert template.fields == {"name"}
+    assert template.render({"name": "Ada"}) == "Hi Ada, {literal} Ada!"
+    with pytest.raises(KeyError):
+        template.render({})
+    with pytest.raises(ValueError):
+        CompiledTemplate("t", "{value:.2f}")
+
+
+def test_grade_band() -> None:
+    """Test mapping of free-form grades to guidance bands."""
+    assert grade_band("Kindergarten") == "early"
+    assert grade_band("3rd grade") == "elementary"
+    assert grade_band("Grade 7") == "middle"
+    assert grade_band("11th grade") == "high"
+    assert grade_band("homeschool") is None
+
+
+def test_tutor_prefix_is_cached_with_lru_eviction(tmp_path) -> None:
+    """Test that prefixes are rendered once per profile combination and evicted least recently used."""
+    registry = make_registry(
+        tmp_path,
+        tutor_persona="Tutor for a {grade} student.",
+        grade_elementary="Keep it simple.",
+        subject_math="Work step by step.",
+        subject_default="Teach {subject}.",
+        learning_style="Style: {learning_style}.",
+        preference="Preference {key}: {value}.",
+    )
+    prefix = registry.tutor_prefix("3rd grade", "Math", "visual", {"response_style": "concise"})
+    assert prefix == (
+        "Tutor for a 3rd grade student.\nKeep it simple.\nWork step by step.\n"
+        "Style: visual.\nPreference response style: concise."
+    )
+    assert registry.tutor_prefix("3rd grade", "Math", "visual", {"response_style": "concise"}) is prefix
+    assert registry.tutor_prefix("Grade 11", "Art History") == "Tutor for a Grade 11 student.\nTeach Art History."
+    registry.tutor_prefix("3rd grade", "Math", "visual", {"response_style": "concise"})
+    registry.tutor_prefix("3rd grade", "Science")
+    
+    stats = registry.stats()
+    assert stats["prefix_cache"] == {"size": 2, "hits": 2, "misses": 3}
+    assert stats["templates"]["tutor_persona"]["renders"] == 3
+    assert stats["templates"]["subject_default"]["renders"] == 2
+
+
+def test_build_system_prompt_uses_templates() -> None:
+    """Test the tutor system prompt built from the bundled templates."""
+    child = SimpleNamespace(
+        name="Sam", grade="3rd grade", learning_style="visual", preferences={"examples_type": "real-world"}
+    )
+    session = SimpleNamespace(subject="Math", topic="Fractions")
+    prompt = build_system_prompt(child, session)
+    
+    assert prompt.startswith("You are a patient, encouraging tutor for a 3rd grade student.")
+    assert "For math," in prompt
+    assert "Adapt explanations to a visual learning style." in prompt
+    assert "Preference examples type: real-world." in prompt
+    assert prompt.endswith("You are talking with Sam. This session is about Math: Fractions.")
@@ -0,0 +1,60 @@
+"""
+Unit tests for bulk provisioning upload parsing and password hashing.
+"""
+import pytest
+
+from app.core.security import verify_password
+from app.services import provisioning
+
+
+def test_parse_ndjson_reports_bad_lines() -> None:
+    """Test that NDJSON parsing keeps line numbers and reports malformed lines."""
+    body = b'{"email": "a@example.com"}\n\nnot json\n[1, 2]\n{"email": "b@example.com"}\n'
+    rows = list(provisioning.parse_upload(body, "application/x-ndjson"))
+    
+    assert [line for line, _, _ in rows] == [1, 3, 4, 5]
+    assert rows[0] == (1, {"email": "a@example.com"}, None)
+    assert rows[1][1] is None and rows[1][2].startswith("Invalid JSON")
+    assert rows[2][2] == "Each line must be a JSON object"
+    assert rows[3][1] == {"email": "b@example.com"}
+
+
+def test_parse_csv_splits_lists_and_preferences() -> None:
+    """Test that CSV cells for subjects and preferences are converted."""
+    body = (
+        "parent_email,name,grade,subjects,preferences\n"
+        'p@example.com,Ann,3rd grade,Math; Science,"{""pace"": ""slow""}"\n'
+        "p@example.com,Bob,4th grade,Art,\n"
+        'p@example.com,Cid,5th grade,Art,"{bad"\n'
+    ).encode()
+    rows = list(provisioning.parse_upload(body, "text/csv"))
+    
+    assert rows[0] == (2, {
+        "parent_email": "p@example.com",
+        "name": "Ann",
+        "grade": "3rd grade",
+        "subjects": ["Math", "Science"],
+        "preferences": {"pace": "slow"},
+    }, None)
+    # Empty cells are omitted so schema defaults apply
+    assert "preferences" not in rows[1][1]
+    assert rows[2][0] == 4 and rows[2][2].startswith("Invalid preferences JSON")
+
+
+def test_parse_upload_rejects_other_media_types() -> None:
+    """Test that unsupported content types raise ValueError."""
+    with pytest.raises(ValueError):
+        provisioning.parse_upload(b"<xml/>", "application/xml")
+
+
+def test_hash_passwords_in_process_pool() -> None:
+    """Test that pooled hashing returns verifiable hashes in input order."""
+    passwords = ["password-one", "password-two", "password-three"]
+    try:
+        hashes = provisioning.hash_passwords(passwords)
+    finally:
+        provisioning.shutdown_hash_pool()
+    
+    assert len(hashes) == len(passwords)
+    for password, hashed in zip(passwords, hashes):
+        assert verify_password(password, hashed)
@@ -0,0 +1,230 @@
+"""
+Unit tests for question bank deduplication, serving and LLM output parsing.
+"""
+import asyncio
+import threading
+from types import SimpleNamespace
+from uuid import uuid4
+
+from app import crud
+from app.core.minhash import lsh_buckets, signature
+from app.schemas.question_bank import BankQuestionIn
+from app.services import question_bank
+
+SLOT = {"subject": "Math", "topic": "Fractions", "grade": "3rd grade", "difficulty": "easy"}
+
+
+class FakeBank:
+    """In-memory stand-in for `crud.question_bank`."""
+    
+    def __init__(self):
+        self.rows = []
+        self.seen = {}
+        self.served = []
+        # Inserts are atomic, like the unique index they stand in for
+        self.lock = threading.Lock()
+    
+    def get_by_buckets(self, db, *, subject, topic, buckets):
+        return [
+            SimpleNamespace(**row) for row in self.rows
+            if row["subject"] == subject and row["topic"] == topic and set(row["lsh_buckets"]) & set(buckets)
+        ]
+    
+    def create_many(self, db, *, rows):
+        with self.lock:
+            return self._create_many(rows)
+    
+    def _create_many(self, rows):
+        ids = []
+        for row in rows:
+            existing = [
+                r for r in self.rows if r["topic"] == row["topic"] and r["content_hash"] == row["content_hash"]
+            ]
+            if existing:
+                ids.append(existing[0]["id"] if existing[0]["is_active"] else None)
+                continue
+            self.rows.append({"id": uuid4(), **row})
+            ids.append(self.rows[-1]["id"])
+        return ids
+    
+    def get_multi_by_slot(self, db, *, subject, topic, grade, difficulty, skip=0, limit=100):
+        return [SimpleNamespace(**row) for row in self.rows][skip:skip + limit]
+    
+    def get_seen_filter(self, db, *, child_id):
+        return self.seen.get(child_id)
+    
+    def get_seen_filter_for_update(self, db, *, child_id, empty):
+        return self.seen.setdefault(child_id, SimpleNamespace(bloom=empty, items=0))
+    
+    def increment_served(self, db, *, ids):
+        self.served.extend(ids)
+
+
+class NullSession:
+    """Session stand-in; the CRUD calls are patched in these tests."""
+    
+    def commit(self) -> None:
+        pass
+
+
+class FakeLLMClient:
+    """Returns a fixed JSON reply and counts calls."""
+    
+    def __init__(self, content: str):
+        self.content = content
+        self.calls = 0
+    
+    async def chat(self, messages, **kwargs):
+        self.calls += 1
+        return {"choices": [{"message": {"role": "assistant", "content": self.content}}]}
+
+
+def question(text: str, answer: str = "1") -> BankQuestionIn:
+    """Helper function to build an open-ended question."""
+    return BankQuestionIn(text=text, type="open_ended", correct_answer=answer)
+
+
+def test_add_questions_skips_near_duplicates(monkeypatch) -> None:
+    """Test that reworded questions with the same answer are matched, in the bank and within a batch."""
+    bank = FakeBank()
+    monkeypatch.setattr(crud, "question_bank", bank)
+    
+    first = question_bank.add_questions(
+        NullSession(), questions=[question("What is 3/4 plus 1/4? Choose the correct answer.")], **SLOT
+    )
+    second = question_bank.add_questions(NullSession(), questions=[
+        question("What is 3/4 plus 1/4? Choose the correct answer below."),
+        question("What is 3/4 plus 2/4? Choose the correct answer.", answer="5/4"),
+        question("What is 3/4 plus 2/4? Choose the correct answer below.", answer="5/4"),
+    ], **SLOT)
+    
+    assert first[0] is not None
+    assert second[0] == first[0]
+    assert second[1] not in (None, first[0])
+    assert second[2] == second[1]
+    assert len(bank.rows) == 2
+    
+    bank.rows[0]["is_active"] = False
+    third = question_bank.add_questions(
+        NullSession(), questions=[question("What is 3/4 plus 1/4? Choose the correct answer.")], **SLOT
+    )
+    assert third == [None]
+
+
+def test_add_questions_skips_concurrently_added_duplicates(monkeypatch) -> None:
+    """Test that a question another caller added since the duplicate check is matched to the existing one."""
+    bank = FakeBank()
+    monkeypatch.setattr(crud, "question_bank", bank)
+    text = "How many quarters make a whole?"
+    # Added by another quiz after this one looked for candidates
+    monkeypatch.setattr(bank, "get_by_buckets", lambda db, **kwargs: [])
+    bank.rows.append(
+        {"id": uuid4(), **SLOT, "content_hash": question_bank.content_hash(text, "4"), "is_active": True}
+    )
+    
+    ids = question_bank.add_questions(NullSession(), questions=[question(text, answer="4")], **SLOT)
+    
+    assert ids == [bank.rows[0]["id"]]
+    assert len(bank.rows) == 1
+
+
+def test_quiz_uses_bank_before_llm_and_skips_seen(monkeypatch) -> None:
+    """Test that the LLM is only called for the shortfall and served questions are not repeated."""
+    bank = FakeBank()
+    monkeypatch.setattr(crud, "question_bank", bank)
+    for i in range(3):
+        text = f"Which fraction is larger, 1/{i + 2} or 1/{i + 3}?"
+        sig = signature(text)
+        bank.rows.append({
+            "id": uuid4(), **SLOT, "text": text, "type": "open_ended", "options": None,
+            "correct_answer": f"1/{i + 2}", "content_hash": question_bank.content_hash(text, f"1/{i + 2}"),
+            "minhash": sig, "lsh_buckets": lsh_buckets(sig), "is_active": True,
+        })
+    llm = FakeLLMClient(
+        'Here you go: [{"text": "Shade 2 of 8 parts. What fraction is shaded?", "type": "open_ended", '
+        '"options": null, "correct_answer": "2/8"}, {"text": "", "type": "essay"}]'
+    )
+    child = SimpleNamespace(id=uuid4(), parent_id=uuid4(), grade=SLOT["grade"])
+    quiz = {k: v for k, v in SLOT.items() if k != "grade"}
+    
+    first = asyncio.run(question_bank.get_quiz_questions(NullSession(), llm, child=child, count=2, **quiz))
+    assert llm.calls == 0
+    assert len(first) == 2
+    
+    second = asyncio.run(question_bank.get_quiz_questions(NullSession(), llm, child=child, count=2, **quiz))
+    assert llm.calls == 1
+    assert [row["text"] for row in second][0] == bank.rows[2]["text"]
+    assert second[1]["correct_answer"] == "2/8"
+    assert second[1]["bank_question_id"] == bank.rows[3]["id"]
+    assert not {row["bank_question_id"] for row in first} & {row["bank_question_id"] for row in second}
+    assert len(bank.served) == 4
+
+
+def test_concurrent_quizzes_share_generated_questions(monkeypatch) -> None:
+    """Test that children whose quizzes generated the same questions at once both get a full quiz."""
+    bank = FakeBank()
+    monkeypatch.setattr(crud, "question_bank", bank)
+    llm = FakeLLMClient(
+        '[{"text": "What is 1/2 of 8?", "type": "open_ended", "options": null, "correct_answer": "4"},'
+        ' {"text": "What is 1/4 of 8?", "type": "open_ended", "options": null, "correct_answer": "2"}]'
+    )
+    chat = llm.chat
+    both_asked = asyncio.Event()
+    
+    async def coalesced_chat(messages, **kwargs):
+        # Both quizzes found the bank empty and share one reply, as coalesced calls do
+        if llm.calls == 1:
+            both_asked.set()
+        reply = await chat(messages, **kwargs)
+        await both_asked.wait()
+        return reply
+    
+    monkeypatch.setattr(llm, "chat", coalesced_chat)
+    quiz = {k: v for k, v in SLOT.items() if k != "grade"}
+    children = [SimpleNamespace(id=uuid4(), parent_id=uuid4(), grade=SLOT["grade"]) for _ in range(2)]
+    
+    async def run():
+        return await asyncio.gather(*(
+            question_bank.get_quiz_questions(NullSession(), llm, child=child, count=2, **quiz) for child in children
+        ))
+    
+    first, second = asyncio.run(run())
+    
+    assert llm.calls == 2
+    assert len(bank.rows) == 2
+    assert [row["bank_question_id"] for row in first] == [row["bank_question_id"] for row in second]
+    assert {row["bank_question_id"] for row in first} == {row["id"] for row in bank.rows}
+    assert len(bank.served) == 4
+
+
+def test_quiz_difficulty_defaults_to_adaptive_level(monkeypatch) -> None:
+    """Test that a quiz without a difficulty uses the child's next adaptive difficulty."""
+    bank = FakeBank()
+    monkeypatch.setattr(crud, "question_bank", bank)
+    asked = []
+    
+    def next_quiz_difficulty(db, *, child_id, subject, topic):
+        asked.append((child_id, subject, topic))
+        return "hard"
+    
+    monkeypatch.setattr(question_bank, "next_quiz_difficulty", next_quiz_difficulty)
+    llm = FakeLLMClient('[{"text": "What is 7/8 - 3/8?", "type": "open_ended", "correct_answer": "1/2"}]')
+    child = SimpleNamespace(id=uuid4(), parent_id=uuid4(), grade=SLOT["grade"])
+    
+    rows = asyncio.run(question_bank.get_quiz_questions(
+        NullSession(), llm, child=child, subject="Math", topic="Fractions", count=1
+    ))
+    
+    assert asked == [(child.id, "Math", "Fractions")]
+    assert len(rows) == 1
+    assert bank.rows[0]["difficulty"] == "hard"
+
+
+def test_parse_generated_questions_drops_invalid_items() -> None:
+    """Test parsing of LLM replies with surrounding text and malformed entries."""
+    parsed = question_bank.parse_generated_questions(
+        'Sure! [{"text": "Is 1/2 > 1/3?", "type": "true_false", "correct_answer": "true"},'
+        ' {"text": "Pick one", "type": "multiple_choice", "correct_answer": "a"}, 42]'
+    )
+    assert [q.text for q in parsed] == ["Is 1/2 > 1/3?"]
+    assert question_bank.parse_generated_questions("no json here") == []
@@ -0,0 +1,121 @@
+"""
+Unit tests for the tutor retrieval step.
+"""
+import asyncio
+from uuid import uuid4
+
+import numpy as np
+import pytest
+
+from app.core.config import settings
+from app.core.vector_index import VectorIndex
+from app.services import retrieval
+from app.services.embedding import EmbeddingBatcher
+from app.services.tutor import TutorContext
+from app.services.usage import BudgetExceeded
+
+
+class FakeBackend:
+    """Embedding backend stand-in returning a fixed embedding."""
+    billed = True
+    model = "text-embedding-ada-002"
+
+    def __init__(self, embedding=None, error=None):
+        self.embedding = embedding
+        self.error = error
+        self.calls = []
+
+    async def embed(self, texts):
+        self.calls.append(texts)
+        if self.error is not None:
+            raise self.error
+        return [self.embedding for _ in texts]
+
+
+class FakeUsage:
+    """Usage tracker stand-in with an optional exhausted budget."""
+
+    def __init__(self, exhausted=False):
+        self.exhausted = exhausted
+        self.recorded = []
+
+    def check(self, parent_id):
+        if self.exhausted:
+            raise BudgetExceeded(parent_id, 10.0, 10.0)
+
+    def record(self, parent_id, model, prompt_tokens, completion_tokens):
+        self.recorded.append(parent_id)
+
+
+def use_backend(monkeypatch, backend, usage=None) -> None:
+    """Helper function to route retrieval embeddings to a fake backend."""
+    batcher = EmbeddingBatcher(backend, max_wait_ms=0, usage=usage or FakeUsage())
+    monkeypatch.setattr(retrieval, "embedding_batcher", batcher)
+
+
+@pytest.fixture
+def index_dir(tmp_path, monkeypatch):
+    """Small index of three snippets with orthogonal embeddings."""
+    vectors = np.eye(3, 8)
+    docs = [
+        {"text": "Fractions: the denominator counts equal parts.", "subject": "Math"},
+        {"text": "Plants make food by photosynthesis.", "subject": "Science"},
+        {"text": "A noun names a person, place or thing.", "subject": None},
+    ]
+    VectorIndex.create(tmp_path, vectors, docs, nlist=1)
+    monkeypatch.setattr(settings, "RETRIEVAL_INDEX_DIR", str(tmp_path))
+    monkeypatch.setattr(retrieval, "_index", None)
+    return tmp_path
+
+
+def test_retrieval_filters_by_subject_and_score(index_dir) -> None:
+    """Test that only close snippets of the session subject (or no subject) are returned."""
+    assert [doc["text"] for doc in retrieval.search(np.eye(1, 8)[0], subject="math")] == [
+        "Fractions: the denominator counts equal parts."
+    ]
+    assert retrieval.search(np.eye(1, 8, 1)[0], subject="Math") == []
+    assert retrieval.search(np.eye(1, 8, 3)[0], subject="Math") == []
+    assert len(retrieval.search(np.eye(1, 8, 2)[0], subject="Math")) == 1
+
+
+def test_reference_for_builds_system_message(index_dir, monkeypatch) -> None:
+    """Test the retrieval step end to end, including its place in the prompt."""
+    parent_id = uuid4()
+    context = TutorContext(uuid4(), "You are a tutor.", parent_id=parent_id, subject="Math")
+    backend, usage = FakeBackend(embedding=np.eye(1, 8)[0].tolist()), FakeUsage()
+    use_backend(monkeypatch, backend, usage)
+
+    reference = asyncio.run(retrieval.reference_for(context, "What is a denominator?"))
+    assert "denominator counts equal parts" in reference
+    assert backend.calls == [["What is a denominator?"]]
+    assert usage.recorded == [parent_id]
+
+    messages = context.prompt("What is a denominator?", reference)
+    assert [m["role"] for m in messages] == ["system", "system", "user"]
+    assert context.prompt("Hi") == [
+        {"role": "system", "content": "You are a tutor."}, {"role": "user", "content": "Hi"}
+    ]
+
+
+def test_reference_for_errors(index_dir, monkeypatch) -> None:
+    """Test that embedding failures are ignored but an exhausted budget is not."""
+    context = TutorContext(uuid4(), "You are a tutor.", parent_id=uuid4(), subject="Math")
+    use_backend(monkeypatch, FakeBackend(error=RuntimeError("backend down")))
+    assert asyncio.run(retrieval.reference_for(context, "?")) is None
+
+    backend = FakeBackend(embedding=np.eye(1, 8)[0].tolist())
+    use_backend(monkeypatch, backend, FakeUsage(exhausted=True))
+    with pytest.raises(BudgetExceeded):
+        asyncio.run(retrieval.reference_for(context, "?"))
+    assert backend.calls == []
+
+
+def test_retrieval_disabled_without_index(monkeypatch) -> None:
+    """Test that no embedding is requested when no index is configured."""
+    monkeypatch.setattr(settings, "RETRIEVAL_INDEX_DIR", None)
+    monkeypatch.setattr(retrieval, "_index", None)
+    backend = FakeBackend()
+    use_backend(monkeypatch, backend)
+    context = TutorContext(uuid4(), "You are a tutor.")
+    assert asyncio.run(retrieval.reference_for(context, "Hi")) is None
+    assert backend.calls == []
@@ -0,0 +1,112 @@
+"""
+Unit tests for the Aho-Corasick matcher and the reply safety filter.
+"""
+import random
+
+import pytest
+
+from app.core.aho_corasick import Automaton
+from app.core.config import settings
+from app.services.safety import ContentFilter, load_terms
+
+
+@pytest.fixture
+def safety(tmp_path) -> ContentFilter:
+    """Filter over a small term list."""
+    path = tmp_path / "terms.txt"
+    path.write_text(
+        "# test terms\n"
+        "[profanity mask]\n"
+        "darn\n"
+        "heck\n"
+        "[grooming block]\n"
+        "don't tell your parents\n"
+    )
+    return ContentFilter(path)
+
+
+def test_automaton_finds_overlapping_matches_across_chunks() -> None:
+    """Test all occurrences are reported, also when a pattern spans chunk boundaries."""
+    automaton = Automaton([("he", "he"), ("she", "she"), ("his", "his"), ("hers", "hers")])
+    _, whole = automaton.scan("ushers")
+    assert sorted(whole) == [(4, 2, "he"), (4, 3, "she"), (6, 4, "hers")]
+    
+    state, matches = 0, []
+    for offset, char in enumerate("ushers"):
+        state, found = automaton.scan(char, state, offset)
+        matches.extend(found)
+    assert sorted(matches) == sorted(whole)
+    assert automaton.max_length == 4
+
+
+def test_masks_whole_words_only(safety: ContentFilter) -> None:
+    """Test case-insensitive masking that leaves longer words containing a term alone."""
+    text, checked = safety.filter_text("Darn, that heckling was a HECK of a mess. darned")
+    assert text == "****, that heckling was a **** of a mess. darned"
+    assert [match.term.text for match in checked.matches] == ["darn", "heck"]
+    assert checked.blocked is None
+
+
+def test_block_replaces_reply(safety: ContentFilter) -> None:
+    """Test that a block term yields the fallback reply, including typographic apostrophes."""
+    text, checked = safety.filter_text("This is fun. Don’t tell your parents about it!")
+    assert text == settings.SAFETY_FALLBACK_REPLY
+    assert checked.blocked.term.category == "grooming"
+
+
+def test_stream_matches_whole_text_for_any_chunking(safety: ContentFilter) -> None:
+    """Test that streamed output equals filtering the whole reply, however it is split."""
+    reply = "Well darn it, the hecklers said heck twice: heck! Darn. That's all, darn"
+    expected, _ = safety.filter_text(reply)
+    rng = random.Random(0)
+    for _ in range(50):
+        stream, output, position = safety.stream(), [], 0
+        while position < len(reply):
+            size = rng.randint(1, 6)
+            output.append(stream.feed(reply[position:position + size]))
+            position += size
+        output.append(stream.finish())
+        assert "".join(output) == expected
+
+
+def test_stream_holds_back_only_a_short_window(safety: ContentFilter) -> None:
+    """Test that text is released as soon as no term can start in it."""
+    stream = safety.stream()
+    hold = stream._hold
+    released = stream.feed("The volcano erupted in 1980 after weeks of small quakes")
+    assert len(released) == len("The volcano erupted in 1980 after weeks of small quakes") - hold
+    
+    blocked = safety.stream()
+    prefix = "That was a great answer about volcanoes. "
+    assert blocked.feed(prefix + "But don't tell ") == prefix[:len(prefix) + 15 - hold]
+    assert blocked.feed("your parents.") == ""
+    assert blocked.blocked is not None
+    assert blocked.finish() == ""
+
+
+def test_bundled_term_list_loads() -> None:
+    """Test that the shipped term list parses and compiles."""
+    terms = load_terms(ContentFilter().path)
+    assert {term.action for term in terms} == {"mask", "block"}
+    assert ContentFilter().automaton.pattern_count == len(terms)
+
+
+@pytest.mark.parametrize("reply", [
+    "Practice every day and you will get high scores on your spelling test.",
+    "Be careful not to cut yourself with scissors.",
+    "Warm up first so you don't hurt yourself when you run.",
+    "Cells have two main ways to die: apoptosis and necrosis.",
+])
+def test_bundled_term_list_allows_lesson_phrases(reply) -> None:
+    """Test that ordinary lesson sentences are not blocked by the shipped term list."""
+    text, checked = ContentFilter().filter_text(reply)
+    assert text == reply
+    assert checked.blocked is None
+
+
+def test_malformed_term_list(tmp_path) -> None:
+    """Test that an unknown action is rejected."""
+    path = tmp_path / "terms.txt"
+    path.write_text("[profanity hide]\ndarn\n")
+    with pytest.raises(ValueError):
+        load_terms(path)
@@ -0,0 +1,128 @@
+"""
+Tests for idle session completion and post-session follow-ups.
+"""
+import asyncio
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+from sqlalchemy.orm import Session
+
+from app import crud
+from app.core.config import settings
+from app.models.child import Child
+from app.models.session import Message, Session as LearningSession, SessionFollowUp, SessionStatus
+from app.schemas.user import UserCreate
+from app.services import session_lifecycle
+
+
+class FakeLLM:
+    """LLM client stand-in returning a fixed summary."""
+    
+    def __init__(self):
+        self.calls = []
+    
+    async def chat(self, messages, *, parent_id=None, **kwargs):
+        self.calls.append((messages, parent_id))
+        return {"choices": [{"message": {"content": " Worked on fractions. \n"}}]}
+
+
+def _child(db: Session) -> Child:
+    parent = crud.user.create(db, obj_in=UserCreate(
+        email=f"parent-{uuid4()}@example.com", password="testpass123", name="Test Parent"
+    ))
+    child = Child(name="Lifecycle Child", grade="3rd grade", subjects=["Math"], parent_id=parent.id)
+    db.add(child)
+    db.flush()
+    return child
+
+
+def test_retry_delay_doubles() -> None:
+    """Test that each failed attempt doubles the retry delay."""
+    base = settings.SESSION_FOLLOW_UP_RETRY_SECONDS
+    
+    assert [session_lifecycle.retry_delay(n).total_seconds() for n in (1, 2, 3)] == [base, 2 * base, 4 * base]
+
+
+def test_complete_idle_sessions(db: Session) -> None:
+    """Test that only idle sessions are completed, ending at their last message, with a follow-up each."""
+    child = _child(db)
+    started = datetime.utcnow() - timedelta(hours=3)
+    idle = LearningSession(subject="Math", topic="Fractions", child_id=child.id, created_at=started)
+    busy = LearningSession(subject="Math", topic="Decimals", child_id=child.id, created_at=started)
+    empty = LearningSession(subject="Math", topic="Shapes", child_id=child.id, created_at=started)
+    db.add_all([idle, busy, empty])
+    db.flush()
+    last_idle_message = started + timedelta(minutes=20)
+    db.add_all([
+        Message(content="What is a half?", role="user", session_id=idle.id, created_at=started + timedelta(minutes=1)),
+        Message(content="One of two parts.", role="assistant", session_id=idle.id, created_at=last_idle_message),
+        Message(content="And a tenth?", role="user", session_id=busy.id, created_at=datetime.utcnow()),
+    ])
+    db.commit()
+    
+    completed = session_lifecycle.complete_idle_sessions(db, idle_minutes=30, batch_size=1)
+    
+    assert completed == 2
+    db.expire_all()
+    assert (idle.status, idle.ended_at) == (SessionStatus.COMPLETED, last_idle_message)
+    assert (empty.status, empty.ended_at) == (SessionStatus.COMPLETED, started)
+    assert busy.status == SessionStatus.ACTIVE
+    assert crud.session.get_active_by_child(db, child_id=child.id).id == busy.id
+    assert {f.session_id for f in db.query(SessionFollowUp).all()} >= {idle.id, empty.id}
+
+
+def test_process_follow_ups(db: Session) -> None:
+    """Test that follow-ups count messages, add subject progress, store a summary and are removed."""
+    child = _child(db)
+    started = datetime.utcnow() - timedelta(hours=3)
+    session = LearningSession(subject="Math", topic="Fractions", child_id=child.id, created_at=started)
+    db.add(session)
+    db.flush()
+    for i in range(4):
+        db.add(Message(content=f"Step {i}", role="user", session_id=session.id, created_at=started + timedelta(minutes=5 * i)))
+    db.commit()
+    session_lifecycle.complete_idle_sessions(db, idle_minutes=30)
+    llm = FakeLLM()
+    
+    asyncio.run(session_lifecycle.process_follow_ups(db, batch_size=100, llm=llm))
+    
+    db.expire_all()
+    assert session.message_count == 4
+    assert session.summary == "Worked on fractions."
+    assert llm.calls[0][1] == child.parent_id
+    [progress] = crud.progress.get_by_child(db, child_id=child.id)
+    assert (progress.subject, progress.sessions_completed, progress.messages) == ("Math", 1, 4)
+    assert progress.minutes == 15
+    assert db.query(SessionFollowUp).filter(SessionFollowUp.session_id == session.id).count() == 0
+
+
+def test_follow_ups_commit_one_at_a_time(db: Session, monkeypatch) -> None:
+    """Test that each follow-up is committed before the next is claimed, so an LLM call holds one lock."""
+    child = _child(db)
+    started = datetime.utcnow() - timedelta(hours=3)
+    sessions = [LearningSession(subject="Math", topic="Fractions", child_id=child.id, created_at=started) for _ in range(2)]
+    db.add_all(sessions)
+    db.flush()
+    for session in sessions:
+        db.add(Message(content="Why?", role="user", session_id=session.id, created_at=started))
+    db.commit()
+    session_lifecycle.complete_idle_sessions(db, idle_minutes=30)
+    events = []
+    claim, commit = crud.session.claim_follow_ups, db.commit
+    
+    def claim_follow_ups(db, *, limit):
+        claimed = claim(db, limit=limit)
+        events.append(f"claim {len(claimed)}")
+        return claimed
+    
+    class RecordingLLM(FakeLLM):
+        async def chat(self, messages, *, parent_id=None, **kwargs):
+            events.append("chat")
+            return await super().chat(messages, parent_id=parent_id, **kwargs)
+    
+    monkeypatch.setattr(crud.session, "claim_follow_ups", claim_follow_ups)
+    monkeypatch.setattr(db, "commit", lambda: (events.append("commit"), commit()))
+    
+    asyncio.run(session_lifecycle.process_follow_ups(db, batch_size=100, llm=RecordingLLM()))
+    
+    assert events == ["claim 1", "chat", "commit", "claim 1", "chat", "commit", "claim 0"]
@@ -0,0 +1,104 @@
+"""
+Unit tests for the adaptive difficulty skill model.
+"""
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from uuid import uuid4
+
+import numpy as np
+import pytest
+
+from app.services import skill
+from app.services.skill import (
+    DIFFICULTY_LEVELS,
+    SkillParams,
+    choose_difficulty,
+    difficulty_value,
+    record_attempt,
+    recompute,
+    step_size,
+    update,
+)
+
+PARAMS = SkillParams(k_initial=0.6, k_min=0.1, k_decay=0.1)
+
+
+def test_update_moves_rating_towards_outcome() -> None:
+    """Test that correct answers raise the rating, wrong ones lower it, and surprises count more."""
+    up, answers = update(0.0, 0, DIFFICULTY_LEVELS["medium"], True, PARAMS)
+    down, _ = update(0.0, 0, DIFFICULTY_LEVELS["medium"], False, PARAMS)
+    assert answers == 1
+    assert up == pytest.approx(0.3)
+    assert down == pytest.approx(-0.3)
+    
+    easy, _ = update(0.0, 0, DIFFICULTY_LEVELS["easy"], True, PARAMS)
+    hard, _ = update(0.0, 0, DIFFICULTY_LEVELS["hard"], True, PARAMS)
+    assert 0 < easy < hard
+
+
+def test_step_size_decays_to_floor() -> None:
+    """Test that later answers move an estimate less, down to k_min."""
+    assert step_size(0, PARAMS) == pytest.approx(0.6)
+    assert step_size(10, PARAMS) == pytest.approx(0.3)
+    assert step_size(1000, PARAMS) == pytest.approx(0.1)
+
+
+def test_choose_difficulty_follows_rating() -> None:
+    """Test that the next quiz gets harder as the rating grows."""
+    assert choose_difficulty(None) == "medium"
+    assert choose_difficulty(-2.0) == "easy"
+    assert choose_difficulty(0.0) == "medium"
+    assert choose_difficulty(2.0) == "hard"
+
+
+def test_difficulty_value_accepts_free_strings() -> None:
+    """Test mapping of the free-form Quiz.difficulty, with unknown levels treated as medium."""
+    assert difficulty_value(" Hard ") == DIFFICULTY_LEVELS["hard"]
+    assert difficulty_value("tricky") == DIFFICULTY_LEVELS["medium"]
+    assert difficulty_value(None) == DIFFICULTY_LEVELS["medium"]
+
+
+def test_recompute_matches_incremental_updates() -> None:
+    """Test that the vectorized replay gives the same estimates as applying answers one by one."""
+    rng = np.random.default_rng(0)
+    n_groups = 50
+    groups = rng.integers(0, n_groups - 1, size=2000)  # the last group has no answers
+    difficulties = rng.choice(list(DIFFICULTY_LEVELS.values()), size=groups.size)
+    correct = rng.random(groups.size) < 0.6
+    
+    expected = [(PARAMS.initial_rating, 0)] * n_groups
+    for group, difficulty, is_correct in zip(groups, difficulties, correct):
+        expected[group] = update(*expected[group], difficulty, bool(is_correct), PARAMS)
+    
+    ratings, counts = recompute(groups, difficulties, correct, n_groups, PARAMS)
+    assert ratings == pytest.approx([rating for rating, _ in expected])
+    assert counts.tolist() == [answers for _, answers in expected]
+    assert ratings[-1] == PARAMS.initial_rating
+
+
+def test_recompute_without_history() -> None:
+    """Test that an empty history yields initial estimates."""
+    ratings, counts = recompute([], [], [], 3, PARAMS)
+    assert ratings.tolist() == [0.0, 0.0, 0.0]
+    assert counts.tolist() == [0, 0, 0]
+
+
+def test_record_attempt_skips_answers_already_replayed(monkeypatch) -> None:
+    """Test that answers a recompute already counted are not applied again."""
+    now = datetime.utcnow()
+    estimate = SimpleNamespace(rating=0.5, answers=3, last_answer_at=now)
+    monkeypatch.setattr(skill.crud.skill, "get_for_update", lambda db, **kwargs: estimate)
+    db = SimpleNamespace(commit=lambda: None)
+    attempt = SimpleNamespace(
+        child_id=uuid4(),
+        quiz=SimpleNamespace(subject="Math", topic="Fractions", difficulty="medium"),
+        answers=[
+            SimpleNamespace(is_correct=True, created_at=now - timedelta(seconds=1)),
+            SimpleNamespace(is_correct=False, created_at=now + timedelta(seconds=1)),
+        ],
+    )
+    
+    record_attempt(db, attempt=attempt, params=PARAMS)
+    
+    assert (estimate.rating, estimate.answers) == update(0.5, 3, difficulty_value("medium"), False, PARAMS)
+    assert estimate.last_answer_at == now + timedelta(seconds=1)
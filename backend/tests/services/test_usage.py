@@ -0,0 +1,96 @@
+"""
+Unit tests for LLM usage accounting and budget enforcement.
+"""
+from uuid import uuid4
+
+import pytest
+
+from app import crud
+from app.services.usage import BudgetExceeded, UsageTracker, estimate_cost
+
+
+class NullSession:
+    """Session stand-in; the CRUD calls are patched in these tests."""
+    
+    def rollback(self) -> None:
+        pass
+    
+    def close(self) -> None:
+        pass
+
+
+def make_tracker() -> UsageTracker:
+    """Helper function to build a tracker without background flushing."""
+    return UsageTracker(NullSession, flush_interval=3600, refresh_interval=3600)
+
+
+def test_estimate_cost_matches_model_prefix() -> None:
+    """Test pricing by the longest matching model prefix, with a conservative fallback."""
+    assert estimate_cost("gpt-3.5-turbo-0613", 1000, 1000) == pytest.approx(0.0035)
+    assert estimate_cost("gpt-4o-mini", 1000, 0) == pytest.approx(0.00015)
+    assert estimate_cost("unknown-model", 1000, 1000) == pytest.approx(0.09)
+
+
+def test_budget_is_enforced_from_cache(monkeypatch) -> None:
+    """Test that checks use cached spending plus usage recorded since the refresh."""
+    parent_id = uuid4()
+    calls = []
+    
+    def fake_get_spend_and_budget(db, *, parent_id, since):
+        calls.append(parent_id)
+        return 0.99, 1.0
+    
+    monkeypatch.setattr(crud.usage, "get_spend_and_budget", fake_get_spend_and_budget)
+    monkeypatch.setattr(crud.usage, "add_increments", lambda db, *, increments: None)
+    tracker = make_tracker()
+    
+    # Unknown parents are allowed while their budget loads in the background
+    tracker.check(parent_id)
+    tracker._refresher.shutdown(wait=True)
+    tracker._refresher = None
+    assert calls == [parent_id]
+    
+    # Still under budget, then over it once this call's cost is added locally
+    tracker.check(parent_id)
+    tracker.record(parent_id, "gpt-4", 1000, 0)
+    with pytest.raises(BudgetExceeded):
+        tracker.check(parent_id)
+    # No further database reads while the cache is fresh
+    assert calls == [parent_id]
+    tracker.stop()
+
+
+def test_refresh_includes_unflushed_usage(monkeypatch) -> None:
+    """Test that a refresh adds usage not yet written to the database."""
+    parent_id = uuid4()
+    monkeypatch.setattr(crud.usage, "get_spend_and_budget", lambda db, **kwargs: (0.5, None))
+    monkeypatch.setattr(crud.usage, "add_increments", lambda db, *, increments: None)
+    tracker = make_tracker()
+    tracker.record(parent_id, "gpt-4", 1000, 0)
+    tracker.refresh(parent_id)
+    
+    assert tracker._budgets[parent_id].spent == pytest.approx(0.53)
+    tracker.stop()
+
+
+def test_flush_aggregates_and_retries_on_failure(monkeypatch) -> None:
+    """Test that counters are aggregated per key and kept when a flush fails."""
+    parent_id = uuid4()
+    written = []
+    
+    def failing_add_increments(db, *, increments):
+        raise RuntimeError("database down")
+    
+    tracker = make_tracker()
+    tracker.record(parent_id, "gpt-3.5-turbo", 100, 20)
+    tracker.record(parent_id, "gpt-3.5-turbo", 50, 10)
+    
+    monkeypatch.setattr(crud.usage, "add_increments", failing_add_increments)
+    tracker.flush()
+    
+    monkeypatch.setattr(crud.usage, "add_increments", lambda db, *, increments: written.extend(increments))
+    tracker.stop()
+    
+    [row] = written
+    assert row["parent_id"] == parent_id
+    assert (row["requests"], row["prompt_tokens"], row["completion_tokens"]) == (2, 150, 30)
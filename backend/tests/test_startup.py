@@ -0,0 +1,36 @@
+"""
+Tests guarding application startup cost.
+"""
+import os
+import subprocess
+import sys
+
+from app.main import create_app
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Heavy AI/ML dependencies that must only be imported on first use
+HEAVY_MODULES = ["openai", "langchain", "numpy", "zstandard"]
+
+
+def test_app_import_does_not_load_ai_dependencies() -> None:
+    """Test that importing the app does not import heavy AI dependencies."""
+    code = (
+        "import sys, app.main; "
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=BACKEND_DIR, capture_output=True, text=True
+    )
+    
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == ""
+
+
+def test_create_app_without_ai_features() -> None:
+    """Test that a minimal app can be built for non-AI workers."""
+    application = create_app(enable_ai=False)
+    paths = {route.path for route in application.routes}
+    
+    assert "/health" in paths
+    assert any(path.startswith("/api/v1/children") for path in paths)
@@ -0,0 +1,5 @@
+#!/bin/bash
+# Allow streaming replication connections for the local read replica.
+# Runs once, when the primary's data directory is first initialized.
+set -e
+echo "host replication all all scram-sha-256" >> "$PGDATA/pg_hba.conf"